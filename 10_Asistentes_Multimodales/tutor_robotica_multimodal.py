@@ -12,6 +12,8 @@ Características:
 - Herramientas especializadas para conceptos de robótica
 """
 
+from __future__ import annotations  # Las anotaciones con Image.Image no importan PIL
+
 # ============================================================================
 # IMPORTACIONES NECESARIAS
 # ============================================================================
@@ -23,36 +25,56 @@ from io import BytesIO
 from typing import Dict, List, Optional, Tuple
 import base64
 
-# Librerías principales
+import importlib.util
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+# Librerías principales. openai, gradio, PIL y requests se importan al usarse:
+# el módulo se importa al instante y la validación se hace en main()
 from dotenv import load_dotenv
-from openai import OpenAI
-import gradio as gr
-from PIL import Image
-import requests
-
-# Librerías de audio
-try:
-    from pydub import AudioSegment
-    from pydub.playback import play
-    AUDIO_AVAILABLE = True
-except ImportError:
-    AUDIO_AVAILABLE = False
-    print("⚠️ Librerías de audio no disponibles. Funcionalidad de audio limitada.")
+
+# Hacer importable el paquete compartido `comun` de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comun.contabilidad_tokens import registrar_llamada, uso_openai
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Librerías de audio (solo se comprueba que estén instaladas)
+AUDIO_AVAILABLE = importlib.util.find_spec("pydub") is not None
 
 # ============================================================================
 # CONFIGURACIÓN INICIAL
 # ============================================================================
 load_dotenv()
-api_key = os.getenv('OPENAI_API_KEY')
 
-if api_key and api_key.startswith('sk-'):
-    print("✓ API Key de OpenAI configurada correctamente")
-else:
+MODEL = 'gpt-4o-mini'
+_openai = None   # Cliente de OpenAI, se crea en el primer uso
+
+def verificar_configuracion() -> bool:
+    """
+    Verifica la API key de OpenAI y avisa si faltan librerías de audio.
+    
+    Returns:
+        bool: True si la API key está configurada
+    """
+    if not AUDIO_AVAILABLE:
+        print("⚠️ Librerías de audio no disponibles. Funcionalidad de audio limitada.")
+    api_key = os.getenv('OPENAI_API_KEY')
+    if api_key and api_key.startswith('sk-'):
+        print("✓ API Key de OpenAI configurada correctamente")
+        return True
     print("❌ Error: API Key de OpenAI no configurada")
-    exit(1)
+    return False
 
-MODEL = 'gpt-4o-mini'
-openai = OpenAI()
+def get_openai():
+    """Devuelve el cliente de OpenAI, creándolo en el primer uso."""
+    global _openai
+    if _openai is None:
+        from openai import OpenAI
+        _openai = OpenAI()
+    return _openai
 
 # ============================================================================
 # CONFIGURACIÓN EDUCATIVA
@@ -140,13 +162,16 @@ def generar_imagen_educativa(tema: str, nivel: str, descripcion_especifica: str
         
         print(f"🎨 Generando imagen para {tema} (nivel {nivel})...")
         
-        response = openai.images.generate(
+        response = get_openai().images.generate(
             model='dall-e-3',
             prompt=prompt,
             size='1024x1024',
             n=1,
         )
         
+        import requests
+        from PIL import Image
+        
         image_url = response.data[0].url
         img_response = requests.get(image_url)
         image = Image.open(BytesIO(img_response.content))
@@ -175,7 +200,7 @@ def generar_audio_educativo(texto: str, velocidad: str = "normal") -> Optional[s
         # Seleccionar voz apropiada para educación
         voice = "nova"  # Voz clara y amigable para educación
         
-        response = openai.audio.speech.create(
+        response = get_openai().audio.speech.create(
             model="tts-1",
             voice=voice,
             input=texto,
@@ -498,12 +523,14 @@ INSTRUCCIONES:
             ]
             
             # Primera llamada a OpenAI
-            response = openai.chat.completions.create(
-                model=MODEL,
-                messages=mensajes,
-                tools=herramientas_educativas,
-                temperature=0.7
-            )
+            with registrar_llamada("openai", MODEL, "respuesta") as llamada:
+                response = get_openai().chat.completions.create(
+                    model=MODEL,
+                    messages=mensajes,
+                    tools=herramientas_educativas,
+                    temperature=0.7
+                )
+                llamada.registrar_uso(uso_openai(response.usage))
             
             imagen_resultado = None
             audio_resultado = None
@@ -541,11 +568,13 @@ INSTRUCCIONES:
                     mensajes.append(respuesta_herramienta)
                 
                 # Segunda llamada para generar respuesta final
-                response = openai.chat.completions.create(
-                    model=MODEL,
-                    messages=mensajes,
-                    temperature=0.7
-                )
+                with registrar_llamada("openai", MODEL, "respuesta_herramienta") as llamada:
+                    response = get_openai().chat.completions.create(
+                        model=MODEL,
+                        messages=mensajes,
+                        temperature=0.7
+                    )
+                    llamada.registrar_uso(uso_openai(response.usage))
             
             respuesta_texto = response.choices[0].message.content
             
@@ -591,6 +620,7 @@ INSTRUCCIONES:
 
 def crear_interfaz_gradio():
     """Crea la interfaz web multimodal con Gradio."""
+    import gradio as gr  # Importación diferida: solo al construir la interfaz
     
     # Inicializar tutor
     tutor = TutorRoboticaMultimodal()
@@ -716,6 +746,8 @@ def crear_interfaz_gradio():
 def main():
     """Función principal para ejecutar el tutor multimodal."""
     print("🚀 Iniciando Tutor de Robótica Multimodal...")
+    if not verificar_configuracion():
+        exit(1)
     
     # Crear y lanzar interfaz
     interfaz = crear_interfaz_gradio()
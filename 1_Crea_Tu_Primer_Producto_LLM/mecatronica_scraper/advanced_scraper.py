@@ -6,11 +6,17 @@ Provides enhanced web scraping capabilities with AI analysis support
 
 import requests
 from bs4 import BeautifulSoup
+import sys
 import time
 import random
+from pathlib import Path
 from typing import Dict, List, Optional
 import json
 
+# Make the repository-wide `comun` package importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from comun.http_client import get_default_client
+
 class AdvancedWebScraper:
     """
     Advanced web scraper with enhanced capabilities
@@ -26,18 +32,16 @@ class AdvancedWebScraper:
         """
         self.headless = headless
         self.enable_ai_analysis = enable_ai_analysis
-        self.session = requests.Session()
         
-        # Set up headers to mimic a real browser
+        # Shared HTTP client: pooled connections, timeouts, retries and body size limits
+        self.client = get_default_client()
+        
+        # Extra headers sent on top of the shared client's browser-like defaults
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
-        self.session.headers.update(self.headers)
     
     def get_page_content(self, url: str, wait_time: float = 1.0) -> Optional[BeautifulSoup]:
         """
@@ -54,7 +58,7 @@ class AdvancedWebScraper:
             # Add random delay to avoid being blocked
             time.sleep(random.uniform(0.5, wait_time))
             
-            response = self.session.get(url, timeout=10)
+            response = self.client.get(url, headers=self.headers)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -229,5 +233,9 @@ class AdvancedWebScraper:
         }
     
     def close(self):
-        """Close the scraper session"""
-        self.session.close()
\ No newline at end of file
+        """
+        Close the scraper.
+        
+        The HTTP connection pool is shared with other scrapers in the process,
+        so it is left open for them to reuse.
+        """
\ No newline at end of file
@@ -15,30 +15,75 @@ Este script utiliza web scraping y OpenAI GPT para:
 # IMPORTACIONES NECESARIAS
 # ============================================================================
 import os                    # Para variables de entorno
-import requests             # Para realizar peticiones HTTP a sitios web
+import sys                  # Para importar los módulos compartidos del repositorio
+import asyncio              # Para la API asíncrona de streaming
 import json                 # Para manejar respuestas JSON de OpenAI
+from pathlib import Path            # Para localizar la raíz del repositorio
 from dotenv import load_dotenv      # Para cargar variables de entorno desde .env
-from bs4 import BeautifulSoup       # Para parsear y extraer contenido HTML
-from openai import OpenAI           # Cliente oficial de OpenAI
+from site_discovery import get_site, get_site_index  # robots.txt, Crawl-delay y sitemap por dominio
+from streaming_parser import header_charset, parse_stream  # Parser HTML incremental
+
+# Hacer importable el paquete compartido `comun` de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from comun.http_client import get_default_client, iter_body  # Cliente HTTP con pool, timeouts y reintentos
+from comun.contabilidad_tokens import registrar_llamada, uso_openai  # Tokens, latencia y costo por llamada
 
 # ============================================================================
 # CONFIGURACIÓN INICIAL Y VALIDACIÓN
 # ============================================================================
 
 # Cargar variables de entorno desde el archivo .env
+# (la clave de API se valida en main() con verificar_api_key(), no al importar)
 load_dotenv()
-api_key = os.getenv('OPENAI_API_KEY')
 
-# Validar que la clave API de OpenAI esté configurada correctamente
-if api_key and api_key[:8] == 'sk-proj-':
-    print("✓ La clave de API parece buena")
-else:
-    print("❌ Puede haber un problema con tu clave API")
-    exit(1)  # Terminar el programa si no hay API key válida
+# Máximo de URLs del sitemap que se ofrecen al modelo para elegir enlaces
+MAX_SITEMAP_LINKS = 150
+
+# Límites por página: bytes descargados, caracteres de texto extraídos y
+# enlaces recogidos (el prompt final se trunca a 20.000 caracteres, no tiene
+# sentido leer más texto; tras el texto solo se sigue leyendo hasta tener los
+# enlaces de la página, que el modelo filtra junto a los del sitemap)
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+MAX_PAGE_TEXT_CHARS = 10_000
+MAX_PAGE_LINKS = 50
 
 # Configuración del modelo de OpenAI a utilizar
 MODEL = 'gpt-5-nano'   # Modelo eficiente y económico para esta tarea
-openai = OpenAI()      # Inicializar el cliente de OpenAI
+
+# Clientes de OpenAI: se importan y crean en el primer uso para que importar
+# este módulo (desde el servidor o desde otros scripts) sea instantáneo
+_openai = None         # Cliente síncrono
+_async_openai = None   # Cliente asíncrono compartido por todos los streams concurrentes
+
+def verificar_api_key():
+    """
+    Valida que la clave API de OpenAI esté configurada correctamente.
+    
+    Returns:
+        bool: True si la clave parece válida
+    """
+    api_key = os.getenv('OPENAI_API_KEY')
+    if api_key and api_key[:8] == 'sk-proj-':
+        print("✓ La clave de API parece buena")
+        return True
+    print("❌ Puede haber un problema con tu clave API")
+    return False
+
+def get_openai():
+    """Devuelve el cliente síncrono de OpenAI, creándolo en el primer uso."""
+    global _openai
+    if _openai is None:
+        from openai import OpenAI
+        _openai = OpenAI()
+    return _openai
+
+def get_async_openai():
+    """Devuelve el cliente asíncrono de OpenAI, creándolo en el primer uso."""
+    global _async_openai
+    if _async_openai is None:
+        from openai import AsyncOpenAI
+        _async_openai = AsyncOpenAI()
+    return _async_openai
 
 # ============================================================================
 # CLASE PARA MANEJO DE SITIOS WEB
@@ -49,8 +94,9 @@ class Website:
     Clase utilitaria para representar y procesar un sitio web.
     
     Esta clase se encarga de:
-    - Descargar el contenido HTML de una URL
-    - Extraer el texto limpio (sin scripts, estilos, etc.)
+    - Respetar robots.txt (Disallow y Crawl-delay) del dominio de la URL
+    - Descargar el contenido HTML de una URL en streaming, con límite de tamaño
+    - Extraer el texto limpio (sin scripts, estilos, etc.) hasta un presupuesto
     - Obtener todos los enlaces de la página
     - Proporcionar métodos para acceder al contenido procesado
     """
@@ -61,34 +107,36 @@ class Website:
         
         Args:
             url (str): La URL del sitio web a procesar
+
+        Raises:
+            PermissionError: Si robots.txt no permite descargar la URL
         """
         self.url = url
+
+        # Mismas reglas y pausas que el descubrimiento de páginas del dominio
+        site = get_site(url)
+        if not site.prepare_fetch(url):
+            raise PermissionError(f"robots.txt no permite descargar {url}")
         
-        # Realizar petición HTTP para obtener el contenido de la página
-        response = requests.get(url)
-        self.body = response.content
-        
-        # Crear objeto BeautifulSoup para parsear el HTML
-        soup = BeautifulSoup(self.body, 'html.parser')
+        # Descargar y parsear la página en streaming con el cliente compartido:
+        # la lectura se corta al llegar a MAX_PAGE_BYTES o en cuanto se reúnen
+        # el texto y los enlaces necesarios, así que el tamaño de la página no importa
+        with get_default_client().stream(url, headers={"User-Agent": site.user_agent}) as response:
+            parser = parse_stream(
+                iter_body(response, MAX_PAGE_BYTES, truncate=True),
+                header_encoding=header_charset(response.headers.get('Content-Type')),
+                max_text_chars=MAX_PAGE_TEXT_CHARS,
+                max_links=MAX_PAGE_LINKS
+            )
         
         # Extraer el título de la página (si existe)
-        self.title = soup.title.string if soup.title else "Sin título"
+        self.title = parser.title.strip() if parser.title else "Sin título"
         
-        # Procesar el contenido del body
-        if soup.body:
-            # Eliminar elementos irrelevantes para el análisis de texto
-            for irrelevant in soup.body(["script", "style", "img", "input"]):
-                irrelevant.decompose()  # Remover completamente estos elementos
-            
-            # Extraer texto limpio con saltos de línea como separadores
-            self.text = soup.body.get_text(separator="\n", strip=True)
-        else:
-            self.text = ""
+        # Texto limpio del body (sin scripts, estilos, etc.), un fragmento por línea
+        self.text = parser.text
         
-        # Extraer todos los enlaces (href) de la página
-        links = [link.get('href') for link in soup.find_all('a')]
-        # Filtrar enlaces vacíos o None
-        self.links = [link for link in links if link]
+        # Enlaces (href) de la página, como máximo MAX_PAGE_LINKS
+        self.links = parser.links
 
     def get_contents(self):
         """
@@ -247,7 +295,7 @@ CONFIGURACIÓN DE IDIOMA:
 # FUNCIONES PARA PROCESAMIENTO DE ENLACES
 # ============================================================================
 
-def get_links_user_prompt(website):
+def get_links_user_prompt(website, sitemap_links=None):
     """
     Genera el prompt del usuario para obtener enlaces relevantes.
     
@@ -256,26 +304,53 @@ def get_links_user_prompt(website):
     
     Args:
         website (Website): Objeto Website con los enlaces extraídos
+        sitemap_links (list): URLs adicionales descubiertas en el sitemap (opcional)
         
     Returns:
         str: Prompt formateado para enviar a OpenAI
     """
+    # Combinar enlaces de la portada y del sitemap sin duplicados, conservando el orden
+    links = list(dict.fromkeys(website.links + (sitemap_links or [])))
+    
     user_prompt = f"Aquí hay una lista de enlaces de la página web {website.url} - "
     user_prompt += "Por favor, decide cuáles de estos son enlaces web relevantes para un folleto sobre la empresa. Responde con la URL https completa en formato JSON. \
 No incluyas Términos y Condiciones, Privacidad ni enlaces de correo electrónico.\n"
     user_prompt += "Links (puede que algunos sean links relativos):\n"
-    user_prompt += "\n".join(website.links)  # Unir todos los enlaces con saltos de línea
+    user_prompt += "\n".join(links)  # Unir todos los enlaces con saltos de línea
     return user_prompt
 
 
+def get_sitemap_links(url):
+    """
+    Descubre páginas del sitio a través de robots.txt y sitemap.xml.
+    
+    Permite que la selección de enlaces considere páginas que no aparecen
+    en la portada. Si el sitio no publica sitemap, devuelve una lista vacía.
+    El índice de cada dominio se reutiliza durante INDEX_TTL segundos.
+    
+    Args:
+        url (str): URL del sitio web a analizar
+        
+    Returns:
+        list: URLs más recientes del sitemap (como máximo MAX_SITEMAP_LINKS)
+    """
+    try:
+        index = get_site_index(url)
+        return index.urls(limit=MAX_SITEMAP_LINKS)
+    except Exception as e:
+        print(f"⚠️ No se pudo descubrir el sitemap de {url}: {e}")
+        return []
+
+
 def get_links(url):
     """
     Obtiene los enlaces relevantes de un sitio web usando OpenAI.
     
     Esta función:
     1. Crea un objeto Website para la URL dada
-    2. Envía los enlaces a GPT para que identifique los relevantes
-    3. Devuelve la respuesta en formato JSON
+    2. Completa los enlaces de la portada con los del sitemap del sitio
+    3. Envía los enlaces a GPT para que identifique los relevantes
+    4. Devuelve la respuesta en formato JSON
     
     Args:
         url (str): URL del sitio web a analizar
@@ -284,16 +359,21 @@ def get_links(url):
         dict: Diccionario con los enlaces relevantes identificados por GPT
     """
     website = Website(url)
+    sitemap_links = get_sitemap_links(url)
+    
+    user_prompt = get_links_user_prompt(website, sitemap_links)
     
     # Realizar llamada a OpenAI para identificar enlaces relevantes
-    response = openai.chat.completions.create(
-        model=MODEL,
-        messages=[
-            {"role": "system", "content": link_system_prompt},
-            {"role": "user", "content": get_links_user_prompt(website)}
-        ],
-        response_format={"type": "json_object"}  # Forzar respuesta en JSON
-    )
+    with registrar_llamada("openai", MODEL, "enlaces") as llamada:
+        response = get_openai().chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": link_system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            response_format={"type": "json_object"}  # Forzar respuesta en JSON
+        )
+        llamada.registrar_uso(uso_openai(response.usage))
     
     # Extraer y parsear la respuesta JSON
     result = response.choices[0].message.content
@@ -310,7 +390,7 @@ def get_all_details(url):
     Esta función:
     1. Obtiene el contenido de la página principal
     2. Identifica enlaces relevantes usando GPT
-    3. Visita cada enlace relevante y extrae su contenido
+    3. Visita cada enlace relevante permitido por robots.txt y extrae su contenido
     4. Combina toda la información en un solo texto
     
     Args:
@@ -327,8 +407,16 @@ def get_all_details(url):
     links = get_links(url)
     print("Links encontrados:", links)  # Mostrar enlaces para debugging
     
-    # Procesar cada enlace relevante
+    # Descartar los enlaces elegidos por el modelo que robots.txt prohíbe
+    allowed = []
     for link in links["links"]:
+        if get_site(link["url"]).can_fetch(link["url"]):
+            allowed.append(link)
+        else:
+            print(f"🚫 robots.txt no permite descargar {link['url']}, se omite")
+
+    # Procesar cada enlace relevante
+    for link in allowed:
         try:
             # Agregar sección para este enlace
             result += f"\n\n{link['type']}\n"
@@ -408,40 +496,111 @@ def stream_brochure(company_name, url, language="Español"):
         # Crear el prompt del sistema con configuración de idioma integrada
         localized_system_prompt = set_output_language(system_prompt, language)
         
-        # Crear stream de respuesta de OpenAI
-        stream = openai.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": localized_system_prompt},
-                {"role": "user", "content": get_brochure_user_prompt(company_name, url)}
-            ],
-            stream=True  # Habilitar streaming para mostrar respuesta en tiempo real
-        )
+        # Recopilar la información del sitio (fuera de la medición de la llamada)
+        user_prompt = get_brochure_user_prompt(company_name, url)
         
-        # Mostrar encabezado
-        print(f"\n📄 Folleto para {company_name}:")
-        print("=" * 50)
-        
-        # Procesar y mostrar la respuesta en tiempo real
-        response = ""
-        for chunk in stream:
-            # Verificar si el chunk contiene contenido
-            if chunk.choices[0].delta.content:
-                content = chunk.choices[0].delta.content
-                response += content  # Acumular respuesta completa
-                print(content, end='', flush=True)  # Mostrar inmediatamente
+        with registrar_llamada("openai", MODEL, "folleto") as llamada:
+            # Crear stream de respuesta de OpenAI
+            stream = get_openai().chat.completions.create(
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": localized_system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                stream=True,  # Habilitar streaming para mostrar respuesta en tiempo real
+                stream_options={"include_usage": True}  # El último fragmento trae el uso de tokens
+            )
+            
+            # Mostrar encabezado
+            print(f"\n📄 Folleto para {company_name}:")
+            print("=" * 50)
+            
+            # Procesar y mostrar la respuesta en tiempo real
+            # (los fragmentos se acumulan en una lista y se unen al final,
+            # evitando el crecimiento cuadrático de `response += content`)
+            chunks = []
+            for chunk in stream:
+                if chunk.usage:
+                    llamada.registrar_uso(uso_openai(chunk.usage))
+                # Verificar si el chunk contiene contenido (el del uso no trae choices)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    llamada.marcar_primer_token()
+                    content = chunk.choices[0].delta.content
+                    chunks.append(content)  # Acumular respuesta completa
+                    print(content, end='', flush=True)  # Mostrar inmediatamente
         
         # Mostrar mensaje de finalización
         print("\n" + "=" * 50)
         print("✅ Folleto generado exitosamente!")
         
-        return response
+        return "".join(chunks)
         
     except Exception as e:
         # Manejar cualquier error durante la generación
         print(f"❌ Error generando el folleto: {e}")
         return None
 
+# ============================================================================
+# API ASÍNCRONA DE STREAMING (PARA SERVIDORES)
+# ============================================================================
+
+async def astream_brochure(company_name, url, language="Español"):
+    """
+    Genera un folleto empresarial como generador asíncrono de fragmentos.
+    
+    A diferencia de stream_brochure, no imprime nada en la terminal: cada
+    fragmento de texto se entrega al consumidor en cuanto llega de OpenAI.
+    El scraping del sitio (bloqueante, con requests) se ejecuta en un hilo
+    para no detener el event loop, de modo que un solo proceso puede servir
+    muchos folletos en paralelo.
+    
+    Args:
+        company_name (str): Nombre de la empresa
+        url (str): URL del sitio web de la empresa
+        language (str): Idioma para generar el folleto (por defecto: "Español")
+        
+    Yields:
+        str: Fragmentos del folleto en el orden en que se generan
+    """
+    localized_system_prompt = set_output_language(system_prompt, language)
+    
+    # Recopilar la información del sitio sin bloquear el event loop
+    user_prompt = await asyncio.to_thread(get_brochure_user_prompt, company_name, url)
+    
+    with registrar_llamada("openai", MODEL, "folleto_servidor") as llamada:
+        stream = await get_async_openai().chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": localized_system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        
+        async for chunk in stream:
+            if chunk.usage:
+                llamada.registrar_uso(uso_openai(chunk.usage))
+            if chunk.choices and chunk.choices[0].delta.content:
+                llamada.marcar_primer_token()
+                yield chunk.choices[0].delta.content
+
+
+async def agenerate_brochure(company_name, url, language="Español"):
+    """
+    Versión asíncrona que devuelve el folleto completo.
+    
+    Args:
+        company_name (str): Nombre de la empresa
+        url (str): URL del sitio web de la empresa
+        language (str): Idioma para generar el folleto (por defecto: "Español")
+        
+    Returns:
+        str: Texto completo del folleto generado
+    """
+    chunks = [chunk async for chunk in astream_brochure(company_name, url, language)]
+    return "".join(chunks)
+
 # ============================================================================
 # FUNCIONES AUXILIARES PARA USO PERSONALIZADO
 # ============================================================================
@@ -504,6 +663,8 @@ def main(language="Español"):
     """
     print("🏢 Generador de Folletos Empresariales")
     print("=" * 40)
+    if not verificar_api_key():
+        exit(1)  # Terminar el programa si no hay API key válida
     
     # Configuración de la empresa a analizar
     # (Puedes cambiar estos valores para analizar otras empresas)
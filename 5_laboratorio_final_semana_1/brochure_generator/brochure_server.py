@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP de Folletos con Server-Sent Events (SSE)
+Expone el generador de folletos como un endpoint que transmite los tokens
+del folleto a los clientes a medida que OpenAI los genera.
+
+Este servidor:
+1. Recibe el nombre de la empresa, la URL y el idioma por query string
+2. Usa el generador asíncrono astream_brochure (un stream por petición)
+3. Envía cada fragmento como un evento SSE `token`
+4. Limita el número de folletos simultáneos para proteger el proceso
+
+Uso:
+    python brochure_server.py
+    curl -N "http://127.0.0.1:8000/brochure?company=Frogames&url=https://cursos.frogamesformacion.com"
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import os                    # Para variables de entorno
+import asyncio              # Para limitar la concurrencia
+from fastapi import FastAPI, Query           # Framework HTTP asíncrono
+from fastapi.responses import StreamingResponse  # Respuestas en streaming
+
+from brochure_generator import astream_brochure, verificar_api_key
+
+# ============================================================================
+# CONFIGURACIÓN DEL SERVIDOR
+# ============================================================================
+
+HOST = os.getenv('BROCHURE_HOST', '127.0.0.1')
+PORT = int(os.getenv('BROCHURE_PORT', '8000'))
+
+# Número máximo de folletos generándose a la vez en este proceso
+# (cada uno ocupa un hilo durante el scraping y una conexión con OpenAI)
+MAX_CONCURRENT_STREAMS = int(os.getenv('BROCHURE_MAX_STREAMS', '32'))
+
+app = FastAPI(title="Generador de Folletos Empresariales")
+_stream_slots = asyncio.Semaphore(MAX_CONCURRENT_STREAMS)
+
+# ============================================================================
+# FUNCIONES AUXILIARES SSE
+# ============================================================================
+
+def format_sse(data, event=None):
+    """
+    Formatea un mensaje según el protocolo Server-Sent Events.
+
+    Los saltos de línea del contenido se envían como varias líneas `data:`,
+    que el cliente vuelve a unir con '\\n'.
+
+    Args:
+        data (str): Contenido del evento
+        event (str): Nombre del evento (opcional)
+
+    Returns:
+        str: Evento SSE listo para enviarse
+    """
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+
+async def brochure_events(company_name, url, language):
+    """
+    Generador asíncrono de eventos SSE para un folleto.
+
+    Args:
+        company_name (str): Nombre de la empresa
+        url (str): URL del sitio web de la empresa
+        language (str): Idioma del folleto
+
+    Yields:
+        str: Eventos SSE (`token`, `done` o `error`)
+    """
+    async with _stream_slots:
+        try:
+            async for chunk in astream_brochure(company_name, url, language):
+                yield format_sse(chunk, event="token")
+            yield format_sse("", event="done")
+        except Exception as e:
+            # Informar al cliente en lugar de cortar la conexión sin explicación
+            yield format_sse(f"Error generando el folleto: {e}", event="error")
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+@app.get("/brochure")
+async def brochure(
+    company: str = Query(..., description="Nombre de la empresa"),
+    url: str = Query(..., description="URL del sitio web de la empresa"),
+    language: str = Query("Español", description="Idioma de salida"),
+):
+    """Transmite el folleto de una empresa como Server-Sent Events."""
+    return StreamingResponse(
+        brochure_events(company, url, language),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/health")
+async def health():
+    """Endpoint de salud para balanceadores de carga."""
+    return {"status": "ok"}
+
+# ============================================================================
+# PUNTO DE ENTRADA DEL PROGRAMA
+# ============================================================================
+
+if __name__ == "__main__":
+    import uvicorn   # Servidor ASGI (solo al ejecutar el script directamente)
+
+    if not verificar_api_key():
+        exit(1)
+    print(f"🚀 Servidor de folletos en http://{HOST}:{PORT}/brochure")
+    uvicorn.run(app, host=HOST, port=PORT)
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Descubrimiento de Páginas mediante robots.txt y sitemap.xml
+Construye un índice de URLs de un sitio web completo sin tener que rastrearlo
+página por página.
+
+Este módulo:
+1. Lee robots.txt, respeta sus reglas Disallow y su Crawl-delay (también en
+   las páginas que descarga el generador, con prepare_fetch)
+2. Localiza los sitemaps declarados (o usa /sitemap.xml por defecto)
+3. Procesa sitemaps e índices de sitemaps en streaming (también .xml.gz)
+4. Devuelve un índice URL -> lastmod que permite detectar páginas modificadas
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import gzip                  # Para sitemaps comprimidos (.xml.gz)
+import json                 # Para guardar y cargar índices
+import sys                  # Para importar los módulos compartidos del repositorio
+import threading            # El caché de índices se comparte entre hilos
+import time                 # Para respetar el Crawl-delay
+from collections import deque       # Cola de sitemaps pendientes
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+import xml.etree.ElementTree as ET  # Parser XML incremental (iterparse)
+
+import requests             # Para las excepciones de red
+
+# Hacer importable el paquete compartido `comun` de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from comun.http_client import BoundedReader, HttpClient, get_default_client
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+USER_AGENT = "BrochureGeneratorBot/1.0"
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024   # Límite del protocolo sitemap (50 MB sin comprimir)
+MAX_SITEMAPS = 50            # Máximo de sitemaps a procesar (índices incluidos)
+MAX_URLS = 5000              # Máximo de URLs a indexar por sitio
+INDEX_TTL = 3600             # Segundos que se reutiliza el índice de un dominio
+MAX_DISCOVERY_SECONDS = 20.0  # Tiempo máximo leyendo sitemaps (pausas incluidas)
+
+# Solo <loc> y <lastmod> del protocolo sitemap (o sin namespace): los de las
+# extensiones de imagen o vídeo (<image:loc>, <video:loc>) no son páginas
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+LOC_TAGS = (SITEMAP_NS + "loc", "loc")
+LASTMOD_TAGS = (SITEMAP_NS + "lastmod", "lastmod")
+
+# ============================================================================
+# ÍNDICE DE URLS
+# ============================================================================
+
+@dataclass
+class SiteIndex:
+    """
+    Índice de las URLs conocidas de un sitio con su fecha de modificación.
+
+    Attributes:
+        base_url (str): URL raíz del sitio
+        entries (dict): Mapa URL -> lastmod (cadena ISO 8601 o None)
+        crawl_delay (float): Pausa mínima entre peticiones indicada por robots.txt
+    """
+    base_url: str
+    entries: Dict[str, Optional[str]] = field(default_factory=dict)
+    crawl_delay: Optional[float] = None
+
+    def urls(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Devuelve las URLs del índice, las modificadas más recientemente primero.
+
+        Args:
+            limit (int): Número máximo de URLs a devolver (opcional)
+
+        Returns:
+            list: URLs ordenadas por lastmod descendente (las que no tienen fecha al final)
+        """
+        ordered = sorted(self.entries, key=lambda url: self.entries[url] or "", reverse=True)
+        return ordered[:limit] if limit is not None else ordered
+
+    def changed_since(self, previous: "SiteIndex") -> List[str]:
+        """
+        Obtiene las URLs nuevas o cuyo lastmod cambió respecto a un índice anterior.
+
+        Las URLs sin lastmod se consideran modificadas, ya que no hay forma
+        de saber si cambiaron.
+
+        Args:
+            previous (SiteIndex): Índice de una ejecución anterior
+
+        Returns:
+            list: URLs que deben volver a descargarse
+        """
+        return [
+            url for url, lastmod in self.entries.items()
+            if lastmod is None or previous.entries.get(url) != lastmod
+        ]
+
+    def save(self, path: str):
+        """Guarda el índice en un archivo JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {"base_url": self.base_url, "crawl_delay": self.crawl_delay, "entries": self.entries},
+                f, ensure_ascii=False, indent=2
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "SiteIndex":
+        """Carga un índice guardado previamente con save()."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data["base_url"], data.get("entries", {}), data.get("crawl_delay"))
+
+# ============================================================================
+# CLASE DE DESCUBRIMIENTO
+# ============================================================================
+
+class SiteDiscovery:
+    """
+    Descubre las páginas de un sitio a partir de robots.txt y sus sitemaps.
+
+    Todas las peticiones respetan el Crawl-delay declarado para nuestro
+    User-Agent, y las URLs prohibidas por robots.txt no entran en el índice.
+    """
+
+    def __init__(self, base_url: str, client: Optional[HttpClient] = None,
+                 user_agent: str = USER_AGENT, max_urls: int = MAX_URLS,
+                 max_seconds: float = MAX_DISCOVERY_SECONDS):
+        """
+        Inicializa el descubridor para un sitio.
+
+        Args:
+            base_url (str): Cualquier URL del sitio (se usa su esquema y dominio)
+            client (HttpClient): Cliente HTTP (por defecto el compartido)
+            user_agent (str): User-Agent con el que se evalúa robots.txt
+            max_urls (int): Máximo de URLs a indexar
+            max_seconds (float): Tiempo máximo recorriendo sitemaps
+        """
+        self.root = site_root(base_url)
+        self.client = client or get_default_client()
+        self.user_agent = user_agent
+        self.max_urls = max_urls
+        self.max_seconds = max_seconds
+        self.robots = RobotFileParser()
+        self.crawl_delay = None
+        self.index: Optional[SiteIndex] = None   # Último índice construido
+        self._last_request = 0.0
+        self._robots_loaded = False
+        self._robots_lock = threading.Lock()   # Robots.txt y Crawl-delay compartidos entre hilos
+        self._delay_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # robots.txt
+    # ------------------------------------------------------------------
+
+    def load_robots(self):
+        """
+        Descarga y procesa robots.txt.
+
+        Si no existe o no puede descargarse, se permite todo (comportamiento
+        estándar de los rastreadores).
+        """
+        try:
+            response = self._get(urljoin(self.root, "/robots.txt"))
+            lines = response.text.splitlines() if response.status_code == 200 else []
+        except requests.RequestException as e:
+            print(f"⚠️ No se pudo leer robots.txt de {self.root}: {e}")
+            lines = []
+
+        self.robots.parse(lines)
+        self.crawl_delay = self.robots.crawl_delay(self.user_agent)
+        self._robots_loaded = True
+
+    def can_fetch(self, url: str) -> bool:
+        """Indica si robots.txt permite descargar la URL."""
+        self._ensure_robots()
+        return self.robots.can_fetch(self.user_agent, url)
+
+    def prepare_fetch(self, url: str) -> bool:
+        """
+        Prepara la descarga de una página del sitio hecha fuera de este módulo.
+
+        Args:
+            url (str): Página que se quiere descargar
+
+        Returns:
+            bool: False si robots.txt la prohíbe; si no, True tras esperar el Crawl-delay
+        """
+        if not self.can_fetch(url):
+            return False
+        self._wait_crawl_delay()
+        return True
+
+    def _ensure_robots(self):
+        """Carga robots.txt una sola vez aunque lo pidan varios hilos a la vez."""
+        if not self._robots_loaded:
+            with self._robots_lock:
+                if not self._robots_loaded:
+                    self.load_robots()
+
+    def sitemap_urls(self) -> List[str]:
+        """Devuelve los sitemaps declarados en robots.txt o /sitemap.xml por defecto."""
+        self._ensure_robots()
+        return self.robots.site_maps() or [urljoin(self.root, "/sitemap.xml")]
+
+    # ------------------------------------------------------------------
+    # Sitemaps
+    # ------------------------------------------------------------------
+
+    def iter_sitemap_entries(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Recorre todos los sitemaps del sitio, incluidos los índices anidados.
+
+        Yields:
+            tuple: (url, lastmod) de cada página encontrada
+        """
+        pending = deque(self.sitemap_urls())
+        seen = set()
+        deadline = time.monotonic() + self.max_seconds
+
+        while pending and len(seen) < MAX_SITEMAPS:
+            sitemap_url = pending.popleft()
+            if sitemap_url in seen:
+                continue
+            if time.monotonic() + (self.crawl_delay or 0) > deadline:
+                print(f"⏳ Descubrimiento de {self.root} cortado tras {self.max_seconds:.0f}s "
+                      f"({len(pending) + 1} sitemaps sin leer)")
+                return
+            seen.add(sitemap_url)
+
+            try:
+                for kind, loc, lastmod in self._parse_sitemap(sitemap_url):
+                    if kind == "sitemap":
+                        pending.append(loc)   # Índice de sitemaps: procesar después
+                    else:
+                        yield loc, lastmod
+            except (requests.RequestException, ET.ParseError, OSError, EOFError) as e:
+                print(f"⚠️ Error procesando sitemap {sitemap_url}: {e}")
+
+    def _parse_sitemap(self, sitemap_url: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """
+        Procesa un sitemap en streaming con iterparse.
+
+        Los elementos se liberan en cuanto se leen, por lo que la memoria
+        usada no depende del tamaño del sitemap.
+
+        Yields:
+            tuple: (tipo, loc, lastmod) donde tipo es "url" o "sitemap"
+        """
+        self._wait_crawl_delay()
+        with self.client.stream(sitemap_url, headers={"User-Agent": self.user_agent}) as response:
+            response.raise_for_status()
+            source = BoundedReader(response, MAX_SITEMAP_BYTES)
+            if sitemap_url.endswith(".gz"):
+                source = gzip.GzipFile(fileobj=source)
+
+            loc = lastmod = None
+            for _, elem in ET.iterparse(source, events=("end",)):
+                tag = elem.tag.rsplit("}", 1)[-1]   # Quitar el namespace XML
+                if elem.tag in LOC_TAGS:
+                    loc = (elem.text or "").strip()
+                elif elem.tag in LASTMOD_TAGS:
+                    lastmod = (elem.text or "").strip() or None
+                elif tag in ("url", "sitemap") and elem.tag in (SITEMAP_NS + tag, tag):
+                    if loc:
+                        yield tag, loc, lastmod
+                    loc = lastmod = None
+                    elem.clear()
+
+    # ------------------------------------------------------------------
+    # Índice
+    # ------------------------------------------------------------------
+
+    def build_index(self) -> SiteIndex:
+        """
+        Construye el índice de URLs del sitio.
+
+        Returns:
+            SiteIndex: Índice con las URLs permitidas por robots.txt
+        """
+        index = SiteIndex(self.root)
+        for url, lastmod in self.iter_sitemap_entries():
+            if len(index.entries) >= self.max_urls:
+                break
+            if self.can_fetch(url):
+                index.entries[url] = lastmod
+        index.crawl_delay = self.crawl_delay
+        self.index = index
+        return index
+
+    def _get(self, url: str) -> requests.Response:
+        """Realiza una petición GET respetando el Crawl-delay."""
+        self._wait_crawl_delay()
+        return self.client.get(url, headers={"User-Agent": self.user_agent})
+
+    def _wait_crawl_delay(self):
+        """Espera lo necesario para respetar el Crawl-delay desde la última petición."""
+        # Cada hilo reserva su instante de salida y espera fuera del lock
+        with self._delay_lock:
+            now = time.monotonic()
+            start = max(now, self._last_request + (self.crawl_delay or 0))
+            self._last_request = start
+        if start > now:
+            time.sleep(start - now)
+
+# ============================================================================
+# FUNCIONES AUXILIARES
+# ============================================================================
+
+def site_root(url: str) -> str:
+    """Esquema y dominio de una URL (la raíz del sitio)."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+_site_cache: Dict[str, Tuple[float, SiteDiscovery]] = {}   # Dominio -> (instante, descubridor)
+_site_lock = threading.Lock()
+
+
+def get_site(url: str, ttl: float = INDEX_TTL) -> SiteDiscovery:
+    """
+    Devuelve el descubridor del dominio de la URL, compartido durante ttl segundos.
+
+    Todas las descargas del mismo dominio (sitemaps y páginas) comparten así
+    sus reglas de robots.txt y su Crawl-delay.
+
+    Args:
+        url (str): Cualquier URL del sitio
+        ttl (float): Segundos durante los que se reutiliza (robots.txt e índice)
+
+    Returns:
+        SiteDiscovery: Descubridor del dominio
+    """
+    root = site_root(url)
+    with _site_lock:
+        cached = _site_cache.get(root)
+        if cached is None or time.monotonic() - cached[0] >= ttl:
+            cached = _site_cache[root] = (time.monotonic(), SiteDiscovery(url))
+    return cached[1]
+
+
+def get_site_index(url: str, ttl: float = INDEX_TTL) -> SiteIndex:
+    """
+    Devuelve el índice del sitio, reutilizándolo si se construyó hace menos de ttl.
+
+    Evita volver a leer robots.txt y los sitemaps (con sus pausas de
+    Crawl-delay) cada vez que se procesa una URL del mismo dominio.
+
+    Args:
+        url (str): Cualquier URL del sitio
+        ttl (float): Segundos durante los que el índice se considera vigente
+
+    Returns:
+        SiteIndex: Índice del dominio de la URL
+    """
+    site = get_site(url, ttl)
+    return site.index or site.build_index()
+
+
+def discover_site(url: str, previous_index_path: Optional[str] = None) -> Tuple[SiteIndex, List[str]]:
+    """
+    Descubre las páginas de un sitio y calcula cuáles cambiaron.
+
+    Args:
+        url (str): URL del sitio web
+        previous_index_path (str): Índice guardado de una ejecución anterior (opcional)
+
+    Returns:
+        tuple: (índice actual, URLs nuevas o modificadas desde el índice anterior)
+    """
+    index = SiteDiscovery(url).build_index()
+
+    if previous_index_path:
+        try:
+            previous = SiteIndex.load(previous_index_path)
+            return index, index.changed_since(previous)
+        except FileNotFoundError:
+            pass
+
+    return index, index.urls()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Parser HTML Incremental con Parada Anticipada
+Extrae título, texto y enlaces de una página a medida que se descarga.
+
+Este módulo:
+1. Decodifica el cuerpo de la respuesta por bloques (sin cargarlo completo)
+2. Alimenta un parser HTML incremental (html.parser de la biblioteca estándar)
+3. Recoge el título, el texto visible del <body> y los enlaces sobre la marcha
+4. Se detiene en cuanto se alcanza el presupuesto de texto y, además, se
+   tienen los enlaces: el máximo pedido o los de un <nav>/<footer> completo
+
+Así la memoria y la CPU usadas por página quedan acotadas sin importar
+el tamaño del documento.
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import codecs                # Decodificador incremental de texto
+import re                   # Para detectar el charset en las etiquetas <meta>
+from html.parser import HTMLParser  # Parser HTML incremental
+from typing import Iterable, List, Optional
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+# Elementos cuyo contenido no aporta texto útil (igual que en Website)
+IGNORED_TAGS = {"script", "style", "img", "input"}
+
+# Bloques de navegación: cerrado uno, ya se tienen los enlaces principales
+NAV_TAGS = {"nav", "footer"}
+
+# Elementos vacíos: nunca tienen etiqueta de cierre
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+             "link", "meta", "param", "source", "track", "wbr"}
+
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+SNIFF_BYTES = 1024           # Bytes iniciales donde se busca <meta charset> (como los navegadores)
+
+# ============================================================================
+# PARSER INCREMENTAL
+# ============================================================================
+
+class StreamingPageParser(HTMLParser):
+    """
+    Parser HTML que acumula título, texto y enlaces con un presupuesto de texto.
+
+    El texto se obtiene como en BeautifulSoup.get_text(separator="\\n", strip=True):
+    cada nodo de texto del <body> se recorta y los nodos vacíos se descartan.
+
+    Attributes:
+        title (str): Título de la página (None si no hay <title>)
+        links (list): Valores href de los enlaces encontrados
+        text_done (bool): True cuando se alcanzó el presupuesto de texto
+    """
+
+    def __init__(self, max_text_chars: Optional[int] = None, max_links: Optional[int] = None):
+        """
+        Inicializa el parser.
+
+        Args:
+            max_text_chars (int): Presupuesto de caracteres de texto (None = sin límite)
+            max_links (int): Máximo de enlaces a recoger (None = sin límite)
+        """
+        super().__init__(convert_charrefs=True)
+        self.max_text_chars = max_text_chars
+        self.max_links = max_links
+        self.title = None
+        self.links: List[str] = []
+        self.text_done = False
+        self.nav_done = False   # Se cerró algún <nav> o <footer>
+        self._text_parts: List[str] = []
+        self._text_chars = 0
+        self._pending: List[str] = []   # Nodo de texto en curso (puede llegar en varios bloques)
+        self._in_title = False
+        self._in_body = False
+        self._ignored_depth = 0
+
+    @property
+    def text(self) -> str:
+        """Texto visible del body, un nodo de texto por línea."""
+        return "\n".join(self._text_parts)
+
+    @property
+    def done(self) -> bool:
+        """True cuando ya no hace falta leer más: texto y enlaces completos."""
+        if not self.text_done:
+            return False
+        return self.nav_done or (self.max_links is not None and len(self.links) >= self.max_links)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag == "a":
+            self._add_link(attrs)
+        elif tag == "title" and self.title is None:
+            self._in_title = True
+            self.title = ""
+        elif tag == "body":
+            self._in_body = True
+        elif tag in IGNORED_TAGS and tag not in VOID_TAGS:
+            self._ignored_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        # <a href="..."/> y similares: registrar sin abrir ningún contexto
+        self._flush_text()
+        if tag == "a":
+            self._add_link(attrs)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag == "title":
+            self._in_title = False
+        elif tag == "body":
+            self._in_body = False
+        elif tag in NAV_TAGS:
+            self.nav_done = True
+        elif tag in IGNORED_TAGS and tag not in VOID_TAGS and self._ignored_depth:
+            self._ignored_depth -= 1
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif self._in_body and not self._ignored_depth and not self.text_done:
+            # Un nodo de texto puede partirse entre bloques: se completa en la siguiente etiqueta
+            self._pending.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+    def _add_link(self, attrs):
+        href = dict(attrs).get("href")
+        if href and (self.max_links is None or len(self.links) < self.max_links):
+            self.links.append(href)
+
+    def _flush_text(self):
+        """Registra el nodo de texto pendiente respetando el presupuesto."""
+        if not self._pending:
+            return
+        text = "".join(self._pending).strip()
+        self._pending.clear()
+        if not text or self.text_done:
+            return
+
+        if self.max_text_chars is not None:
+            remaining = self.max_text_chars - self._text_chars
+            if len(text) >= remaining:
+                text = text[:remaining]
+                self.text_done = True   # Presupuesto agotado: solo quedan los enlaces
+        self._text_parts.append(text)
+        self._text_chars += len(text)
+
+# ============================================================================
+# FUNCIONES AUXILIARES
+# ============================================================================
+
+def sniff_encoding(first_chunk: bytes, header_encoding: Optional[str]) -> str:
+    """
+    Determina la codificación del documento.
+
+    Prioridad: charset de la cabecera HTTP, <meta charset> de los primeros
+    SNIFF_BYTES del cuerpo, UTF-8.
+
+    Args:
+        first_chunk (bytes): Primeros bytes del cuerpo
+        header_encoding (str): charset declarado en Content-Type (o None)
+
+    Returns:
+        str: Nombre de la codificación a usar
+    """
+    if _valid_encoding(header_encoding):
+        return header_encoding   # La cabecera manda: no hace falta mirar el cuerpo
+    match = META_CHARSET_RE.search(first_chunk)
+    if match and _valid_encoding(match.group(1).decode("ascii", "ignore")):
+        return match.group(1).decode("ascii")
+    return "utf-8"
+
+
+def _valid_encoding(encoding: Optional[str]) -> bool:
+    """Indica si Python conoce la codificación."""
+    if not encoding:
+        return False
+    try:
+        codecs.lookup(encoding)
+        return True
+    except LookupError:
+        return False
+
+
+def parse_stream(chunks: Iterable[bytes], header_encoding: Optional[str] = None,
+                 max_text_chars: Optional[int] = None,
+                 max_links: Optional[int] = None) -> StreamingPageParser:
+    """
+    Procesa un cuerpo HTML por bloques y se detiene al tener el texto y los enlaces.
+
+    Tras agotar el presupuesto de texto se sigue leyendo para recoger enlaces
+    (suelen estar en menús y pies de página) hasta tener max_links o cerrar
+    un <nav> o <footer>.
+
+    Args:
+        chunks (iterable): Bloques de bytes del cuerpo
+        header_encoding (str): charset de la cabecera Content-Type (opcional)
+        max_text_chars (int): Presupuesto de caracteres de texto (opcional)
+        max_links (int): Máximo de enlaces a recoger (opcional)
+
+    Returns:
+        StreamingPageParser: Parser con el título, el texto y los enlaces extraídos
+    """
+    parser = StreamingPageParser(max_text_chars, max_links)
+    decoder = None
+    head = b""   # Bytes reunidos hasta poder decidir la codificación
+
+    for chunk in chunks:
+        if decoder is None:
+            head += chunk
+            if not _valid_encoding(header_encoding) and len(head) < SNIFF_BYTES:
+                continue   # Sin charset en la cabecera: esperar a tener el <head>
+            encoding = sniff_encoding(head, header_encoding)
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            chunk, head = head, b""
+        parser.feed(decoder.decode(chunk))
+        if parser.done:
+            break   # No seguir descargando: ya tenemos el texto y los enlaces necesarios
+    else:
+        if decoder is None and head:
+            decoder = codecs.getincrementaldecoder(sniff_encoding(head, header_encoding))(errors="replace")
+            parser.feed(decoder.decode(head))
+        if decoder is not None:
+            parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+
+    return parser
+
+
+def header_charset(content_type: Optional[str]) -> Optional[str]:
+    """Extrae el charset explícito de una cabecera Content-Type, si existe."""
+    if not content_type:
+        return None
+    match = re.search(r'charset=["\']?([\w-]+)', content_type, re.IGNORECASE)
+    return match.group(1) if match else None
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Pruebas del parser HTML incremental (parada anticipada y codificación).
+
+Uso:
+    python -m pytest -q test_streaming_parser.py
+"""
+
+from streaming_parser import parse_stream
+
+
+class Bloques:
+    """Cuerpo HTML en bloques de tamaño fijo; cuenta cuántos se leyeron."""
+
+    def __init__(self, html: bytes, tamano: int = 1024):
+        self.html = html
+        self.tamano = tamano
+        self.leidos = 0
+
+    def __iter__(self):
+        for i in range(0, len(self.html), self.tamano):
+            self.leidos += 1
+            yield self.html[i:i + self.tamano]
+
+    @property
+    def total(self) -> int:
+        return -(-len(self.html) // self.tamano)
+
+
+def _pagina(parrafos: int, enlaces: int = 0, pie: bool = False, resto: int = 0) -> bytes:
+    """Texto, enlaces (opcionalmente en un <footer>) y `resto` párrafos más al final."""
+    def texto(n):
+        return "".join(f"<p>Párrafo número {i} con texto de relleno.</p>" for i in range(n))
+    menu = "".join(f'<a href="/p{i}">Página {i}</a>' for i in range(enlaces))
+    if pie:
+        menu = f"<footer>{menu}</footer>"
+    return (f"<html><head><title>Empresa</title></head><body>"
+            f"{texto(parrafos)}{menu}{texto(resto)}</body></html>").encode()
+
+
+def test_se_detiene_al_tener_texto_y_enlaces():
+    bloques = Bloques(_pagina(200, enlaces=80, resto=20_000))
+    parser = parse_stream(bloques, max_text_chars=2_000, max_links=50)
+
+    assert len(parser.links) == 50
+    assert len(parser.text) <= 2_000 + parser.text.count("\n")
+    assert bloques.leidos < bloques.total / 10
+
+
+def test_se_detiene_al_cerrar_el_pie_de_pagina():
+    bloques = Bloques(_pagina(200, enlaces=10, pie=True, resto=20_000))
+    parser = parse_stream(bloques, max_text_chars=2_000, max_links=50)
+
+    assert parser.links == [f"/p{i}" for i in range(10)]
+    assert bloques.leidos < bloques.total / 10
+
+
+def test_sin_enlaces_suficientes_lee_hasta_el_final():
+    bloques = Bloques(_pagina(200, enlaces=3, resto=200))
+    parser = parse_stream(bloques, max_text_chars=500, max_links=50)
+
+    assert len(parser.links) == 3
+    assert bloques.leidos == bloques.total
+
+
+def test_charset_de_la_cabecera_y_de_meta():
+    html = '<html><head><meta charset="iso-8859-1"><title>Año</title></head><body>Niño</body></html>'
+    latin1 = Bloques(html.encode("latin-1"), tamano=8)
+    assert parse_stream(latin1).title == "Año"
+
+    utf8 = Bloques("<body>Niño</body>".encode("utf-8"), tamano=3)
+    assert parse_stream(utf8, header_encoding="utf-8").text == "Niño"
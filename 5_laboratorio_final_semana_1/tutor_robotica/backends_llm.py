@@ -0,0 +1,682 @@
+#!/usr/bin/env python3
+"""
+Backends de Modelos de Lenguaje para los Tutores
+Interfaz común para generar respuestas con OpenAI, Ollama o un modelo simulado,
+de modo que el tutor no dependa de ningún proveedor concreto.
+
+Este módulo proporciona:
+1. BackendLLM: interfaz común (streaming, métricas de la última respuesta)
+   y BackendConReintentos: base de los proveedores con reintentos y timeouts
+2. BackendOpenAI: modelos de OpenAI (requiere OPENAI_API_KEY)
+3. BackendOllama: modelos locales con Ollama (modelo residente con keep_alive)
+4. BackendMock: respuestas simuladas para pruebas sin red ni costos
+5. BackendHibrido: usa el modelo local primero y recurre a la nube si es lento o falla
+6. LimitadorJusto y BackendLimitado: límite de llamadas simultáneas repartido entre sesiones
+
+Cada llamada se registra en comun.contabilidad_tokens (tokens, latencia y costo
+por función y sesión).
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import os                    # Para variables de entorno
+import queue                # Para leer el primer token con tiempo límite
+import random               # Para el jitter de los reintentos
+import sys                  # Para importar los módulos compartidos
+import threading            # Para el backend híbrido y el precalentamiento
+import time                 # Para medir tiempos
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Módulos compartidos del repositorio (raíz del repo en sys.path)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from comun.contabilidad_tokens import registrar_llamada, uso_openai
+
+# ============================================================================
+# CONFIGURACIÓN POR DEFECTO
+# ============================================================================
+
+MODELO_OPENAI = 'gpt-4o-mini'   # Modelo eficiente para tareas educativas
+MODELO_OLLAMA = 'gpt-oss:20b'   # Modelo local eficiente para tareas educativas
+KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
+
+TIMEOUT = 60.0               # Segundos máximos por petición
+REINTENTOS = 2               # Reintentos si la petición falla antes del primer token
+BACKOFF_BASE = 0.5           # Segundos de espera base entre reintentos
+
+Mensaje = Dict[str, str]
+Uso = Dict[str, Optional[int]]
+
+# ============================================================================
+# MÉTRICAS Y ERRORES
+# ============================================================================
+
+@dataclass
+class MetricasLLM:
+    """
+    Métricas de una respuesta generada por un backend.
+
+    Attributes:
+        backend (str): Nombre del backend que respondió
+        modelo (str): Modelo utilizado
+        tiempo_primer_token (float): Segundos hasta el primer token
+        tiempo_total (float): Segundos hasta el final de la respuesta
+        tokens_prompt (int): Tokens de entrada reportados por el proveedor
+        tokens_generados (int): Tokens de salida reportados por el proveedor
+        tokens_por_segundo (float): Velocidad de generación
+        intentos (int): Número de intentos realizados
+    """
+    backend: str
+    modelo: str
+    tiempo_primer_token: Optional[float] = None
+    tiempo_total: float = 0.0
+    tokens_prompt: Optional[int] = None
+    tokens_generados: Optional[int] = None
+    tokens_por_segundo: Optional[float] = None
+    intentos: int = 1
+
+    def resumen(self) -> str:
+        """Línea legible con las métricas principales."""
+        partes = [f"{self.backend}:{self.modelo}"]
+        if self.tiempo_primer_token is not None:
+            partes.append(f"primer token {self.tiempo_primer_token:.2f}s")
+        if self.tokens_por_segundo:
+            partes.append(f"{self.tokens_por_segundo:.1f} tokens/s")
+        if self.tokens_generados:
+            partes.append(f"{self.tokens_generados} tokens")
+        partes.append(f"total {self.tiempo_total:.2f}s")
+        return " | ".join(partes)
+
+
+class ErrorBackend(Exception):
+    """Error al generar una respuesta con un backend."""
+
+# ============================================================================
+# INTERFAZ COMÚN
+# ============================================================================
+
+class BackendLLM(ABC):
+    """
+    Interfaz común de los backends de modelos de lenguaje.
+
+    Los proveedores heredan de BackendConReintentos; los backends que
+    combinan otros (híbrido, limitado) implementan stream() directamente.
+    """
+
+    nombre = "base"
+
+    def __init__(self, modelo: str, timeout: float = TIMEOUT):
+        """
+        Inicializa el backend.
+
+        Args:
+            modelo (str): Nombre del modelo
+            timeout (float): Segundos máximos por petición
+        """
+        self.modelo = modelo
+        self.timeout = timeout
+        self.ultimas_metricas: Optional[MetricasLLM] = None
+
+    @abstractmethod
+    def stream(self, mensajes: List[Mensaje], temperatura: float = 0.7,
+               funcion: str = "chat", sesion: Optional[str] = None) -> Iterator[str]:
+        """
+        Genera la respuesta fragmento a fragmento.
+
+        Args:
+            mensajes (list): Mensajes en formato chat (system/user/assistant)
+            temperatura (float): Creatividad del modelo
+            funcion (str): Función que hace la llamada, para la contabilidad de tokens
+            sesion (str): Sesión que hace la llamada, para la contabilidad de tokens
+
+        Yields:
+            str: Fragmentos de texto en el orden en que se generan
+
+        Raises:
+            ErrorBackend: Si no se puede generar la respuesta
+        """
+
+    def completar(self, mensajes: List[Mensaje], temperatura: float = 0.3,
+                  funcion: str = "chat", sesion: Optional[str] = None) -> str:
+        """Genera la respuesta completa (sin streaming para el llamador)."""
+        return "".join(self.stream(mensajes, temperatura, funcion, sesion))
+
+    def verificar(self) -> bool:
+        """Comprueba que el backend esté configurado y disponible."""
+        return True
+
+    def precalentar(self) -> Optional[threading.Thread]:
+        """Prepara el modelo para reducir la latencia de la primera respuesta."""
+        return None
+
+
+class BackendConReintentos(BackendLLM):
+    """
+    Base de los backends que llaman directamente a un proveedor.
+
+    Las subclases solo implementan _stream(); esta clase añade los reintentos
+    con backoff (solo antes del primer token, para no duplicar texto ya
+    mostrado) y el cálculo de métricas.
+    """
+
+    def __init__(self, modelo: str, timeout: float = TIMEOUT, reintentos: int = REINTENTOS):
+        """
+        Inicializa el backend.
+
+        Args:
+            modelo (str): Nombre del modelo
+            timeout (float): Segundos máximos por petición
+            reintentos (int): Reintentos ante errores antes del primer token
+        """
+        super().__init__(modelo, timeout)
+        self.reintentos = reintentos
+
+    def stream(self, mensajes: List[Mensaje], temperatura: float = 0.7,
+               funcion: str = "chat", sesion: Optional[str] = None) -> Iterator[str]:
+        """
+        Genera la respuesta fragmento a fragmento.
+
+        Args:
+            mensajes (list): Mensajes en formato chat (system/user/assistant)
+            temperatura (float): Creatividad del modelo
+            funcion (str): Función que hace la llamada, para la contabilidad de tokens
+            sesion (str): Sesión que hace la llamada, para la contabilidad de tokens
+
+        Yields:
+            str: Fragmentos de texto en el orden en que se generan
+
+        Raises:
+            ErrorBackend: Si la petición falla tras los reintentos
+        """
+        for intento in range(1, self.reintentos + 2):
+            inicio = time.perf_counter()
+            primer_token = None
+            uso: Uso = {}
+            try:
+                # Cada intento cuenta: los fallidos también pueden consumir tokens
+                with registrar_llamada(self.nombre, self.modelo, funcion, sesion) as llamada:
+                    for texto, uso_parcial in self._stream(mensajes, temperatura):
+                        if uso_parcial:
+                            uso = uso_parcial
+                            llamada.registrar_uso(uso)
+                        if texto:
+                            if primer_token is None:
+                                primer_token = time.perf_counter() - inicio
+                                llamada.marcar_primer_token()
+                            yield texto
+                self.ultimas_metricas = self._metricas(inicio, primer_token, uso, intento)
+                return
+            except GeneratorExit:
+                raise
+            except Exception as e:
+                # Si ya se entregó texto, reintentar duplicaría la respuesta
+                if primer_token is not None or intento > self.reintentos:
+                    raise ErrorBackend(f"{self.nombre}: {e}") from e
+                espera = BACKOFF_BASE * (2 ** (intento - 1)) + random.uniform(0, BACKOFF_BASE)
+                time.sleep(espera)
+
+    @abstractmethod
+    def _stream(self, mensajes: List[Mensaje], temperatura: float) -> Iterator[Tuple[str, Optional[Uso]]]:
+        """
+        Llamada concreta al proveedor.
+
+        Yields:
+            tuple: (texto, uso) donde uso es None salvo en el fragmento que
+            trae el conteo de tokens ({"prompt": n, "generados": m, "cache": c,
+            "segundos_generacion": s})
+        """
+
+    def _metricas(self, inicio: float, primer_token: Optional[float], uso: Uso, intentos: int) -> MetricasLLM:
+        total = time.perf_counter() - inicio
+        generados = uso.get("generados")
+        segundos = uso.get("segundos_generacion")
+        if segundos is None and primer_token is not None:
+            segundos = total - primer_token
+        velocidad = generados / segundos if generados and segundos else None
+        return MetricasLLM(
+            backend=self.nombre,
+            modelo=self.modelo,
+            tiempo_primer_token=primer_token,
+            tiempo_total=total,
+            tokens_prompt=uso.get("prompt"),
+            tokens_generados=generados,
+            tokens_por_segundo=velocidad,
+            intentos=intentos,
+        )
+
+# ============================================================================
+# BACKEND OPENAI
+# ============================================================================
+
+class BackendOpenAI(BackendConReintentos):
+    """Backend para los modelos de OpenAI."""
+
+    nombre = "openai"
+
+    def __init__(self, modelo: str = MODELO_OPENAI, **kwargs):
+        super().__init__(modelo, **kwargs)
+        self._cliente = None
+
+    @property
+    def cliente(self):
+        """Cliente de OpenAI, creado en el primer uso."""
+        if self._cliente is None:
+            from openai import OpenAI
+            # Los reintentos los gestiona BackendLLM
+            self._cliente = OpenAI(timeout=self.timeout, max_retries=0)
+        return self._cliente
+
+    def verificar(self) -> bool:
+        api_key = os.getenv('OPENAI_API_KEY')
+        if api_key and api_key[:8] == 'sk-proj-':
+            print("✓ La clave de API parece buena")
+            return True
+        print("❌ Puede haber un problema con tu clave API")
+        return False
+
+    def _stream(self, mensajes, temperatura):
+        stream = self.cliente.chat.completions.create(
+            model=self.modelo,
+            messages=mensajes,
+            stream=True,
+            stream_options={"include_usage": True},  # El último fragmento trae el uso de tokens
+            temperature=temperatura
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content, None
+            if chunk.usage:
+                yield "", uso_openai(chunk.usage)   # Incluye los tokens servidos de la caché de prompts
+
+# ============================================================================
+# BACKEND OLLAMA
+# ============================================================================
+
+class BackendOllama(BackendConReintentos):
+    """Backend para modelos locales servidos por Ollama."""
+
+    nombre = "ollama"
+
+    def __init__(self, modelo: str = MODELO_OLLAMA, keep_alive: str = KEEP_ALIVE, **kwargs):
+        super().__init__(modelo, **kwargs)
+        self.keep_alive = keep_alive
+        self._cliente = None
+        self._verificado = None
+
+    @property
+    def cliente(self):
+        """Cliente de Ollama (usa OLLAMA_HOST si está definido), creado en el primer uso."""
+        if self._cliente is None:
+            import ollama
+            self._cliente = ollama.Client(timeout=self.timeout)
+        return self._cliente
+
+    def verificar(self, forzar: bool = False) -> bool:
+        """
+        Verifica que Ollama esté ejecutándose y el modelo esté descargado.
+
+        El resultado se reutiliza en llamadas posteriores salvo que se fuerce.
+        """
+        if self._verificado is not None and not forzar:
+            return self._verificado
+        try:
+            models_response = self.cliente.list()
+            model_names = [model.model for model in getattr(models_response, 'models', None) or []]
+            if self.modelo in model_names:
+                print(f"✓ Modelo {self.modelo} disponible en Ollama")
+                self._verificado = True
+            elif model_names:
+                print(f"❌ Modelo {self.modelo} no encontrado. Modelos disponibles: {model_names}")
+                print(f"💡 Ejecuta: ollama run {self.modelo}")
+                self._verificado = False
+            else:
+                print("❌ No se encontraron modelos en Ollama")
+                self._verificado = False
+        except Exception as e:
+            print(f"❌ Error conectando con Ollama: {e}")
+            print("💡 Asegúrate de que Ollama esté ejecutándose: ollama serve")
+            self._verificado = False
+        return self._verificado
+
+    def precalentar(self) -> threading.Thread:
+        """Carga el modelo en memoria en segundo plano con una petición vacía."""
+        def _precalentar():
+            inicio = time.perf_counter()
+            try:
+                # Un prompt vacío solo carga el modelo; keep_alive lo mantiene residente
+                self.cliente.generate(model=self.modelo, prompt="", keep_alive=self.keep_alive)
+                print(f"\n🔥 Modelo {self.modelo} cargado en memoria ({time.perf_counter() - inicio:.1f}s)")
+            except Exception as e:
+                print(f"\n⚠️ No se pudo precalentar el modelo: {e}")
+
+        hilo = threading.Thread(target=_precalentar, name="precalentar-ollama", daemon=True)
+        hilo.start()
+        return hilo
+
+    def _stream(self, mensajes, temperatura):
+        stream = self.cliente.chat(
+            model=self.modelo,
+            messages=mensajes,
+            stream=True,
+            keep_alive=self.keep_alive,
+            options={"temperature": temperatura}
+        )
+        for chunk in stream:
+            uso = None
+            if chunk.get('done'):
+                # Ollama reporta las duraciones en nanosegundos
+                eval_duration = chunk.get('eval_duration')
+                uso = {"prompt": chunk.get('prompt_eval_count'),
+                       "generados": chunk.get('eval_count'),
+                       "segundos_generacion": eval_duration / 1e9 if eval_duration else None}
+            yield chunk['message']['content'], uso
+
+# ============================================================================
+# BACKEND SIMULADO
+# ============================================================================
+
+class BackendMock(BackendConReintentos):
+    """
+    Backend simulado: devuelve una respuesta fija palabra a palabra.
+
+    Útil para probar la interfaz y medir el rendimiento del propio tutor sin
+    red, sin claves de API y sin costos.
+    """
+
+    nombre = "mock"
+
+    def __init__(self, modelo: str = "mock", respuesta: Optional[str] = None,
+                 latencia_primer_token: float = 0.05, segundos_por_token: float = 0.005,
+                 tasa_error: float = 0.0, **kwargs):
+        """
+        Args:
+            modelo (str): Nombre a reportar en las métricas
+            respuesta (str): Texto a devolver (por defecto uno genérico)
+            latencia_primer_token (float): Segundos antes del primer token
+            segundos_por_token (float): Segundos entre tokens
+            tasa_error (float): Probabilidad de fallar antes del primer token (0-1)
+        """
+        super().__init__(modelo, **kwargs)
+        self.respuesta = respuesta or "# 🤖 Respuesta simulada\n\nEsta es una respuesta de prueba del tutor de robótica. ✨"
+        self.latencia_primer_token = latencia_primer_token
+        self.segundos_por_token = segundos_por_token
+        self.tasa_error = tasa_error
+
+    def _stream(self, mensajes, temperatura):
+        time.sleep(self.latencia_primer_token)
+        if random.random() < self.tasa_error:
+            raise ConnectionError("fallo simulado")
+        palabras = self.respuesta.split(" ")
+        for i, palabra in enumerate(palabras):
+            if i:
+                time.sleep(self.segundos_por_token)
+            yield (palabra if i == 0 else " " + palabra), None
+        prompt = sum(len(m["content"]) for m in mensajes) // 4
+        yield "", {"prompt": prompt, "generados": len(palabras)}
+
+# ============================================================================
+# BACKEND HÍBRIDO
+# ============================================================================
+
+class BackendHibrido(BackendLLM):
+    """
+    Enruta al backend primario (local) y recurre al de respaldo (nube).
+
+    Se usa el respaldo cuando el primario:
+    - no entrega el primer token dentro del presupuesto de latencia, o
+    - falla antes de empezar a responder.
+
+    Si el primario agota su presupuesto de errores en la ventana reciente,
+    se evita durante un tiempo de enfriamiento y todo va al respaldo.
+    """
+
+    nombre = "hibrido"
+
+    def __init__(self, primario: BackendLLM, respaldo: BackendLLM,
+                 presupuesto_primer_token: float = 8.0, ventana: int = 10,
+                 max_fallos: int = 3, enfriamiento: float = 60.0):
+        """
+        Args:
+            primario (BackendLLM): Backend preferido (normalmente Ollama)
+            respaldo (BackendLLM): Backend de respaldo (normalmente OpenAI)
+            presupuesto_primer_token (float): Segundos máximos de espera al primario
+            ventana (int): Número de peticiones recientes consideradas
+            max_fallos (int): Fallos/lentitudes en la ventana que activan el enfriamiento
+            enfriamiento (float): Segundos durante los que se omite el primario
+        """
+        super().__init__(f"{primario.modelo}->{respaldo.modelo}")
+        self.primario = primario
+        self.respaldo = respaldo
+        self.presupuesto_primer_token = presupuesto_primer_token
+        self.max_fallos = max_fallos
+        self.enfriamiento = enfriamiento
+        self._resultados = deque(maxlen=ventana)   # True = éxito a tiempo
+        self._omitir_hasta = 0.0
+        self._lock = threading.Lock()
+
+    def verificar(self) -> bool:
+        # Basta con que uno de los dos esté disponible
+        primario_ok = self.primario.verificar()
+        return self.respaldo.verificar() or primario_ok
+
+    def precalentar(self):
+        return self.primario.precalentar()
+
+    def stream(self, mensajes, temperatura=0.7, funcion="chat", sesion=None):
+        if time.monotonic() >= self._omitir_hasta:
+            fragmentos = self._intentar_primario(mensajes, temperatura, funcion, sesion)
+            if fragmentos is not None:
+                yield from fragmentos
+                self.ultimas_metricas = self.primario.ultimas_metricas
+                return
+        else:
+            print("↪️ Backend primario en enfriamiento, usando respaldo")
+
+        yield from self.respaldo.stream(mensajes, temperatura, funcion, sesion)
+        self.ultimas_metricas = self.respaldo.ultimas_metricas
+
+    def _intentar_primario(self, mensajes, temperatura, funcion, sesion) -> Optional[Iterator[str]]:
+        """
+        Arranca el primario en un hilo y espera su primer token con tiempo límite.
+
+        Returns:
+            iterator: Fragmentos del primario, o None si hay que usar el respaldo
+        """
+        cola: "queue.Queue" = queue.Queue()
+        cancelado = threading.Event()
+        fin = object()
+
+        def producir():
+            fragmentos = self.primario.stream(mensajes, temperatura, funcion, sesion)
+            try:
+                for texto in fragmentos:
+                    if cancelado.is_set():
+                        return   # Nadie lee ya: dejar de generar con el modelo local
+                    cola.put(texto)
+                cola.put(fin)
+            except Exception as e:
+                cola.put(e)
+            finally:
+                fragmentos.close()
+
+        threading.Thread(target=producir, name="hibrido-primario", daemon=True).start()
+
+        try:
+            primero = cola.get(timeout=self.presupuesto_primer_token)
+        except queue.Empty:
+            cancelado.set()
+            print(f"\n⏳ {self.primario.nombre} tardó más de {self.presupuesto_primer_token}s, usando {self.respaldo.nombre}")
+            self._registrar(False)
+            return None
+
+        if isinstance(primero, Exception):
+            print(f"\n⚠️ {self.primario.nombre} falló ({primero}), usando {self.respaldo.nombre}")
+            self._registrar(False)
+            return None
+
+        self._registrar(True)
+
+        def continuar():
+            try:
+                elemento = primero
+                while elemento is not fin:
+                    if isinstance(elemento, Exception):
+                        raise ErrorBackend(f"{self.primario.nombre}: {elemento}") from elemento
+                    yield elemento
+                    try:
+                        elemento = cola.get(timeout=self.primario.timeout)
+                    except queue.Empty:
+                        raise ErrorBackend(f"{self.primario.nombre}: sin fragmentos en "
+                                           f"{self.primario.timeout}s") from None
+            finally:
+                # Respuesta terminada, fallida o abandonada por el llamador
+                cancelado.set()
+
+        return continuar()
+
+    def _registrar(self, exito: bool):
+        """Actualiza la ventana de resultados y activa el enfriamiento si hace falta."""
+        with self._lock:
+            self._resultados.append(exito)
+            if list(self._resultados).count(False) >= self.max_fallos:
+                self._omitir_hasta = time.monotonic() + self.enfriamiento
+                self._resultados.clear()
+
+# ============================================================================
+# LIMITE DE CONCURRENCIA COMPARTIDO
+# ============================================================================
+
+class LimitadorJusto:
+    """
+    Limita las llamadas simultáneas al modelo y reparte los turnos entre sesiones.
+
+    Las peticiones en espera se atienden por turnos rotativos entre sesiones
+    (round-robin), de modo que un estudiante con muchas peticiones no deja sin
+    servicio a los demás. Funciona entre hilos.
+    """
+
+    def __init__(self, max_concurrentes: int):
+        """
+        Args:
+            max_concurrentes (int): Llamadas simultáneas máximas al modelo
+        """
+        self.max_concurrentes = max_concurrentes
+        self._cond = threading.Condition()
+        self._activos = 0
+        self._colas: "OrderedDict[str, deque]" = OrderedDict()   # Sesión -> peticiones en espera
+
+    @property
+    def en_espera(self) -> int:
+        """Peticiones esperando turno."""
+        with self._cond:
+            return sum(len(c) for c in self._colas.values())
+
+    @property
+    def activos(self) -> int:
+        """Llamadas en curso."""
+        return self._activos
+
+    @contextmanager
+    def turno(self, sesion: str):
+        """
+        Espera un turno para la sesión y lo libera al salir del bloque.
+
+        Args:
+            sesion (str): Identificador de la sesión que hace la petición
+        """
+        ticket = object()
+        with self._cond:
+            self._colas.setdefault(sesion, deque()).append(ticket)
+            while not (self._activos < self.max_concurrentes and self._siguiente() is ticket):
+                self._cond.wait()
+            self._colas[sesion].popleft()
+            if self._colas[sesion]:
+                self._colas.move_to_end(sesion)   # Sus demás peticiones, al final de la ronda
+            else:
+                del self._colas[sesion]
+            self._activos += 1
+            # Cambió la cabeza de la ronda: el nuevo primero puede tener hueco
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._activos -= 1
+                self._cond.notify_all()
+
+    def _siguiente(self):
+        """Primera petición de la primera sesión de la ronda (con el lock tomado)."""
+        return self._colas[next(iter(self._colas))][0]
+
+
+class BackendLimitado(BackendConReintentos):
+    """
+    Envoltorio de un backend que pasa cada llamada por un LimitadorJusto.
+
+    Cada sesión usa su propio envoltorio sobre el mismo backend y el mismo
+    limitador; así las métricas de la última respuesta son por sesión.
+    """
+
+    def __init__(self, backend: BackendLLM, limitador: LimitadorJusto, sesion: str):
+        super().__init__(backend.modelo, timeout=backend.timeout,
+                         reintentos=getattr(backend, "reintentos", REINTENTOS))
+        self.nombre = backend.nombre
+        self.backend = backend
+        self.limitador = limitador
+        self.sesion = sesion
+
+    def verificar(self) -> bool:
+        return self.backend.verificar()
+
+    def precalentar(self):
+        return self.backend.precalentar()
+
+    def stream(self, mensajes, temperatura=0.7, funcion="chat", sesion=None):
+        sesion = sesion or self.sesion
+        with self.limitador.turno(self.sesion):
+            if isinstance(self.backend, BackendConReintentos) and \
+                    type(self.backend).stream is BackendConReintentos.stream:
+                # Llamar a _stream() del backend con los reintentos de este
+                # envoltorio: las métricas no se mezclan entre sesiones
+                yield from super().stream(mensajes, temperatura, funcion, sesion)
+            else:
+                # Backends con su propia lógica de enrutado (p. ej. el híbrido)
+                yield from self.backend.stream(mensajes, temperatura, funcion, sesion)
+                self.ultimas_metricas = self.backend.ultimas_metricas
+
+    def _stream(self, mensajes, temperatura):
+        return self.backend._stream(mensajes, temperatura)
+
+# ============================================================================
+# FÁBRICA DE BACKENDS
+# ============================================================================
+
+BACKENDS_DISPONIBLES = ["openai", "ollama", "hibrido", "mock"]
+
+
+def crear_backend(nombre: Optional[str] = None) -> BackendLLM:
+    """
+    Crea un backend por nombre.
+
+    Args:
+        nombre (str): openai, ollama, hibrido o mock (por defecto la variable
+            de entorno TUTOR_BACKEND o "openai")
+
+    Returns:
+        BackendLLM: Backend listo para usar
+    """
+    nombre = (nombre or os.getenv('TUTOR_BACKEND', 'openai')).lower()
+    if nombre == "openai":
+        return BackendOpenAI()
+    if nombre == "ollama":
+        return BackendOllama()
+    if nombre == "hibrido":
+        return BackendHibrido(BackendOllama(), BackendOpenAI())
+    if nombre == "mock":
+        return BackendMock()
+    raise ValueError(f"Backend '{nombre}' no válido. Opciones: {BACKENDS_DISPONIBLES}")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Memoria de Conversación para los Tutores de Robótica
+Permite que el tutor recuerde las preguntas anteriores del estudiante sin que
+el prompt crezca sin límite.
+
+Este módulo:
+1. Guarda los turnos recientes (pregunta y respuesta) de forma literal
+2. Estima los tokens de la memoria con una aproximación rápida
+3. Al superar un umbral, resume en segundo plano los turnos más antiguos
+4. Construye la lista de mensajes: sistema + resumen + turnos recientes
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import threading            # Para proteger el estado compartido con el hilo de resumen
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+CARACTERES_POR_TOKEN = 4      # Aproximación habitual para texto en español/inglés
+UMBRAL_TOKENS = 1500          # Tokens de turnos literales antes de resumir
+TURNOS_MINIMOS = 2            # Turnos recientes que nunca se resumen
+RESUMENES_SIMULTANEOS = 4     # Hilos compartidos por las memorias de todas las sesiones
+
+PROMPT_RESUMEN = """Eres un asistente que resume conversaciones entre un tutor de robótica y un estudiante.
+Actualiza el resumen existente incorporando los nuevos turnos. Conserva:
+- Los temas y conceptos que el estudiante ya preguntó
+- Los proyectos, componentes o código que se mencionaron
+- Las dudas que quedaron pendientes
+Responde solo con el resumen actualizado, en viñetas breves y en el mismo idioma de la conversación."""
+
+Mensaje = Dict[str, str]
+
+# Un solo pool para todo el proceso: cada memoria tiene como mucho un resumen
+# en curso, y crear un pool por sesión dejaría hilos vivos tras cerrarla
+_executor = ThreadPoolExecutor(max_workers=RESUMENES_SIMULTANEOS, thread_name_prefix="resumen-memoria")
+
+# ============================================================================
+# FUNCIONES AUXILIARES
+# ============================================================================
+
+def estimar_tokens(texto: str) -> int:
+    """Estima el número de tokens de un texto sin usar un tokenizador."""
+    return len(texto) // CARACTERES_POR_TOKEN + 1
+
+
+def construir_mensajes_resumen(resumen_previo: str, mensajes: List[Mensaje]) -> List[Mensaje]:
+    """
+    Construye la petición al modelo para actualizar el resumen.
+
+    Args:
+        resumen_previo (str): Resumen acumulado hasta ahora (puede estar vacío)
+        mensajes (list): Turnos que se van a incorporar al resumen
+
+    Returns:
+        list: Mensajes en formato chat listos para enviar al modelo
+    """
+    transcripcion = "\n".join(
+        f"{'Estudiante' if m['role'] == 'user' else 'Tutor'}: {m['content']}" for m in mensajes
+    )
+    return [
+        {"role": "system", "content": PROMPT_RESUMEN},
+        {"role": "user", "content": f"RESUMEN ACTUAL:\n{resumen_previo or '(vacío)'}\n\nNUEVOS TURNOS:\n{transcripcion}"}
+    ]
+
+# ============================================================================
+# CLASE DE MEMORIA
+# ============================================================================
+
+class MemoriaConversacion:
+    """
+    Memoria de conversación con ventana de turnos recientes y resumen acumulado.
+
+    El resumen se calcula en un hilo aparte para que el estudiante no espere;
+    mientras tanto, los turnos que se están resumiendo se siguen enviando
+    literalmente, de modo que nunca se pierde contexto.
+    """
+
+    def __init__(self, resumir: Callable[[List[Mensaje]], str],
+                 umbral_tokens: int = UMBRAL_TOKENS, turnos_minimos: int = TURNOS_MINIMOS):
+        """
+        Inicializa la memoria.
+
+        Args:
+            resumir (callable): Recibe los mensajes de construir_mensajes_resumen()
+                y devuelve el texto del resumen (cada tutor usa su propio modelo)
+            umbral_tokens (int): Tokens de turnos literales que disparan el resumen
+            turnos_minimos (int): Turnos recientes que siempre se conservan literales
+        """
+        self.resumir = resumir
+        self.umbral_tokens = umbral_tokens
+        self.turnos_minimos = turnos_minimos
+        self.resumen = ""
+        self._turnos: Deque[List[Mensaje]] = deque()   # Cada turno: [usuario, asistente]
+        self._en_resumen: List[List[Mensaje]] = []      # Turnos que se están resumiendo
+        self._tokens_turnos = 0
+        self._lock = threading.RLock()
+        self._tarea: Optional[Future] = None
+
+    def mensajes(self, system_prompt: str) -> List[Mensaje]:
+        """
+        Construye el historial que se envía al modelo antes de la nueva pregunta.
+
+        Args:
+            system_prompt (str): Prompt del sistema del tutor
+
+        Returns:
+            list: Mensajes de sistema, resumen y turnos recientes
+        """
+        with self._lock:
+            mensajes = [{"role": "system", "content": system_prompt}]
+            if self.resumen:
+                mensajes.append({"role": "system", "content": f"RESUMEN DE LA CONVERSACIÓN PREVIA:\n{self.resumen}"})
+            for turno in self._en_resumen:
+                mensajes.extend(turno)
+            for turno in self._turnos:
+                mensajes.extend(turno)
+            return mensajes
+
+    def agregar_turno(self, pregunta: str, respuesta: str):
+        """
+        Registra una pregunta y su respuesta; resume en segundo plano si hace falta.
+
+        Args:
+            pregunta (str): Pregunta del estudiante
+            respuesta (str): Respuesta del tutor
+        """
+        with self._lock:
+            turno = [{"role": "user", "content": pregunta},
+                     {"role": "assistant", "content": respuesta}]
+            self._turnos.append(turno)
+            self._tokens_turnos += self._tokens_de(turno)
+
+            if self._tokens_turnos > self.umbral_tokens and self._tarea is None:
+                self._iniciar_resumen()
+
+    def reiniciar(self):
+        """Olvida toda la conversación (el resumen en curso se descarta)."""
+        with self._lock:
+            self.resumen = ""
+            self._turnos.clear()
+            self._en_resumen = []
+            self._tokens_turnos = 0
+            self._tarea = None
+
+    def esperar_resumen(self, timeout: Optional[float] = None):
+        """Espera a que termine el resumen en curso (útil al cerrar el programa)."""
+        tarea = self._tarea
+        if tarea is not None:
+            tarea.result(timeout)
+
+    @property
+    def vacia(self) -> bool:
+        """True si todavía no hay ningún turno ni resumen."""
+        with self._lock:
+            return not (self.resumen or self._turnos or self._en_resumen)
+    
+    @property
+    def tokens_estimados(self) -> int:
+        """Tokens aproximados de la memoria completa (resumen + turnos)."""
+        with self._lock:
+            pendientes = sum(self._tokens_de(t) for t in self._en_resumen)
+            return estimar_tokens(self.resumen) + pendientes + self._tokens_turnos
+
+    # ------------------------------------------------------------------
+    # Resumen en segundo plano
+    # ------------------------------------------------------------------
+
+    def _iniciar_resumen(self):
+        """Mueve los turnos más antiguos a resumen (se llama con el lock tomado)."""
+        # Quitar turnos viejos hasta quedar en la mitad del umbral
+        while len(self._turnos) > self.turnos_minimos and self._tokens_turnos > self.umbral_tokens // 2:
+            turno = self._turnos.popleft()
+            self._tokens_turnos -= self._tokens_de(turno)
+            self._en_resumen.append(turno)
+
+        if not self._en_resumen:
+            return
+
+        mensajes = construir_mensajes_resumen(self.resumen, [m for t in self._en_resumen for m in t])
+        # El callback puede ejecutarse en este mismo hilo si el resumen ya terminó,
+        # por eso se registra la tarea antes y el lock es reentrante
+        self._tarea = _executor.submit(self.resumir, mensajes)
+        self._tarea.add_done_callback(self._resumen_terminado)
+
+    def _resumen_terminado(self, tarea: Future):
+        """Incorpora el resumen calculado o devuelve los turnos si falló."""
+        with self._lock:
+            if tarea is not self._tarea:
+                return   # La memoria se reinició mientras se resumía
+
+            self._tarea = None
+            error = tarea.exception()
+            resumen = "" if error else (tarea.result() or "").strip()
+            if resumen:
+                self.resumen = resumen
+            else:
+                print(f"\n⚠️ No se pudo resumir la conversación: {error or 'respuesta vacía'}")
+                # Devolver los turnos a la ventana; se reintenta al agregar el
+                # próximo turno, no de inmediato
+                for turno in reversed(self._en_resumen):
+                    self._turnos.appendleft(turno)
+                    self._tokens_turnos += self._tokens_de(turno)
+            self._en_resumen = []
+
+            # Si llegaron más turnos mientras se resumía, continuar con ellos
+            if resumen and self._tokens_turnos > self.umbral_tokens:
+                self._iniciar_resumen()
+
+    @staticmethod
+    def _tokens_de(turno: List[Mensaje]) -> int:
+        return sum(estimar_tokens(m["content"]) for m in turno)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Precálculo de Respuestas para las Preguntas de Ejemplo
+Genera por adelantado las respuestas a EJEMPLOS_PREGUNTAS para todos los
+niveles e idiomas del tutor, de modo que al preguntarlas el estudiante
+las recibe sin esperar al modelo.
+
+Solo se generan las respuestas que faltan o cuya versión de prompt cambió
+(al editar un archivo de prompts/ basta con volver a ejecutar este script).
+
+Uso:
+    python precalcular_respuestas.py
+    python precalcular_respuestas.py --backend ollama --concurrencia 2
+    python precalcular_respuestas.py --niveles primaria --idiomas Español English
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import argparse             # Para los argumentos de la línea de comandos
+import time                 # Para medir la duración del lote
+
+from backends_llm import BACKENDS_DISPONIBLES, crear_backend
+# tutor_robotica hace importable el paquete compartido `comun`
+from tutor_robotica import (EJEMPLOS_PREGUNTAS, IDIOMAS_DISPONIBLES, NIVELES_EDUCATIVOS,
+                            REGISTRO_PROMPTS, RESPUESTAS_PRECALCULADAS, construir_prompt_usuario,
+                            get_system_prompt_para_pregunta)
+from comun.respuestas_precalculadas import MAX_CONCURRENCIA, TareaPrecalculo, precalcular
+
+# ============================================================================
+# MATRIZ DE PREGUNTAS
+# ============================================================================
+
+def construir_tareas(niveles, idiomas):
+    """
+    Construye la matriz (pregunta × nivel × idioma) con la versión actual de cada prompt.
+
+    Args:
+        niveles (list): Niveles educativos a cubrir
+        idiomas (list): Idiomas a cubrir
+
+    Returns:
+        list: Tareas de precálculo
+    """
+    return [
+        TareaPrecalculo(nivel, idioma, pregunta, REGISTRO_PROMPTS.obtener(nivel, idioma).version)
+        for nivel in niveles
+        for idioma in idiomas
+        for pregunta in EJEMPLOS_PREGUNTAS[nivel]
+    ]
+
+# ============================================================================
+# FUNCIÓN PRINCIPAL
+# ============================================================================
+
+def main():
+    """Genera las respuestas pendientes de la matriz de ejemplos."""
+    parser = argparse.ArgumentParser(description="Precalcula las respuestas de las preguntas de ejemplo")
+    parser.add_argument("--backend", choices=BACKENDS_DISPONIBLES, help="Backend del modelo (por defecto TUTOR_BACKEND u openai)")
+    parser.add_argument("--niveles", nargs="+", choices=list(NIVELES_EDUCATIVOS), default=list(NIVELES_EDUCATIVOS))
+    parser.add_argument("--idiomas", nargs="+", default=IDIOMAS_DISPONIBLES)
+    parser.add_argument("--concurrencia", type=int, default=MAX_CONCURRENCIA, help="Peticiones simultáneas al modelo")
+    parser.add_argument("--forzar", action="store_true", help="Regenerar también las respuestas vigentes")
+    args = parser.parse_args()
+
+    backend = crear_backend(args.backend)
+    if not backend.verificar():
+        exit(1)
+
+    def generar(tarea: TareaPrecalculo) -> str:
+        mensajes = [
+            {"role": "system", "content": get_system_prompt_para_pregunta(tarea.nivel, tarea.idioma, tarea.pregunta)},
+            {"role": "user", "content": construir_prompt_usuario(tarea.pregunta, tarea.nivel)}
+        ]
+        return backend.completar(mensajes, temperatura=0.7, funcion="precalculo")
+
+    print("🧮 PRECÁLCULO DE RESPUESTAS DE EJEMPLO")
+    print("=" * 40)
+    inicio = time.perf_counter()
+    resultado = precalcular(RESPUESTAS_PRECALCULADAS, construir_tareas(args.niveles, args.idiomas),
+                            generar, modelo=backend.modelo, max_concurrencia=args.concurrencia,
+                            forzar=args.forzar)
+
+    print("=" * 40)
+    print(f"✅ Generadas: {resultado['generadas']} | Vigentes: {resultado['vigentes']} | "
+          f"Errores: {resultado['errores']} | {time.perf_counter() - inicio:.1f}s")
+    print(f"💾 Guardadas en {RESPUESTAS_PRECALCULADAS.ruta}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⏹️ Precálculo interrumpido (las respuestas ya generadas están guardadas)")
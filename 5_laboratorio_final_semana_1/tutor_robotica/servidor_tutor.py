@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Servidor Multi-Estudiante del Tutor de Robótica
+Un solo proceso atiende a toda una clase: cada estudiante se conecta por TCP
+y tiene su propia sesión del tutor (nivel, idioma e historial).
+
+Este servidor:
+1. Usa asyncio para atender muchas conexiones en un solo proceso
+2. Crea un TutorRobotica independiente por conexión
+3. Comparte un único backend del modelo entre todas las sesiones
+4. Limita las llamadas simultáneas al modelo y reparte los turnos entre
+   estudiantes (nadie acapara el modelo aunque envíe muchas preguntas)
+5. Transmite cada respuesta token a token al estudiante
+
+PROTOCOLO (una línea por mensaje, UTF-8):
+- Cualquier texto es una pregunta para el tutor
+- Comandos: /nivel <nivel>, /idioma <idioma>, /tema <tema>, /ejemplos,
+  /info, /reiniciar, /ayuda, /salir
+- Tras cada respuesta el servidor envía el indicador ">>> "
+
+Uso:
+    python servidor_tutor.py --backend ollama --puerto 8765 --max-concurrentes 4
+    nc 127.0.0.1 8765       # Cliente de prueba
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import argparse             # Para los argumentos de la línea de comandos
+import asyncio              # Servidor TCP asíncrono
+import itertools            # Para numerar las sesiones
+import os                   # Para variables de entorno
+import threading            # Para cancelar respuestas de clientes desconectados
+from concurrent.futures import ThreadPoolExecutor
+
+from backends_llm import BACKENDS_DISPONIBLES, BackendLimitado, LimitadorJusto, crear_backend
+from tutor_robotica import (EJEMPLOS_PREGUNTAS, IDIOMAS_DISPONIBLES, NIVELES_EDUCATIVOS,
+                            TutorRobotica)
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+HOST = os.getenv('TUTOR_HOST', '127.0.0.1')
+PUERTO = int(os.getenv('TUTOR_PUERTO', '8765'))
+MAX_CONCURRENTES = int(os.getenv('TUTOR_MAX_CONCURRENTES', '8'))   # Llamadas simultáneas al modelo
+MAX_SESIONES = int(os.getenv('TUTOR_MAX_SESIONES', '200'))         # Conexiones simultáneas
+
+INDICADOR = ">>> "           # Marca el final de cada respuesta
+MAX_LINEA = 4096             # Bytes máximos por línea recibida
+
+AYUDA = """Comandos disponibles:
+  /nivel <nivel>     Cambiar nivel (preescolar, primaria, secundaria, preparatoria)
+  /idioma <idioma>   Cambiar idioma de las respuestas
+  /tema <tema>       Fijar el tema de las preguntas (/tema general para quitarlo)
+  /ejemplos          Ver preguntas de ejemplo del nivel
+  /info              Ver la configuración actual
+  /reiniciar         Olvidar la conversación
+  /salir             Terminar la sesión
+Cualquier otro texto se envía como pregunta al tutor."""
+
+# ============================================================================
+# SESIÓN DE UN ESTUDIANTE
+# ============================================================================
+
+class SesionEstudiante:
+    """
+    Estado y bucle de una conexión: un tutor propio y el tema actual.
+    """
+
+    def __init__(self, servidor: "ServidorTutor", reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter, sesion_id: str):
+        self.servidor = servidor
+        self.reader = reader
+        self.writer = writer
+        self.sesion_id = sesion_id
+        self.tema = "general"
+        # Cada sesión tiene su envoltorio del backend compartido (métricas propias)
+        backend = BackendLimitado(servidor.backend, servidor.limitador, sesion_id)
+        self.tutor = TutorRobotica(backend=backend, silencioso=True)
+
+    async def enviar(self, texto: str):
+        """Envía texto al estudiante respetando el control de flujo del socket."""
+        self.writer.write(texto.encode('utf-8'))
+        await self.writer.drain()
+
+    async def atender(self):
+        """Bucle principal de la sesión: lee líneas y responde hasta /salir o desconexión."""
+        await self.enviar(f"🤖 Tutor de Robótica - sesión {self.sesion_id}\n"
+                          f"📚 Nivel: {self.tutor.nivel} | 🌍 Idioma: {self.tutor.language}\n"
+                          f"{AYUDA}\n{INDICADOR}")
+        while True:
+            try:
+                linea = await self.reader.readline()
+            except ValueError:
+                await self.enviar(f"❌ Línea demasiado larga (máximo {MAX_LINEA} bytes)\n{INDICADOR}")
+                continue
+            if not linea:
+                return   # El estudiante cerró la conexión
+            texto = linea.decode('utf-8', errors='replace').strip()
+            if not texto:
+                await self.enviar(INDICADOR)
+                continue
+            if texto.startswith("/"):
+                if not await self.comando(texto):
+                    return
+            else:
+                await self.responder(texto)
+            await self.enviar(f"\n{INDICADOR}")
+
+    async def comando(self, texto: str) -> bool:
+        """
+        Ejecuta un comando de la sesión.
+
+        Returns:
+            bool: False si la sesión debe terminar
+        """
+        nombre, _, argumento = texto[1:].partition(" ")
+        nombre, argumento = nombre.lower(), argumento.strip()
+
+        if nombre == "salir":
+            await self.enviar("👋 ¡Gracias por usar el Tutor de Robótica!\n")
+            return False
+        if nombre == "nivel":
+            if argumento.lower() in NIVELES_EDUCATIVOS:
+                self.tutor.cambiar_nivel(argumento.lower())
+                await self.enviar(f"📚 Nivel cambiado a: {self.tutor.nivel}")
+            else:
+                await self.enviar(f"❌ Nivel no válido. Opciones: {', '.join(NIVELES_EDUCATIVOS)}")
+        elif nombre == "idioma" and argumento:
+            self.tutor.cambiar_idioma(argumento)
+            await self.enviar(f"🌍 Idioma cambiado a: {argumento}")
+        elif nombre == "tema":
+            self.tema = argumento or "general"
+            await self.enviar(f"🔧 Tema: {self.tema}")
+        elif nombre == "ejemplos":
+            preguntas = "\n".join(f"• {p}" for p in EJEMPLOS_PREGUNTAS[self.tutor.nivel])
+            await self.enviar(f"💡 Ejemplos para {self.tutor.nivel}:\n{preguntas}")
+        elif nombre == "info":
+            metricas = self.tutor.ultimas_metricas
+            await self.enviar(f"📚 Nivel: {self.tutor.nivel} | 🌍 Idioma: {self.tutor.language} | "
+                              f"🔧 Tema: {self.tema} | Idiomas: {', '.join(IDIOMAS_DISPONIBLES)}"
+                              + (f"\n⏱️ {metricas.resumen()}" if metricas else ""))
+        elif nombre == "reiniciar":
+            self.tutor.memoria.reiniciar()
+            await self.enviar("🧹 Conversación reiniciada")
+        else:
+            await self.enviar(AYUDA)
+        return True
+
+    async def responder(self, pregunta: str):
+        """
+        Genera la respuesta en un hilo y la transmite al estudiante en cuanto llega.
+
+        Los clientes del modelo son síncronos; el hilo publica cada fragmento en
+        una cola de asyncio y esta corrutina los envía por el socket.
+        """
+        loop = asyncio.get_running_loop()
+        cola: asyncio.Queue = asyncio.Queue()
+        cancelado = threading.Event()
+        fin = object()
+
+        def generar():
+            try:
+                for texto in self.tutor.responder_stream(pregunta, self.tema):
+                    if cancelado.is_set():
+                        break   # El estudiante se desconectó: dejar de consumir el modelo
+                    loop.call_soon_threadsafe(cola.put_nowait, texto)
+            except Exception as e:
+                loop.call_soon_threadsafe(cola.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(cola.put_nowait, fin)
+
+        tarea = loop.run_in_executor(self.servidor.executor, generar)
+        try:
+            while True:
+                elemento = await cola.get()
+                if elemento is fin:
+                    break
+                if isinstance(elemento, Exception):
+                    await self.enviar(f"\n❌ Error al generar respuesta: {elemento}")
+                    continue
+                await self.enviar(elemento)
+        finally:
+            cancelado.set()
+            await tarea
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+
+class ServidorTutor:
+    """
+    Servidor TCP que crea una SesionEstudiante por conexión.
+    """
+
+    def __init__(self, backend, max_concurrentes: int = MAX_CONCURRENTES,
+                 max_sesiones: int = MAX_SESIONES):
+        """
+        Args:
+            backend (BackendLLM): Backend compartido por todas las sesiones
+            max_concurrentes (int): Llamadas simultáneas máximas al modelo
+            max_sesiones (int): Conexiones simultáneas máximas
+        """
+        self.backend = backend
+        self.limitador = LimitadorJusto(max_concurrentes)
+        self.max_sesiones = max_sesiones
+        # Un hilo por sesión activa como máximo: los que esperan turno del
+        # limitador no consumen CPU
+        self.executor = ThreadPoolExecutor(max_workers=max_sesiones, thread_name_prefix="sesion")
+        self.sesiones = {}
+        self._ids = itertools.count(1)
+
+    async def manejar_conexion(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atiende una conexión de principio a fin."""
+        sesion_id = f"s{next(self._ids)}"
+        if len(self.sesiones) >= self.max_sesiones:
+            writer.write("❌ El servidor está lleno, intenta de nuevo en unos minutos\n".encode('utf-8'))
+            await writer.drain()
+            writer.close()
+            return
+
+        sesion = SesionEstudiante(self, reader, writer, sesion_id)
+        self.sesiones[sesion_id] = sesion
+        print(f"🔌 {sesion_id} conectada desde {writer.get_extra_info('peername')} "
+              f"({len(self.sesiones)} activas)")
+        try:
+            await sesion.atender()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self.sesiones[sesion_id]
+            writer.close()
+            print(f"👋 {sesion_id} desconectada ({len(self.sesiones)} activas, "
+                  f"{self.limitador.activos} llamadas en curso, {self.limitador.en_espera} en espera)")
+
+    async def servir(self, host: str = HOST, puerto: int = PUERTO):
+        """Escucha conexiones hasta que se interrumpa el proceso."""
+        servidor = await asyncio.start_server(self.manejar_conexion, host, puerto, limit=MAX_LINEA)
+        print(f"🚀 Tutor de Robótica escuchando en {host}:{puerto} "
+              f"(modelo {self.backend.modelo}, {self.limitador.max_concurrentes} llamadas simultáneas)")
+        async with servidor:
+            await servidor.serve_forever()
+
+# ============================================================================
+# FUNCIÓN PRINCIPAL
+# ============================================================================
+
+def main():
+    """Arranca el servidor multi-estudiante."""
+    parser = argparse.ArgumentParser(description="Servidor multi-estudiante del Tutor de Robótica")
+    parser.add_argument("--backend", choices=BACKENDS_DISPONIBLES, help="Backend del modelo (por defecto TUTOR_BACKEND u openai)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--max-concurrentes", type=int, default=MAX_CONCURRENTES, help="Llamadas simultáneas al modelo")
+    parser.add_argument("--max-sesiones", type=int, default=MAX_SESIONES, help="Conexiones simultáneas")
+    args = parser.parse_args()
+
+    backend = crear_backend(args.backend)
+    if not backend.verificar():
+        exit(1)
+    backend.precalentar()
+
+    servidor = ServidorTutor(backend, args.max_concurrentes, args.max_sesiones)
+    asyncio.run(servidor.servir(args.host, args.puerto))
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n👋 Servidor detenido")
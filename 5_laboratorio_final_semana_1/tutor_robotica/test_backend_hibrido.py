@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Pruebas del BackendHibrido (primario local con respaldo en la nube).
+
+Uso:
+    python -m pytest -q test_backend_hibrido.py
+"""
+
+import threading
+
+import pytest
+
+from backends_llm import BackendHibrido, BackendLLM, ErrorBackend
+
+
+class PrimarioFalso(BackendLLM):
+    """Entrega fragmentos cada `pausa` segundos; se atasca tras `atascar_en` fragmentos."""
+
+    nombre = "local"
+
+    def __init__(self, pausa=0.01, atascar_en=None, timeout=0.2):
+        super().__init__("falso", timeout=timeout)
+        self.pausa = pausa
+        self.atascar_en = atascar_en
+        self.entregados = 0
+        self.cerrado = threading.Event()
+        self._soltar = threading.Event()
+
+    def stream(self, mensajes, temperatura=0.7, funcion="chat", sesion=None):
+        try:
+            while True:
+                if self.entregados == self.atascar_en:
+                    self._soltar.wait(5)
+                self._soltar.wait(self.pausa)
+                self.entregados += 1
+                yield f"t{self.entregados} "
+        finally:
+            self.cerrado.set()
+
+
+class RespaldoFalso(BackendLLM):
+    nombre = "nube"
+
+    def stream(self, mensajes, temperatura=0.7, funcion="chat", sesion=None):
+        yield "respaldo"
+
+
+def test_primario_atascado_a_mitad_lanza_error_backend():
+    hibrido = BackendHibrido(PrimarioFalso(atascar_en=2), RespaldoFalso("nube"))
+    recibidos = []
+    with pytest.raises(ErrorBackend):
+        for texto in hibrido.stream([]):
+            recibidos.append(texto)
+    assert recibidos == ["t1 ", "t2 "]
+
+
+def test_abandonar_la_respuesta_detiene_al_primario():
+    primario = PrimarioFalso()
+    hibrido = BackendHibrido(primario, RespaldoFalso("nube"))
+    fragmentos = hibrido.stream([])
+    assert next(fragmentos) == "t1 "
+    fragmentos.close()
+
+    assert primario.cerrado.wait(2)
+    entregados = primario.entregados
+    threading.Event().wait(0.1)
+    assert primario.entregados == entregados
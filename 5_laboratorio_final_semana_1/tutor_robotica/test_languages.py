@@ -5,16 +5,31 @@ del generador de folletos empresariales.
 
 Este script demuestra cómo usar la nueva función generate_custom_brochure
 con diferentes idiomas.
+
+Es un script manual (llama a OpenAI y descarga páginas web): pytest no lo
+recolecta y el generador solo se importa al ejecutarlo.
 """
 
-from brochure_generator import generate_custom_brochure
+import sys
+from pathlib import Path
+
+# No es una prueba unitaria: evitar que pytest la ejecute al recolectar tests
+__test__ = False
+
+# El generador de folletos vive en la carpeta hermana brochure_generator/
+DIR_FOLLETOS = Path(__file__).resolve().parents[1] / "brochure_generator"
 
 def test_different_languages():
     """
     Prueba la generación de folletos en diferentes idiomas.
     """
+    sys.path.insert(0, str(DIR_FOLLETOS))
+    from brochure_generator import generate_custom_brochure, verificar_api_key
+    
     print("🧪 Probando la funcionalidad de cambio de idioma")
     print("=" * 50)
+    if not verificar_api_key():
+        return
     
     # Configuración de la empresa de prueba
     company_name = "Frogames Formación"
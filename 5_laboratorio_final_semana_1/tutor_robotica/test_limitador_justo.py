@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Pruebas del LimitadorJusto (reparto de turnos entre sesiones).
+
+Uso:
+    python -m pytest -q test_limitador_justo.py
+"""
+
+import threading
+
+from backends_llm import LimitadorJusto
+
+
+def _ocupar(limitador, sesion, dentro, salir):
+    """Toma un turno, avisa con `dentro` y lo suelta cuando se activa `salir`."""
+    with limitador.turno(sesion):
+        dentro.set()
+        salir.wait(5)
+
+
+def _esperar(condicion, segundos=2.0):
+    """Espera activa corta hasta que se cumpla la condición."""
+    fin = threading.Event()
+    for _ in range(int(segundos / 0.005)):
+        if condicion():
+            return True
+        fin.wait(0.005)
+    return condicion()
+
+
+def test_nuevo_primero_de_la_ronda_entra_si_hay_hueco():
+    """
+    Si se liberan dos turnos a la vez y entra el primero de la ronda, el
+    siguiente no debe quedarse esperando con un hueco libre.
+    """
+    for _ in range(30):
+        limitador = LimitadorJusto(max_concurrentes=2)
+        soltar_ocupantes, soltar_a, soltar_b = threading.Event(), threading.Event(), threading.Event()
+        dentro = {nombre: threading.Event() for nombre in ("h1", "h2", "a", "b")}
+        hilos = [threading.Thread(target=_ocupar, args=(limitador, h, dentro[h], soltar_ocupantes), daemon=True)
+                 for h in ("h1", "h2")]
+        for hilo in hilos:
+            hilo.start()
+        assert dentro["h1"].wait(2) and dentro["h2"].wait(2)
+
+        # a y b esperan (en ese orden) con el limitador lleno
+        for sesion, salir in (("a", soltar_a), ("b", soltar_b)):
+            hilo = threading.Thread(target=_ocupar, args=(limitador, sesion, dentro[sesion], salir), daemon=True)
+            hilo.start()
+            hilos.append(hilo)
+            esperando = len(hilos) - 2
+            assert _esperar(lambda: limitador.en_espera == esperando)
+
+        soltar_ocupantes.set()
+        assert dentro["a"].wait(2)
+        # Queda un hueco libre: b debe entrar mientras a sigue dentro
+        assert dentro["b"].wait(2), "b sigue esperando con un turno libre"
+        assert limitador.activos == 2
+
+        soltar_a.set()
+        soltar_b.set()
+        for hilo in hilos:
+            hilo.join(2)
+        assert limitador.activos == 0 and limitador.en_espera == 0
+
+
+def test_turnos_rotan_entre_sesiones():
+    """Con un solo turno, una sesión con muchas peticiones no acapara el modelo."""
+    limitador = LimitadorJusto(max_concurrentes=1)
+    orden = []
+    soltar = threading.Event()
+    dentro = threading.Event()
+    ocupante = threading.Thread(target=_ocupar, args=(limitador, "ocupante", dentro, soltar), daemon=True)
+    ocupante.start()
+    assert dentro.wait(2)
+
+    def pedir(sesion):
+        with limitador.turno(sesion):
+            orden.append(sesion)
+
+    hilos = []
+    for sesion in ("a", "a", "a", "b"):
+        hilo = threading.Thread(target=pedir, args=(sesion,), daemon=True)
+        hilo.start()
+        hilos.append(hilo)
+        esperando = len(hilos)
+        assert _esperar(lambda: limitador.en_espera == esperando)
+
+    soltar.set()
+    for hilo in hilos:
+        hilo.join(2)
+    assert orden == ["a", "b", "a", "a"]
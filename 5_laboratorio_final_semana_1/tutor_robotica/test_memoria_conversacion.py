@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Pruebas de MemoriaConversacion (resumen en segundo plano).
+
+Uso:
+    python -m pytest -q test_memoria_conversacion.py
+"""
+
+import threading
+
+from memoria_conversacion import MemoriaConversacion
+
+
+class ResumidorFalso:
+    """Cuenta las llamadas y responde lo indicado (o lanza la excepción)."""
+
+    def __init__(self, respuesta):
+        self.respuesta = respuesta
+        self.llamadas = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, mensajes):
+        with self._lock:
+            self.llamadas += 1
+        if isinstance(self.respuesta, Exception):
+            raise self.respuesta
+        return self.respuesta
+
+
+def _llenar(memoria, turnos):
+    for i in range(turnos):
+        memoria.agregar_turno(f"pregunta {i} " + "p" * 200, f"respuesta {i} " + "r" * 200)
+    try:
+        memoria.esperar_resumen(2)
+    except RuntimeError:
+        pass   # El error del resumidor ya lo gestionó la memoria
+
+
+def test_resumen_correcto_sustituye_turnos_antiguos():
+    resumir = ResumidorFalso("  - El estudiante preguntó por servomotores  ")
+    memoria = MemoriaConversacion(resumir, umbral_tokens=150, turnos_minimos=1)
+    _llenar(memoria, 3)
+
+    assert memoria.resumen == "- El estudiante preguntó por servomotores"
+    mensajes = memoria.mensajes("Sistema")
+    assert mensajes[1]["content"].startswith("RESUMEN DE LA CONVERSACIÓN PREVIA")
+    assert len(mensajes) < 2 + 3 * 2   # Algún turno pasó al resumen
+
+
+def test_error_devuelve_los_turnos_a_la_ventana():
+    resumir = ResumidorFalso(RuntimeError("sin red"))
+    memoria = MemoriaConversacion(resumir, umbral_tokens=150, turnos_minimos=1)
+    _llenar(memoria, 3)
+
+    assert memoria.resumen == ""
+    assert len(memoria.mensajes("Sistema")) == 1 + 3 * 2
+    assert resumir.llamadas == 1
+
+
+def test_resumen_vacio_no_se_reintenta_en_bucle():
+    resumir = ResumidorFalso("")
+    memoria = MemoriaConversacion(resumir, umbral_tokens=50, turnos_minimos=1)
+    _llenar(memoria, 3)
+    threading.Event().wait(0.2)   # Margen para un reintento indebido
+
+    assert memoria.resumen == ""
+    assert len(memoria.mensajes("Sistema")) == 1 + 3 * 2
+    assert resumir.llamadas == 1
+
+    # El reintento llega con el siguiente turno
+    _llenar(memoria, 1)
+    assert resumir.llamadas == 2
@@ -4,40 +4,46 @@ Tutor de Robótica Inteligente
 Script que actúa como tutor personalizado para enseñar robótica, Arduino, 
 electrónica, mecatrónica y programación a estudiantes de diferentes edades.
 
-Este script utiliza OpenAI GPT con prompts multi-shot para:
+Este script utiliza OpenAI GPT (u otro backend) con prompts multi-shot para:
 1. Adaptar el lenguaje según el nivel educativo (preescolar, primaria, secundaria, preparatoria)
 2. Explicar conceptos de robótica de manera apropiada para cada edad
 3. Proporcionar ejemplos prácticos y proyectos adaptados
 4. Soportar múltiples idiomas para la enseñanza
+
+El modelo se elige al ejecutar: --backend openai|ollama|hibrido|mock
+(o la variable de entorno TUTOR_BACKEND).
 """
 
 # ============================================================================
 # IMPORTACIONES NECESARIAS
 # ============================================================================
 import os                    # Para variables de entorno
-import json                 # Para manejar respuestas JSON de OpenAI
+import sys                   # Para importar los módulos compartidos del repositorio
+import argparse             # Para elegir el backend desde la línea de comandos
+import time                 # Para medir las respuestas servidas desde la caché
 from dotenv import load_dotenv      # Para cargar variables de entorno desde .env
-from openai import OpenAI           # Cliente oficial de OpenAI
-from typing import Dict, List       # Para type hints
+from typing import Callable, Dict, Iterator, List, Optional  # Para type hints
+from pathlib import Path            # Para localizar archivos junto al script
+
+# Hacer importable el paquete compartido `comun` de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from comun.registro_prompts import RegistroPrompts  # Caché de prompts por (nivel, idioma)
+from comun.cache_semantico import CacheSemantico  # Caché de respuestas a preguntas frecuentes
+from comun.respuestas_precalculadas import AlmacenRespuestas  # Respuestas a los ejemplos
+from memoria_conversacion import MemoriaConversacion  # Historial con resumen acumulado
+from backends_llm import (BACKENDS_DISPONIBLES, MODELO_OPENAI, BackendLLM,  # Backends de modelos
+                          MetricasLLM, crear_backend)
 
 # ============================================================================
-# CONFIGURACIÓN INICIAL Y VALIDACIÓN
+# CONFIGURACIÓN INICIAL
 # ============================================================================
 
 # Cargar variables de entorno desde el archivo .env
+# (la clave de API se valida al arrancar el backend, no al importar el módulo)
 load_dotenv()
-api_key = os.getenv('OPENAI_API_KEY')
-
-# Validar que la clave API de OpenAI esté configurada correctamente
-if api_key and api_key[:8] == 'sk-proj-':
-    print("✓ La clave de API parece buena")
-else:
-    print("❌ Puede haber un problema con tu clave API")
-    exit(1)  # Terminar el programa si no hay API key válida
 
-# Configuración del modelo de OpenAI a utilizar
-MODEL = 'gpt-4o-mini'   # Modelo eficiente para tareas educativas
-openai = OpenAI()       # Inicializar el cliente de OpenAI
+# Modelo de OpenAI usado por el backend por defecto
+MODEL = MODELO_OPENAI   # Modelo eficiente para tareas educativas
 
 # ============================================================================
 # CONFIGURACIÓN DE NIVELES EDUCATIVOS
@@ -76,38 +82,45 @@ TEMAS_ROBOTICA = [
     "proyectos", "robotica_basica", "automatizacion"
 ]
 
+IDIOMAS_DISPONIBLES = ["Español", "English", "Français", "Deutsch", "Italiano", "Português"]
+
+# Preguntas de ejemplo que se muestran a cada nivel (sus respuestas se
+# precalculan con precalcular_respuestas.py)
+EJEMPLOS_PREGUNTAS = {
+    "preescolar": [
+        "¿Qué es un robot?",
+        "¿Cómo se enciende un LED?",
+        "¿Por qué los robots se mueven?"
+    ],
+    "primaria": [
+        "¿Cómo funciona Arduino?",
+        "¿Qué son los sensores?",
+        "¿Cómo hago que un LED parpadee?"
+    ],
+    "secundaria": [
+        "¿Cómo programo un motor con Arduino?",
+        "¿Cómo calculo resistencias para LEDs?",
+        "¿Qué es PWM y cómo se usa?"
+    ],
+    "preparatoria": [
+        "¿Cómo implemento comunicación I2C?",
+        "¿Qué es un controlador PID?",
+        "¿Cómo diseño un sistema de control automático?"
+    ]
+}
+
 # ============================================================================
 # PROMPTS MULTI-SHOT PARA DIFERENTES NIVELES
 # ============================================================================
 
-def cargar_prompt_desde_archivo(nivel: str) -> str:
+def construir_prompt_sistema(nivel: str, language: str, ejemplos: str) -> str:
     """
-    Carga el prompt multi-shot desde un archivo externo.
-    
-    Args:
-        nivel (str): Nivel educativo (preescolar, primaria, secundaria, preparatoria)
-        
-    Returns:
-        str: Contenido del archivo de prompt
-    """
-    try:
-        archivo_prompt = f"prompts/{nivel}.txt"
-        with open(archivo_prompt, 'r', encoding='utf-8') as file:
-            return file.read()
-    except FileNotFoundError:
-        print(f"⚠️ Archivo de prompt no encontrado: {archivo_prompt}")
-        return "No hay ejemplos disponibles para este nivel."
-    except Exception as e:
-        print(f"❌ Error al cargar prompt: {e}")
-        return "Error al cargar ejemplos."
-
-def get_system_prompt_multishot(nivel: str, language: str = "Español") -> str:
-    """
-    Genera el prompt del sistema con ejemplos multi-shot para cada nivel educativo.
+    Construye el prompt del sistema con ejemplos multi-shot para un nivel educativo.
     
     Args:
         nivel (str): Nivel educativo (preescolar, primaria, secundaria, preparatoria)
         language (str): Idioma para las respuestas
+        ejemplos (str): Ejemplos multi-shot del archivo prompts/{nivel}.txt
         
     Returns:
         str: Prompt del sistema con ejemplos multi-shot
@@ -132,9 +145,6 @@ INSTRUCCIONES GENERALES:
 
 EJEMPLOS DE RESPUESTAS MULTI-SHOT PARA NIVEL {nivel.upper()}:"""
 
-    # Cargar ejemplos desde archivo externo
-    ejemplos = cargar_prompt_desde_archivo(nivel)
-    
     # Agregar configuración de idioma
     language_config = f"""
 
@@ -147,6 +157,83 @@ CONFIGURACIÓN DE IDIOMA:
 
     return base_prompt + ejemplos + language_config
 
+# Ejemplos multi-shot incluidos en cada petición: los k más parecidos a la
+# pregunta (0 = todos los del archivo del nivel). Con k + 1 ejemplos o menos,
+# o si ninguno se parece a la pregunta, se incluyen todos
+EJEMPLOS_POR_PREGUNTA = int(os.getenv('TUTOR_EJEMPLOS_POR_PREGUNTA', '1'))
+
+# Registro compartido: lee los archivos de ejemplos una sola vez y precompila
+# todos los niveles e idiomas; se recarga solo si cambia algún archivo
+REGISTRO_PROMPTS = RegistroPrompts(
+    directorio=str(Path(__file__).resolve().parent / "prompts"),
+    niveles=NIVELES_EDUCATIVOS.keys(),
+    construir=construir_prompt_sistema,
+    idiomas=IDIOMAS_DISPONIBLES,
+    k_ejemplos=EJEMPLOS_POR_PREGUNTA or None
+)
+
+def get_system_prompt_multishot(nivel: str, language: str = "Español") -> str:
+    """
+    Obtiene el prompt del sistema precompilado para un nivel e idioma.
+    
+    Args:
+        nivel (str): Nivel educativo (preescolar, primaria, secundaria, preparatoria)
+        language (str): Idioma para las respuestas
+        
+    Returns:
+        str: Prompt del sistema con ejemplos multi-shot
+    """
+    return REGISTRO_PROMPTS.obtener(nivel, language).texto
+
+def get_system_prompt_para_pregunta(nivel: str, language: str, pregunta: str,
+                                    tema: str = "general") -> str:
+    """
+    Obtiene el prompt del sistema con solo los ejemplos relacionados con la pregunta.
+    
+    Args:
+        nivel (str): Nivel educativo
+        language (str): Idioma para las respuestas
+        pregunta (str): Pregunta del estudiante
+        tema (str): Tema específico (opcional)
+        
+    Returns:
+        str: Prompt del sistema con los EJEMPLOS_POR_PREGUNTA ejemplos más parecidos
+    """
+    return REGISTRO_PROMPTS.obtener_para_pregunta(nivel, language, pregunta, tema).texto
+
+def construir_prompt_usuario(pregunta: str, nivel: str, tema: str = "general") -> str:
+    """
+    Construye el mensaje del usuario con el contexto del tema y del nivel.
+    
+    Args:
+        pregunta (str): Pregunta del estudiante
+        nivel (str): Nivel educativo
+        tema (str): Tema específico (opcional)
+        
+    Returns:
+        str: Prompt del usuario
+    """
+    return f"""
+TEMA: {tema.upper() if tema != "general" else "ROBÓTICA GENERAL"}
+PREGUNTA DEL ESTUDIANTE: {pregunta}
+
+Por favor, responde esta pregunta adaptando tu explicación al nivel {nivel} 
+({NIVELES_EDUCATIVOS[nivel]['edad']}). Usa el estilo y formato de los ejemplos 
+multi-shot proporcionados en el prompt del sistema.
+"""
+
+# ============================================================================
+# CACHÉ SEMÁNTICA DE RESPUESTAS
+# ============================================================================
+
+# Compartida por todos los tutores del proceso: en un aula muchos estudiantes
+# hacen las mismas preguntas. Se desactiva con TUTOR_CACHE_SEMANTICO=0
+CACHE_RESPUESTAS = CacheSemantico() if os.getenv('TUTOR_CACHE_SEMANTICO', '1') != '0' else None
+
+# Respuestas generadas por adelantado para EJEMPLOS_PREGUNTAS (ver precalcular_respuestas.py);
+# solo se usan si coinciden con la versión actual de los archivos de prompts
+RESPUESTAS_PRECALCULADAS = AlmacenRespuestas(Path(__file__).resolve().parent / "respuestas_precalculadas.json")
+
 # ============================================================================
 # CLASE PRINCIPAL DEL TUTOR
 # ============================================================================
@@ -155,15 +242,26 @@ class TutorRobotica:
     """
     Clase principal del tutor de robótica que maneja la interacción 
     con el estudiante y adapta las respuestas según el nivel educativo.
+    
+    El modelo de lenguaje lo aporta un backend intercambiable (OpenAI, Ollama,
+    híbrido o simulado); el bucle de respuesta es el mismo para todos.
     """
     
-    def __init__(self, nivel: str = "primaria", language: str = "Español"):
+    titulo = "Tutor de Robótica"
+    
+    def __init__(self, nivel: str = "primaria", language: str = "Español",
+                 backend: Optional[BackendLLM] = None, usar_cache: bool = True,
+                 silencioso: bool = False):
         """
         Inicializa el tutor con un nivel educativo y idioma específico.
         
         Args:
             nivel (str): Nivel educativo del estudiante
             language (str): Idioma para las respuestas
+            backend (BackendLLM): Backend del modelo (por defecto según TUTOR_BACKEND)
+            usar_cache (bool): Servir preguntas repetidas desde CACHE_RESPUESTAS
+            silencioso (bool): No mostrar la configuración ni sus cambios por
+                consola (modo servidor: cada sesión informa a su estudiante)
         """
         if nivel not in NIVELES_EDUCATIVOS:
             raise ValueError(f"Nivel '{nivel}' no válido. Opciones: {list(NIVELES_EDUCATIVOS.keys())}")
@@ -171,10 +269,23 @@ class TutorRobotica:
         self.nivel = nivel
         self.language = language
         self.system_prompt = get_system_prompt_multishot(nivel, language)
+        self.backend = backend or crear_backend()
+        self.cache = CACHE_RESPUESTAS if usar_cache else None
+        self.silencioso = silencioso
+        
+        # Métricas de la última respuesta (tiempo al primer token, tokens/s, etc.)
+        self.ultimas_metricas: Optional[MetricasLLM] = None
+        
+        # Memoria de la conversación: turnos recientes literales + resumen de los antiguos
+        # (el resumen lo genera el mismo backend que responde)
+        self.memoria = MemoriaConversacion(self.resumir_conversacion)
         
-        print(f"🤖 Tutor de Robótica inicializado")
+        if silencioso:
+            return
+        print(f"🤖 {self.titulo} inicializado")
         print(f"📚 Nivel: {nivel.title()} ({NIVELES_EDUCATIVOS[nivel]['edad']})")
         print(f"🌍 Idioma: {language}")
+        print(f"🔧 Modelo: {self.backend.modelo} ({self.backend.nombre})")
         print(f"✨ {NIVELES_EDUCATIVOS[nivel]['descripcion']}")
     
     def cambiar_nivel(self, nuevo_nivel: str):
@@ -185,12 +296,14 @@ class TutorRobotica:
             nuevo_nivel (str): Nuevo nivel educativo
         """
         if nuevo_nivel not in NIVELES_EDUCATIVOS:
-            print(f"❌ Nivel '{nuevo_nivel}' no válido. Opciones: {list(NIVELES_EDUCATIVOS.keys())}")
+            if not self.silencioso:
+                print(f"❌ Nivel '{nuevo_nivel}' no válido. Opciones: {list(NIVELES_EDUCATIVOS.keys())}")
             return
         
         self.nivel = nuevo_nivel
         self.system_prompt = get_system_prompt_multishot(nuevo_nivel, self.language)
-        print(f"📚 Nivel cambiado a: {nuevo_nivel.title()} ({NIVELES_EDUCATIVOS[nuevo_nivel]['edad']})")
+        if not self.silencioso:
+            print(f"📚 Nivel cambiado a: {nuevo_nivel.title()} ({NIVELES_EDUCATIVOS[nuevo_nivel]['edad']})")
     
     def cambiar_idioma(self, nuevo_idioma: str):
         """
@@ -201,60 +314,134 @@ class TutorRobotica:
         """
         self.language = nuevo_idioma
         self.system_prompt = get_system_prompt_multishot(self.nivel, nuevo_idioma)
-        print(f"🌍 Idioma cambiado a: {nuevo_idioma}")
+        if not self.silencioso:
+            print(f"🌍 Idioma cambiado a: {nuevo_idioma}")
     
-    def responder_pregunta(self, pregunta: str, tema: str = "general") -> str:
+    def reiniciar_conversacion(self):
+        """Olvida el historial de la conversación actual."""
+        self.memoria.reiniciar()
+        if not self.silencioso:
+            print("🧹 Conversación reiniciada")
+    
+    def resumir_conversacion(self, mensajes: List[Dict]) -> str:
         """
-        Responde una pregunta del estudiante adaptada a su nivel.
+        Resume los turnos antiguos de la conversación con el backend del tutor.
+        
+        Args:
+            mensajes (List[Dict]): Petición de resumen construida por la memoria
+            
+        Returns:
+            str: Resumen actualizado de la conversación
+        """
+        return self.backend.completar(mensajes, temperatura=0.3, funcion="resumen")  # Resúmenes fieles, poca creatividad
+    
+    def construir_mensajes(self, pregunta: str, tema: str = "general") -> List[Dict]:
+        """
+        Construye los mensajes para el modelo: sistema + memoria + pregunta actual.
         
         Args:
             pregunta (str): Pregunta del estudiante
             tema (str): Tema específico (opcional)
             
         Returns:
-            str: Respuesta del tutor adaptada al nivel
+            List[Dict]: Mensajes en formato chat
         """
-        try:
-            # Crear el prompt del usuario con contexto del tema
-            user_prompt = f"""
-TEMA: {tema.upper() if tema != "general" else "ROBÓTICA GENERAL"}
-PREGUNTA DEL ESTUDIANTE: {pregunta}
-
-Por favor, responde esta pregunta adaptando tu explicación al nivel {self.nivel} 
-({NIVELES_EDUCATIVOS[self.nivel]['edad']}). Usa el estilo y formato de los ejemplos 
-multi-shot proporcionados en el prompt del sistema.
-"""
+        system_prompt = get_system_prompt_para_pregunta(self.nivel, self.language, pregunta, tema)
+        mensajes = self.memoria.mensajes(system_prompt)
+        mensajes.append({"role": "user", "content": construir_prompt_usuario(pregunta, self.nivel, tema)})
+        return mensajes
+    
+    def responder_stream(self, pregunta: str, tema: str = "general") -> Iterator[str]:
+        """
+        Genera la respuesta fragmento a fragmento y la guarda en la memoria al terminar.
+        
+        Las preguntas de ejemplo se sirven desde las respuestas precalculadas y
+        las casi idénticas a otras ya respondidas para el mismo nivel e idioma,
+        desde la caché semántica; en ambos casos sin llamar al modelo y solo
+        en el primer turno de la conversación.
+        
+        Args:
+            pregunta (str): Pregunta del estudiante
+            tema (str): Tema específico (opcional)
             
-            # Realizar llamada a OpenAI con streaming
-            stream = openai.chat.completions.create(
-                model=MODEL,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                stream=True,
-                temperature=0.7  # Creatividad moderada para respuestas educativas
-            )
+        Yields:
+            str: Fragmentos de la respuesta en cuanto llegan
             
-            # Mostrar encabezado
-            print(f"\n🤖 Tutor de Robótica - Nivel {self.nivel.title()}")
-            print("=" * 50)
+        Raises:
+            ErrorBackend: Si el backend no pudo generar la respuesta
+        """
+        inicio = time.perf_counter()
+        clave_cache = pregunta if tema == "general" else f"{tema}: {pregunta}"
+        version = REGISTRO_PROMPTS.obtener(self.nivel, self.language).version
+        # Solo se reutilizan y guardan respuestas que no dependen de turnos
+        # anteriores ("¿me das otro ejemplo?" necesita la conversación)
+        sin_contexto = self.memoria.vacia
+        
+        guardada, origen = None, None
+        if tema == "general" and sin_contexto:
+            guardada = RESPUESTAS_PRECALCULADAS.obtener(self.nivel, self.language, pregunta, version)
+            origen = "precalculada"
+        if guardada is None and self.cache is not None and sin_contexto:
+            acierto = self.cache.buscar(self.nivel, self.language, clave_cache, version)
+            guardada, origen = (acierto.respuesta, "cache") if acierto else (None, None)
+        
+        if guardada is not None:
+            duracion = time.perf_counter() - inicio
+            self.ultimas_metricas = MetricasLLM(backend=origen, modelo=self.backend.modelo,
+                                                tiempo_primer_token=duracion, tiempo_total=duracion)
+            yield guardada
+            self.memoria.agregar_turno(pregunta, guardada)
+            return
+        
+        chunks = []
+        for texto in self.backend.stream(self.construir_mensajes(pregunta, tema), temperatura=0.7,
+                                         funcion="respuesta"):
+            chunks.append(texto)
+            yield texto
+        respuesta = "".join(chunks)
+        self.ultimas_metricas = self.backend.ultimas_metricas
+        
+        if self.cache is not None and sin_contexto:
+            self.cache.guardar(self.nivel, self.language, clave_cache, respuesta, version)
+        
+        # Recordar el turno para las siguientes preguntas
+        self.memoria.agregar_turno(pregunta, respuesta)
+    
+    def responder_pregunta(self, pregunta: str, tema: str = "general") -> str:
+        """
+        Responde una pregunta del estudiante adaptada a su nivel, mostrándola en streaming.
+        
+        Args:
+            pregunta (str): Pregunta del estudiante
+            tema (str): Tema específico (opcional)
             
-            # Procesar respuesta en streaming
-            response = ""
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    response += content
-                    print(content, end='', flush=True)
+        Returns:
+            str: Respuesta del tutor adaptada al nivel
+        """
+        # Mostrar encabezado
+        print(f"\n🤖 {self.titulo} - Nivel {self.nivel.title()}")
+        print("=" * 50)
+        
+        try:
+            chunks = []
+            for texto in self.responder_stream(pregunta, tema):
+                chunks.append(texto)
+                print(texto, end='', flush=True)
             
             print("\n" + "=" * 50)
-            return response
+            if self.ultimas_metricas:
+                print(f"⏱️ {self.ultimas_metricas.resumen()}")
+            return "".join(chunks)
             
         except Exception as e:
             error_msg = f"❌ Error al generar respuesta: {e}"
             print(error_msg)
+            self.mostrar_ayuda_error()
             return error_msg
+    
+    def mostrar_ayuda_error(self):
+        """Muestra sugerencias cuando falla el backend."""
+        print(f"💡 Verifica la configuración del backend '{self.backend.nombre}' ({self.backend.modelo})")
 
 # ============================================================================
 # FUNCIONES AUXILIARES
@@ -293,48 +480,22 @@ def mostrar_temas():
 
 def mostrar_ejemplos_preguntas(nivel: str):
     """Muestra ejemplos de preguntas según el nivel."""
-    ejemplos = {
-        "preescolar": [
-            "¿Qué es un robot?",
-            "¿Cómo se enciende un LED?",
-            "¿Por qué los robots se mueven?"
-        ],
-        "primaria": [
-            "¿Cómo funciona Arduino?",
-            "¿Qué son los sensores?",
-            "¿Cómo hago que un LED parpadee?"
-        ],
-        "secundaria": [
-            "¿Cómo programo un motor con Arduino?",
-            "¿Cómo calculo resistencias para LEDs?",
-            "¿Qué es PWM y cómo se usa?"
-        ],
-        "preparatoria": [
-            "¿Cómo implemento comunicación I2C?",
-            "¿Qué es un controlador PID?",
-            "¿Cómo diseño un sistema de control automático?"
-        ]
-    }
-    
     print(f"\n💡 EJEMPLOS DE PREGUNTAS PARA {nivel.upper()}:")
     print("-" * 40)
-    for pregunta in ejemplos[nivel]:
+    for pregunta in EJEMPLOS_PREGUNTAS[nivel]:
         print(f"• {pregunta}")
 
 # ============================================================================
 # FUNCIÓN PRINCIPAL INTERACTIVA
 # ============================================================================
 
-def main():
+def seleccionar_configuracion():
     """
-    Función principal que maneja la interfaz interactiva del tutor.
-    """
-    print("🤖 TUTOR DE ROBÓTICA INTELIGENTE")
-    print("=" * 35)
-    print("¡Bienvenido al tutor personalizado de robótica!")
-    print("Adaptamos nuestras explicaciones a tu nivel educativo 📚✨")
+    Pide al estudiante su nivel educativo e idioma.
     
-    # Configuración inicial
+    Returns:
+        tuple: (nivel, idioma) seleccionados
+    """
     print("\n🔧 CONFIGURACIÓN INICIAL")
     print("-" * 25)
     
@@ -347,22 +508,32 @@ def main():
         print("❌ Nivel no válido. Intenta de nuevo.")
     
     # Seleccionar idioma
-    idiomas_disponibles = ["Español", "English", "Français", "Deutsch", "Italiano", "Português"]
-    print(f"\n🌍 Idiomas disponibles: {', '.join(idiomas_disponibles)}")
+    print(f"\n🌍 Idiomas disponibles: {', '.join(IDIOMAS_DISPONIBLES)}")
     idioma = input("🌍 Selecciona el idioma (por defecto Español): ").strip()
     if not idioma:
         idioma = "Español"
+    return nivel, idioma
+
+def bucle_interactivo(tutor: TutorRobotica, menu: Callable[[], None] = mostrar_menu,
+                      opciones_extra: Optional[Dict[str, Callable[[], None]]] = None):
+    """
+    Bucle del menú principal, común a todas las versiones del tutor.
     
-    # Inicializar tutor
-    tutor = TutorRobotica(nivel, idioma)
+    Args:
+        tutor (TutorRobotica): Tutor ya inicializado
+        menu (callable): Función que muestra el menú
+        opciones_extra (dict): Acciones adicionales a partir de la opción 6;
+            la opción siguiente a la última es "Salir"
+    """
+    opciones_extra = opciones_extra or {}
+    opcion_salir = str(6 + len(opciones_extra))
     
     # Mostrar ejemplos de preguntas
-    mostrar_ejemplos_preguntas(nivel)
+    mostrar_ejemplos_preguntas(tutor.nivel)
     
-    # Bucle principal
     while True:
-        mostrar_menu()
-        opcion = input("\n🎯 Selecciona una opción (1-6): ").strip()
+        menu()
+        opcion = input(f"\n🎯 Selecciona una opción (1-{opcion_salir}): ").strip()
         
         if opcion == "1":
             # Hacer pregunta
@@ -393,7 +564,7 @@ def main():
             # Cambiar idioma
             print("\n🌍 CAMBIAR IDIOMA")
             print("-" * 15)
-            print(f"Idiomas disponibles: {', '.join(idiomas_disponibles)}")
+            print(f"Idiomas disponibles: {', '.join(IDIOMAS_DISPONIBLES)}")
             nuevo_idioma = input("🌍 Nuevo idioma: ").strip()
             if nuevo_idioma:
                 tutor.cambiar_idioma(nuevo_idioma)
@@ -404,38 +575,74 @@ def main():
             print("-" * 25)
             print(f"📚 Nivel: {tutor.nivel.title()} ({NIVELES_EDUCATIVOS[tutor.nivel]['edad']})")
             print(f"🌍 Idioma: {tutor.language}")
+            print(f"🔧 Modelo: {tutor.backend.modelo} ({tutor.backend.nombre})")
             print(f"✨ Descripción: {NIVELES_EDUCATIVOS[tutor.nivel]['descripcion']}")
+            if tutor.ultimas_metricas:
+                print(f"⏱️ Última respuesta: {tutor.ultimas_metricas.resumen()}")
+            if tutor.cache is not None:
+                stats = tutor.cache.estadisticas()
+                print(f"⚡ Caché: {stats['aciertos']} aciertos de {stats['aciertos'] + stats['fallos']} "
+                      f"preguntas ({stats['entradas']} respuestas guardadas)")
         
         elif opcion == "5":
             # Mostrar temas
             mostrar_temas()
             mostrar_ejemplos_preguntas(tutor.nivel)
         
-        elif opcion == "6":
+        elif opcion in opciones_extra:
+            opciones_extra[opcion]()
+        
+        elif opcion == opcion_salir:
             # Salir
-            print("\n👋 ¡Gracias por usar el Tutor de Robótica!")
+            print(f"\n👋 ¡Gracias por usar el {tutor.titulo}!")
             print("¡Sigue aprendiendo y creando proyectos increíbles! 🚀✨")
             break
         
         else:
-            print("❌ Opción no válida. Selecciona un número del 1 al 6.")
+            print(f"❌ Opción no válida. Selecciona un número del 1 al {opcion_salir}.")
+
+def main(backend_nombre: Optional[str] = None):
+    """
+    Función principal que maneja la interfaz interactiva del tutor.
+    
+    Args:
+        backend_nombre (str): openai, ollama, hibrido o mock (por defecto TUTOR_BACKEND)
+    """
+    print("🤖 TUTOR DE ROBÓTICA INTELIGENTE")
+    print("=" * 35)
+    print("¡Bienvenido al tutor personalizado de robótica!")
+    print("Adaptamos nuestras explicaciones a tu nivel educativo 📚✨")
+    
+    # Validar el backend antes de empezar (clave de API, servidor de Ollama...)
+    backend = crear_backend(backend_nombre)
+    if not backend.verificar():
+        exit(1)  # Terminar el programa si el backend no está disponible
+    backend.precalentar()  # Cargar el modelo mientras el estudiante elige nivel e idioma
+    
+    nivel, idioma = seleccionar_configuracion()
+    
+    # Inicializar tutor
+    tutor = TutorRobotica(nivel, idioma, backend)
+    bucle_interactivo(tutor)
 
 # ============================================================================
 # FUNCIÓN PARA USO PROGRAMÁTICO
 # ============================================================================
 
-def crear_tutor_personalizado(nivel: str = "primaria", idioma: str = "Español") -> TutorRobotica:
+def crear_tutor_personalizado(nivel: str = "primaria", idioma: str = "Español",
+                              backend: Optional[str] = None) -> TutorRobotica:
     """
     Función auxiliar para crear un tutor personalizado desde otros scripts.
     
     Args:
         nivel (str): Nivel educativo
         idioma (str): Idioma para las respuestas
+        backend (str): openai, ollama, hibrido o mock (por defecto TUTOR_BACKEND)
         
     Returns:
         TutorRobotica: Instancia del tutor configurada
     """
-    return TutorRobotica(nivel, idioma)
+    return TutorRobotica(nivel, idioma, crear_backend(backend))
 
 # ============================================================================
 # PUNTO DE ENTRADA DEL PROGRAMA
@@ -448,10 +655,15 @@ if __name__ == "__main__":
     Ejecuta la interfaz interactiva del tutor cuando el script
     se ejecuta directamente.
     """
+    parser = argparse.ArgumentParser(description="Tutor de Robótica Inteligente")
+    parser.add_argument("--backend", choices=BACKENDS_DISPONIBLES,
+                        help="Modelo a usar (por defecto TUTOR_BACKEND u openai)")
+    args = parser.parse_args()
+    
     try:
-        main()
+        main(args.backend)
     except KeyboardInterrupt:
         print("\n\n👋 ¡Hasta luego! Gracias por usar el Tutor de Robótica 🤖✨")
     except Exception as e:
         print(f"\n❌ Error inesperado: {e}")
-        print("Por favor, verifica tu configuración y vuelve a intentar.")
\ No newline at end of file
+        print("Por favor, verifica tu configuración y vuelve a intentar.")
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Tutor de Robótica Inteligente - Versión Local con Ollama
-Script que actúa como tutor personalizado para enseñar robótica, Arduino, 
+Script que actúa como tutor personalizado para enseñar robótica, Arduino,
 electrónica, mecatrónica y programación a estudiantes de diferentes edades.
 
 Esta versión utiliza Ollama con modelos locales en lugar de OpenAI para:
@@ -11,6 +11,9 @@ Esta versión utiliza Ollama con modelos locales en lugar de OpenAI para:
 4. Soportar múltiples idiomas para la enseñanza
 5. Funcionar completamente offline sin costos de API
 
+Comparte con tutor_robotica.py la clase del tutor, los prompts y el bucle
+interactivo; solo cambia el backend (BackendOllama) y el menú de Ollama.
+
 REQUISITOS:
 - Ollama instalado y ejecutándose (ollama serve)
 - Modelo descargado (ollama run gpt-oss:20b)
@@ -19,269 +22,77 @@ REQUISITOS:
 # ============================================================================
 # IMPORTACIONES NECESARIAS
 # ============================================================================
-import os                    # Para variables de entorno
-import json                 # Para manejar respuestas JSON
-import ollama               # Cliente de Ollama para modelos locales
-from typing import Dict, List       # Para type hints
+import threading            # Para precalentar el modelo en segundo plano
+
+from backends_llm import KEEP_ALIVE, MODELO_OLLAMA, BackendOllama  # Backend local
+from tutor_robotica import (  # Tutor y bucle interactivo compartidos con la versión OpenAI
+    TutorRobotica, bucle_interactivo, seleccionar_configuracion,
+)
 
 # ============================================================================
 # CONFIGURACIÓN INICIAL Y VALIDACIÓN
 # ============================================================================
 
 # Configuración del modelo local de Ollama
-MODEL = 'gpt-oss:20b'   # Modelo local eficiente para tareas educativas
-OLLAMA_HOST = 'http://127.0.0.1:11434'  # Servidor local de Ollama
+MODEL = MODELO_OLLAMA   # Modelo local eficiente para tareas educativas
 
-def verificar_ollama():
+# Backend compartido por todos los tutores locales del proceso
+# (reutiliza el cliente y el resultado de la verificación)
+BACKEND_LOCAL = BackendOllama(MODEL, keep_alive=KEEP_ALIVE)
+
+def verificar_ollama(forzar: bool = False) -> bool:
     """
     Verifica que Ollama esté ejecutándose y el modelo esté disponible.
-    """
-    try:
-        # Intentar listar modelos disponibles
-        models_response = ollama.list()
-        
-        # La respuesta de ollama.list() tiene una estructura diferente
-        # Contiene un atributo 'models' que es una lista de objetos Model
-        if hasattr(models_response, 'models') and models_response.models:
-            model_names = [model.model for model in models_response.models]
-            
-            if MODEL in model_names:
-                print(f"✓ Modelo {MODEL} disponible en Ollama")
-                return True
-            else:
-                print(f"❌ Modelo {MODEL} no encontrado. Modelos disponibles: {model_names}")
-                print(f"💡 Ejecuta: ollama run {MODEL}")
-                return False
-        else:
-            print("❌ No se encontraron modelos en Ollama")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error conectando con Ollama: {e}")
-        print("💡 Asegúrate de que Ollama esté ejecutándose: ollama serve")
-        return False
-
-# Verificar Ollama al importar
-if not verificar_ollama():
-    print("⚠️ Continuando sin verificación de Ollama...")
 
-# ============================================================================
-# CONFIGURACIÓN DE NIVELES EDUCATIVOS
-# ============================================================================
-
-NIVELES_EDUCATIVOS = {
-    "preescolar": {
-        "edad": "3-6 años",
-        "descripcion": "Nivel inicial con conceptos muy básicos y juegos",
-        "vocabulario": "simple",
-        "ejemplos": "cotidianos"
-    },
-    "primaria": {
-        "edad": "6-12 años", 
-        "descripcion": "Conceptos básicos con experimentos sencillos",
-        "vocabulario": "básico",
-        "ejemplos": "prácticos"
-    },
-    "secundaria": {
-        "edad": "12-15 años",
-        "descripcion": "Conceptos intermedios con proyectos estructurados", 
-        "vocabulario": "técnico básico",
-        "ejemplos": "proyectos"
-    },
-    "preparatoria": {
-        "edad": "15-18 años",
-        "descripcion": "Conceptos avanzados con aplicaciones reales",
-        "vocabulario": "técnico avanzado", 
-        "ejemplos": "profesionales"
-    }
-}
-
-TEMAS_ROBOTICA = [
-    "arduino", "electronica", "mecatronica", "programacion", 
-    "sensores", "actuadores", "motores", "circuitos", "codigo",
-    "proyectos", "robotica_basica", "automatizacion"
-]
-
-# ============================================================================
-# PROMPTS MULTI-SHOT PARA DIFERENTES NIVELES
-# ============================================================================
+    El resultado se guarda y se reutiliza en llamadas posteriores.
 
-def cargar_prompt_desde_archivo(nivel: str) -> str:
-    """
-    Carga el prompt multi-shot desde un archivo externo.
-    
     Args:
-        nivel (str): Nivel educativo (preescolar, primaria, secundaria, preparatoria)
-        
+        forzar (bool): Repetir la verificación aunque ya exista un resultado
+
     Returns:
-        str: Contenido del archivo de prompt
+        bool: True si Ollama responde y el modelo está descargado
     """
-    try:
-        archivo_prompt = f"prompts/{nivel}.txt"
-        with open(archivo_prompt, 'r', encoding='utf-8') as file:
-            return file.read()
-    except FileNotFoundError:
-        print(f"⚠️ Archivo de prompt no encontrado: {archivo_prompt}")
-        return "No hay ejemplos disponibles para este nivel."
-    except Exception as e:
-        print(f"❌ Error al cargar prompt: {e}")
-        return "Error al cargar ejemplos."
+    return BACKEND_LOCAL.verificar(forzar)
 
-def get_system_prompt_multishot(nivel: str, language: str = "Español") -> str:
+def precalentar_modelo() -> threading.Thread:
     """
-    Genera el prompt del sistema con ejemplos multi-shot para cada nivel educativo.
-    
-    Args:
-        nivel (str): Nivel educativo (preescolar, primaria, secundaria, preparatoria)
-        language (str): Idioma para las respuestas
-        
+    Carga el modelo en memoria en segundo plano con una petición vacía.
+
+    Así la primera pregunta del estudiante no paga el tiempo de carga del
+    modelo. Se ejecuta mientras el estudiante elige su nivel e idioma.
+
     Returns:
-        str: Prompt del sistema con ejemplos multi-shot
+        threading.Thread: Hilo del precalentamiento (por si se quiere esperar)
     """
-    
-    base_prompt = f"""Eres un tutor experto en robótica, Arduino, electrónica, mecatrónica y programación. 
-Tu especialidad es adaptar tu enseñanza al nivel educativo del estudiante.
-
-NIVEL ACTUAL: {nivel.upper()} ({NIVELES_EDUCATIVOS[nivel]['edad']})
-CARACTERÍSTICAS DEL NIVEL:
-- {NIVELES_EDUCATIVOS[nivel]['descripcion']}
-- Vocabulario: {NIVELES_EDUCATIVOS[nivel]['vocabulario']}
-- Tipo de ejemplos: {NIVELES_EDUCATIVOS[nivel]['ejemplos']}
-
-INSTRUCCIONES GENERALES:
-1. Adapta tu lenguaje al nivel de edad especificado
-2. Usa analogías y ejemplos apropiados para la edad
-3. Incluye emojis para hacer más atractiva la explicación
-4. Proporciona ejemplos prácticos cuando sea posible
-5. Fomenta la curiosidad y el aprendizaje activo
-6. Responde en formato Markdown para mejor legibilidad
-
-EJEMPLOS DE RESPUESTAS MULTI-SHOT PARA NIVEL {nivel.upper()}:"""
-
-    # Cargar ejemplos desde archivo externo
-    ejemplos = cargar_prompt_desde_archivo(nivel)
-    
-    # Agregar configuración de idioma
-    language_config = f"""
-
-CONFIGURACIÓN DE IDIOMA:
-- TODAS las respuestas deben generarse en {language}
-- Mantén el formato Markdown y los emojis
-- Adapta las expresiones culturalmente al idioma seleccionado
-- Los términos técnicos pueden mantenerse en inglés si es estándar internacional
-"""
-
-    return base_prompt + ejemplos + language_config
+    return BACKEND_LOCAL.precalentar()
 
 # ============================================================================
 # CLASE PRINCIPAL DEL TUTOR LOCAL
 # ============================================================================
 
-class TutorRoboticaLocal:
+class TutorRoboticaLocal(TutorRobotica):
     """
-    Clase principal del tutor de robótica que maneja la interacción 
-    con el estudiante y adapta las respuestas según el nivel educativo.
-    Utiliza Ollama para funcionar completamente offline.
+    Tutor de robótica que utiliza Ollama para funcionar completamente offline.
     """
-    
-    def __init__(self, nivel: str = "primaria", language: str = "Español"):
+
+    titulo = "Tutor de Robótica Local"
+
+    def __init__(self, nivel: str = "primaria", language: str = "Español",
+                 backend: BackendOllama = None):
         """
         Inicializa el tutor con un nivel educativo y idioma específico.
-        
+
         Args:
             nivel (str): Nivel educativo del estudiante
             language (str): Idioma para las respuestas
+            backend (BackendOllama): Backend local (por defecto BACKEND_LOCAL)
         """
-        if nivel not in NIVELES_EDUCATIVOS:
-            raise ValueError(f"Nivel '{nivel}' no válido. Opciones: {list(NIVELES_EDUCATIVOS.keys())}")
-        
-        self.nivel = nivel
-        self.language = language
-        self.system_prompt = get_system_prompt_multishot(nivel, language)
-        
-        print(f"🤖 Tutor de Robótica Local inicializado")
-        print(f"📚 Nivel: {nivel.title()} ({NIVELES_EDUCATIVOS[nivel]['edad']})")
-        print(f"🌍 Idioma: {language}")
-        print(f"🔧 Modelo: {MODEL} (Local)")
-        print(f"✨ {NIVELES_EDUCATIVOS[nivel]['descripcion']}")
-    
-    def cambiar_nivel(self, nuevo_nivel: str):
-        """
-        Cambia el nivel educativo del tutor.
-        
-        Args:
-            nuevo_nivel (str): Nuevo nivel educativo
-        """
-        if nuevo_nivel not in NIVELES_EDUCATIVOS:
-            print(f"❌ Nivel '{nuevo_nivel}' no válido. Opciones: {list(NIVELES_EDUCATIVOS.keys())}")
-            return
-        
-        self.nivel = nuevo_nivel
-        self.system_prompt = get_system_prompt_multishot(nuevo_nivel, self.language)
-        print(f"📚 Nivel cambiado a: {nuevo_nivel.title()} ({NIVELES_EDUCATIVOS[nuevo_nivel]['edad']})")
-    
-    def cambiar_idioma(self, nuevo_idioma: str):
-        """
-        Cambia el idioma de las respuestas del tutor.
-        
-        Args:
-            nuevo_idioma (str): Nuevo idioma para las respuestas
-        """
-        self.language = nuevo_idioma
-        self.system_prompt = get_system_prompt_multishot(self.nivel, nuevo_idioma)
-        print(f"🌍 Idioma cambiado a: {nuevo_idioma}")
-    
-    def responder_pregunta(self, pregunta: str, tema: str = "general") -> str:
-        """
-        Responde una pregunta del estudiante adaptada a su nivel usando Ollama.
-        
-        Args:
-            pregunta (str): Pregunta del estudiante
-            tema (str): Tema específico (opcional)
-            
-        Returns:
-            str: Respuesta del tutor adaptada al nivel
-        """
-        try:
-            # Crear el prompt del usuario con contexto del tema
-            user_prompt = f"""
-TEMA: {tema.upper() if tema != "general" else "ROBÓTICA GENERAL"}
-PREGUNTA DEL ESTUDIANTE: {pregunta}
-
-Por favor, responde esta pregunta adaptando tu explicación al nivel {self.nivel} 
-({NIVELES_EDUCATIVOS[self.nivel]['edad']}). Usa el estilo y formato de los ejemplos 
-multi-shot proporcionados en el prompt del sistema.
-"""
-            
-            # Preparar mensajes para Ollama
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-            
-            # Mostrar encabezado
-            print(f"\n🤖 Tutor de Robótica Local - Nivel {self.nivel.title()}")
-            print("=" * 50)
-            print("🔄 Generando respuesta con modelo local...")
-            
-            # Realizar llamada a Ollama
-            response = ollama.chat(
-                model=MODEL,
-                messages=messages
-            )
-            
-            # Obtener y mostrar respuesta
-            content = response['message']['content']
-            print(content)
-            print("\n" + "=" * 50)
-            return content
-            
-        except Exception as e:
-            error_msg = f"❌ Error al generar respuesta con Ollama: {e}"
-            print(error_msg)
-            print("💡 Verifica que Ollama esté ejecutándose: ollama serve")
-            print(f"💡 Verifica que el modelo esté disponible: ollama run {MODEL}")
-            return error_msg
+        super().__init__(nivel, language, backend or BACKEND_LOCAL)
+
+    def mostrar_ayuda_error(self):
+        """Muestra sugerencias cuando falla Ollama."""
+        print("💡 Verifica que Ollama esté ejecutándose: ollama serve")
+        print(f"💡 Verifica que el modelo esté disponible: ollama run {self.backend.modelo}")
 
 # ============================================================================
 # FUNCIONES AUXILIARES
@@ -300,65 +111,22 @@ def mostrar_menu():
     print("7. 🚪 Salir")
     print("=" * 45)
 
-def mostrar_niveles():
-    """Muestra los niveles educativos disponibles."""
-    print("\n📚 NIVELES EDUCATIVOS DISPONIBLES:")
-    print("-" * 35)
-    for nivel, info in NIVELES_EDUCATIVOS.items():
-        print(f"• {nivel.title()}: {info['edad']} - {info['descripcion']}")
-
-def mostrar_temas():
-    """Muestra los temas de robótica disponibles."""
-    print("\n🔧 TEMAS DE ROBÓTICA DISPONIBLES:")
-    print("-" * 35)
-    temas_formateados = [
-        "Arduino", "Electrónica", "Mecatrónica", "Programación",
-        "Sensores", "Actuadores", "Motores", "Circuitos", 
-        "Código", "Proyectos", "Robótica Básica", "Automatización"
-    ]
-    for i, tema in enumerate(temas_formateados, 1):
-        print(f"{i:2d}. {tema}")
-
-def mostrar_ejemplos_preguntas(nivel: str):
-    """Muestra ejemplos de preguntas según el nivel."""
-    ejemplos = {
-        "preescolar": [
-            "¿Qué es un robot?",
-            "¿Cómo se enciende un LED?",
-            "¿Por qué los robots se mueven?"
-        ],
-        "primaria": [
-            "¿Cómo funciona Arduino?",
-            "¿Qué son los sensores?",
-            "¿Cómo hago que un LED parpadee?"
-        ],
-        "secundaria": [
-            "¿Cómo programo un motor con Arduino?",
-            "¿Cómo calculo resistencias para LEDs?",
-            "¿Qué es PWM y cómo se usa?"
-        ],
-        "preparatoria": [
-            "¿Cómo implemento comunicación I2C?",
-            "¿Qué es un controlador PID?",
-            "¿Cómo diseño un sistema de control automático?"
-        ]
-    }
-    
-    print(f"\n💡 EJEMPLOS DE PREGUNTAS PARA {nivel.upper()}:")
-    print("-" * 40)
-    for pregunta in ejemplos[nivel]:
-        print(f"• {pregunta}")
-
 def verificar_estado_ollama():
     """Verifica y muestra el estado de Ollama."""
     print("\n🔧 VERIFICANDO ESTADO DE OLLAMA")
     print("-" * 30)
-    
+
     try:
         # Verificar conexión
-        models_response = ollama.list()
+        cliente = BACKEND_LOCAL.cliente
+        models_response = cliente.list()
         print("✓ Ollama está ejecutándose correctamente")
-        
+
+        # Modelos cargados actualmente en memoria (residentes por keep_alive)
+        cargados = [m.model for m in getattr(cliente.ps(), 'models', None) or []]
+        if cargados:
+            print(f"🔥 Modelos en memoria: {', '.join(cargados)} (keep_alive={KEEP_ALIVE})")
+
         # Verificar si la respuesta tiene modelos
         if hasattr(models_response, 'models') and models_response.models:
             # Mostrar modelos disponibles
@@ -367,7 +135,7 @@ def verificar_estado_ollama():
                 model_name = model.model
                 status = "✓ ACTIVO" if model_name == MODEL else "○ Disponible"
                 print(f"  {status} {model_name}")
-            
+
             # Verificar modelo específico
             model_names = [model.model for model in models_response.models]
             if MODEL in model_names:
@@ -377,7 +145,7 @@ def verificar_estado_ollama():
                 print(f"💡 Ejecuta: ollama run {MODEL}")
         else:
             print("❌ No se encontraron modelos en Ollama")
-            
+
     except Exception as e:
         print(f"❌ Error conectando con Ollama: {e}")
         print("💡 Soluciones:")
@@ -397,7 +165,7 @@ def main():
     print("=" * 40)
     print("¡Bienvenido al tutor personalizado de robótica!")
     print("Funciona completamente offline con modelos locales 🔧✨")
-    
+
     # Verificar Ollama antes de continuar
     if not verificar_ollama():
         print("\n⚠️ Ollama no está disponible. El tutor puede no funcionar correctamente.")
@@ -405,97 +173,15 @@ def main():
         if continuar != 's':
             print("👋 ¡Configura Ollama y vuelve pronto!")
             return
-    
-    # Configuración inicial
-    print("\n🔧 CONFIGURACIÓN INICIAL")
-    print("-" * 25)
-    
-    # Seleccionar nivel
-    mostrar_niveles()
-    while True:
-        nivel = input("\n📚 Selecciona tu nivel educativo: ").lower().strip()
-        if nivel in NIVELES_EDUCATIVOS:
-            break
-        print("❌ Nivel no válido. Intenta de nuevo.")
-    
-    # Seleccionar idioma
-    idiomas_disponibles = ["Español", "English", "Français", "Deutsch", "Italiano", "Português"]
-    print(f"\n🌍 Idiomas disponibles: {', '.join(idiomas_disponibles)}")
-    idioma = input("🌍 Selecciona el idioma (por defecto Español): ").strip()
-    if not idioma:
-        idioma = "Español"
-    
+    else:
+        # Cargar el modelo mientras el estudiante elige nivel e idioma
+        precalentar_modelo()
+
+    nivel, idioma = seleccionar_configuracion()
+
     # Inicializar tutor local
     tutor = TutorRoboticaLocal(nivel, idioma)
-    
-    # Mostrar ejemplos de preguntas
-    mostrar_ejemplos_preguntas(nivel)
-    
-    # Bucle principal
-    while True:
-        mostrar_menu()
-        opcion = input("\n🎯 Selecciona una opción (1-7): ").strip()
-        
-        if opcion == "1":
-            # Hacer pregunta
-            print("\n💬 HACER UNA PREGUNTA")
-            print("-" * 20)
-            mostrar_temas()
-            tema = input("\n🔧 Tema (opcional, presiona Enter para general): ").strip()
-            if not tema:
-                tema = "general"
-            
-            pregunta = input("❓ Tu pregunta: ").strip()
-            if pregunta:
-                tutor.responder_pregunta(pregunta, tema)
-            else:
-                print("❌ Por favor, escribe una pregunta.")
-        
-        elif opcion == "2":
-            # Cambiar nivel
-            print("\n📚 CAMBIAR NIVEL EDUCATIVO")
-            print("-" * 25)
-            mostrar_niveles()
-            nuevo_nivel = input("📚 Nuevo nivel: ").lower().strip()
-            tutor.cambiar_nivel(nuevo_nivel)
-            if nuevo_nivel in NIVELES_EDUCATIVOS:
-                mostrar_ejemplos_preguntas(nuevo_nivel)
-        
-        elif opcion == "3":
-            # Cambiar idioma
-            print("\n🌍 CAMBIAR IDIOMA")
-            print("-" * 15)
-            print(f"Idiomas disponibles: {', '.join(idiomas_disponibles)}")
-            nuevo_idioma = input("🌍 Nuevo idioma: ").strip()
-            if nuevo_idioma:
-                tutor.cambiar_idioma(nuevo_idioma)
-        
-        elif opcion == "4":
-            # Mostrar información actual
-            print(f"\n📊 CONFIGURACIÓN ACTUAL")
-            print("-" * 25)
-            print(f"📚 Nivel: {tutor.nivel.title()} ({NIVELES_EDUCATIVOS[tutor.nivel]['edad']})")
-            print(f"🌍 Idioma: {tutor.language}")
-            print(f"🔧 Modelo: {MODEL} (Local)")
-            print(f"✨ Descripción: {NIVELES_EDUCATIVOS[tutor.nivel]['descripcion']}")
-        
-        elif opcion == "5":
-            # Mostrar temas
-            mostrar_temas()
-            mostrar_ejemplos_preguntas(tutor.nivel)
-        
-        elif opcion == "6":
-            # Verificar Ollama
-            verificar_estado_ollama()
-        
-        elif opcion == "7":
-            # Salir
-            print("\n👋 ¡Gracias por usar el Tutor de Robótica Local!")
-            print("¡Sigue aprendiendo y creando proyectos increíbles! 🚀✨")
-            break
-        
-        else:
-            print("❌ Opción no válida. Selecciona un número del 1 al 7.")
+    bucle_interactivo(tutor, mostrar_menu, {"6": verificar_estado_ollama})
 
 # ============================================================================
 # FUNCIÓN PARA USO PROGRAMÁTICO
@@ -504,11 +190,11 @@ def main():
 def crear_tutor_local_personalizado(nivel: str = "primaria", idioma: str = "Español") -> TutorRoboticaLocal:
     """
     Función auxiliar para crear un tutor local personalizado desde otros scripts.
-    
+
     Args:
         nivel (str): Nivel educativo
         idioma (str): Idioma para las respuestas
-        
+
     Returns:
         TutorRoboticaLocal: Instancia del tutor local configurada
     """
@@ -521,7 +207,7 @@ def crear_tutor_local_personalizado(nivel: str = "primaria", idioma: str = "Espa
 if __name__ == "__main__":
     """
     Punto de entrada del script.
-    
+
     Ejecuta la interfaz interactiva del tutor local cuando el script
     se ejecuta directamente.
     """
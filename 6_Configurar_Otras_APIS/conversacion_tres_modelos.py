@@ -2,14 +2,51 @@
 """
 Script para conversación entre tres modelos de IA: Claude, GPT y Gemini
 Basado en el patrón de conversación del notebook day1.ipynb
+
+Modos de cada turno:
+- secuencial: cada modelo responde a lo que dijeron los anteriores
+- simultaneo: los tres responden a la vez al mismo historial
+- encadenado: cada modelo empieza en cuanto el anterior lleva escrita una
+  frase, y recibe lo que los anteriores han dicho hasta ese momento
+
+El ritmo de las llamadas lo marcan los límites de cada proveedor
+(comun/limites_proveedor.py), no pausas fijas. Cada respuesta tiene un plazo
+y una petición de cobertura si tarda más de lo habitual (comun/resiliencia.py);
+si un modelo no responde se salta su intervención, sin meter el error en el
+historial. Antes de cada llamada el historial se ajusta al presupuesto de
+tokens de entrada del modelo (comun/presupuesto_contexto.py). Gemini conversa
+en una sesión de chat persistente que solo recibe lo nuevo desde su último
+turno (comun/sesion_gemini.py).
+
+Cada respuesta se escribe en la transcripción mientras se genera, y cada
+intervención terminada en un diario .jsonl; con --reanudar la conversación
+continúa donde se quedó.
+
+Uso:
+    python conversacion_tres_modelos.py --turnos 3 --modo simultaneo
+    python conversacion_tres_modelos.py --turnos 6 --reanudar
 """
 
+import argparse
 import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
 import openai
 import anthropic
 import google.generativeai as genai
 from dotenv import load_dotenv
-import time
+
+# Hacer importable el paquete compartido `comun` de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comun.contabilidad_tokens import registrar_llamada, uso_anthropic, uso_openai
+from comun.limites_proveedor import obtener_limitador
+from comun.presupuesto_contexto import ajustar_contexto, estadisticas_recorte
+from comun.resiliencia import Candidato, transmitir_resiliente
+from comun.sesion_gemini import SesionGemini
+from transcripcion_debate import EscritorTranscripcion
 
 # Cargar variables de entorno
 load_dotenv()
@@ -37,150 +74,336 @@ GEMINI_SYSTEM = """Eres un chatbot filosófico y reflexivo. Te gusta hacer pregu
 y analizar las situaciones desde múltiples perspectivas. Eres curioso y siempre buscas
 el significado más profundo de las cosas."""
 
+# Participantes en orden de palabra: nombre -> (proveedor, modelo, emoji)
+PARTICIPANTES = {
+    "GPT": ("openai", GPT_MODEL, "🤖"),
+    "Claude": ("anthropic", CLAUDE_MODEL, "🎭"),
+    "Gemini": ("gemini", GEMINI_MODEL, "🧠"),
+}
+MODOS = ("secuencial", "simultaneo", "encadenado")
+ADELANTO_ENCADENADO = 120   # Caracteres del anterior antes de arrancar en modo encadenado
+ARCHIVO_TRANSCRIPCION = "conversacion_tres_modelos.txt"
+
+class RegistroConversacion:
+    """
+    Registro único de la conversación con vistas por participante.
+
+    Cada intervención se guarda una sola vez y se añade al momento a la vista
+    de cada participante (sus mensajes como "assistant", los demás como "user"
+    con el nombre de quien habla). Así cada llamada reutiliza lo ya construido
+    en lugar de recorrer todo el historial.
+    """
+
+    def __init__(self, participantes, sistemas=None):
+        """
+        Args:
+            participantes (list): Participantes con vista en formato chat (GPT, Claude)
+            sistemas (dict): Mensaje de sistema a incluir al inicio de la vista
+                de cada participante (solo para APIs que lo esperan en la lista)
+        """
+        sistemas = sistemas or {}
+        self.intervenciones = []   # (participante, texto) en orden cronológico
+        self._vistas = {
+            nombre: [{"role": "system", "content": sistemas[nombre]}] if sistemas.get(nombre) else []
+            for nombre in participantes
+        }
+
+    def agregar(self, participante, texto):
+        """Añade una intervención al registro y a todas las vistas."""
+        self.intervenciones.append((participante, texto))
+        for nombre, vista in self._vistas.items():
+            if nombre == participante:
+                vista.append({"role": "assistant", "content": texto})
+            else:
+                vista.append({"role": "user", "content": f"{participante} dice: {texto}"})
+
+    def mensajes(self, participante, en_curso=()):
+        """
+        Vista de la conversación desde un participante, lista para la API.
+
+        Args:
+            participante (str): Participante desde cuyo punto de vista se lee
+            en_curso (list): Intervenciones (participante, texto) de este turno
+                que aún no están en el registro; se añaden al final solo para
+                esta llamada
+
+        Sin intervenciones en curso la lista es la del registro (no una
+        copia): no debe modificarse.
+        """
+        vista = self._vistas[participante]
+        if not en_curso:
+            return vista
+        return vista + [{"role": "user", "content": f"{autor} dice: {texto}"}
+                        for autor, texto in en_curso]
+
+
 class ConversacionTresModelos:
-    def __init__(self):
-        self.gpt_messages = ["¡Hola a todos!"]
-        self.claude_messages = ["Hola, encantado de conocerlos"]
-        self.gemini_messages = ["Saludos, ¿qué nos depara esta conversación?"]
-        
-        # Inicializar modelo Gemini con system_instruction
-        self.gemini_model = genai.GenerativeModel(
-            model_name=GEMINI_MODEL,
-            system_instruction=GEMINI_SYSTEM
+    def __init__(self, escritor=None):
+        """
+        Args:
+            escritor (EscritorTranscripcion): Transcripción en vivo; si trae
+                intervenciones de una ejecución anterior, se recuperan
+        """
+        self.escritor = escritor
+        self.registro = RegistroConversacion(
+            ["GPT", "Claude"],             # Gemini lee las intervenciones desde su sesión
+            sistemas={"GPT": GPT_SYSTEM}   # Claude recibe el sistema aparte
         )
+        self.registro.agregar("GPT", "¡Hola a todos!")
+        self.registro.agregar("Claude", "Hola, encantado de conocerlos")
+        self.registro.agregar("Gemini", "Saludos, ¿qué nos depara esta conversación?")
         
-    def call_gpt(self):
-        """Llama a GPT con el historial de conversación"""
-        messages = [{"role": "system", "content": GPT_SYSTEM}]
-        
-        # Construir historial alternando entre los tres modelos
-        max_len = max(len(self.gpt_messages), len(self.claude_messages), len(self.gemini_messages))
+        # Reanudar: reconstruir el historial con las intervenciones del diario
+        for intervencion in (escritor.intervenciones if escritor else []):
+            self.registro.agregar(intervencion["participante"], intervencion["texto"])
         
-        for i in range(max_len):
-            if i < len(self.gpt_messages):
-                messages.append({"role": "assistant", "content": self.gpt_messages[i]})
-            if i < len(self.claude_messages):
-                messages.append({"role": "user", "content": f"Claude dice: {self.claude_messages[i]}"})
-            if i < len(self.gemini_messages):
-                messages.append({"role": "user", "content": f"Gemini dice: {self.gemini_messages[i]}"})
+        # Sesión de chat de Gemini (con system_instruction); recoge el
+        # historial anterior en su primer turno
+        self.sesion_gemini = SesionGemini(
+            genai.GenerativeModel(model_name=GEMINI_MODEL, system_instruction=GEMINI_SYSTEM),
+            "Gemini", GEMINI_MODEL
+        )
         
-        try:
-            completion = openai.chat.completions.create(
+    def stream_gpt(self, intento, en_curso=()):
+        """Respuesta de GPT al historial de conversación, fragmento a fragmento"""
+        messages, _ = ajustar_contexto(self.registro.mensajes("GPT", en_curso), GPT_MODEL, 300,
+                                       avisar=False)
+        with registrar_llamada("openai", GPT_MODEL, "conversacion") as llamada:
+            stream = openai.chat.completions.create(
                 model=GPT_MODEL,
                 messages=messages,
-                max_tokens=300
+                max_tokens=300,
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=intento.timeout()
             )
-            return completion.choices[0].message.content
-        except Exception as e:
-            return f"Error en GPT: {str(e)}"
+            intento.al_cancelar(llamada.marcar_cancelada, stream.close)
+            for chunk in stream:
+                if chunk.usage:
+                    llamada.registrar_uso(uso_openai(chunk.usage))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    llamada.marcar_primer_token()
+                    yield chunk.choices[0].delta.content
+    
+    def stream_claude(self, intento, en_curso=()):
+        """Respuesta de Claude al historial de conversación, fragmento a fragmento"""
+        messages, _ = ajustar_contexto(self.registro.mensajes("Claude", en_curso), CLAUDE_MODEL, 300,
+                                       avisar=False)
+        with registrar_llamada("anthropic", CLAUDE_MODEL, "conversacion") as llamada, \
+                claude.messages.stream(
+                    model=CLAUDE_MODEL,
+                    system=CLAUDE_SYSTEM,
+                    messages=messages,
+                    max_tokens=300,
+                    timeout=intento.timeout()
+                ) as stream:
+            intento.al_cancelar(llamada.marcar_cancelada, stream.close)
+            for text in stream.text_stream:
+                if text:
+                    llamada.marcar_primer_token()
+                    yield text
+            llamada.registrar_uso(uso_anthropic(stream.get_final_message().usage))
     
-    def call_claude(self):
-        """Llama a Claude con el historial de conversación"""
-        messages = []
+    def stream_gemini(self, intento, en_curso=()):
+        """Respuesta de Gemini a lo dicho desde su último turno, fragmento a fragmento"""
+        with registrar_llamada("gemini", GEMINI_MODEL, "conversacion") as llamada:
+            # El SDK de Gemini no permite cerrar el stream desde otro hilo: lo acota el timeout
+            intento.al_cancelar(llamada.marcar_cancelada)
+            yield from self.sesion_gemini.transmitir(self.registro.intervenciones, llamada,
+                                                     timeout=intento.timeout(),
+                                                     en_curso=en_curso)
+    
+    def stream_resiliente(self, participante, en_curso=()):
+        """
+        Respuesta de un participante con turno en su limitador, plazo, cobertura y cortacircuitos
         
-        # Construir historial alternando entre los tres modelos
-        max_len = max(len(self.gpt_messages), len(self.claude_messages), len(self.gemini_messages))
+        Args:
+            participante (str): Participante que responde
+            en_curso (list): Intervenciones (participante, texto) de este turno
+                que aún se están generando (modo encadenado)
+        """
+        proveedor, modelo, _ = PARTICIPANTES[participante]
+        streams = {"GPT": self.stream_gpt, "Claude": self.stream_claude, "Gemini": self.stream_gemini}
         
-        for i in range(max_len):
-            if i < len(self.claude_messages):
-                messages.append({"role": "assistant", "content": self.claude_messages[i]})
-            if i < len(self.gpt_messages):
-                messages.append({"role": "user", "content": f"GPT dice: {self.gpt_messages[i]}"})
-            if i < len(self.gemini_messages):
-                messages.append({"role": "user", "content": f"Gemini dice: {self.gemini_messages[i]}"})
+        def transmitir(intento):
+            return streams[participante](intento, en_curso)
         
+        # Sin cobertura para Gemini: una segunda petición a la misma sesión de
+        # chat solo esperaría a la primera
+        return transmitir_resiliente([
+            Candidato(proveedor, modelo, transmitir, turno=obtener_limitador(proveedor).turno)
+        ], cubrir=proveedor != "gemini")
+    
+    def _escribir(self, texto):
+        """Muestra texto y lo añade a la transcripción (si hay)"""
+        if self.escritor:
+            self.escritor.escribir(texto)
+        else:
+            print(texto, end='', flush=True)
+    
+    def _transmitir(self, participante, fragmentos):
+        """Muestra y escribe una respuesta fragmento a fragmento; devuelve el texto completo"""
+        encabezado = f"{PARTICIPANTES[participante][2]} {participante}:"
+        if self.escritor:
+            return self.escritor.transmitir(encabezado, fragmentos)
+        print(encabezado)
+        partes = []
         try:
-            message = claude.messages.create(
-                model=CLAUDE_MODEL,
-                system=CLAUDE_SYSTEM,
-                messages=messages,
-                max_tokens=300
-            )
-            return message.content[0].text
-        except Exception as e:
-            return f"Error en Claude: {str(e)}"
+            for texto in fragmentos:
+                partes.append(texto)
+                print(texto, end='', flush=True)
+        finally:
+            print("\n")
+        return "".join(partes)
     
-    def call_gemini(self):
-        """Llama a Gemini con el historial de conversación"""
-        # Construir prompt con historial
-        conversation_history = "Historial de conversación:\n"
-        
-        max_len = max(len(self.gpt_messages), len(self.claude_messages), len(self.gemini_messages))
-        SSS
-        for i in range(max_len):
-            if i < len(self.gemini_messages):
-                conversation_history += f"Gemini: {self.gemini_messages[i]}\n"
-            if i < len(self.gpt_messages):
-                conversation_history += f"GPT: {self.gpt_messages[i]}\n"
-            if i < len(self.claude_messages):
-                conversation_history += f"Claude: {self.claude_messages[i]}\n"
-        
-        conversation_history += "\nResponde como Gemini:"
+    def _agregar(self, participante, texto, turno):
+        """Añade una intervención al historial y al diario"""
+        self.registro.agregar(participante, texto)
+        if self.escritor:
+            self.escritor.registrar(participante, texto, turno)
+    
+    def turno_secuencial(self, turno, participantes=None):
+        """Cada modelo responde, en orden, a todo lo dicho hasta ese momento"""
+        for participante in participantes or PARTICIPANTES:
+            try:
+                respuesta = self._transmitir(participante, self.stream_resiliente(participante))
+            except Exception as e:
+                # El error se muestra, pero no entra en el historial ni en el diario
+                self._escribir(f"⚠️ {participante} no respondió ({e}); se salta su intervención\n\n")
+                continue
+            self._agregar(participante, respuesta, turno)
+    
+    def turno_paralelo(self, turno, encadenado=False):
+        """
+        Los tres modelos responden al historial del inicio del turno en hilos.
         
-        try:
-            response = self.gemini_model.generate_content(conversation_history)
-            return response.text
-        except Exception as e:
-            return f"Error en Gemini: {str(e)}"
+        Si encadenado es True, cada modelo espera a que el anterior lleve
+        ADELANTO_ENCADENADO caracteres (o termine) y empieza con lo que los
+        anteriores han dicho hasta ese momento (terminado en "…" si aún
+        siguen hablando).
+        Las respuestas se muestran en orden: la primera en vivo y las demás en
+        cuanto le toca. El historial no se modifica hasta que terminan las tres.
+        """
+        nombres = list(PARTICIPANTES)
+        colas = {nombre: queue.Queue() for nombre in nombres}
+        arrancado = {nombre: threading.Event() for nombre in nombres}
+        parciales = {nombre: [] for nombre in nombres}   # Lo transmitido hasta ahora
+        respuestas = {}   # Solo las respuestas completas
+        fallidos = set()
+        fin = object()
+        
+        def en_curso(previos):
+            """Lo dicho en este turno por los anteriores, terminado o no"""
+            dicho = []
+            for nombre in previos:
+                if nombre in respuestas:
+                    dicho.append((nombre, respuestas[nombre]))
+                elif nombre not in fallidos and parciales[nombre]:
+                    dicho.append((nombre, "".join(parciales[nombre]).rstrip() + "…"))
+            return dicho
+        
+        def responder(previos, participante):
+            contexto = []
+            if encadenado and previos:
+                arrancado[previos[-1]].wait()
+                contexto = en_curso(previos)
+            partes = parciales[participante]
+            caracteres = 0
+            try:
+                for texto in self.stream_resiliente(participante, contexto):
+                    partes.append(texto)
+                    colas[participante].put(texto)
+                    caracteres += len(texto)
+                    if caracteres >= ADELANTO_ENCADENADO:
+                        arrancado[participante].set()
+                respuestas[participante] = "".join(partes)
+            except Exception as e:
+                fallidos.add(participante)
+                colas[participante].put(f"\n⚠️ {participante} no respondió ({e}); se salta su intervención")
+            finally:
+                arrancado[participante].set()
+                colas[participante].put(fin)
+        
+        hilos = [threading.Thread(target=responder, args=(nombres[:i], participante), daemon=True)
+                 for i, participante in enumerate(nombres)]
+        for hilo in hilos:
+            hilo.start()
+        
+        for participante in nombres:
+            self._transmitir(participante, iter(colas[participante].get, fin))
+        for hilo in hilos:
+            hilo.join()
+        
+        for participante in nombres:
+            if participante in respuestas:
+                self._agregar(participante, respuestas[participante], turno)
     
-    def ejecutar_conversacion(self, num_turnos=5):
-        """Ejecuta la conversación entre los tres modelos"""
-        print("=== CONVERSACIÓN ENTRE TRES MODELOS DE IA ===\n")
-        print("🤖 GPT (Argumentativo)")
-        print("🎭 Claude (Diplomático)")  
-        print("🧠 Gemini (Filosófico)")
-        print("\n" + "="*50 + "\n")
-        
-        # Mostrar mensajes iniciales
-        print(f"🤖 GPT:\n{self.gpt_messages[0]}\n")
-        print(f"🎭 Claude:\n{self.claude_messages[0]}\n")
-        print(f"🧠 Gemini:\n{self.gemini_messages[0]}\n")
-        print("-" * 50 + "\n")
-        
-        for turno in range(num_turnos):
-            print(f"--- TURNO {turno + 1} ---\n")
-            
-            # GPT responde
-            gpt_response = self.call_gpt()
-            print(f"🤖 GPT:\n{gpt_response}\n")
-            self.gpt_messages.append(gpt_response)
-            time.sleep(1)  # Pausa para evitar rate limits
-            
-            # Claude responde
-            claude_response = self.call_claude()
-            print(f"🎭 Claude:\n{claude_response}\n")
-            self.claude_messages.append(claude_response)
-            time.sleep(1)
-            
-            # Gemini responde
-            gemini_response = self.call_gemini()
-            print(f"🧠 Gemini:\n{gemini_response}\n")
-            self.gemini_messages.append(gemini_response)
-            time.sleep(1)
+    def ejecutar_conversacion(self, num_turnos=5, modo="secuencial"):
+        """
+        Ejecuta la conversación entre los tres modelos
+        
+        Si el escritor trae intervenciones de una ejecución anterior, se
+        continúa desde el último turno registrado hasta completar num_turnos.
+        
+        Args:
+            num_turnos (int): Turnos totales de la conversación
+            modo (str): secuencial, simultaneo o encadenado
+        """
+        if modo not in MODOS:
+            raise ValueError(f"Modo '{modo}' no válido. Opciones: {MODOS}")
+        
+        previas = self.escritor.intervenciones if self.escritor else []
+        ultimo_turno = previas[-1]["turno"] if previas else 0
+        
+        if not previas:
+            self._escribir("=== CONVERSACIÓN ENTRE TRES MODELOS DE IA ===\n\n"
+                           "🤖 GPT (Argumentativo)\n"
+                           "🎭 Claude (Diplomático)\n"
+                           "🧠 Gemini (Filosófico)\n"
+                           "\n" + "="*50 + "\n\n")
             
-            print("-" * 50 + "\n")
-    
-    def guardar_conversacion(self, archivo="conversacion_tres_modelos.txt"):
-        """Guarda la conversación en un archivo"""
-        with open(archivo, 'w', encoding='utf-8') as f:
-            f.write("=== CONVERSACIÓN ENTRE TRES MODELOS DE IA ===\n\n")
+            # Mostrar mensajes iniciales
+            for participante, texto in self.registro.intervenciones[:3]:
+                self._escribir(f"{PARTICIPANTES[participante][2]} {participante}:\n{texto}\n\n")
+            self._escribir("-" * 50 + "\n\n")
+        else:
+            print(f"↩️ Reanudando tras {len(previas)} intervenciones (turno {ultimo_turno})\n")
+            # Completar el último turno si quedó a medias
+            hablaron = {i["participante"] for i in previas if i["turno"] == ultimo_turno}
+            pendientes = [p for p in PARTICIPANTES if p not in hablaron]
+            if pendientes:
+                self._escribir(f"--- TURNO {ultimo_turno} (continuación) ---\n\n")
+                self.turno_secuencial(ultimo_turno, pendientes)
+                self._escribir("-" * 50 + "\n\n")
+        
+        for turno in range(ultimo_turno + 1, num_turnos + 1):
+            self._escribir(f"--- TURNO {turno} ---\n\n")
+            inicio = time.perf_counter()
+            ahorrados = estadisticas_recorte()["tokens_ahorrados"]
             
-            max_len = max(len(self.gpt_messages), len(self.claude_messages), len(self.gemini_messages))
+            if modo == "secuencial":
+                self.turno_secuencial(turno)
+            else:
+                self.turno_paralelo(turno, encadenado=(modo == "encadenado"))
             
-            for i in range(max_len):
-                f.write(f"--- INTERCAMBIO {i + 1} ---\n")
-                if i < len(self.gpt_messages):
-                    f.write(f"GPT: {self.gpt_messages[i]}\n\n")
-                if i < len(self.claude_messages):
-                    f.write(f"Claude: {self.claude_messages[i]}\n\n")
-                if i < len(self.gemini_messages):
-                    f.write(f"Gemini: {self.gemini_messages[i]}\n\n")
-                f.write("-" * 50 + "\n\n")
-        
-        print(f"Conversación guardada en: {archivo}")
+            print(f"⏱️ Turno completado en {time.perf_counter() - inicio:.1f}s")
+            ahorrados = estadisticas_recorte()["tokens_ahorrados"] - ahorrados
+            if ahorrados:
+                print(f"✂️ {ahorrados:,} tokens de entrada ahorrados condensando turnos antiguos")
+            self._escribir("-" * 50 + "\n\n")
 
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description="Conversación entre GPT, Claude y Gemini")
+    parser.add_argument("--turnos", type=int, default=3)
+    parser.add_argument("--modo", choices=MODOS, default="secuencial",
+                        help="secuencial, simultaneo (los tres a la vez) o encadenado")
+    parser.add_argument("--transcripcion", default=ARCHIVO_TRANSCRIPCION,
+                        help="Archivo de la transcripción (el diario usa la extensión .jsonl)")
+    parser.add_argument("--reanudar", action="store_true",
+                        help="Continuar la conversación guardada en la transcripción")
+    args = parser.parse_args()
+    
     print("Iniciando conversación entre tres modelos de IA...")
     
     # Verificar que las API keys estén configuradas
@@ -191,15 +414,18 @@ def main():
         print("   - GOOGLE_API_KEY")
         return
     
+    escritor = EscritorTranscripcion(args.transcripcion, reanudar=args.reanudar)
     try:
-        conversacion = ConversacionTresModelos()
-        conversacion.ejecutar_conversacion(num_turnos=3)
-        conversacion.guardar_conversacion()
+        conversacion = ConversacionTresModelos(escritor)
+        conversacion.ejecutar_conversacion(num_turnos=args.turnos, modo=args.modo)
         
     except KeyboardInterrupt:
-        print("\n\n⏹️ Conversación interrumpida por el usuario.")
+        print("\n\n⏹️ Conversación interrumpida por el usuario. Continúa con --reanudar.")
     except Exception as e:
         print(f"\n❌ Error durante la conversación: {str(e)}")
+    finally:
+        escritor.cerrar()
+        print(f"Conversación guardada en: {args.transcripcion}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,13 +3,32 @@
 Script para conversación entre Claude y GPT como expertos en educación y tecnología
 Tema: Soluciones al problema de desconexión entre educación universitaria y mundo laboral en México
 Enfoque: Uso de IA, tecnología e internet para soluciones accesibles y de bajo costo
+
+Cada respuesta se escribe en la transcripción mientras se genera; con
+--reanudar el debate continúa desde la última intervención guardada.
+
+Uso:
+    python educacion_mexico_claude_vs_gpt.py --mensajes 10
+    python educacion_mexico_claude_vs_gpt.py --mensajes 10 --reanudar
 """
 
+import argparse
 import os
+import sys
+from pathlib import Path
 import openai
 import anthropic
 from dotenv import load_dotenv
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Hacer importable el paquete compartido `comun` de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comun.contabilidad_tokens import registrar_llamada, uso_anthropic, uso_openai
+from comun.presupuesto_contexto import ajustar_contexto
+from comun.resiliencia import Candidato, transmitir_resiliente
+from memoria_debate import MemoriaDebate
+from transcripcion_debate import EscritorTranscripcion
 
 # Cargar variables de entorno
 load_dotenv()
@@ -22,6 +41,18 @@ claude = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
 GPT_MODEL = "gpt-4o-mini"
 CLAUDE_MODEL = "claude-3-haiku-20240307"
 
+# Etapas de postproceso (resumen, Markdown...) que se ejecutan a la vez
+MAX_POSTPROCESO = 3
+
+ARCHIVO_TXT = "debate_educacion_mexico.txt"
+ARCHIVO_MD = "debate_educacion_mexico.md"
+
+# Encabezado de cada participante en la terminal y en la transcripción
+ETIQUETAS = {
+    "GPT": "🚀 EXPERTO EN TECNOLOGÍA EDUCATIVA (GPT):",
+    "Claude": "🎓 EXPERTO EN POLÍTICAS EDUCATIVAS (Claude):",
+}
+
 # Personalidades de los expertos
 GPT_SYSTEM = """Eres un experto en tecnología educativa y transformación digital con amplia experiencia en México. 
 Tu enfoque es pragmático y orientado a resultados. Te especializas en:
@@ -44,7 +75,12 @@ Eres reflexivo, empático y siempre consideras el impacto social de las solucion
 Buscas equilibrar la innovación con la equidad y la sostenibilidad social."""
 
 class ConversacionEducacionMexico:
-    def __init__(self):
+    def __init__(self, escritor=None):
+        """
+        Args:
+            escritor (EscritorTranscripcion): Transcripción en vivo; si trae
+                intervenciones de una ejecución anterior, se recuperan
+        """
         # Mensaje inicial que establece el contexto del debate
         self.tema_inicial = """El problema: En México existe una gran desconexión entre lo que se enseña en las universidades 
         y las habilidades que demanda el mercado laboral actual. Muchos graduados no encuentran empleo en su área, 
@@ -57,92 +93,187 @@ class ConversacionEducacionMexico:
         self.gpt_messages = []
         self.claude_messages = []
         
-    def call_gpt(self, turno):
-        """Llama a GPT con el contexto de la conversación"""
+        # Lo que se envía a los modelos: últimos intercambios + resumen acumulado
+        self.memoria = MemoriaDebate(["GPT", "Claude"], resumir=self._resumir)
+        
+        # Reanudar: reconstruir el estado con las intervenciones del diario
+        self.escritor = escritor
+        for intervencion in (escritor.intervenciones if escritor else []):
+            self._agregar(intervencion["participante"], intervencion["texto"])
+        
+    def _agregar(self, participante, texto):
+        """Añade una intervención a las listas y a la memoria del debate"""
+        (self.gpt_messages if participante == "GPT" else self.claude_messages).append(texto)
+        self.memoria.agregar(participante, texto)
+        
+    def _contexto(self):
+        """Contexto del debate y, si ya existe, el resumen de lo dicho fuera de la ventana"""
+        contexto = f"Contexto del debate:\n{self.tema_inicial}"
+        if self.memoria.resumen:
+            contexto += f"\n\nResumen de lo debatido hasta ahora:\n{self.memoria.resumen}"
+        return contexto
+    
+    def _resumir(self, mensajes):
+        """Actualiza el resumen de la memoria del debate con GPT"""
+        with registrar_llamada("openai", GPT_MODEL, "memoria_debate") as llamada:
+            completion = openai.chat.completions.create(
+                model=GPT_MODEL,
+                messages=mensajes,
+                max_tokens=600,
+                temperature=0.3
+            )
+            llamada.registrar_uso(uso_openai(completion.usage))
+        return completion.choices[0].message.content
+        
+    def stream_gpt(self, turno, intento):
+        """Respuesta de GPT con el contexto de la conversación, fragmento a fragmento"""
         messages = [{"role": "system", "content": GPT_SYSTEM}]
         
         if turno == 0:
             # Primer mensaje: presentar el problema
             messages.append({"role": "user", "content": f"Contexto del debate:\n{self.tema_inicial}\n\nComo experto en tecnología educativa, ¿cuál es tu análisis inicial del problema y qué soluciones tecnológicas propones?"})
         else:
-            # Construir historial de la conversación
-            messages.append({"role": "user", "content": f"Contexto del debate:\n{self.tema_inicial}"})
-            
-            for i in range(len(self.claude_messages)):
-                if i < len(self.gpt_messages):
-                    messages.append({"role": "assistant", "content": self.gpt_messages[i]})
-                messages.append({"role": "user", "content": f"El experto en políticas educativas responde: {self.claude_messages[i]}"})
+            # Contexto + resumen acumulado + últimos intercambios (no todo el debate)
+            messages.append({"role": "user", "content": self._contexto()})
+            messages.extend(self.memoria.mensajes("GPT", {"Claude": "El experto en políticas educativas responde: "}))
             
             messages.append({"role": "user", "content": "Continúa el debate con tu siguiente propuesta o respuesta a los puntos planteados."})
         
-        try:
-            completion = openai.chat.completions.create(
+        # El sistema y el contexto del debate nunca se condensan
+        messages, _ = ajustar_contexto(messages, GPT_MODEL, 400, fijos=2)
+        
+        with registrar_llamada("openai", GPT_MODEL, "debate") as llamada:
+            stream = openai.chat.completions.create(
                 model=GPT_MODEL,
                 messages=messages,
                 max_tokens=400,
-                temperature=0.7
+                temperature=0.7,
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=intento.timeout()
             )
-            return completion.choices[0].message.content
-        except Exception as e:
-            return f"Error en GPT: {str(e)}"
+            intento.al_cancelar(llamada.marcar_cancelada, stream.close)
+            for chunk in stream:
+                if chunk.usage:
+                    llamada.registrar_uso(uso_openai(chunk.usage))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    llamada.marcar_primer_token()
+                    yield chunk.choices[0].delta.content
     
-    def call_claude(self, turno):
-        """Llama a Claude con el contexto de la conversación"""
+    def stream_claude(self, turno, intento):
+        """Respuesta de Claude con el contexto de la conversación, fragmento a fragmento"""
         messages = []
         
         if turno == 0:
             # Primer mensaje: responder al análisis de GPT
             if self.gpt_messages:
                 messages.append({"role": "user", "content": f"Contexto del debate:\n{self.tema_inicial}\n\nEl experto en tecnología educativa dice: {self.gpt_messages[0]}\n\nComo experto en políticas educativas, ¿cuál es tu perspectiva sobre este análisis y qué complementarías o matizarías?"})
+            else:
+                # GPT no respondió: Claude abre el debate
+                messages.append({"role": "user", "content": f"Contexto del debate:\n{self.tema_inicial}\n\nComo experto en políticas educativas, ¿cuál es tu análisis inicial del problema y qué propones?"})
         else:
-            # Construir historial de la conversación
-            messages.append({"role": "user", "content": f"Contexto del debate:\n{self.tema_inicial}"})
-            
-            for i in range(len(self.gpt_messages)):
-                messages.append({"role": "user", "content": f"Experto en tecnología: {self.gpt_messages[i]}"})
-                if i < len(self.claude_messages):
-                    messages.append({"role": "assistant", "content": self.claude_messages[i]})
+            # Contexto + resumen acumulado + últimos intercambios (no todo el debate)
+            messages.append({"role": "user", "content": self._contexto()})
+            messages.extend(self.memoria.mensajes("Claude", {"GPT": "Experto en tecnología: "}))
             
             messages.append({"role": "user", "content": "Continúa el debate con tu siguiente análisis o propuesta."})
         
+        messages, _ = ajustar_contexto(messages, CLAUDE_MODEL, 400, fijos=1)
+        
+        with registrar_llamada("anthropic", CLAUDE_MODEL, "debate") as llamada, \
+                claude.messages.stream(
+                    model=CLAUDE_MODEL,
+                    system=CLAUDE_SYSTEM,
+                    messages=messages,
+                    max_tokens=400,
+                    timeout=intento.timeout()
+                ) as stream:
+            intento.al_cancelar(llamada.marcar_cancelada, stream.close)
+            for text in stream.text_stream:
+                if text:
+                    llamada.marcar_primer_token()
+                    yield text
+            llamada.registrar_uso(uso_anthropic(stream.get_final_message().usage))
+    
+    def _escribir(self, texto):
+        """Muestra texto y lo añade a la transcripción (si hay)"""
+        if self.escritor:
+            self.escritor.escribir(texto)
+        else:
+            print(texto, end='', flush=True)
+    
+    def _intervenir(self, participante, turno):
+        """
+        Transmite la respuesta de un participante y la registra
+        
+        La respuesta tiene plazo y cobertura si tarda (comun/resiliencia.py).
+        Si el modelo no responde, se avisa y se salta la intervención: el
+        error no entra en la memoria del debate ni en el diario.
+        """
+        if participante == "GPT":
+            candidato = Candidato("openai", GPT_MODEL, lambda intento: self.stream_gpt(turno, intento))
+        else:
+            candidato = Candidato("anthropic", CLAUDE_MODEL, lambda intento: self.stream_claude(turno, intento))
+        fragmentos = transmitir_resiliente([candidato])
         try:
-            message = claude.messages.create(
-                model=CLAUDE_MODEL,
-                system=CLAUDE_SYSTEM,
-                messages=messages,
-                max_tokens=400
-            )
-            return message.content[0].text
+            if self.escritor:
+                respuesta = self.escritor.transmitir(ETIQUETAS[participante], fragmentos)
+            else:
+                print(ETIQUETAS[participante])
+                partes = []
+                for texto in fragmentos:
+                    partes.append(texto)
+                    print(texto, end='', flush=True)
+                print("\n")
+                respuesta = "".join(partes)
         except Exception as e:
-            return f"Error en Claude: {str(e)}"
+            self._escribir(f"⚠️ {participante} no respondió ({e}); se salta su intervención\n\n")
+            return
+        self._agregar(participante, respuesta)
+        if self.escritor:
+            self.escritor.registrar(participante, respuesta, turno + 1)
     
     def ejecutar_debate(self, num_mensajes=10):
-        """Ejecuta el debate entre los dos expertos"""
-        print("=== DEBATE: EDUCACIÓN UNIVERSITARIA Y MUNDO LABORAL EN MÉXICO ===\n")
-        print("🚀 GPT - Experto en Tecnología Educativa (Enfoque Pragmático)")
-        print("🎓 Claude - Experto en Políticas Educativas (Enfoque Holístico)")
-        print("\n" + "="*80 + "\n")
+        """
+        Ejecuta el debate entre los dos expertos
         
-        print("📋 CONTEXTO DEL DEBATE:")
-        print(self.tema_inicial)
-        print("\n" + "="*80 + "\n")
+        Si el escritor trae intervenciones de una ejecución anterior, el
+        debate continúa desde la siguiente intervención pendiente.
+        
+        Args:
+            num_mensajes (int): Intercambios totales (un mensaje por modelo en cada uno)
+        """
+        previas = self.escritor.intervenciones if self.escritor else []
+        if not previas:
+            self._escribir("=== DEBATE: EDUCACIÓN UNIVERSITARIA Y MUNDO LABORAL EN MÉXICO ===\n\n"
+                           "🚀 GPT - Experto en Tecnología Educativa (Enfoque Pragmático)\n"
+                           "🎓 Claude - Experto en Políticas Educativas (Enfoque Holístico)\n"
+                           "\n" + "="*80 + "\n\n"
+                           "📋 CONTEXTO DEL DEBATE:\n"
+                           f"{self.tema_inicial}\n"
+                           "\n" + "="*80 + "\n\n")
+            primer_turno, falta_gpt = 0, True
+        else:
+            print(f"↩️ Reanudando tras {len(previas)} intervenciones\n")
+            # Continuar tras la última intervención del diario (el turno se
+            # toma de ahí porque una intervención fallida no queda registrada)
+            ultima = previas[-1]
+            primer_turno = ultima["turno"] - 1 if ultima["participante"] == "GPT" else ultima["turno"]
+            falta_gpt = ultima["participante"] != "GPT"
         
-        for turno in range(num_mensajes):
-            print(f"--- INTERCAMBIO {turno + 1} ---\n")
+        for turno in range(primer_turno, num_mensajes):
+            self._escribir(f"--- INTERCAMBIO {turno + 1} ---\n\n")
             
-            # GPT inicia o responde
-            gpt_response = self.call_gpt(turno)
-            print(f"🚀 EXPERTO EN TECNOLOGÍA EDUCATIVA (GPT):\n{gpt_response}\n")
-            self.gpt_messages.append(gpt_response)
-            time.sleep(2)  # Pausa para evitar rate limits
+            # GPT inicia o responde (salvo que ya lo hiciera antes de interrumpirse)
+            if turno > primer_turno or falta_gpt:
+                self._intervenir("GPT", turno)
+                time.sleep(2)  # Pausa para evitar rate limits
             
             # Claude responde
-            claude_response = self.call_claude(turno)
-            print(f"🎓 EXPERTO EN POLÍTICAS EDUCATIVAS (Claude):\n{claude_response}\n")
-            self.claude_messages.append(claude_response)
+            self._intervenir("Claude", turno)
             time.sleep(2)
             
-            print("-" * 80 + "\n")
+            self._escribir("-" * 80 + "\n\n")
     
     def generar_resumen_final(self):
         """Genera un resumen final de las propuestas discutidas"""
@@ -151,16 +282,18 @@ class ConversacionEducacionMexico:
         # Llamar a GPT para generar resumen
         messages = [
             {"role": "system", "content": "Eres un analista experto que debe crear un resumen ejecutivo conciso de las principales propuestas discutidas en el debate sobre educación y tecnología en México."},
-            {"role": "user", "content": f"Basándote en este debate completo, crea un resumen ejecutivo con las 5 propuestas más viables y concretas que surgieron:\n\nDebate completo:\n{self._obtener_debate_completo()}"}
+            {"role": "user", "content": f"Basándote en este debate, crea un resumen ejecutivo con las 5 propuestas más viables y concretas que surgieron:\n\n{self.memoria.contexto_final()}"}
         ]
         
         try:
-            completion = openai.chat.completions.create(
-                model=GPT_MODEL,
-                messages=messages,
-                max_tokens=500,
-                temperature=0.3
-            )
+            with registrar_llamada("openai", GPT_MODEL, "resumen") as llamada:
+                completion = openai.chat.completions.create(
+                    model=GPT_MODEL,
+                    messages=messages,
+                    max_tokens=500,
+                    temperature=0.3
+                )
+                llamada.registrar_uso(uso_openai(completion.usage))
             resumen = completion.choices[0].message.content
             print(f"📊 RESUMEN EJECUTIVO:\n{resumen}\n")
             return resumen
@@ -168,22 +301,10 @@ class ConversacionEducacionMexico:
             print(f"Error generando resumen: {str(e)}")
             return ""
     
-    def _obtener_debate_completo(self):
-        """Obtiene el texto completo del debate"""
-        debate_completo = ""
-        max_len = max(len(self.gpt_messages), len(self.claude_messages))
-        
-        for i in range(max_len):
-            if i < len(self.gpt_messages):
-                debate_completo += f"GPT: {self.gpt_messages[i]}\n\n"
-            if i < len(self.claude_messages):
-                debate_completo += f"Claude: {self.claude_messages[i]}\n\n"
-        
-        return debate_completo
-    
     def convertir_a_markdown(self):
         """Convierte el debate completo a formato Markdown usando GPT"""
-        debate_texto = self._obtener_debate_completo()
+        # Resumen acumulado + últimos intercambios en lugar de la transcripción completa
+        debate_texto = self.memoria.contexto_final()
         
         prompt_conversion = f"""Convierte el siguiente debate entre expertos a un formato Markdown profesional y bien estructurado.
 
@@ -205,24 +326,24 @@ DEBATE A CONVERTIR:
 Genera un documento Markdown completo, profesional y bien estructurado."""
 
         try:
-            completion = openai.chat.completions.create(
-                model=GPT_MODEL,
-                messages=[
-                    {"role": "system", "content": "Eres un experto en documentación técnica y formato Markdown. Creas documentos profesionales, bien estructurados y visualmente atractivos."},
-                    {"role": "user", "content": prompt_conversion}
-                ],
-                max_tokens=2000,
-                temperature=0.3
-            )
+            with registrar_llamada("openai", GPT_MODEL, "markdown") as llamada:
+                completion = openai.chat.completions.create(
+                    model=GPT_MODEL,
+                    messages=[
+                        {"role": "system", "content": "Eres un experto en documentación técnica y formato Markdown. Creas documentos profesionales, bien estructurados y visualmente atractivos."},
+                        {"role": "user", "content": prompt_conversion}
+                    ],
+                    max_tokens=2000,
+                    temperature=0.3
+                )
+                llamada.registrar_uso(uso_openai(completion.usage))
             return completion.choices[0].message.content
         except Exception as e:
             print(f"Error convirtiendo a Markdown: {str(e)}")
             return None
 
-    def guardar_debate(self, archivo_txt="debate_educacion_mexico.txt", archivo_md="debate_educacion_mexico.md"):
-        """Guarda el debate completo en formato texto y Markdown"""
-        
-        # Guardar en formato texto original
+    def _escribir_transcripcion(self, archivo_txt):
+        """Escribe la transcripción completa (debate sin escritor en vivo)"""
         with open(archivo_txt, 'w', encoding='utf-8') as f:
             f.write("=== DEBATE: EDUCACIÓN UNIVERSITARIA Y MUNDO LABORAL EN MÉXICO ===\n\n")
             f.write("PARTICIPANTES:\n")
@@ -242,28 +363,83 @@ Genera un documento Markdown completo, profesional y bien estructurado."""
                 if i < len(self.claude_messages):
                     f.write(f"🎓 EXPERTO EN POLÍTICAS EDUCATIVAS (Claude):\n{self.claude_messages[i]}\n\n")
                 f.write("-" * 80 + "\n\n")
-            
-            # Agregar resumen si existe
-            resumen = self.generar_resumen_final()
-            if resumen:
-                f.write("=== RESUMEN EJECUTIVO ===\n\n")
-                f.write(resumen)
+    
+    def guardar_debate(self, archivo_txt=ARCHIVO_TXT, archivo_md=ARCHIVO_MD, etapas_extra=None):
+        """
+        Guarda el debate completo en formato texto y genera los derivados
         
-        print(f"💾 Debate en formato texto guardado en: {archivo_txt}")
+        El resumen ejecutivo y la conversión a Markdown son llamadas
+        independientes al modelo: se ejecutan a la vez y cada resultado se
+        guarda en cuanto termina.
         
-        # Convertir y guardar en formato Markdown
-        print("🔄 Convirtiendo debate a formato Markdown...")
-        markdown_content = self.convertir_a_markdown()
+        Args:
+            archivo_txt (str): Transcripción completa (al final se añade el resumen);
+                si el debate se escribió en vivo, se usa la de su escritor
+            archivo_md (str): Debate en formato Markdown
+            etapas_extra (dict): Derivados adicionales {nombre: (generar, guardar)}
+        """
         
-        if markdown_content:
-            with open(archivo_md, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-            print(f"📝 Debate en formato Markdown guardado en: {archivo_md}")
+        if self.escritor:
+            # La transcripción ya se escribió durante el debate
+            self.escritor.cerrar()
+            archivo_txt = self.escritor.archivo_txt
         else:
-            print("❌ Error al convertir a Markdown")
+            self._escribir_transcripcion(archivo_txt)
+        print(f"💾 Debate en formato texto guardado en: {archivo_txt}")
+        
+        def anexar_resumen(resumen):
+            if resumen:
+                with open(archivo_txt, 'a', encoding='utf-8') as f:
+                    f.write("=== RESUMEN EJECUTIVO ===\n\n")
+                    f.write(resumen)
+                print(f"💾 Resumen ejecutivo añadido a: {archivo_txt}")
+        
+        def guardar_markdown(markdown_content):
+            if markdown_content:
+                with open(archivo_md, 'w', encoding='utf-8') as f:
+                    f.write(markdown_content)
+                print(f"📝 Debate en formato Markdown guardado en: {archivo_md}")
+            else:
+                print("❌ Error al convertir a Markdown")
+        
+        print("🔄 Generando resumen ejecutivo y formato Markdown...")
+        etapas = {
+            "resumen ejecutivo": (self.generar_resumen_final, anexar_resumen),
+            "Markdown": (self.convertir_a_markdown, guardar_markdown),
+            **(etapas_extra or {}),
+        }
+        self.postprocesar(etapas)
+    
+    def postprocesar(self, etapas, max_paralelo=MAX_POSTPROCESO):
+        """
+        Ejecuta las etapas de postproceso con paralelismo limitado
+        
+        Args:
+            etapas (dict): {nombre: (generar, guardar)}; generar() no recibe
+                argumentos y guardar(resultado) se llama en cuanto termina
+            max_paralelo (int): Etapas ejecutándose a la vez como máximo
+        """
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_paralelo, thread_name_prefix="postproceso") as executor:
+            futuros = {executor.submit(generar): (nombre, guardar)
+                       for nombre, (generar, guardar) in etapas.items()}
+            for futuro in as_completed(futuros):
+                nombre, guardar = futuros[futuro]
+                try:
+                    guardar(futuro.result())
+                except Exception as e:
+                    print(f"❌ Error en la etapa '{nombre}': {str(e)}")
+        print(f"⏱️ Postproceso completado en {time.perf_counter() - inicio:.1f}s")
 
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description="Debate sobre educación y tecnología en México")
+    parser.add_argument("--mensajes", type=int, default=10, help="Mensajes por modelo")
+    parser.add_argument("--transcripcion", default=ARCHIVO_TXT, help="Archivo de la transcripción en vivo")
+    parser.add_argument("--reanudar", action="store_true",
+                        help="Continuar el debate guardado en la transcripción")
+    args = parser.parse_args()
+    
     print("🇲🇽 Iniciando debate sobre educación y tecnología en México...\n")
     
     # Verificar que las API keys estén configuradas
@@ -273,20 +449,24 @@ def main():
         print("   - ANTHROPIC_API_KEY")
         return
     
+    escritor = EscritorTranscripcion(args.transcripcion, reanudar=args.reanudar)
     try:
-        debate = ConversacionEducacionMexico()
-        debate.ejecutar_debate(num_mensajes=10)  # 10 mensajes por modelo
+        debate = ConversacionEducacionMexico(escritor)
+        debate.ejecutar_debate(num_mensajes=args.mensajes)  # Mensajes por modelo
         debate.guardar_debate()
         
         print("\n🎉 Debate completado exitosamente!")
         print("📄 Revisa los archivos generados:")
-        print("   - debate_educacion_mexico.txt (formato texto)")
-        print("   - debate_educacion_mexico.md (formato Markdown)")
+        print(f"   - {args.transcripcion} (formato texto)")
+        print(f"   - {escritor.archivo_diario} (diario para --reanudar)")
+        print(f"   - {ARCHIVO_MD} (formato Markdown)")
         
     except KeyboardInterrupt:
-        print("\n\n⏹️ Debate interrumpido por el usuario.")
+        print("\n\n⏹️ Debate interrumpido por el usuario. Continúa con --reanudar.")
     except Exception as e:
         print(f"\n❌ Error durante el debate: {str(e)}")
+    finally:
+        escritor.cerrar()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Experimentos por Lotes con Debates entre Modelos
+Compara modelos en el formato de debate sin editar GPT_MODEL, CLAUDE_MODEL
+o el tema a mano: se define una rejilla y se ejecuta de una vez.
+
+Este módulo:
+1. Expande una rejilla (temas × emparejamientos de modelos × turnos × repeticiones)
+2. Ejecuta varios debates a la vez con el orquestador; los límites de cada
+   proveedor (comun/limites_proveedor.py) reparten las llamadas entre ellos
+3. Guarda la transcripción, los tokens, la latencia y el costo de cada
+   debate en una base SQLite local
+4. Muestra una tabla comparativa por emparejamiento y número de turnos
+
+Uso:
+    python experimentos_debate.py --rejilla rejilla.json --max-debates 6
+    python experimentos_debate.py --rejilla rejilla.json --reanudar   # Omite los ya terminados
+    python experimentos_debate.py --tabla
+
+Formato de rejilla.json:
+    {"temas": ["..."], "turnos": [2, 4], "repeticiones": 1, "politica": "rotacion",
+     "emparejamientos": [{"nombre": "gpt-vs-claude",
+                          "modelos": [["openai", "gpt-4o-mini"],
+                                      ["anthropic", "claude-3-haiku-20240307"]]}],
+     "puestos": [{"nombre": "Tecnóloga", "persona": "...", "emoji": "🚀"}, ...]}
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import argparse
+import hashlib              # Identificador estable de cada experimento
+import itertools            # Para expandir la rejilla
+import json                 # Rejilla y transcripciones
+import os                   # Para variables de entorno
+import sqlite3              # Base de resultados
+import sys
+import threading            # Para compartir la base entre hilos
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+# Hacer importable el paquete compartido `comun` de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comun.contabilidad_tokens import obtener_contador
+from orquestador_debate import CLAVES_API, POLITICAS, Agente, OrquestadorDebate
+from transcripcion_debate import EscritorTranscripcion
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+MAX_DEBATES = 4                                   # Debates simultáneos
+ARCHIVO_RESULTADOS = "resultados_experimentos.sqlite"
+DIRECTORIO_TRANSCRIPCIONES = "transcripciones_experimentos"
+
+# Puestos del debate: a cada uno se le asigna un modelo del emparejamiento
+PUESTOS_POR_DEFECTO = [
+    {"nombre": "Tecnóloga", "emoji": "🚀",
+     "persona": "Eres una experta en tecnología educativa, pragmática y orientada a "
+                "soluciones de bajo costo. Respondes en 2-3 párrafos breves."},
+    {"nombre": "Analista", "emoji": "🎓",
+     "persona": "Eres un analista de políticas públicas que cuida la equidad y la "
+                "viabilidad de cada propuesta. Respondes en 2-3 párrafos breves."},
+    {"nombre": "Empresaria", "emoji": "💼",
+     "persona": "Eres una empresaria que contrata egresados y conoce las habilidades "
+                "que faltan. Respondes en 2-3 párrafos breves."},
+]
+
+REJILLA_POR_DEFECTO = {
+    "temas": [
+        "¿Cómo puede la inteligencia artificial reducir el costo de la educación universitaria en México?",
+        "¿Qué habilidades deberían enseñar las universidades para el mercado laboral de 2030?",
+    ],
+    "emparejamientos": [
+        {"nombre": "gpt-vs-claude",
+         "modelos": [["openai", "gpt-4o-mini"], ["anthropic", "claude-3-haiku-20240307"]]},
+        {"nombre": "gpt-vs-gemini",
+         "modelos": [["openai", "gpt-4o-mini"], ["gemini", "gemini-flash-latest"]]},
+        {"nombre": "claude-vs-gemini",
+         "modelos": [["anthropic", "claude-3-haiku-20240307"], ["gemini", "gemini-flash-latest"]]},
+    ],
+    "turnos": [3],
+    "repeticiones": 1,
+    "politica": "rotacion",
+}
+
+# ============================================================================
+# REJILLA DE EXPERIMENTOS
+# ============================================================================
+
+@dataclass(frozen=True)
+class Experimento:
+    """Un debate de la rejilla."""
+    tema: str
+    emparejamiento: str
+    modelos: Tuple[Tuple[str, str], ...]     # (proveedor, modelo) por puesto
+    turnos: int
+    repeticion: int = 1
+    politica: str = "rotacion"
+
+    @property
+    def id(self) -> str:
+        """Identificador estable: el mismo experimento tiene el mismo id en cada ejecución."""
+        clave = json.dumps([self.tema, self.modelos, self.turnos, self.repeticion, self.politica])
+        return hashlib.sha1(clave.encode('utf-8')).hexdigest()[:12]
+
+    def agentes(self, puestos: Sequence[Dict]) -> List[Agente]:
+        """Un agente por modelo, con la persona del puesto que ocupa."""
+        if len(self.modelos) > len(puestos):
+            raise ValueError(f"'{self.emparejamiento}' tiene {len(self.modelos)} modelos "
+                             f"y solo hay {len(puestos)} puestos")
+        return [Agente(puesto["nombre"], proveedor, modelo, puesto["persona"], puesto.get("emoji", "🤖"))
+                for (proveedor, modelo), puesto in zip(self.modelos, puestos)]
+
+
+def expandir_rejilla(rejilla: Dict) -> List[Experimento]:
+    """
+    Todas las combinaciones de la rejilla.
+
+    Args:
+        rejilla (dict): temas, emparejamientos, turnos, repeticiones y política
+
+    Returns:
+        list: Experimentos en orden (tema, emparejamiento, turnos, repetición)
+    """
+    politica = rejilla.get("politica", "rotacion")
+    if politica not in POLITICAS:
+        raise ValueError(f"Política '{politica}' no válida. Opciones: {POLITICAS}")
+    return [
+        Experimento(tema, emparejamiento["nombre"],
+                    tuple(tuple(modelo) for modelo in emparejamiento["modelos"]),
+                    turnos, repeticion, politica)
+        for tema, emparejamiento, turnos, repeticion in itertools.product(
+            rejilla["temas"], rejilla["emparejamientos"], rejilla["turnos"],
+            range(1, rejilla.get("repeticiones", 1) + 1))
+    ]
+
+# ============================================================================
+# BASE DE RESULTADOS
+# ============================================================================
+
+class ResultadosExperimentos:
+    """
+    Base SQLite con una fila por debate ejecutado.
+
+    Se comparte entre los hilos de los debates: cada escritura toma un lock y
+    se confirma de inmediato, así un lote interrumpido conserva lo terminado.
+    """
+
+    COLUMNAS = ("id", "lote", "tema", "emparejamiento", "modelos", "turnos", "repeticion",
+                "politica", "estado", "inicio", "duracion", "intervenciones", "transcripcion",
+                "llamadas", "fallidas", "tokens_prompt", "tokens_generados", "costo_usd",
+                "latencia_media", "primer_token_medio", "por_modelo", "error")
+
+    def __init__(self, ruta: str = ARCHIVO_RESULTADOS):
+        """
+        Args:
+            ruta (str): Archivo SQLite de resultados
+        """
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        with self._lock, self._conexion:
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute("""
+                CREATE TABLE IF NOT EXISTS experimentos (
+                    id TEXT PRIMARY KEY,
+                    lote TEXT NOT NULL,
+                    tema TEXT NOT NULL,
+                    emparejamiento TEXT NOT NULL,
+                    modelos TEXT NOT NULL,
+                    turnos INTEGER NOT NULL,
+                    repeticion INTEGER NOT NULL,
+                    politica TEXT NOT NULL,
+                    estado TEXT NOT NULL,
+                    inicio REAL NOT NULL,
+                    duracion REAL NOT NULL,
+                    intervenciones INTEGER NOT NULL,
+                    transcripcion TEXT,
+                    llamadas INTEGER,
+                    fallidas INTEGER,
+                    tokens_prompt INTEGER,
+                    tokens_generados INTEGER,
+                    costo_usd REAL,
+                    latencia_media REAL,
+                    primer_token_medio REAL,
+                    por_modelo TEXT,
+                    error TEXT
+                )
+            """)
+
+    def guardar(self, resultado: Dict):
+        """Escribe (o reemplaza) el resultado de un debate."""
+        fila = tuple(resultado.get(columna) for columna in self.COLUMNAS)
+        with self._lock, self._conexion:
+            self._conexion.execute(
+                f"INSERT OR REPLACE INTO experimentos ({', '.join(self.COLUMNAS)}) "
+                f"VALUES ({', '.join('?' * len(self.COLUMNAS))})", fila)
+
+    def completados(self) -> Set[str]:
+        """Ids de los debates que terminaron sin errores."""
+        with self._lock:
+            return {fila[0] for fila in self._conexion.execute(
+                "SELECT id FROM experimentos WHERE estado = 'ok'")}
+
+    def comparar(self, lote: Optional[str] = None) -> List[Dict]:
+        """
+        Promedios por emparejamiento y número de turnos.
+
+        Args:
+            lote (str): Solo los debates de ese lote (None = todos)
+
+        Returns:
+            list: Un diccionario por grupo, del más barato al más caro por debate
+        """
+        filtro, parametros = ("WHERE lote = ?", (lote,)) if lote else ("", ())
+        consulta = f"""
+            SELECT emparejamiento, turnos, COUNT(*), SUM(estado = 'ok'),
+                   AVG(duracion), AVG(tokens_prompt), AVG(tokens_generados),
+                   AVG(costo_usd), SUM(costo_usd), AVG(latencia_media), AVG(primer_token_medio)
+            FROM experimentos {filtro}
+            GROUP BY emparejamiento, turnos ORDER BY AVG(costo_usd), AVG(duracion)
+        """
+        with self._lock:
+            filas = self._conexion.execute(consulta, parametros).fetchall()
+        columnas = ("emparejamiento", "turnos", "debates", "ok", "duracion_media",
+                    "tokens_prompt_medio", "tokens_generados_medio", "costo_medio",
+                    "costo_total", "latencia_media", "primer_token_medio")
+        return [dict(zip(columnas, fila)) for fila in filas]
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+# ============================================================================
+# EJECUCIÓN DE LOS DEBATES
+# ============================================================================
+
+def ejecutar_experimento(experimento: Experimento, puestos: Sequence[Dict],
+                         directorio: Path, lote: str) -> Dict:
+    """
+    Ejecuta un debate sin salida por terminal y mide su uso.
+
+    Args:
+        experimento (Experimento): Debate a ejecutar
+        puestos (list): Personas de los puestos del debate
+        directorio (Path): Carpeta de las transcripciones (<id>.txt y <id>.jsonl)
+        lote (str): Identificador de esta ejecución del lote
+
+    Returns:
+        dict: Fila para ResultadosExperimentos
+    """
+    # La sesión incluye el lote para no mezclar llamadas de ejecuciones anteriores
+    sesion = f"{lote}:{experimento.id}"
+    escritor = EscritorTranscripcion(directorio / f"{experimento.id}.txt", mostrar=False)
+    orquestador = None
+    error = None
+    inicio = time.time()
+    t0 = time.perf_counter()
+    try:
+        orquestador = OrquestadorDebate(experimento.agentes(puestos), experimento.tema,
+                                        escritor=escritor, sesion=sesion)
+        orquestador.ejecutar(experimento.turnos, experimento.politica)
+    except Exception as e:
+        error = str(e)
+    finally:
+        escritor.cerrar()
+    duracion = time.perf_counter() - t0
+
+    por_modelo = obtener_contador().resumen(por="modelo", sesion=sesion)
+
+    def total(campo):
+        return sum(fila[campo] or 0 for fila in por_modelo)
+
+    def promedio(campo):
+        # Ponderado por el número de llamadas de cada modelo
+        filas = [fila for fila in por_modelo if fila[campo] is not None]
+        llamadas = sum(fila["llamadas"] for fila in filas)
+        return sum(fila[campo] * fila["llamadas"] for fila in filas) / llamadas if llamadas else None
+
+    fallidas = total("fallidas")
+    intervenciones = orquestador.historial.intervenciones if orquestador else []
+    # Un debate con fallos es el que perdió intervenciones (también las saltadas
+    # con el cortacircuitos abierto, que no llegan a llamar); las coberturas
+    # canceladas no cuentan
+    saltadas = orquestador.saltadas if orquestador else 0
+    return {
+        "id": experimento.id,
+        "lote": lote,
+        "tema": experimento.tema,
+        "emparejamiento": experimento.emparejamiento,
+        "modelos": json.dumps(experimento.modelos),
+        "turnos": experimento.turnos,
+        "repeticion": experimento.repeticion,
+        "politica": experimento.politica,
+        "estado": "error" if error else ("con_fallos" if saltadas else "ok"),
+        "inicio": inicio,
+        "duracion": duracion,
+        "intervenciones": len(intervenciones),
+        "transcripcion": json.dumps(intervenciones, ensure_ascii=False),
+        "llamadas": total("llamadas"),
+        "fallidas": fallidas,
+        "tokens_prompt": total("tokens_prompt"),
+        "tokens_generados": total("tokens_generados"),
+        "costo_usd": total("costo_usd"),
+        "latencia_media": promedio("latencia_media"),
+        "primer_token_medio": promedio("primer_token_medio"),
+        "por_modelo": json.dumps(por_modelo, ensure_ascii=False),
+        "error": error,
+    }
+
+
+def ejecutar_lote(experimentos: Sequence[Experimento], resultados: ResultadosExperimentos,
+                  puestos: Sequence[Dict] = PUESTOS_POR_DEFECTO, max_debates: int = MAX_DEBATES,
+                  directorio: str = DIRECTORIO_TRANSCRIPCIONES, lote: Optional[str] = None) -> str:
+    """
+    Ejecuta varios debates a la vez y guarda cada resultado en cuanto termina.
+
+    El número de debates simultáneos lo fija max_debates; las llamadas de
+    todos ellos pasan por el limitador de su proveedor, así un proveedor con
+    límites bajos no recibe más peticiones de las que admite.
+
+    Returns:
+        str: Identificador del lote (para ResultadosExperimentos.comparar)
+    """
+    lote = lote or time.strftime("%Y%m%d-%H%M%S")
+    carpeta = Path(directorio)
+    carpeta.mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=max_debates, thread_name_prefix="debate") as executor:
+        futuros = {executor.submit(ejecutar_experimento, exp, puestos, carpeta, lote): exp
+                   for exp in experimentos}
+        for n, futuro in enumerate(as_completed(futuros), 1):
+            exp = futuros[futuro]
+            resultado = futuro.result()
+            resultados.guardar(resultado)
+            icono = {"ok": "✅", "con_fallos": "⚠️"}.get(resultado["estado"], "❌")
+            print(f"{icono} [{n}/{len(futuros)}] {exp.emparejamiento} · {exp.turnos} turnos · "
+                  f"{resultado['duracion']:.1f}s · ${resultado['costo_usd']:.4f} · {exp.tema[:50]}"
+                  + (f" ({resultado['error']})" if resultado["error"] else ""))
+    return lote
+
+# ============================================================================
+# TABLA COMPARATIVA
+# ============================================================================
+
+def formatear_tabla(filas: Sequence[Dict]) -> str:
+    """Tabla de texto con la comparación por emparejamiento."""
+    if not filas:
+        return "(sin resultados)"
+
+    def numero(valor, formato):
+        return "-" if valor is None else format(valor, formato)
+
+    encabezado = ("Emparejamiento", "Turnos", "OK", "Duración s", "Tok. prompt",
+                  "Tok. gen.", "USD/debate", "USD total", "Latencia s", "1er token s")
+    renglones = [encabezado] + [
+        (f["emparejamiento"], str(f["turnos"]), f"{f['ok']}/{f['debates']}",
+         numero(f["duracion_media"], ".1f"), numero(f["tokens_prompt_medio"], ".0f"),
+         numero(f["tokens_generados_medio"], ".0f"), numero(f["costo_medio"], ".5f"),
+         numero(f["costo_total"], ".4f"), numero(f["latencia_media"], ".2f"),
+         numero(f["primer_token_medio"], ".2f"))
+        for f in filas
+    ]
+    anchos = [max(len(renglon[i]) for renglon in renglones) for i in range(len(encabezado))]
+    lineas = ["  ".join(celda.ljust(ancho) for celda, ancho in zip(renglon, anchos)) for renglon in renglones]
+    lineas.insert(1, "  ".join("-" * ancho for ancho in anchos))
+    return "\n".join(lineas)
+
+# ============================================================================
+# FUNCIÓN PRINCIPAL
+# ============================================================================
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Debates por lotes para comparar modelos")
+    parser.add_argument("--rejilla", help="Archivo JSON con temas, emparejamientos y turnos")
+    parser.add_argument("--max-debates", type=int, default=MAX_DEBATES, help="Debates simultáneos")
+    parser.add_argument("--resultados", default=ARCHIVO_RESULTADOS, help="Base SQLite de resultados")
+    parser.add_argument("--directorio", default=DIRECTORIO_TRANSCRIPCIONES, help="Carpeta de transcripciones")
+    parser.add_argument("--reanudar", action="store_true", help="Omitir los debates ya terminados sin errores")
+    parser.add_argument("--tabla", action="store_true", help="Solo mostrar la comparación guardada")
+    args = parser.parse_args()
+
+    resultados = ResultadosExperimentos(args.resultados)
+    try:
+        if args.tabla:
+            print(formatear_tabla(resultados.comparar()))
+            return
+
+        rejilla = REJILLA_POR_DEFECTO
+        if args.rejilla:
+            with open(args.rejilla, encoding='utf-8') as archivo:
+                rejilla = json.load(archivo)
+        experimentos = expandir_rejilla(rejilla)
+        puestos = rejilla.get("puestos", PUESTOS_POR_DEFECTO)
+
+        # Verificar solo las claves de los proveedores que usa la rejilla
+        proveedores = {proveedor for exp in experimentos for proveedor, _ in exp.modelos}
+        faltantes = [CLAVES_API[p] for p in sorted(proveedores) if p in CLAVES_API and not os.getenv(CLAVES_API[p])]
+        if faltantes:
+            print("❌ Error: Faltan API keys. Asegúrate de tener configuradas:")
+            for clave in faltantes:
+                print(f"   - {clave}")
+            return
+
+        if args.reanudar:
+            hechos = resultados.completados()
+            experimentos = [exp for exp in experimentos if exp.id not in hechos]
+        print(f"🧪 {len(experimentos)} debates, hasta {args.max_debates} a la vez...\n")
+
+        lote = ejecutar_lote(experimentos, resultados, puestos, args.max_debates, args.directorio)
+        print(f"\n📊 Comparación del lote {lote}:\n")
+        print(formatear_tabla(resultados.comparar(lote)))
+        print(f"\n💾 Resultados en {args.resultados}; transcripciones en {args.directorio}/")
+
+    except KeyboardInterrupt:
+        print("\n\n⏹️ Lote interrumpido. Continúa con --reanudar.")
+    finally:
+        resultados.cerrar()
+
+if __name__ == "__main__":
+    main()
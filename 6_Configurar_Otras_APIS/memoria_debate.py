@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Memoria de Debate para Conversaciones entre Modelos
+Evita que cada turno de un debate largo reenvíe todo lo dicho hasta entonces.
+
+Este módulo:
+1. Guarda literalmente los últimos K intercambios del debate
+2. Resume en segundo plano cada intercambio que sale de la ventana,
+   actualizando un resumen acumulado (nunca se vuelve a resumir todo)
+3. Construye la vista de cada participante: sus intervenciones como
+   "assistant" y las de los demás como "user"
+4. Ofrece el resumen + los últimos intercambios para las etapas finales
+   (resumen ejecutivo, conversión a Markdown)
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import threading            # Para proteger el estado compartido con el hilo de resumen
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+VENTANA_INTERCAMBIOS = 3      # Intercambios recientes que se envían literalmente
+
+PROMPT_RESUMEN = """Eres un relator que lleva el acta de un debate entre expertos.
+Actualiza el resumen existente incorporando el nuevo intercambio. Conserva:
+- Las propuestas concretas de cada experto y quién las hizo
+- Los acuerdos y desacuerdos
+- Las cifras, ejemplos y recursos mencionados
+Responde solo con el resumen actualizado, en viñetas breves."""
+
+Mensaje = Dict[str, str]
+Intercambio = Dict[str, str]   # Participante -> intervención, en orden de palabra
+
+# ============================================================================
+# FUNCIONES AUXILIARES
+# ============================================================================
+
+def formatear_intercambios(intercambios: Sequence[Intercambio]) -> str:
+    """Texto plano de una serie de intercambios ("Participante: texto")."""
+    return "\n\n".join(f"{nombre}: {texto}"
+                       for intercambio in intercambios for nombre, texto in intercambio.items())
+
+
+def construir_mensajes_resumen(resumen_previo: str, intercambios: Sequence[Intercambio]) -> List[Mensaje]:
+    """
+    Construye la petición al modelo para actualizar el resumen del debate.
+
+    Args:
+        resumen_previo (str): Resumen acumulado hasta ahora (puede estar vacío)
+        intercambios (list): Intercambios que se van a incorporar al resumen
+
+    Returns:
+        list: Mensajes en formato chat listos para enviar al modelo
+    """
+    return [
+        {"role": "system", "content": PROMPT_RESUMEN},
+        {"role": "user", "content": f"RESUMEN ACTUAL:\n{resumen_previo or '(vacío)'}\n\n"
+                                    f"NUEVO INTERCAMBIO:\n{formatear_intercambios(intercambios)}"}
+    ]
+
+# ============================================================================
+# CLASE DE MEMORIA
+# ============================================================================
+
+class MemoriaDebate:
+    """
+    Ventana de intercambios recientes más resumen acumulado del debate.
+
+    El resumen se actualiza en un hilo aparte mientras el debate continúa;
+    los intercambios que se están resumiendo se siguen enviando literalmente,
+    de modo que nunca se pierde contexto.
+    """
+
+    def __init__(self, participantes: Sequence[str], resumir: Callable[[List[Mensaje]], str],
+                 ventana: int = VENTANA_INTERCAMBIOS):
+        """
+        Args:
+            participantes (list): Participantes en orden de palabra
+            resumir (callable): Recibe los mensajes de construir_mensajes_resumen()
+                y devuelve el resumen actualizado
+            ventana (int): Intercambios recientes que se conservan literales
+        """
+        self.participantes = list(participantes)
+        self.resumir = resumir
+        self.ventana = ventana
+        self.resumen = ""
+        self._recientes: Deque[Intercambio] = deque()
+        self._en_resumen: List[Intercambio] = []
+        self._actual: Intercambio = {}
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resumen-debate")
+        self._tarea: Optional[Future] = None
+        self._sin_resumen = threading.Event()   # Activo cuando no hay resumen en curso
+        self._sin_resumen.set()
+
+    def agregar(self, participante: str, texto: str):
+        """Registra una intervención; al completarse el intercambio, desliza la ventana."""
+        with self._lock:
+            if participante in self._actual:
+                # Otro participante no habló (p. ej. su llamada falló): el
+                # intercambio se cierra incompleto en lugar de sobrescribirlo
+                self._cerrar_intercambio()
+            self._actual[participante] = texto
+            if len(self._actual) == len(self.participantes):
+                self._cerrar_intercambio()
+
+    def _cerrar_intercambio(self):
+        """Pasa el intercambio en curso a la ventana y la desliza (con el lock tomado)."""
+        self._recientes.append(self._actual)
+        self._actual = {}
+        if len(self._recientes) > self.ventana and self._tarea is None:
+            self._iniciar_resumen()
+
+    def mensajes(self, participante: str, prefijos: Dict[str, str]) -> List[Mensaje]:
+        """
+        Intercambios literales vistos desde un participante.
+
+        Args:
+            participante (str): Quién va a hablar (sus intervenciones son "assistant")
+            prefijos (dict): Texto que antecede a las intervenciones de cada
+                uno de los demás participantes
+
+        Returns:
+            list: Mensajes en orden cronológico (sin sistema ni contexto)
+        """
+        with self._lock:
+            intercambios = [*self._en_resumen, *self._recientes, self._actual]
+            mensajes = []
+            for intercambio in intercambios:
+                for nombre, texto in intercambio.items():
+                    if nombre == participante:
+                        mensajes.append({"role": "assistant", "content": texto})
+                    else:
+                        mensajes.append({"role": "user", "content": f"{prefijos[nombre]}{texto}"})
+            return mensajes
+
+    def contexto_final(self, timeout: Optional[float] = None) -> str:
+        """
+        Resumen acumulado + intercambios literales, para las etapas finales.
+
+        Espera a que termine el resumen en curso para no perder intercambios.
+        """
+        self.esperar_resumen(timeout)
+        with self._lock:
+            recientes = [*self._en_resumen, *self._recientes] + ([self._actual] if self._actual else [])
+            partes = []
+            if self.resumen:
+                partes.append(f"RESUMEN DEL DEBATE:\n{self.resumen}")
+            if recientes:
+                partes.append(f"ÚLTIMOS INTERCAMBIOS:\n{formatear_intercambios(recientes)}")
+            return "\n\n".join(partes)
+
+    def esperar_resumen(self, timeout: Optional[float] = None):
+        """Espera a que terminen el resumen en curso y los que este encadene."""
+        self._sin_resumen.wait(timeout)
+
+    # ------------------------------------------------------------------
+    # Resumen en segundo plano
+    # ------------------------------------------------------------------
+
+    def _iniciar_resumen(self):
+        """Mueve los intercambios que salen de la ventana a resumen (con el lock tomado)."""
+        while len(self._recientes) > self.ventana:
+            self._en_resumen.append(self._recientes.popleft())
+        mensajes = construir_mensajes_resumen(self.resumen, self._en_resumen)
+        self._sin_resumen.clear()
+        # El callback puede ejecutarse en este mismo hilo si el resumen ya terminó,
+        # por eso se registra la tarea antes y el lock es reentrante
+        self._tarea = self._executor.submit(self.resumir, mensajes)
+        self._tarea.add_done_callback(self._resumen_terminado)
+
+    def _resumen_terminado(self, tarea: Future):
+        """Incorpora el resumen calculado o devuelve los intercambios si falló."""
+        with self._lock:
+            self._tarea = None
+            error = tarea.exception()
+            resumen = "" if error else (tarea.result() or "").strip()
+            if resumen:
+                self.resumen = resumen
+            else:
+                print(f"\n⚠️ No se pudo actualizar el resumen del debate: {error or 'respuesta vacía'}")
+                # Devolver los intercambios a la ventana; se reintenta al cerrar
+                # el próximo intercambio, no de inmediato
+                for intercambio in reversed(self._en_resumen):
+                    self._recientes.appendleft(intercambio)
+            self._en_resumen = []
+
+            # Si salieron más intercambios de la ventana mientras se resumía, continuar
+            if resumen and len(self._recientes) > self.ventana:
+                self._iniciar_resumen()
+            else:
+                self._sin_resumen.set()
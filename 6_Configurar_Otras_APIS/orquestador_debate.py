@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""
+Orquestador de Debates entre N Agentes
+Conversaciones entre cualquier número de modelos sin escribir un método
+call_* por participante.
+
+Este módulo:
+1. Describe cada agente con su proveedor, modelo y persona (Agente)
+2. Guarda el debate una sola vez y proyecta la vista de cada agente al
+   formato de su proveedor, de forma incremental y solo cuando va a hablar
+3. Ofrece tres políticas de turno: rotacion, moderador y paralelo
+4. Reutiliza los límites por proveedor, la contabilidad de tokens y la
+   transcripción en vivo (con --reanudar)
+5. Cada intervención tiene plazo, cobertura si tarda (al mismo modelo o al
+   de respaldo del agente) y cortacircuitos por proveedor; si un agente no
+   responde, su turno se salta y el error no entra en el historial
+6. Ajusta cada vista al presupuesto de tokens de entrada del modelo
+   (comun/presupuesto_contexto.py), condensando los turnos más antiguos
+
+Uso:
+    python orquestador_debate.py --turnos 2 --politica rotacion
+    python orquestador_debate.py --panel panel.json --politica moderador
+    python orquestador_debate.py --turnos 4 --reanudar
+
+Formato de panel.json:
+    {"tema": "...", "agentes": [{"nombre": "Ana", "proveedor": "openai",
+      "modelo": "gpt-4o-mini", "persona": "...", "emoji": "🚀",
+      "respaldo": ["anthropic", "claude-3-haiku-20240307"]}, ...]}
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import argparse
+import json                 # Paneles definidos en archivo
+import os                   # Para variables de entorno
+import queue                # Fragmentos de los agentes que hablan en paralelo
+import re                   # Para leer la elección del moderador
+import sys
+import threading            # Hilos de la política paralela
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+# Hacer importable el paquete compartido `comun` de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comun.contabilidad_tokens import registrar_llamada, uso_anthropic, uso_gemini, uso_openai
+from comun.limites_proveedor import obtener_limitador
+from comun.presupuesto_contexto import ajustar_contexto, estadisticas_recorte
+from comun.resiliencia import Candidato, Intento, transmitir_resiliente
+from transcripcion_debate import EscritorTranscripcion
+
+# Cargar variables de entorno
+load_dotenv()
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+POLITICAS = ("rotacion", "moderador", "paralelo")
+ARCHIVO_TRANSCRIPCION = "debate_panel.txt"
+
+# Variable de entorno con la clave de cada proveedor
+CLAVES_API = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "gemini": "GOOGLE_API_KEY",
+}
+
+PROMPT_MODERADOR = """Eres el moderador de un panel de expertos. Tu tarea es decidir
+quién debe intervenir en la siguiente ronda para que el debate avance: da la
+palabra a quien fue aludido, a quien lleva más tiempo sin hablar o a quien
+puede aportar una perspectiva que falta."""
+
+# Si la vista de un agente acaba en su propia intervención (ronda paralela,
+# turno saltado o el moderador le da la palabra dos veces seguidas), la
+# petición necesita un mensaje "user" al que responder
+CONTINUAR = "Continúa el debate con tu siguiente intervención."
+
+Mensaje = dict
+Intervencion = Tuple[str, str]   # (nombre del agente, texto)
+
+
+@dataclass
+class Agente:
+    """Participante del debate."""
+    nombre: str
+    proveedor: str          # openai, anthropic o gemini
+    modelo: str
+    persona: str            # Mensaje de sistema
+    emoji: str = "🤖"
+    max_tokens: int = 300
+    respaldo: Optional[Tuple[str, str]] = None   # (proveedor, modelo) para cobertura y failover
+
+
+TEMA_POR_DEFECTO = ("¿Cómo puede la inteligencia artificial ayudar a que la educación "
+                    "universitaria en México prepare mejor para el mercado laboral?")
+
+PANEL_POR_DEFECTO = [
+    Agente("Tecnóloga", "openai", "gpt-4o-mini",
+           "Eres una experta en tecnología educativa, pragmática y orientada a soluciones "
+           "de bajo costo. Respondes en 2-3 párrafos breves.", "🚀"),
+    Agente("Sociólogo", "anthropic", "claude-3-haiku-20240307",
+           "Eres un sociólogo que analiza la desigualdad y el acceso a la educación. "
+           "Respondes en 2-3 párrafos breves.", "🎓"),
+    Agente("Empresaria", "gemini", "gemini-flash-latest",
+           "Eres una empresaria que contrata egresados y conoce las habilidades que "
+           "faltan. Respondes en 2-3 párrafos breves.", "💼"),
+    Agente("Escéptico", "openai", "gpt-4o-mini",
+           "Eres un crítico que cuestiona con argumentos las propuestas de los demás "
+           "y señala sus riesgos. Respondes en 2-3 párrafos breves.", "🤨"),
+    Agente("Estudiante", "anthropic", "claude-3-haiku-20240307",
+           "Eres una estudiante universitaria de una región rural que aporta su "
+           "experiencia directa. Respondes en 2-3 párrafos breves.", "📚"),
+]
+
+MODERADOR_POR_DEFECTO = Agente("Moderador", "openai", "gpt-4o-mini", PROMPT_MODERADOR, "🎙️", 60)
+
+# ============================================================================
+# CLIENTES DE API
+# ============================================================================
+
+# Cada SDK se importa y se configura la primera vez que habla un agente de
+# ese proveedor, así un panel solo de OpenAI no carga los otros dos
+_clientes = {}
+
+def obtener_openai():
+    """Cliente de OpenAI, creado en el primer uso"""
+    if 'openai' not in _clientes:
+        from openai import OpenAI
+        _clientes['openai'] = OpenAI()
+    return _clientes['openai']
+
+def obtener_claude():
+    """Cliente de Anthropic, creado en el primer uso"""
+    if 'claude' not in _clientes:
+        import anthropic
+        _clientes['claude'] = anthropic.Anthropic()
+    return _clientes['claude']
+
+def obtener_gemini():
+    """Módulo de Gemini configurado con la clave de API en el primer uso"""
+    if 'gemini' not in _clientes:
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+        _clientes['gemini'] = genai
+    return _clientes['gemini']
+
+# ============================================================================
+# PROYECCIÓN DEL HISTORIAL POR FORMATO DE PROVEEDOR
+# ============================================================================
+# Cada función añade a la vista de un agente solo las intervenciones nuevas.
+# La vista empieza con el tema como primer mensaje del usuario, de modo que
+# siempre abre con "user" como exigen Anthropic y Gemini.
+
+def proyectar_openai(vista: List[Mensaje], agente: Agente, tema: str, nuevas: Sequence[Intervencion]):
+    """Formato chat de OpenAI: sistema en la lista y un mensaje por intervención."""
+    if not vista:
+        vista += [{"role": "system", "content": agente.persona},
+                  {"role": "user", "content": tema}]
+    for autor, texto in nuevas:
+        if autor == agente.nombre:
+            vista.append({"role": "assistant", "content": texto})
+        else:
+            vista.append({"role": "user", "content": f"{autor} dice: {texto}"})
+
+
+def proyectar_anthropic(vista: List[Mensaje], agente: Agente, tema: str, nuevas: Sequence[Intervencion]):
+    """Formato de Anthropic: sistema aparte y roles alternos (se unen las seguidas)."""
+    if not vista:
+        vista.append({"role": "user", "content": tema})
+    for autor, texto in nuevas:
+        rol, contenido = ("assistant", texto) if autor == agente.nombre else ("user", f"{autor} dice: {texto}")
+        if vista[-1]["role"] == rol:
+            vista[-1]["content"] += f"\n\n{contenido}"
+        else:
+            vista.append({"role": rol, "content": contenido})
+
+
+def proyectar_gemini(vista: List[Mensaje], agente: Agente, tema: str, nuevas: Sequence[Intervencion]):
+    """Formato de Gemini: roles user/model con partes (las seguidas se acumulan)."""
+    if not vista:
+        vista.append({"role": "user", "parts": [tema]})
+    for autor, texto in nuevas:
+        rol, contenido = ("model", texto) if autor == agente.nombre else ("user", f"{autor} dice: {texto}")
+        if vista[-1]["role"] == rol:
+            vista[-1]["parts"].append(contenido)
+        else:
+            vista.append({"role": rol, "parts": [contenido]})
+
+
+PROYECCIONES: Dict[str, Callable] = {
+    "openai": proyectar_openai,
+    "anthropic": proyectar_anthropic,
+    "gemini": proyectar_gemini,
+}
+
+# ============================================================================
+# STREAMING POR PROVEEDOR
+# ============================================================================
+
+def stream_openai(agente: Agente, mensajes: List[Mensaje], llamada, intento: Intento) -> Iterator[str]:
+    """Respuesta de un modelo de OpenAI, fragmento a fragmento"""
+    stream = obtener_openai().chat.completions.create(
+        model=agente.modelo,
+        messages=mensajes,
+        max_tokens=agente.max_tokens,
+        stream=True,
+        stream_options={"include_usage": True},
+        timeout=intento.timeout()
+    )
+    intento.al_cancelar(llamada.marcar_cancelada, stream.close)
+    for chunk in stream:
+        if chunk.usage:
+            llamada.registrar_uso(uso_openai(chunk.usage))
+        if chunk.choices and chunk.choices[0].delta.content:
+            llamada.marcar_primer_token()
+            yield chunk.choices[0].delta.content
+
+
+def stream_anthropic(agente: Agente, mensajes: List[Mensaje], llamada, intento: Intento) -> Iterator[str]:
+    """Respuesta de un modelo de Anthropic, fragmento a fragmento"""
+    with obtener_claude().messages.stream(
+        model=agente.modelo,
+        system=agente.persona,
+        messages=mensajes,
+        max_tokens=agente.max_tokens,
+        timeout=intento.timeout()
+    ) as stream:
+        intento.al_cancelar(llamada.marcar_cancelada, stream.close)
+        for text in stream.text_stream:
+            if text:
+                llamada.marcar_primer_token()
+                yield text
+        llamada.registrar_uso(uso_anthropic(stream.get_final_message().usage))
+
+
+_modelos_gemini = {}
+
+def stream_gemini(agente: Agente, mensajes: List[Mensaje], llamada, intento: Intento) -> Iterator[str]:
+    """Respuesta de un modelo de Gemini, fragmento a fragmento"""
+    # Un GenerativeModel por (modelo, persona): se crea una vez por agente
+    clave = (agente.modelo, agente.persona)
+    if clave not in _modelos_gemini:
+        _modelos_gemini[clave] = obtener_gemini().GenerativeModel(
+            model_name=agente.modelo,
+            system_instruction=agente.persona
+        )
+    response = _modelos_gemini[clave].generate_content(
+        mensajes,
+        generation_config={"max_output_tokens": agente.max_tokens},
+        stream=True,
+        request_options={"timeout": intento.timeout()}
+    )
+    # El SDK de Gemini no permite cerrar el stream desde otro hilo: lo acota el timeout
+    intento.al_cancelar(llamada.marcar_cancelada)
+    for chunk in response:
+        if chunk.text:
+            llamada.marcar_primer_token()
+            yield chunk.text
+    llamada.registrar_uso(uso_gemini(response.usage_metadata))
+
+
+STREAMS: Dict[str, Callable] = {
+    "openai": stream_openai,
+    "anthropic": stream_anthropic,
+    "gemini": stream_gemini,
+}
+
+
+def stream_agente(agente: Agente, mensajes: List[Mensaje], intento: Intento, funcion: str = "panel",
+                  sesion: Optional[str] = None) -> Iterator[str]:
+    """Respuesta de un agente, fragmento a fragmento (ya con turno en el limitador)"""
+    # El sistema (OpenAI) y el tema del inicio nunca se condensan
+    fijos = 2 if agente.proveedor == "openai" else 1
+    mensajes, _ = ajustar_contexto(mensajes, agente.modelo, agente.max_tokens, fijos=fijos, avisar=False)
+    with registrar_llamada(agente.proveedor, agente.modelo, funcion, sesion) as llamada:
+        yield from STREAMS[agente.proveedor](agente, mensajes, llamada, intento)
+
+
+def candidato_agente(agente: Agente, mensajes: Callable[[], List[Mensaje]], funcion: str = "panel",
+                     sesion: Optional[str] = None) -> Candidato:
+    """
+    Candidato para transmitir_resiliente que espera turno en el limitador del
+    proveedor; los mensajes se piden al obtenerlo (la vista puede haber cambiado).
+
+    Gemini no se cubre consigo mismo: su stream no se puede cerrar, y la
+    petición perdedora ocuparía un turno de su limitador hasta el timeout.
+    Solo se cubre con el respaldo del agente, si es de otro proveedor.
+    """
+    return Candidato(agente.proveedor, agente.modelo,
+                     lambda intento: stream_agente(agente, mensajes(), intento, funcion, sesion),
+                     turno=obtener_limitador(agente.proveedor).turno,
+                     repetible=agente.proveedor != "gemini")
+
+# ============================================================================
+# HISTORIAL DEL DEBATE
+# ============================================================================
+
+class HistorialDebate:
+    """
+    Intervenciones del debate más una vista en caché por agente.
+
+    Las vistas se ponen al día de forma perezosa: al pedir la de un agente
+    solo se proyectan las intervenciones que aún no ha visto. Con N agentes,
+    cada turno cuesta lo nuevo desde la última vez que habló, no todo el
+    historial ni una copia por cada uno de los demás.
+    """
+
+    def __init__(self, tema: str):
+        """
+        Args:
+            tema (str): Planteamiento inicial, primer mensaje de todas las vistas
+        """
+        self.tema = tema
+        self.intervenciones: List[Intervencion] = []
+        # (agente, proveedor) -> (vista, intervenciones ya proyectadas); el
+        # respaldo de un agente puede usar otro formato
+        self._vistas: Dict[Tuple[str, str], Tuple[List[Mensaje], int]] = {}
+        self._lock = threading.Lock()
+
+    def agregar(self, nombre: str, texto: str):
+        """Añade una intervención (las vistas la recogen cuando se piden)."""
+        with self._lock:
+            self.intervenciones.append((nombre, texto))
+
+    def vista(self, agente: Agente) -> List[Mensaje]:
+        """
+        Historial visto por un agente, en el formato de su proveedor.
+
+        La lista es la de la caché (no una copia): no debe modificarse.
+        """
+        with self._lock:
+            clave = (agente.nombre, agente.proveedor)
+            vista, vistas = self._vistas.get(clave, ([], 0))
+            PROYECCIONES[agente.proveedor](vista, agente, self.tema, self.intervenciones[vistas:])
+            self._vistas[clave] = (vista, len(self.intervenciones))
+            return vista
+
+    def peticion(self, agente: Agente) -> List[Mensaje]:
+        """
+        Vista del agente lista para pedirle una respuesta.
+
+        Si acaba en un mensaje propio se devuelve una copia con un mensaje
+        "user" para continuar: Anthropic tomaría el "assistant" final como
+        inicio de la respuesta y Gemini rechaza una petición que acaba en "model".
+        """
+        vista = self.vista(agente)
+        if vista[-1]["role"] not in ("assistant", "model"):
+            return vista
+        if agente.proveedor == "gemini":
+            return vista + [{"role": "user", "parts": [CONTINUAR]}]
+        return vista + [{"role": "user", "content": CONTINUAR}]
+
+# ============================================================================
+# ORQUESTADOR
+# ============================================================================
+
+class OrquestadorDebate:
+    """
+    Debate entre una lista de agentes con una política de turno.
+
+    - rotacion: cada agente habla en orden y oye lo dicho hasta ese momento
+    - moderador: un agente moderador elige quién habla en cada ronda
+    - paralelo: todos responden a la vez al historial del inicio de la ronda
+    """
+
+    def __init__(self, agentes: Sequence[Agente], tema: str = TEMA_POR_DEFECTO,
+                 moderador: Optional[Agente] = None, escritor: Optional[EscritorTranscripcion] = None,
+                 sesion: Optional[str] = None):
+        """
+        Args:
+            agentes (list): Participantes en orden de palabra (nombres únicos)
+            tema (str): Planteamiento inicial del debate
+            moderador (Agente): Moderador para la política "moderador"
+            escritor (EscritorTranscripcion): Transcripción en vivo; si trae
+                intervenciones de una ejecución anterior, se recuperan
+            sesion (str): Etiqueta de las llamadas en la contabilidad de tokens
+        """
+        self.agentes = {agente.nombre: agente for agente in agentes}
+        if len(self.agentes) != len(agentes):
+            raise ValueError("Los nombres de los agentes deben ser únicos")
+        for agente in agentes:
+            for proveedor in [agente.proveedor] + ([agente.respaldo[0]] if agente.respaldo else []):
+                if proveedor not in PROYECCIONES:
+                    raise ValueError(f"Proveedor '{proveedor}' no soportado. Opciones: {list(PROYECCIONES)}")
+        self.moderador = moderador or MODERADOR_POR_DEFECTO
+        self.historial = HistorialDebate(tema)
+        self.escritor = escritor
+        self.sesion = sesion
+        self.saltadas = 0   # Intervenciones saltadas porque el agente no respondió
+
+        # Reanudar: reconstruir el historial con las intervenciones del diario
+        for intervencion in (escritor.intervenciones if escritor else []):
+            self.historial.agregar(intervencion["participante"], intervencion["texto"])
+
+    def _escribir(self, texto: str):
+        """Muestra texto y lo añade a la transcripción (si hay)"""
+        if self.escritor:
+            self.escritor.escribir(texto)
+        else:
+            print(texto, end='', flush=True)
+
+    def _avisar(self, texto: str):
+        """Mensaje de progreso solo para la terminal (se omite si el escritor no muestra)"""
+        if self.escritor is None or self.escritor.mostrar:
+            print(texto)
+
+    def _transmitir(self, agente: Agente, fragmentos: Iterator[str]) -> str:
+        """Muestra y escribe una respuesta fragmento a fragmento; devuelve el texto completo"""
+        encabezado = f"{agente.emoji} {agente.nombre}:"
+        if self.escritor:
+            return self.escritor.transmitir(encabezado, fragmentos)
+        print(encabezado)
+        partes = []
+        try:
+            for texto in fragmentos:
+                partes.append(texto)
+                print(texto, end='', flush=True)
+        finally:
+            print("\n")
+        return "".join(partes)
+
+    def _candidatos(self, agente: Agente) -> List[Candidato]:
+        """El agente y, si lo tiene, su modelo de respaldo (cada uno con su vista)"""
+        opciones = [agente]
+        if agente.respaldo:
+            opciones.append(replace(agente, proveedor=agente.respaldo[0], modelo=agente.respaldo[1]))
+        return [candidato_agente(opcion, lambda opcion=opcion: self.historial.peticion(opcion),
+                                 sesion=self.sesion)
+                for opcion in opciones]
+
+    def _aviso_fallo(self, agente: Agente, error: Exception) -> str:
+        """Texto para la transcripción cuando un agente no responde (no va al historial)"""
+        return f"⚠️ {agente.nombre} no respondió ({error}); se salta su intervención\n\n"
+
+    def _agregar(self, agente: Agente, texto: str, turno: int):
+        """Añade una intervención al historial y al diario"""
+        self.historial.agregar(agente.nombre, texto)
+        if self.escritor:
+            self.escritor.registrar(agente.nombre, texto, turno)
+
+    # ------------------------------------------------------------------
+    # Políticas de turno
+    # ------------------------------------------------------------------
+
+    def ronda_secuencial(self, turno: int, agentes: Sequence[Agente]):
+        """Cada agente responde, en orden, a todo lo dicho hasta ese momento"""
+        for agente in agentes:
+            try:
+                respuesta = self._transmitir(agente, transmitir_resiliente(self._candidatos(agente)))
+            except Exception as e:
+                self._escribir(self._aviso_fallo(agente, e))
+                self.saltadas += 1
+                continue
+            self._agregar(agente, respuesta, turno)
+
+    def ronda_paralela(self, turno: int, agentes: Sequence[Agente]):
+        """
+        Todos los agentes responden a la vez al historial del inicio de la ronda.
+
+        Las respuestas se muestran en orden: la primera en vivo y las demás en
+        cuanto le toca. El historial no cambia hasta que terminan todas.
+        """
+        colas = {agente.nombre: queue.Queue() for agente in agentes}
+        respuestas = {}   # Solo las respuestas completas
+        fin = object()
+
+        def responder(agente):
+            partes = []
+            try:
+                for texto in transmitir_resiliente(self._candidatos(agente)):
+                    partes.append(texto)
+                    colas[agente.nombre].put(texto)
+                respuestas[agente.nombre] = "".join(partes)
+            except Exception as e:
+                colas[agente.nombre].put("\n" + self._aviso_fallo(agente, e).rstrip())
+            finally:
+                colas[agente.nombre].put(fin)
+
+        hilos = [threading.Thread(target=responder, args=(agente,), daemon=True) for agente in agentes]
+        for hilo in hilos:
+            hilo.start()
+        for agente in agentes:
+            self._transmitir(agente, iter(colas[agente.nombre].get, fin))
+        for hilo in hilos:
+            hilo.join()
+
+        self.saltadas += len(agentes) - len(respuestas)
+        for agente in agentes:
+            if agente.nombre in respuestas:
+                self._agregar(agente, respuestas[agente.nombre], turno)
+
+    def elegir_oradores(self) -> List[Agente]:
+        """
+        Pregunta al moderador quién interviene en la siguiente ronda.
+
+        Returns:
+            list: Agentes en el orden elegido (todos, si la respuesta no nombra a nadie)
+        """
+        nombres = ", ".join(self.agentes)
+        instruccion = (f"Participantes: {nombres}.\n¿Quiénes deben intervenir en la siguiente "
+                       "ronda y en qué orden? Responde solo con sus nombres separados por comas.")
+        # La vista en caché no se modifica: la instrucción va en una lista aparte
+        mensajes = self.historial.vista(self.moderador)
+        mensajes = mensajes + ([{"role": "user", "parts": [instruccion]}] if self.moderador.proveedor == "gemini"
+                               else [{"role": "user", "content": instruccion}])
+        if self.moderador.proveedor != "openai" and mensajes[-2]["role"] == "user":
+            # Anthropic y Gemini no admiten dos mensajes "user" seguidos sin unir
+            ultimo = dict(mensajes[-2])
+            if "parts" in ultimo:
+                ultimo["parts"] = ultimo["parts"] + [instruccion]
+            else:
+                ultimo["content"] = f"{ultimo['content']}\n\n{instruccion}"
+            mensajes = mensajes[:-2] + [ultimo]
+        try:
+            respuesta = "".join(transmitir_resiliente([
+                candidato_agente(self.moderador, lambda: mensajes, "moderador", self.sesion)]))
+        except Exception as e:
+            self._avisar(f"⚠️ El moderador no respondió ({e}); hablan todos en orden")
+            return list(self.agentes.values())
+
+        # Nombres en el orden en que aparecen en la respuesta, sin repetir
+        patron = "|".join(re.escape(nombre) for nombre in sorted(self.agentes, key=len, reverse=True))
+        elegidos = dict.fromkeys(re.findall(patron, respuesta, flags=re.IGNORECASE))
+        por_minusculas = {nombre.lower(): agente for nombre, agente in self.agentes.items()}
+        oradores = [por_minusculas[nombre.lower()] for nombre in elegidos]
+        return oradores or list(self.agentes.values())
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    def ejecutar(self, num_turnos: int = 2, politica: str = "rotacion"):
+        """
+        Ejecuta el debate
+
+        Si el escritor trae intervenciones de una ejecución anterior, se
+        continúa desde el último turno registrado hasta completar num_turnos.
+
+        Args:
+            num_turnos (int): Rondas totales del debate
+            politica (str): rotacion, moderador o paralelo
+        """
+        if politica not in POLITICAS:
+            raise ValueError(f"Política '{politica}' no válida. Opciones: {POLITICAS}")
+
+        previas = self.escritor.intervenciones if self.escritor else []
+        ultimo_turno = previas[-1]["turno"] if previas else 0
+
+        if not previas:
+            self._escribir(f"=== PANEL DE {len(self.agentes)} AGENTES ===\n\n")
+            for agente in self.agentes.values():
+                self._escribir(f"{agente.emoji} {agente.nombre} ({agente.proveedor}: {agente.modelo})\n")
+            self._escribir(f"\n📋 TEMA: {self.historial.tema}\n\n" + "="*60 + "\n\n")
+        else:
+            self._avisar(f"↩️ Reanudando tras {len(previas)} intervenciones (turno {ultimo_turno})\n")
+            # En rotación se completa el último turno si quedó a medias
+            if politica == "rotacion":
+                hablaron = {i["participante"] for i in previas if i["turno"] == ultimo_turno}
+                pendientes = [a for nombre, a in self.agentes.items() if nombre not in hablaron]
+                if pendientes:
+                    self._escribir(f"--- TURNO {ultimo_turno} (continuación) ---\n\n")
+                    self.ronda_secuencial(ultimo_turno, pendientes)
+                    self._escribir("-" * 60 + "\n\n")
+
+        agentes = list(self.agentes.values())
+        for turno in range(ultimo_turno + 1, num_turnos + 1):
+            self._escribir(f"--- TURNO {turno} ---\n\n")
+            inicio = time.perf_counter()
+            ahorrados = estadisticas_recorte()["tokens_ahorrados"]
+
+            if politica == "paralelo":
+                self.ronda_paralela(turno, agentes)
+            elif politica == "moderador":
+                oradores = self.elegir_oradores()
+                self._avisar(f"{self.moderador.emoji} El moderador da la palabra a: "
+                             f"{', '.join(a.nombre for a in oradores)}\n")
+                self.ronda_secuencial(turno, oradores)
+            else:
+                self.ronda_secuencial(turno, agentes)
+
+            self._avisar(f"⏱️ Turno completado en {time.perf_counter() - inicio:.1f}s")
+            ahorrados = estadisticas_recorte()["tokens_ahorrados"] - ahorrados
+            if ahorrados:
+                self._avisar(f"✂️ {ahorrados:,} tokens de entrada ahorrados condensando turnos antiguos")
+            self._escribir("-" * 60 + "\n\n")
+
+# ============================================================================
+# PANEL DESDE ARCHIVO
+# ============================================================================
+
+def cargar_panel(ruta: str) -> Tuple[str, List[Agente], Optional[Agente]]:
+    """
+    Lee un panel en JSON.
+
+    Returns:
+        tuple: (tema, agentes, moderador o None)
+    """
+    with open(ruta, encoding='utf-8') as archivo:
+        datos = json.load(archivo)
+    agentes = [Agente(**agente) for agente in datos["agentes"]]
+    moderador = Agente(**datos["moderador"]) if datos.get("moderador") else None
+    return datos.get("tema", TEMA_POR_DEFECTO), agentes, moderador
+
+# ============================================================================
+# FUNCIÓN PRINCIPAL
+# ============================================================================
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Debate entre un panel de N agentes")
+    parser.add_argument("--panel", help="Archivo JSON con tema, agentes y moderador opcional")
+    parser.add_argument("--turnos", type=int, default=2)
+    parser.add_argument("--politica", choices=POLITICAS, default="rotacion")
+    parser.add_argument("--transcripcion", default=ARCHIVO_TRANSCRIPCION,
+                        help="Archivo de la transcripción (el diario usa la extensión .jsonl)")
+    parser.add_argument("--reanudar", action="store_true",
+                        help="Continuar el debate guardado en la transcripción")
+    args = parser.parse_args()
+
+    if args.panel:
+        tema, agentes, moderador = cargar_panel(args.panel)
+    else:
+        tema, agentes, moderador = TEMA_POR_DEFECTO, PANEL_POR_DEFECTO, None
+
+    # Verificar solo las claves de los proveedores que usa el panel
+    proveedores = {a.proveedor for a in agentes}
+    if args.politica == "moderador":
+        proveedores.add((moderador or MODERADOR_POR_DEFECTO).proveedor)
+    faltantes = [CLAVES_API[p] for p in sorted(proveedores) if p in CLAVES_API and not os.getenv(CLAVES_API[p])]
+    if faltantes:
+        print("❌ Error: Faltan API keys. Asegúrate de tener configuradas:")
+        for clave in faltantes:
+            print(f"   - {clave}")
+        return
+
+    escritor = EscritorTranscripcion(args.transcripcion, reanudar=args.reanudar)
+    try:
+        orquestador = OrquestadorDebate(agentes, tema, moderador, escritor)
+        orquestador.ejecutar(num_turnos=args.turnos, politica=args.politica)
+
+    except KeyboardInterrupt:
+        print("\n\n⏹️ Debate interrumpido por el usuario. Continúa con --reanudar.")
+    except Exception as e:
+        print(f"\n❌ Error durante el debate: {str(e)}")
+    finally:
+        escritor.cerrar()
+        print(f"Debate guardado en: {args.transcripcion}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Transcripción en Vivo de Conversaciones entre Modelos
+Escribe cada respuesta en la terminal y en el archivo de transcripción a
+medida que se genera, para que una interrupción no pierda el debate.
+
+Este módulo:
+1. Muestra y escribe cada fragmento en cuanto llega del modelo
+2. Vacía el archivo a disco periódicamente y al final de cada intervención
+3. Lleva un diario JSONL con una línea por intervención terminada
+4. Lee el diario de una ejecución anterior para reanudar el debate
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import json                 # Formato del diario
+import os                   # Para forzar la escritura a disco
+import time                 # Para el vaciado periódico
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+INTERVALO_FLUSH = 1.0       # Segundos máximos entre vaciados del archivo a disco
+
+# ============================================================================
+# ESCRITOR DE TRANSCRIPCIÓN
+# ============================================================================
+
+class EscritorTranscripcion:
+    """
+    Transcripción legible (.txt) más diario de intervenciones (.jsonl).
+
+    El .txt recibe los fragmentos tal como llegan; el diario solo guarda
+    intervenciones completas, así al reanudar nunca se recupera media respuesta.
+    """
+
+    def __init__(self, archivo_txt: str, reanudar: bool = False,
+                 intervalo_flush: float = INTERVALO_FLUSH, mostrar: bool = True):
+        """
+        Args:
+            archivo_txt (str): Transcripción legible; el diario usa el mismo
+                nombre con extensión .jsonl
+            reanudar (bool): Añadir a los archivos existentes en lugar de reemplazarlos
+            intervalo_flush (float): Segundos máximos entre vaciados a disco
+            mostrar (bool): Mostrar también en la terminal (False para ejecutar
+                varios debates a la vez sin mezclar su salida)
+        """
+        self.archivo_txt = Path(archivo_txt)
+        self.archivo_diario = self.archivo_txt.with_suffix(".jsonl")
+        self.intervalo_flush = intervalo_flush
+        self.mostrar = mostrar
+        self.intervenciones = self.cargar_diario(self.archivo_diario) if reanudar else []
+        modo = 'a' if reanudar else 'w'
+        self._txt = open(self.archivo_txt, modo, encoding='utf-8')
+        if reanudar:
+            self._reescribir_diario()
+        self._diario = open(self.archivo_diario, modo, encoding='utf-8')
+        self._ultimo_flush = time.monotonic()
+        if reanudar:
+            self.escribir(f"\n[Reanudado el {time.strftime('%Y-%m-%d %H:%M:%S')} "
+                          f"tras {len(self.intervenciones)} intervenciones]\n\n")
+
+    def _reescribir_diario(self):
+        """
+        Deja en el diario solo las intervenciones válidas.
+
+        Si la última línea quedó cortada, lo nuevo no debe quedar detrás de
+        ella. Se escribe un archivo temporal, se fuerza a disco y se sustituye
+        al diario de golpe, así una interrupción a mitad no lo deja vacío.
+        """
+        temporal = self.archivo_diario.with_suffix(".jsonl.tmp")
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            for intervencion in self.intervenciones:
+                archivo.write(json.dumps(intervencion, ensure_ascii=False) + "\n")
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, self.archivo_diario)
+
+    @staticmethod
+    def cargar_diario(ruta) -> List[Dict]:
+        """
+        Lee las intervenciones terminadas de un diario.
+
+        Una última línea incompleta (el proceso murió mientras se escribía)
+        se descarta.
+        """
+        ruta = Path(ruta)
+        if not ruta.exists():
+            return []
+        intervenciones = []
+        with open(ruta, encoding='utf-8') as archivo:
+            for linea in archivo:
+                try:
+                    intervenciones.append(json.loads(linea))
+                except json.JSONDecodeError:
+                    break
+        return intervenciones
+
+    def escribir(self, texto: str, mostrar: Optional[bool] = None):
+        """Escribe texto en la transcripción (y en la terminal) y vacía si toca."""
+        if self.mostrar if mostrar is None else mostrar:
+            print(texto, end='', flush=True)
+        self._txt.write(texto)
+        if time.monotonic() - self._ultimo_flush >= self.intervalo_flush:
+            self._vaciar()
+
+    def transmitir(self, encabezado: str, fragmentos: Iterable[str]) -> str:
+        """
+        Muestra y escribe una respuesta fragmento a fragmento.
+
+        Args:
+            encabezado (str): Línea que presenta al participante
+            fragmentos (iterable): Fragmentos de texto del modelo
+
+        Returns:
+            str: Respuesta completa (si el modelo falla, la excepción sigue
+            y en la transcripción queda lo recibido hasta entonces)
+        """
+        self.escribir(f"{encabezado}\n")
+        partes = []
+        try:
+            for texto in fragmentos:
+                partes.append(texto)
+                self.escribir(texto)
+        finally:
+            self.escribir("\n\n")
+            self._vaciar()
+        return "".join(partes)
+
+    def registrar(self, participante: str, texto: str, turno: int, **extra):
+        """Añade una intervención terminada al diario y la fuerza a disco."""
+        intervencion = {"turno": turno, "participante": participante, "texto": texto, **extra}
+        self.intervenciones.append(intervencion)
+        self._diario.write(json.dumps(intervencion, ensure_ascii=False) + "\n")
+        self._diario.flush()
+        os.fsync(self._diario.fileno())
+
+    def cerrar(self):
+        """Vacía y cierra ambos archivos (se puede llamar más de una vez)."""
+        if self._txt.closed:
+            return
+        self._vaciar()
+        self._txt.close()
+        self._diario.close()
+
+    def _vaciar(self):
+        self._txt.flush()
+        self._ultimo_flush = time.monotonic()
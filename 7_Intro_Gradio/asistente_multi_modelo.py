@@ -5,19 +5,42 @@ Incluye GPT-4o-mini, Claude-3-Haiku y Gemini Pro
 """
 
 import os
-import gradio as gr
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
-from openai import OpenAI
-import anthropic
-import google.generativeai as genai
+
+# Hacer importable el paquete compartido `comun` de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comun.contabilidad_tokens import registrar_llamada, uso_anthropic, uso_gemini, uso_openai
 
 # Cargar variables de entorno
 load_dotenv()
 
-# Configurar clientes de API
-openai_client = OpenAI()
-claude_client = anthropic.Anthropic()
-genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+# Clientes de API: cada SDK se importa y se configura la primera vez que se
+# usa su modelo, así el asistente arranca sin cargar los tres proveedores
+_clientes = {}
+
+def obtener_openai():
+    """Cliente de OpenAI, creado en el primer uso"""
+    if 'openai' not in _clientes:
+        from openai import OpenAI
+        _clientes['openai'] = OpenAI()
+    return _clientes['openai']
+
+def obtener_claude():
+    """Cliente de Anthropic, creado en el primer uso"""
+    if 'claude' not in _clientes:
+        import anthropic
+        _clientes['claude'] = anthropic.Anthropic()
+    return _clientes['claude']
+
+def obtener_gemini():
+    """Módulo de Gemini configurado con la clave de API en el primer uso"""
+    if 'gemini' not in _clientes:
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+        _clientes['gemini'] = genai
+    return _clientes['gemini']
 
 # Mensaje del sistema por defecto
 DEFAULT_SYSTEM_MESSAGE = "Eres un asistente útil que responde en formato markdown"
@@ -53,24 +76,29 @@ def stream_gpt(prompt, system_message=DEFAULT_SYSTEM_MESSAGE):
             {"role": "system", "content": system_message},
             {"role": "user", "content": prompt}
         ]
-        stream = openai_client.chat.completions.create(
-            model='gpt-4o-mini',
-            messages=messages,
-            stream=True,
-            temperature=0.7
-        )
-        result = ""
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                result += chunk.choices[0].delta.content
-                yield result
+        with registrar_llamada("openai", 'gpt-4o-mini', "chat_gpt") as llamada:
+            stream = obtener_openai().chat.completions.create(
+                model='gpt-4o-mini',
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},  # El último fragmento trae el uso de tokens
+                temperature=0.7
+            )
+            result = ""
+            for chunk in stream:
+                if chunk.usage:
+                    llamada.registrar_uso(uso_openai(chunk.usage))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    llamada.marcar_primer_token()
+                    result += chunk.choices[0].delta.content
+                    yield result
     except Exception as e:
         yield f"❌ Error con GPT: {str(e)}"
 
 def stream_claude(prompt, system_message=DEFAULT_SYSTEM_MESSAGE):
     """Función para streaming con Claude-3-Haiku"""
     try:
-        result = claude_client.messages.stream(
+        result = obtener_claude().messages.stream(
             model="claude-3-haiku-20240307",
             max_tokens=1000,
             temperature=0.7,
@@ -80,36 +108,43 @@ def stream_claude(prompt, system_message=DEFAULT_SYSTEM_MESSAGE):
             ],
         )
         response = ""
-        with result as stream:
+        with registrar_llamada("anthropic", "claude-3-haiku-20240307", "chat_claude") as llamada, result as stream:
             for text in stream.text_stream:
                 if text:
+                    llamada.marcar_primer_token()
                     response += text
                     yield response
+            llamada.registrar_uso(uso_anthropic(stream.get_final_message().usage))
     except Exception as e:
         yield f"❌ Error con Claude: {str(e)}"
 
 def stream_gemini(prompt, system_message=DEFAULT_SYSTEM_MESSAGE):
     """Función para streaming con Gemini Pro"""
     try:
+        genai = obtener_gemini()
         model = genai.GenerativeModel('gemini-flash-latest')
         
         # Combinar system message con el prompt del usuario
         full_prompt = f"{system_message}\n\nUsuario: {prompt}"
         
-        response = model.generate_content(
-            full_prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.7,
-                max_output_tokens=1000,
-            ),
-            stream=True
-        )
-        
-        result = ""
-        for chunk in response:
-            if chunk.text:
-                result += chunk.text
-                yield result
+        with registrar_llamada("gemini", 'gemini-flash-latest', "chat_gemini") as llamada:
+            response = model.generate_content(
+                full_prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=0.7,
+                    max_output_tokens=1000,
+                ),
+                stream=True
+            )
+            
+            result = ""
+            for chunk in response:
+                if chunk.text:
+                    llamada.marcar_primer_token()
+                    result += chunk.text
+                    yield result
+            # El uso de tokens llega con el último fragmento
+            llamada.registrar_uso(uso_gemini(response.usage_metadata))
     except Exception as e:
         yield f"❌ Error con Gemini: {str(e)}"
 
@@ -135,6 +170,7 @@ def chat_with_model(prompt, model_choice, system_message):
 
 def crear_interfaz():
     """Crear la interfaz de Gradio"""
+    import gradio as gr  # Importación diferida: solo al construir la interfaz
     
     # CSS personalizado para mejorar la apariencia
     css = """
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Precálculo de Respuestas para las Preguntas de Ejemplo (Gradio)
+Genera por adelantado las respuestas a EJEMPLOS_PREGUNTAS para todos los
+niveles e idiomas del tutor web, de modo que al preguntarlas se muestran
+sin esperar al modelo.
+
+Solo se generan las respuestas que faltan o cuya versión de prompt cambió
+(al editar un archivo de prompts/ basta con volver a ejecutar este script).
+
+Uso:
+    python precalcular_respuestas.py
+    python precalcular_respuestas.py --concurrencia 8 --idiomas Español English
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import argparse             # Para los argumentos de la línea de comandos
+import time                 # Para medir la duración del lote
+
+# tutor_robotica_gradio hace importable el paquete compartido `comun`
+from tutor_robotica_gradio import (EJEMPLOS_PREGUNTAS, IDIOMAS_DISPONIBLES, MODEL,
+                                   NIVELES_EDUCATIVOS, REGISTRO_PROMPTS,
+                                   RESPUESTAS_PRECALCULADAS, get_system_prompt_para_pregunta,
+                                   obtener_cliente_openai, verificar_api_key)
+from comun.contabilidad_tokens import registrar_llamada, uso_openai
+from comun.respuestas_precalculadas import MAX_CONCURRENCIA, TareaPrecalculo, precalcular
+
+# ============================================================================
+# GENERACIÓN
+# ============================================================================
+
+def generar(tarea: TareaPrecalculo) -> str:
+    """
+    Genera la respuesta de una pregunta de ejemplo igual que el chat de Gradio.
+
+    Args:
+        tarea (TareaPrecalculo): Pregunta, nivel e idioma
+
+    Returns:
+        str: Respuesta del tutor
+    """
+    with registrar_llamada("openai", MODEL, "precalculo") as llamada:
+        completion = obtener_cliente_openai().chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": get_system_prompt_para_pregunta(tarea.nivel, tarea.idioma, tarea.pregunta)},
+                {"role": "user", "content": tarea.pregunta}
+            ],
+            max_completion_tokens=5000
+        )
+        llamada.registrar_uso(uso_openai(completion.usage))
+    return completion.choices[0].message.content
+
+def main():
+    """Genera las respuestas pendientes de la matriz de ejemplos."""
+    parser = argparse.ArgumentParser(description="Precalcula las respuestas de las preguntas de ejemplo")
+    parser.add_argument("--niveles", nargs="+", choices=list(NIVELES_EDUCATIVOS), default=list(NIVELES_EDUCATIVOS))
+    parser.add_argument("--idiomas", nargs="+", default=IDIOMAS_DISPONIBLES)
+    parser.add_argument("--concurrencia", type=int, default=MAX_CONCURRENCIA, help="Peticiones simultáneas a OpenAI")
+    parser.add_argument("--forzar", action="store_true", help="Regenerar también las respuestas vigentes")
+    args = parser.parse_args()
+    if not verificar_api_key():
+        exit(1)
+
+    tareas = [
+        TareaPrecalculo(nivel, idioma, pregunta, REGISTRO_PROMPTS.obtener(nivel, idioma).version)
+        for nivel in args.niveles
+        for idioma in args.idiomas
+        for pregunta in EJEMPLOS_PREGUNTAS[nivel]
+    ]
+
+    print("🧮 PRECÁLCULO DE RESPUESTAS DE EJEMPLO")
+    print("=" * 40)
+    inicio = time.perf_counter()
+    resultado = precalcular(RESPUESTAS_PRECALCULADAS, tareas, generar, modelo=MODEL,
+                            max_concurrencia=args.concurrencia, forzar=args.forzar)
+
+    print("=" * 40)
+    print(f"✅ Generadas: {resultado['generadas']} | Vigentes: {resultado['vigentes']} | "
+          f"Errores: {resultado['errores']} | {time.perf_counter() - inicio:.1f}s")
+    print(f"💾 Guardadas en {RESPUESTAS_PRECALCULADAS.ruta}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⏹️ Precálculo interrumpido (las respuestas ya generadas están guardadas)")
@@ -15,27 +15,50 @@ Este script combina:
 # IMPORTACIONES NECESARIAS
 # ============================================================================
 import os
-import gradio as gr
+import sys
 from dotenv import load_dotenv
-from openai import OpenAI
+from pathlib import Path
 from typing import Dict, List, Tuple
 
+# Hacer importable el paquete compartido `comun` de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from comun.registro_prompts import RegistroPrompts
+from comun.cache_semantico import CacheSemantico
+from comun.respuestas_precalculadas import AlmacenRespuestas
+from comun.contabilidad_tokens import registrar_llamada, uso_openai
+
 # ============================================================================
 # CONFIGURACIÓN INICIAL
 # ============================================================================
 
 # Cargar variables de entorno
+# (la clave de API se valida en main(), no al importar el módulo)
 load_dotenv()
-api_key = os.getenv('OPENAI_API_KEY')
-
-# Validar API key
-if not api_key or not api_key.startswith('sk-'):
-    print("❌ Error: OPENAI_API_KEY no configurada correctamente")
-    exit(1)
 
 # Configuración del modelo
 MODEL = 'gpt-5-nano'
-openai = OpenAI()
+_cliente_openai = None   # Se crea en la primera pregunta
+
+def verificar_api_key() -> bool:
+    """
+    Comprueba que la clave de API de OpenAI esté configurada.
+    
+    Returns:
+        bool: True si la clave parece válida
+    """
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key or not api_key.startswith('sk-'):
+        print("❌ Error: OPENAI_API_KEY no configurada correctamente")
+        return False
+    return True
+
+def obtener_cliente_openai():
+    """Devuelve el cliente de OpenAI, importándolo y creándolo en el primer uso."""
+    global _cliente_openai
+    if _cliente_openai is None:
+        from openai import OpenAI   # Importación diferida: no retrasa el arranque
+        _cliente_openai = OpenAI()
+    return _cliente_openai
 
 # ============================================================================
 # CONFIGURACIÓN DE NIVELES EDUCATIVOS
@@ -72,28 +95,43 @@ NIVELES_EDUCATIVOS = {
     }
 }
 
+IDIOMAS_DISPONIBLES = ["Español", "English", "Français", "Português", "Italiano", "日本語", "Deutsch", "中文"]
+
+# Preguntas de ejemplo de cada nivel (sus respuestas se precalculan con
+# precalcular_respuestas.py)
+EJEMPLOS_PREGUNTAS = {
+    "preescolar": [
+        "¿Qué es un robot?",
+        "¿Cómo se enciende una luz?",
+        "¿Por qué se mueven los carros de juguete?",
+        "¿Qué hace que suene un timbre?"
+    ],
+    "primaria": [
+        "¿Cómo funciona un LED?",
+        "¿Qué es Arduino?",
+        "¿Cómo hacer que un motor gire?",
+        "¿Qué es un sensor de temperatura?"
+    ],
+    "secundaria": [
+        "¿Cómo programar un Arduino?",
+        "¿Qué es PWM y para qué sirve?",
+        "¿Cómo funciona un servo motor?",
+        "¿Cómo hacer un robot que siga líneas?"
+    ],
+    "preparatoria": [
+        "¿Cómo implementar PID en robótica?",
+        "¿Qué es la comunicación I2C?",
+        "¿Cómo diseñar un sistema de control?",
+        "¿Cómo integrar sensores IoT?"
+    ]
+}
+
 # ============================================================================
 # FUNCIONES AUXILIARES
 # ============================================================================
 
-def cargar_prompt_desde_archivo(nivel: str) -> str:
-    """Carga el prompt multi-shot desde un archivo externo."""
-    try:
-        # Obtener el directorio donde está ubicado este script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        archivo_prompt = os.path.join(script_dir, "prompts", f"{nivel}.txt")
-        
-        with open(archivo_prompt, 'r', encoding='utf-8') as file:
-            return file.read()
-    except FileNotFoundError:
-        print(f"⚠️ Archivo de prompt no encontrado: {archivo_prompt}")
-        return "No hay ejemplos disponibles para este nivel."
-    except Exception as e:
-        print(f"❌ Error al cargar prompt: {e}")
-        return "Error al cargar ejemplos."
-
-def get_system_prompt_multishot(nivel: str, language: str = "Español") -> str:
-    """Genera el prompt del sistema con ejemplos multi-shot para cada nivel educativo."""
+def construir_prompt_sistema(nivel: str, language: str, ejemplos: str) -> str:
+    """Construye el prompt del sistema con los ejemplos multi-shot de un nivel educativo."""
     
     base_prompt = f"""Eres un tutor experto en robótica, Arduino, electrónica, mecatrónica y programación. 
 Tu especialidad es adaptar tu enseñanza al nivel educativo del estudiante.
@@ -116,9 +154,6 @@ INSTRUCCIONES GENERALES:
 
 EJEMPLOS DE RESPUESTAS MULTI-SHOT PARA NIVEL {nivel.upper()}:"""
 
-    # Cargar ejemplos desde archivo externo
-    ejemplos = cargar_prompt_desde_archivo(nivel)
-    
     # Agregar configuración de idioma
     language_config = f"""
 
@@ -131,6 +166,35 @@ CONFIGURACIÓN DE IDIOMA:
 
     return base_prompt + ejemplos + language_config
 
+# Ejemplos multi-shot por petición: los k más parecidos a la pregunta (0 = todos;
+# también todos si el archivo tiene k + 1 o menos, o si ninguno se parece)
+EJEMPLOS_POR_PREGUNTA = int(os.getenv('TUTOR_EJEMPLOS_POR_PREGUNTA', '1'))
+
+# Registro compartido por todas las sesiones: archivos leídos una sola vez,
+# prompts precompilados por (nivel, idioma) y recarga si cambia un archivo
+REGISTRO_PROMPTS = RegistroPrompts(
+    directorio=os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts"),
+    niveles=NIVELES_EDUCATIVOS.keys(),
+    construir=construir_prompt_sistema,
+    idiomas=IDIOMAS_DISPONIBLES,
+    k_ejemplos=EJEMPLOS_POR_PREGUNTA or None
+)
+
+def get_system_prompt_multishot(nivel: str, language: str = "Español") -> str:
+    """Obtiene el prompt del sistema precompilado para un nivel e idioma."""
+    return REGISTRO_PROMPTS.obtener(nivel, language).texto
+
+def get_system_prompt_para_pregunta(nivel: str, language: str, pregunta: str) -> str:
+    """Obtiene el prompt del sistema con solo los ejemplos más parecidos a la pregunta."""
+    return REGISTRO_PROMPTS.obtener_para_pregunta(nivel, language, pregunta).texto
+
+# Caché semántica: las preguntas frecuentes de la clase se responden al instante.
+# Se desactiva con TUTOR_CACHE_SEMANTICO=0
+CACHE_RESPUESTAS = CacheSemantico() if os.getenv('TUTOR_CACHE_SEMANTICO', '1') != '0' else None
+
+# Respuestas generadas por adelantado para EJEMPLOS_PREGUNTAS (ver precalcular_respuestas.py)
+RESPUESTAS_PRECALCULADAS = AlmacenRespuestas(Path(__file__).resolve().parent / "respuestas_precalculadas.json")
+
 # ============================================================================
 # CLASE PRINCIPAL DEL TUTOR PARA GRADIO
 # ============================================================================
@@ -207,6 +271,9 @@ class TutorRoboticaGradio:
         """
         Función principal de chat que responde a los mensajes del usuario.
         
+        La primera pregunta de una conversación se busca antes en las respuestas
+        precalculadas y en la caché semántica; si está, se devuelve al instante.
+        
         Args:
             message (str): Mensaje del usuario
             history (List): Historial de la conversación
@@ -214,25 +281,46 @@ class TutorRoboticaGradio:
         Yields:
             str: Respuesta del tutor en streaming
         """
-        # Preparar mensajes para OpenAI
-        messages = [{"role": "system", "content": self.system_prompt}] + history + [{"role": "user", "content": message}]
+        # Solo las preguntas sin historial previo son reutilizables entre estudiantes
+        version = REGISTRO_PROMPTS.obtener(self.nivel_actual, self.language).version
+        if not history:
+            precalculada = RESPUESTAS_PRECALCULADAS.obtener(self.nivel_actual, self.language, message, version)
+            if precalculada:
+                yield precalculada
+                return
+            acierto = CACHE_RESPUESTAS.buscar(self.nivel_actual, self.language, message, version) if CACHE_RESPUESTAS else None
+            if acierto:
+                yield acierto.respuesta
+                return
+        
+        # Preparar mensajes para OpenAI (solo con los ejemplos relacionados con la pregunta)
+        system_prompt = get_system_prompt_para_pregunta(self.nivel_actual, self.language, message)
+        messages = [{"role": "system", "content": system_prompt}] + history + [{"role": "user", "content": message}]
         
         try:
-            # Llamada a OpenAI con streaming
-            stream = openai.chat.completions.create(
-                model=MODEL,
-                messages=messages,
-                stream=True,
-                max_completion_tokens=5000
-            )
+            # Llamada a OpenAI con streaming (registrando tokens, latencia y costo)
+            with registrar_llamada("openai", MODEL, "respuesta") as llamada:
+                stream = obtener_cliente_openai().chat.completions.create(
+                    model=MODEL,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},  # El último fragmento trae el uso de tokens
+                    max_completion_tokens=5000
+                )
+                
+                # Procesar respuesta en streaming
+                response = ""
+                for chunk in stream:
+                    if chunk.usage:
+                        llamada.registrar_uso(uso_openai(chunk.usage))
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        llamada.marcar_primer_token()
+                        content = chunk.choices[0].delta.content
+                        response += content
+                        yield response
             
-            # Procesar respuesta en streaming
-            response = ""
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    response += content
-                    yield response
+            if not history and CACHE_RESPUESTAS:
+                CACHE_RESPUESTAS.guardar(self.nivel_actual, self.language, message, response, version)
                     
         except Exception as e:
             error_msg = f"❌ Error al procesar tu pregunta: {str(e)}\n\nPor favor, intenta de nuevo o reformula tu pregunta."
@@ -279,34 +367,7 @@ def obtener_info_nivel_actual() -> str:
 
 def obtener_ejemplos_preguntas(nivel: str) -> str:
     """Obtiene ejemplos de preguntas para cada nivel."""
-    ejemplos = {
-        "preescolar": [
-            "¿Qué es un robot?",
-            "¿Cómo se enciende una luz?",
-            "¿Por qué se mueven los carros de juguete?",
-            "¿Qué hace que suene un timbre?"
-        ],
-        "primaria": [
-            "¿Cómo funciona un LED?",
-            "¿Qué es Arduino?",
-            "¿Cómo hacer que un motor gire?",
-            "¿Qué es un sensor de temperatura?"
-        ],
-        "secundaria": [
-            "¿Cómo programar un Arduino?",
-            "¿Qué es PWM y para qué sirve?",
-            "¿Cómo funciona un servo motor?",
-            "¿Cómo hacer un robot que siga líneas?"
-        ],
-        "preparatoria": [
-            "¿Cómo implementar PID en robótica?",
-            "¿Qué es la comunicación I2C?",
-            "¿Cómo diseñar un sistema de control?",
-            "¿Cómo integrar sensores IoT?"
-        ]
-    }
-    
-    lista_ejemplos = ejemplos.get(nivel, [])
+    lista_ejemplos = EJEMPLOS_PREGUNTAS.get(nivel, [])
     ejemplos_texto = "\n".join([f"• {ejemplo}" for ejemplo in lista_ejemplos])
     
     return f"""💡 **Ejemplos de preguntas para {nivel.title()}:**
@@ -321,6 +382,7 @@ def obtener_ejemplos_preguntas(nivel: str) -> str:
 
 def crear_interfaz():
     """Crea y configura la interfaz de Gradio."""
+    import gradio as gr   # Importación diferida: solo al construir la interfaz
     
     # CSS personalizado para mejorar la apariencia
     css = """
@@ -369,7 +431,7 @@ def crear_interfaz():
                 )
                 
                 idioma_dropdown = gr.Dropdown(
-                    choices=["Español", "English", "Français", "Português", "Italiano", "日本語", "Deutsch", "中文"],
+                    choices=IDIOMAS_DISPONIBLES,
                     value="Español",
                     label="🌍 Idioma",
                     info="Selecciona el idioma para las respuestas"
@@ -482,6 +544,8 @@ def crear_interfaz():
 def main():
     """Función principal que lanza la aplicación."""
     print("🤖 Iniciando Tutor de Robótica con Gradio...")
+    if not verificar_api_key():
+        exit(1)
     print(f"📚 Niveles disponibles: {list(NIVELES_EDUCATIVOS.keys())}")
     print(f"🌍 Idioma: {tutor.language}")
     print("🚀 Creando interfaz...")
@@ -21,9 +21,14 @@ Autor: Basado en el notebook day4.ipynb
 
 import os          # Para acceder a variables de entorno
 import json        # Para manejar datos JSON en las herramientas
+import sys         # Para hacer importable el paquete compartido `comun`
+from pathlib import Path
 from dotenv import load_dotenv  # Para cargar variables de entorno desde .env
-from openai import OpenAI       # Cliente de OpenAI
-import gradio as gr             # Para crear la interfaz web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comun.contabilidad_tokens import registrar_llamada, uso_openai  # Tokens y costo por llamada
+# openai y gradio se importan al usarlos: importar este módulo (por ejemplo,
+# para probar get_ticket_price) no carga ninguno de los dos
 
 # ============================================================================
 # CONFIGURACIÓN E INICIALIZACIÓN
@@ -32,19 +37,33 @@ import gradio as gr             # Para crear la interfaz web
 # Cargar variables de entorno desde el archivo .env
 load_dotenv()
 
-# Verificar que la API key de OpenAI esté configurada
-openai_api_key = os.getenv('OPENAI_API_KEY')
-if openai_api_key:
-    print(f"OpenAI API Key exists and begins {openai_api_key[:8]}")
-else:
+def verificar_api_key():
+    """
+    Verifica que la API key de OpenAI esté configurada.
+    
+    Returns:
+        bool: True si la clave existe
+    """
+    openai_api_key = os.getenv('OPENAI_API_KEY')
+    if openai_api_key:
+        print(f"OpenAI API Key exists and begins {openai_api_key[:8]}")
+        return True
     print("OpenAI API Key Sin Configurar")
-    exit(1)  # Salir si no hay API key
+    return False
     
 # Configuración del modelo a utilizar
 MODEL = "gpt-4o-mini"
 
-# Inicializar el cliente de OpenAI
-openai = OpenAI()
+# Cliente de OpenAI (se crea en el primer mensaje)
+_openai = None
+
+def get_openai():
+    """Devuelve el cliente de OpenAI, creándolo en el primer uso."""
+    global _openai
+    if _openai is None:
+        from openai import OpenAI
+        _openai = OpenAI()
+    return _openai
 
 # ============================================================================
 # CONFIGURACIÓN DEL ASISTENTE
@@ -193,11 +212,13 @@ def chat(message, history):
     ]
     
     # Primera llamada a OpenAI con las herramientas disponibles
-    response = openai.chat.completions.create(
-        model=MODEL, 
-        messages=messages, 
-        tools=tools  # Herramientas disponibles
-    )
+    with registrar_llamada("openai", MODEL, "chat") as llamada:
+        response = get_openai().chat.completions.create(
+            model=MODEL, 
+            messages=messages, 
+            tools=tools  # Herramientas disponibles
+        )
+        llamada.registrar_uso(uso_openai(response.usage))
 
     # Verificar si el LLM quiere usar una herramienta
     if response.choices[0].finish_reason == "tool_calls":
@@ -217,7 +238,9 @@ def chat(message, history):
         
         # Segunda llamada a OpenAI con el resultado de la herramienta
         # Ahora el LLM puede usar esta información para responder al usuario
-        response = openai.chat.completions.create(model=MODEL, messages=messages)
+        with registrar_llamada("openai", MODEL, "respuesta_herramienta") as llamada:
+            response = get_openai().chat.completions.create(model=MODEL, messages=messages)
+            llamada.registrar_uso(uso_openai(response.usage))
     
     # Devolver la respuesta final del asistente
     return response.choices[0].message.content
@@ -233,7 +256,11 @@ if __name__ == "__main__":
     Cuando se ejecuta el script directamente, se lanza la interfaz web de Gradio
     con nuestro asistente de aerolínea.
     """
+    import gradio as gr  # Para crear la interfaz web
+    
     print("🛫 Iniciando Asistente de Aerolínea FlightAI...")
+    if not verificar_api_key():
+        exit(1)  # Salir si no hay API key
     print("📋 Herramientas disponibles: Consulta de precios de billetes")
     print("🌐 Lanzando interfaz web...")
     
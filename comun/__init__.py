@@ -0,0 +1,6 @@
+"""
+Módulos compartidos entre los proyectos del repositorio.
+
+Los scripts de cada módulo del curso se ejecutan de forma independiente, por lo
+que añaden la raíz del repositorio a ``sys.path`` antes de importar este paquete.
+"""
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Caché Semántica de Respuestas para los Tutores
+Sirve al instante las respuestas a preguntas casi idénticas que ya se
+respondieron para el mismo nivel e idioma.
+
+Este módulo:
+1. Convierte cada pregunta en un embedding con un modelo local
+2. Busca en un índice vectorial por (nivel, idioma, versión del prompt)
+3. Devuelve la respuesta guardada si la similitud supera un umbral y las
+   dos preguntas tienen los mismos números y negaciones
+4. Expira las entradas por antigüedad (TTL) y descarta las menos usadas (LRU)
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import itertools            # Para generar identificadores de entrada
+import threading            # Para compartir la caché entre sesiones
+import time                 # Para el TTL de las entradas
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from comun.embeddings import IndiceVectorial, normalizar_texto, obtener_modelo_embeddings
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+TTL_SEGUNDOS = 24 * 60 * 60     # Las respuestas se regeneran al menos una vez al día
+MAX_ENTRADAS = 2000             # Entradas máximas entre todos los niveles e idiomas
+CANDIDATOS = 5                  # Vecinos revisados por consulta (el primero puede no valer)
+
+# Palabras que invierten el sentido de una pregunta (ya sin acentos, como las
+# deja normalizar_texto): "¿cómo NO funciona?" no es "¿cómo funciona?"
+PALABRAS_NEGACION = {
+    "no", "ni", "nunca", "jamas", "tampoco", "sin", "nada", "ningun", "ninguno", "ninguna",
+    "not", "never", "without", "nothing", "cannot", "cant", "dont", "doesnt", "didnt",
+    "isnt", "arent", "wont", "don", "doesn", "didn", "isn", "aren", "won",
+    "ne", "pas", "jamais", "sans", "non", "mai", "senza", "nicht", "kein", "keine",
+    "nie", "ohne", "nao", "sem",
+}
+
+# ============================================================================
+# RASGOS QUE DEBEN COINCIDIR
+# ============================================================================
+
+def rasgos_exactos(pregunta: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Números y negaciones de una pregunta.
+
+    Los embeddings apenas los distinguen ("pin 12" y "pin 13" se parecen
+    casi tanto como dos preguntas idénticas), así que una respuesta solo se
+    reutiliza si coinciden exactamente.
+
+    Returns:
+        tuple: (números, negaciones), cada uno ordenado
+    """
+    palabras = normalizar_texto(pregunta).split()
+    numeros = sorted(p for p in palabras if any(c.isdigit() for c in p))
+    negaciones = sorted(p for p in palabras if p in PALABRAS_NEGACION)
+    return tuple(numeros), tuple(negaciones)
+
+# ============================================================================
+# ENTRADAS DE LA CACHÉ
+# ============================================================================
+
+@dataclass
+class EntradaCache:
+    """
+    Respuesta guardada en la caché.
+
+    Attributes:
+        contexto (tuple): (nivel, idioma, versión del prompt)
+        pregunta (str): Pregunta original que generó la respuesta
+        respuesta (str): Respuesta del tutor
+        creada (float): Instante (monotonic) en que se guardó
+        usos (int): Veces que se ha servido desde la caché
+    """
+    contexto: Tuple[str, str, str]
+    pregunta: str
+    respuesta: str
+    creada: float
+    usos: int = 0
+
+
+@dataclass(frozen=True)
+class ResultadoCache:
+    """Acierto de la caché: respuesta servida y pregunta con la que coincidió."""
+    respuesta: str
+    pregunta_original: str
+    similitud: float
+
+# ============================================================================
+# CACHÉ SEMÁNTICA
+# ============================================================================
+
+class CacheSemantico:
+    """
+    Caché de respuestas por similitud de preguntas, segura entre hilos.
+
+    El modelo de embeddings se carga en la primera consulta, no al crear la caché.
+    """
+
+    def __init__(self, umbral: Optional[float] = None, ttl: float = TTL_SEGUNDOS,
+                 max_entradas: int = MAX_ENTRADAS, modelo=None):
+        """
+        Inicializa la caché.
+
+        Args:
+            umbral (float): Similitud mínima para considerar dos preguntas iguales
+                (por defecto la sugerida por el modelo de embeddings)
+            ttl (float): Segundos de vida de cada respuesta
+            max_entradas (int): Tamaño máximo antes de descartar las menos usadas
+            modelo: Modelo de embeddings (por defecto el compartido del proceso)
+        """
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._umbral = umbral
+        self._modelo = modelo
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[int, EntradaCache]" = OrderedDict()   # Orden LRU
+        self._indices: Dict[Tuple[str, str, str], IndiceVectorial] = {}
+        self._ids = itertools.count()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @property
+    def modelo(self):
+        """Modelo de embeddings, cargado en el primer uso."""
+        if self._modelo is None:
+            self._modelo = obtener_modelo_embeddings()
+        return self._modelo
+
+    @property
+    def umbral(self) -> float:
+        """Similitud mínima para un acierto."""
+        return self._umbral if self._umbral is not None else self.modelo.umbral_sugerido
+
+    def buscar(self, nivel: str, idioma: str, pregunta: str, version: str = "") -> Optional[ResultadoCache]:
+        """
+        Busca una respuesta guardada para una pregunta parecida.
+
+        Args:
+            nivel (str): Nivel educativo
+            idioma (str): Idioma de la respuesta
+            pregunta (str): Pregunta del estudiante
+            version (str): Versión del prompt del sistema (las respuestas de
+                otra versión no se reutilizan)
+
+        Returns:
+            ResultadoCache: La respuesta guardada, o None si no hay coincidencia
+        """
+        contexto = (nivel, idioma, version)
+        vector = self.modelo.codificar([pregunta])[0]   # Fuera del lock: es lo más costoso
+        rasgos = rasgos_exactos(pregunta)
+
+        with self._lock:
+            indice = self._indices.get(contexto)
+            resultados = indice.buscar(vector, k=CANDIDATOS) if indice else []
+            for clave, similitud in resultados:
+                if similitud < self.umbral:
+                    break   # Ordenados de mayor a menor: ya no hay coincidencias
+                entrada = self._entradas[clave]
+                if time.monotonic() - entrada.creada > self.ttl:
+                    self._eliminar(clave)
+                elif rasgos_exactos(entrada.pregunta) == rasgos:
+                    entrada.usos += 1
+                    self._entradas.move_to_end(clave)
+                    self.aciertos += 1
+                    return ResultadoCache(entrada.respuesta, entrada.pregunta, similitud)
+            self.fallos += 1
+            return None
+
+    def guardar(self, nivel: str, idioma: str, pregunta: str, respuesta: str, version: str = ""):
+        """
+        Guarda la respuesta a una pregunta.
+
+        Args:
+            nivel (str): Nivel educativo
+            idioma (str): Idioma de la respuesta
+            pregunta (str): Pregunta del estudiante
+            respuesta (str): Respuesta completa del tutor
+            version (str): Versión del prompt del sistema
+        """
+        if not respuesta.strip():
+            return
+        contexto = (nivel, idioma, version)
+        vector = self.modelo.codificar([pregunta])[0]
+
+        with self._lock:
+            clave = next(self._ids)
+            self._entradas[clave] = EntradaCache(contexto, pregunta, respuesta, time.monotonic())
+            self._indices.setdefault(contexto, IndiceVectorial()).agregar(clave, vector)
+            while len(self._entradas) > self.max_entradas:
+                self._eliminar(next(iter(self._entradas)))   # La menos usada recientemente
+
+    def limpiar(self):
+        """Vacía la caché."""
+        with self._lock:
+            self._entradas.clear()
+            self._indices.clear()
+
+    def estadisticas(self) -> Dict[str, float]:
+        """Aciertos, fallos, tasa de aciertos y número de entradas."""
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+                "entradas": len(self._entradas),
+            }
+
+    def _eliminar(self, clave: int):
+        """Quita una entrada y su vector (se llama con el lock tomado)."""
+        entrada = self._entradas.pop(clave)
+        indice = self._indices[entrada.contexto]
+        indice.eliminar(clave)
+        if not len(indice):
+            del self._indices[entrada.contexto]
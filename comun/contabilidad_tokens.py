@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Contabilidad de Tokens y Costos de las Llamadas a Modelos
+Registra cada llamada a OpenAI, Anthropic, Gemini u Ollama (tokens, latencia,
+modelo y costo estimado) para saber qué función, sesión o día gasta más.
+
+Este módulo:
+1. Extrae el uso de tokens de las respuestas de cada proveedor
+   (prompt, generados y tokens servidos desde la caché de prompts)
+2. Mide la latencia total y hasta el primer token de cada llamada
+3. Guarda cada llamada en una base SQLite local desde un hilo escritor
+4. Resume el uso por función, sesión, día o modelo
+5. Expone los totales en formato de texto de Prometheus (/metrics)
+
+Uso:
+    python -m comun.contabilidad_tokens --por funcion --dias 7
+    python -m comun.contabilidad_tokens --servir 9464
+
+Variables de entorno:
+    LLM_USO_DB            Ruta de la base SQLite ("0" = solo en memoria)
+    LLM_METRICAS_PUERTO   Si está definida, sirve /metrics en ese puerto
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import argparse             # Para los argumentos de la línea de comandos
+import atexit               # Para escribir las filas pendientes al salir
+import os                   # Para variables de entorno
+import queue                # Filas pendientes de escribir
+import sqlite3              # Base de datos local de llamadas
+import threading            # Para compartir el contador entre hilos
+import time                 # Para medir latencias y fechar las llamadas
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+RUTA_DB = os.getenv('LLM_USO_DB', str(Path.home() / ".cache" / "my_llm_engineering" / "uso_llm.sqlite"))
+PUERTO_METRICAS = os.getenv('LLM_METRICAS_PUERTO')
+
+# Precios en USD por millón de tokens: (entrada, entrada en caché, salida).
+# Se busca por prefijo del nombre del modelo; los modelos locales no cuestan.
+PRECIOS: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "claude-3-haiku": (0.25, 0.03, 1.25),
+    "claude-3-5-haiku": (0.80, 0.08, 4.00),
+    "claude-sonnet-4": (3.00, 0.30, 15.00),
+    "gemini-2.0-flash": (0.10, 0.025, 0.40),
+    "gemini-2.5-flash": (0.30, 0.075, 2.50),
+    "gemini-flash": (0.30, 0.075, 2.50),         # gemini-flash-latest
+}
+PROVEEDORES_LOCALES = {"ollama", "mock"}
+
+# Límites (segundos) del histograma de latencia
+CUBETAS_LATENCIA = (0.25, 0.5, 1, 2, 5, 10, 30, 60)
+
+Uso = Dict[str, Optional[int]]
+
+# ============================================================================
+# USO DE TOKENS POR PROVEEDOR
+# ============================================================================
+# Todas las funciones devuelven {"prompt": n, "generados": m, "cache": c}
+
+def uso_openai(usage) -> Uso:
+    """Uso de una respuesta de OpenAI (chunk.usage o response.usage)."""
+    if usage is None:
+        return {}
+    detalles = getattr(usage, "prompt_tokens_details", None)
+    return {"prompt": usage.prompt_tokens,
+            "generados": usage.completion_tokens,
+            "cache": getattr(detalles, "cached_tokens", None)}
+
+
+def uso_anthropic(usage) -> Uso:
+    """Uso de una respuesta de Anthropic (message.usage)."""
+    if usage is None:
+        return {}
+    cache = getattr(usage, "cache_read_input_tokens", None) or 0
+    # Anthropic no incluye los tokens leídos de caché en input_tokens
+    return {"prompt": (usage.input_tokens or 0) + cache,
+            "generados": usage.output_tokens,
+            "cache": cache}
+
+
+def uso_gemini(usage_metadata) -> Uso:
+    """Uso de una respuesta de Gemini (response.usage_metadata)."""
+    if usage_metadata is None:
+        return {}
+    return {"prompt": getattr(usage_metadata, "prompt_token_count", None),
+            "generados": getattr(usage_metadata, "candidates_token_count", None),
+            "cache": getattr(usage_metadata, "cached_content_token_count", None)}
+
+
+def uso_ollama(respuesta) -> Uso:
+    """Uso de una respuesta de Ollama (último fragmento o respuesta completa)."""
+    if respuesta is None:
+        return {}
+    return {"prompt": respuesta.get('prompt_eval_count'),
+            "generados": respuesta.get('eval_count'),
+            "cache": None}
+
+
+def costo_usd(proveedor: str, modelo: str, uso: Uso) -> float:
+    """
+    Costo estimado de una llamada según la tabla PRECIOS.
+
+    Returns:
+        float: Costo en USD (0 para modelos locales o sin precio conocido)
+    """
+    if proveedor in PROVEEDORES_LOCALES:
+        return 0.0
+    # El prefijo más largo gana (gpt-4o-mini antes que gpt-4o)
+    candidatos = [p for p in PRECIOS if modelo.startswith(p)]
+    if not candidatos:
+        return 0.0
+    entrada, entrada_cache, salida = PRECIOS[max(candidatos, key=len)]
+    prompt = uso.get("prompt") or 0
+    cache = min(uso.get("cache") or 0, prompt)
+    generados = uso.get("generados") or 0
+    return ((prompt - cache) * entrada + cache * entrada_cache + generados * salida) / 1_000_000
+
+# ============================================================================
+# REGISTRO DE LLAMADAS
+# ============================================================================
+
+@dataclass
+class LlamadaLLM:
+    """
+    Una llamada a un modelo en curso o terminada.
+
+    Attributes:
+        proveedor (str): openai, anthropic, gemini, ollama o mock
+        modelo (str): Modelo utilizado
+        funcion (str): Función del programa que hizo la llamada (respuesta, resumen...)
+        sesion (str): Sesión o usuario, si se conoce
+        uso (dict): Tokens reportados por el proveedor
+        latencia (float): Segundos desde el inicio hasta el final
+        primer_token (float): Segundos hasta el primer token (solo en streaming)
+        estado (str): ok, error o cancelada
+    """
+    proveedor: str
+    modelo: str
+    funcion: str
+    sesion: Optional[str] = None
+    uso: Uso = field(default_factory=dict)
+    latencia: float = 0.0
+    primer_token: Optional[float] = None
+    estado: str = "ok"
+    _inicio: float = field(default_factory=time.perf_counter, repr=False)
+
+    def registrar_uso(self, uso: Uso):
+        """Guarda el uso de tokens (se puede llamar varias veces; gana el último)."""
+        if uso:
+            self.uso = uso
+
+    def marcar_primer_token(self):
+        """Anota la latencia hasta el primer token (solo la primera vez)."""
+        if self.primer_token is None:
+            self.primer_token = time.perf_counter() - self._inicio
+
+    def marcar_cancelada(self):
+        """Marca la llamada como cancelada: el error que provoque cerrar su stream no cuenta como fallo."""
+        self.estado = "cancelada"
+
+    @property
+    def costo_usd(self) -> float:
+        return costo_usd(self.proveedor, self.modelo, self.uso)
+
+
+class ContadorTokens:
+    """
+    Base SQLite con una fila por llamada y consultas agregadas.
+
+    Se puede compartir entre hilos. guardar() solo encola la fila: la escribe
+    un hilo escritor en segundo plano, así registrar una llamada nunca
+    bloquea al que la hizo (ni al bucle de eventos en los generadores
+    asíncronos). Las filas pendientes se escriben antes de cada consulta y al
+    terminar el proceso. La base (y su carpeta) se crea con la primera
+    escritura o consulta.
+    """
+
+    def __init__(self, ruta: str = RUTA_DB):
+        """
+        Args:
+            ruta (str): Archivo SQLite (":memory:" o "0" para no escribir a disco)
+        """
+        self.ruta = ":memory:" if ruta in ("", "0", ":memory:") else ruta
+        self._lock = threading.Lock()
+        self._conexion: Optional[sqlite3.Connection] = None
+        self._pendientes: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._escritor: Optional[threading.Thread] = None
+
+    def _conectar(self) -> sqlite3.Connection:
+        """Abre la base y crea la tabla en el primer uso (con self._lock tomado)."""
+        if self._conexion is None:
+            if self.ruta != ":memory:":
+                Path(self.ruta).parent.mkdir(parents=True, exist_ok=True)
+            conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+            with conexion:
+                if self.ruta != ":memory:":
+                    conexion.execute("PRAGMA journal_mode=WAL")
+                conexion.executescript("""
+                    CREATE TABLE IF NOT EXISTS llamadas (
+                        id INTEGER PRIMARY KEY,
+                        instante REAL NOT NULL,
+                        dia TEXT NOT NULL,
+                        proveedor TEXT NOT NULL,
+                        modelo TEXT NOT NULL,
+                        funcion TEXT NOT NULL,
+                        sesion TEXT,
+                        tokens_prompt INTEGER,
+                        tokens_generados INTEGER,
+                        tokens_cache INTEGER,
+                        latencia REAL NOT NULL,
+                        primer_token REAL,
+                        costo_usd REAL NOT NULL,
+                        estado TEXT NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_llamadas_dia ON llamadas (dia);
+                    CREATE INDEX IF NOT EXISTS idx_llamadas_funcion ON llamadas (funcion);
+                    CREATE INDEX IF NOT EXISTS idx_llamadas_sesion ON llamadas (sesion);
+                """)
+            self._conexion = conexion
+        return self._conexion
+
+    def guardar(self, llamada: LlamadaLLM):
+        """Encola una llamada terminada para que la escriba el hilo escritor."""
+        ahora = time.time()
+        fila = (ahora, time.strftime("%Y-%m-%d", time.localtime(ahora)),
+                llamada.proveedor, llamada.modelo, llamada.funcion, llamada.sesion,
+                llamada.uso.get("prompt"), llamada.uso.get("generados"), llamada.uso.get("cache"),
+                llamada.latencia, llamada.primer_token, llamada.costo_usd, llamada.estado)
+        if self._escritor is None:
+            with self._lock:
+                if self._escritor is None:
+                    self._escritor = threading.Thread(target=self._escribir, name="contabilidad-llm",
+                                                      daemon=True)
+                    self._escritor.start()
+                    atexit.register(self.vaciar)
+        self._pendientes.put(fila)
+
+    def _escribir(self):
+        """Hilo escritor: inserta en una sola transacción todas las filas encoladas."""
+        while True:
+            filas = [self._pendientes.get()]
+            while True:
+                try:
+                    filas.append(self._pendientes.get_nowait())
+                except queue.Empty:
+                    break
+            fin = None in filas
+            try:
+                with self._lock:
+                    conexion = self._conectar()
+                    with conexion:
+                        conexion.executemany(
+                            "INSERT INTO llamadas (instante, dia, proveedor, modelo, funcion, sesion, "
+                            "tokens_prompt, tokens_generados, tokens_cache, latencia, primer_token, "
+                            "costo_usd, estado) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [fila for fila in filas if fila is not None])
+            except Exception as e:
+                print(f"⚠️ No se pudo registrar el uso de tokens: {e}")
+            finally:
+                for _ in filas:
+                    self._pendientes.task_done()
+            if fin:
+                return
+
+    def vaciar(self):
+        """Espera a que el hilo escritor guarde todas las filas encoladas."""
+        if self._escritor is not None and self._escritor.is_alive():
+            self._pendientes.join()
+
+    def resumen(self, por: str = "funcion", dias: Optional[int] = None,
+                sesion: Optional[str] = None) -> List[Dict]:
+        """
+        Totales agrupados por una columna.
+
+        Args:
+            por (str): funcion, sesion, dia, modelo o proveedor
+            dias (int): Solo las llamadas de los últimos N días (None = todas)
+            sesion (str): Solo las llamadas de esa sesión (None = todas)
+
+        Returns:
+            list: Un diccionario por grupo, del más caro al más barato
+        """
+        if por not in ("funcion", "sesion", "dia", "modelo", "proveedor"):
+            raise ValueError(f"No se puede agrupar por '{por}'")
+        condiciones, parametros = [], []
+        if dias is not None:
+            condiciones.append("instante >= ?")
+            parametros.append(time.time() - dias * 86400)
+        if sesion is not None:
+            condiciones.append("sesion = ?")
+            parametros.append(sesion)
+        filtro = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        consulta = f"""
+            SELECT {por}, COUNT(*), SUM(estado = 'error'),
+                   COALESCE(SUM(tokens_prompt), 0), COALESCE(SUM(tokens_generados), 0),
+                   COALESCE(SUM(tokens_cache), 0), SUM(costo_usd), AVG(latencia), AVG(primer_token)
+            FROM llamadas {filtro} GROUP BY {por} ORDER BY SUM(costo_usd) DESC, COUNT(*) DESC
+        """
+        self.vaciar()
+        with self._lock:
+            filas = self._conectar().execute(consulta, parametros).fetchall()
+        columnas = (por, "llamadas", "fallidas", "tokens_prompt", "tokens_generados",
+                    "tokens_cache", "costo_usd", "latencia_media", "primer_token_medio")
+        return [dict(zip(columnas, fila)) for fila in filas]
+
+    def metricas_prometheus(self) -> str:
+        """Totales acumulados en el formato de texto de Prometheus."""
+        self.vaciar()
+        with self._lock:
+            conexion = self._conectar()
+            totales = conexion.execute("""
+                SELECT proveedor, modelo, funcion, estado, COUNT(*),
+                       COALESCE(SUM(tokens_prompt), 0), COALESCE(SUM(tokens_generados), 0),
+                       COALESCE(SUM(tokens_cache), 0), SUM(costo_usd),
+                       SUM(latencia), COALESCE(SUM(primer_token), 0), COUNT(primer_token)
+                FROM llamadas GROUP BY proveedor, modelo, funcion, estado
+            """).fetchall()
+            cubetas = conexion.execute(
+                "SELECT proveedor, modelo, funcion, "
+                + ", ".join(f"SUM(latencia <= {limite})" for limite in CUBETAS_LATENCIA)
+                + ", COUNT(*), SUM(latencia) FROM llamadas GROUP BY proveedor, modelo, funcion"
+            ).fetchall()
+
+        def etiquetas(**valores) -> str:
+            pares = (f'{k}="{_escapar(v)}"' for k, v in valores.items())
+            return "{" + ",".join(pares) + "}"
+
+        lineas = [
+            "# HELP llm_llamadas_total Llamadas a modelos de lenguaje",
+            "# TYPE llm_llamadas_total counter",
+        ]
+        for proveedor, modelo, funcion, estado, n, *_ in totales:
+            lineas.append(f"llm_llamadas_total{etiquetas(proveedor=proveedor, modelo=modelo, funcion=funcion, estado=estado)} {n}")
+
+        lineas += ["# HELP llm_tokens_total Tokens procesados (prompt incluye los de caché)",
+                   "# TYPE llm_tokens_total counter"]
+        for proveedor, modelo, funcion, estado, _, prompt, generados, cache, *_ in totales:
+            base = dict(proveedor=proveedor, modelo=modelo, funcion=funcion, estado=estado)
+            for tipo, valor in (("prompt", prompt), ("generados", generados), ("cache", cache)):
+                lineas.append(f"llm_tokens_total{etiquetas(**base, tipo=tipo)} {valor}")
+
+        lineas += ["# HELP llm_costo_usd_total Costo estimado en dólares",
+                   "# TYPE llm_costo_usd_total counter"]
+        for proveedor, modelo, funcion, estado, _, _, _, _, costo, *_ in totales:
+            lineas.append(f"llm_costo_usd_total{etiquetas(proveedor=proveedor, modelo=modelo, funcion=funcion, estado=estado)} {costo:.8f}")
+
+        lineas += ["# HELP llm_primer_token_segundos Latencia hasta el primer token",
+                   "# TYPE llm_primer_token_segundos summary"]
+        for proveedor, modelo, funcion, estado, *_, suma_primer, n_primer in totales:
+            base = etiquetas(proveedor=proveedor, modelo=modelo, funcion=funcion, estado=estado)
+            lineas.append(f"llm_primer_token_segundos_sum{base} {suma_primer:.6f}")
+            lineas.append(f"llm_primer_token_segundos_count{base} {n_primer}")
+
+        lineas += ["# HELP llm_latencia_segundos Latencia total de cada llamada",
+                   "# TYPE llm_latencia_segundos histogram"]
+        for proveedor, modelo, funcion, *conteos, n, suma in cubetas:
+            base = dict(proveedor=proveedor, modelo=modelo, funcion=funcion)
+            for limite, conteo in zip(CUBETAS_LATENCIA, conteos):
+                lineas.append(f"llm_latencia_segundos_bucket{etiquetas(**base, le=limite)} {conteo}")
+            lineas.append(f"llm_latencia_segundos_bucket{etiquetas(**base, le='+Inf')} {n}")
+            lineas.append(f"llm_latencia_segundos_sum{etiquetas(**base)} {suma:.6f}")
+            lineas.append(f"llm_latencia_segundos_count{etiquetas(**base)} {n}")
+        return "\n".join(lineas) + "\n"
+
+    def cerrar(self):
+        """Escribe las filas pendientes, detiene el hilo escritor y cierra la base."""
+        if self._escritor is not None and self._escritor.is_alive():
+            self._pendientes.put(None)
+            self._escritor.join()
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
+
+def _escapar(valor) -> str:
+    """Escapa el valor de una etiqueta de Prometheus."""
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# ============================================================================
+# CONTADOR COMPARTIDO Y REGISTRO DE LLAMADAS
+# ============================================================================
+
+_contador: Optional[ContadorTokens] = None
+_lock_contador = threading.Lock()
+
+
+def obtener_contador() -> ContadorTokens:
+    """
+    Contador compartido por todo el proceso, creado en el primer uso.
+
+    Si LLM_METRICAS_PUERTO está definida, arranca también el endpoint /metrics.
+    """
+    global _contador
+    if _contador is None:
+        with _lock_contador:
+            if _contador is None:
+                contador = ContadorTokens(RUTA_DB)
+                if PUERTO_METRICAS:
+                    servir_metricas(contador, puerto=int(PUERTO_METRICAS))
+                _contador = contador
+    return _contador
+
+
+@contextmanager
+def registrar_llamada(proveedor: str, modelo: str, funcion: str,
+                      sesion: Optional[str] = None) -> Iterator[LlamadaLLM]:
+    """
+    Mide y guarda una llamada a un modelo.
+
+    Ejemplo:
+        with registrar_llamada("openai", MODEL, "folleto") as llamada:
+            respuesta = openai.chat.completions.create(...)
+            llamada.registrar_uso(uso_openai(respuesta.usage))
+
+    Si el bloque lanza una excepción la llamada se guarda como "error" (o
+    "cancelada" si el consumidor abandonó un generador o la llamada se marcó
+    con marcar_cancelada) y la excepción sigue.
+    Guardar solo encola la fila (no bloquea, tampoco dentro de generadores
+    asíncronos) y un fallo al guardar nunca interrumpe al programa.
+    """
+    llamada = LlamadaLLM(proveedor, modelo, funcion, sesion)
+    try:
+        yield llamada
+    except GeneratorExit:
+        llamada.estado = "cancelada"
+        raise
+    except BaseException:
+        if llamada.estado != "cancelada":
+            llamada.estado = "error"
+        raise
+    finally:
+        llamada.latencia = time.perf_counter() - llamada._inicio
+        try:
+            obtener_contador().guardar(llamada)
+        except Exception as e:
+            print(f"⚠️ No se pudo registrar el uso de tokens: {e}")
+
+# ============================================================================
+# ENDPOINT DE PROMETHEUS
+# ============================================================================
+
+def servir_metricas(contador: ContadorTokens, host: str = "127.0.0.1",
+                    puerto: int = 9464) -> ThreadingHTTPServer:
+    """
+    Sirve /metrics en un hilo en segundo plano.
+
+    Returns:
+        ThreadingHTTPServer: Servidor en marcha (server_address trae el puerto real)
+    """
+    class ManejadorMetricas(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            cuerpo = contador.metricas_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass   # Sin una línea por cada consulta de Prometheus
+
+    servidor = ThreadingHTTPServer((host, puerto), ManejadorMetricas)
+    threading.Thread(target=servidor.serve_forever, name="metricas-llm", daemon=True).start()
+    print(f"📈 Métricas de uso de LLM en http://{host}:{servidor.server_address[1]}/metrics")
+    return servidor
+
+# ============================================================================
+# FUNCIÓN PRINCIPAL
+# ============================================================================
+
+def main():
+    """Muestra el resumen de uso o sirve las métricas."""
+    parser = argparse.ArgumentParser(description="Uso de tokens y costos de las llamadas a modelos")
+    parser.add_argument("--db", default=RUTA_DB, help="Base SQLite de llamadas")
+    parser.add_argument("--por", default="funcion", choices=["funcion", "sesion", "dia", "modelo", "proveedor"])
+    parser.add_argument("--dias", type=int, help="Solo los últimos N días")
+    parser.add_argument("--servir", type=int, metavar="PUERTO", help="Servir /metrics en este puerto")
+    args = parser.parse_args()
+
+    contador = ContadorTokens(args.db)
+    if args.servir:
+        servidor = servir_metricas(contador, host="0.0.0.0", puerto=args.servir)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            servidor.shutdown()
+        return
+
+    filas = contador.resumen(args.por, args.dias)
+    print(f"💰 USO DE MODELOS POR {args.por.upper()} ({args.db})")
+    print("=" * 96)
+    print(f"{args.por:<24} {'llamadas':>8} {'fallidas':>8} {'prompt':>10} {'caché':>9} "
+          f"{'generados':>10} {'costo USD':>10} {'latencia':>9}")
+    for fila in filas:
+        print(f"{str(fila[args.por])[:24]:<24} {fila['llamadas']:>8} {fila['fallidas']:>8} "
+              f"{fila['tokens_prompt']:>10} {fila['tokens_cache']:>9} {fila['tokens_generados']:>10} "
+              f"{fila['costo_usd']:>10.4f} {fila['latencia_media']:>8.2f}s")
+    print("=" * 96)
+    print(f"Total: {sum(f['llamadas'] for f in filas)} llamadas, "
+          f"{sum(f['costo_usd'] for f in filas):.4f} USD")
+
+if __name__ == "__main__":
+    main()
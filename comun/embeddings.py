@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Embeddings Locales e Índice Vectorial
+Convierte textos cortos (preguntas, ejemplos) en vectores para buscar los más
+parecidos sin llamar a ninguna API.
+
+Este módulo proporciona:
+1. Un modelo de embeddings con sentence-transformers si está instalado
+2. Un modelo de respaldo sin dependencias (n-gramas de caracteres con hashing)
+3. Un índice vectorial en memoria con búsqueda por similitud coseno
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import hashlib              # Para repartir los n-gramas entre las dimensiones
+import importlib.util       # Para detectar dependencias opcionales sin importarlas
+import math                 # Para normalizar los vectores
+import re                   # Para limpiar el texto
+import threading            # Para cargar el modelo una sola vez
+import unicodedata          # Para quitar acentos
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+# Dependencias opcionales. Solo se comprueba que estén instaladas: importarlas
+# (torch en el caso de sentence-transformers) tarda segundos y se hace en el
+# primer uso, no al arrancar el tutor.
+# sentence-transformers da mejores resultados con paráfrasis
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+# numpy acelera la búsqueda en índices grandes
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+# Modelo multilingüe pequeño (funciona en CPU y entiende español)
+MODELO_SENTENCE_TRANSFORMERS = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+DIMENSION_HASH = 1024          # Dimensiones del modelo de respaldo
+TAMANOS_NGRAMA = (3, 4)        # n-gramas de caracteres usados por el respaldo
+
+# Artículos y preposiciones frecuentes: no distinguen una pregunta de otra
+PALABRAS_VACIAS = {
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "lo", "de", "del", "al",
+    "a", "en", "y", "o", "mi", "me", "se", "the", "an", "of", "to", "and", "le",
+    "les", "des", "du", "il", "i", "gli", "der", "die", "das", "ein", "eine", "os",
+}
+
+Vector = List[float]
+
+# ============================================================================
+# MODELOS DE EMBEDDINGS
+# ============================================================================
+
+def normalizar_texto(texto: str) -> str:
+    """Pasa a minúsculas y quita acentos, signos de puntuación y palabras vacías."""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    palabras = re.sub(r'[^\w]+', ' ', texto).split()
+    return " ".join(p for p in palabras if p not in PALABRAS_VACIAS)
+
+
+class EmbeddingsHash:
+    """
+    Modelo de embeddings sin dependencias basado en n-gramas de caracteres.
+
+    No entiende sinónimos, pero reconoce muy bien las preguntas casi idénticas
+    (mayúsculas, acentos, signos o palabras sueltas distintas), que es lo más
+    habitual cuando muchos estudiantes preguntan lo mismo.
+    """
+
+    nombre = "hash-ngramas"
+    # Similitud a partir de la cual dos preguntas son "la misma". Los
+    # n-gramas puntúan alto a preguntas que difieren en una palabra
+    # ("pin 12" frente a "pin 13" da 0.85): solo se aceptan las que cambian
+    # en acentos, signos, mayúsculas o palabras vacías
+    umbral_sugerido = 0.95
+
+    def __init__(self, dimension: int = DIMENSION_HASH):
+        self.dimension = dimension
+
+    def codificar(self, textos: Sequence[str]) -> List[Vector]:
+        """
+        Convierte textos en vectores normalizados.
+
+        Args:
+            textos (list): Textos a codificar
+
+        Returns:
+            list: Un vector de longitud 1 por texto
+        """
+        return [self._codificar(texto) for texto in textos]
+
+    def _codificar(self, texto: str) -> Vector:
+        vector = [0.0] * self.dimension
+        limpio = normalizar_texto(texto)
+        relleno = f" {limpio} "
+        rasgos = [relleno[i:i + n] for n in TAMANOS_NGRAMA for i in range(len(relleno) - n + 1)]
+        rasgos += [f"#{palabra}" for palabra in limpio.split()]   # Palabras completas
+        for rasgo in rasgos:
+            digest = hashlib.blake2b(rasgo.encode('utf-8'), digest_size=8).digest()
+            valor = int.from_bytes(digest, 'little')
+            # El bit de signo reduce el sesgo de las colisiones
+            vector[valor % self.dimension] += 1.0 if valor >> 63 else -1.0
+        return _normalizar(vector)
+
+
+class EmbeddingsSentenceTransformers:
+    """Modelo de embeddings local con sentence-transformers."""
+
+    nombre = "sentence-transformers"
+    umbral_sugerido = 0.9
+
+    def __init__(self, modelo: str = MODELO_SENTENCE_TRANSFORMERS):
+        from sentence_transformers import SentenceTransformer   # Importación diferida (lenta)
+        self.nombre = f"sentence-transformers:{modelo}"
+        self._modelo = SentenceTransformer(modelo)
+
+    def codificar(self, textos: Sequence[str]) -> List[Vector]:
+        vectores = self._modelo.encode(list(textos), normalize_embeddings=True)
+        return [list(map(float, v)) for v in vectores]
+
+
+_modelo_defecto = None
+_modelo_lock = threading.Lock()
+
+
+def obtener_modelo_embeddings():
+    """
+    Devuelve el modelo de embeddings compartido por el proceso.
+
+    Usa sentence-transformers si está instalado y, si no (o si falla al
+    cargar), el modelo de n-gramas.
+
+    Returns:
+        Modelo con codificar(textos) y umbral_sugerido
+    """
+    global _modelo_defecto
+    if _modelo_defecto is None:
+        with _modelo_lock:
+            if _modelo_defecto is None:
+                modelo = None
+                if SENTENCE_TRANSFORMERS_AVAILABLE:
+                    try:
+                        modelo = EmbeddingsSentenceTransformers()
+                    except Exception as e:
+                        print(f"⚠️ No se pudo cargar sentence-transformers ({e}), usando n-gramas")
+                _modelo_defecto = modelo or EmbeddingsHash()
+    return _modelo_defecto
+
+# ============================================================================
+# ÍNDICE VECTORIAL
+# ============================================================================
+
+def similitud_coseno(a: Vector, b: Vector) -> float:
+    """Similitud coseno entre dos vectores ya normalizados."""
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _normalizar(vector: Vector) -> Vector:
+    norma = math.sqrt(sum(x * x for x in vector))
+    return [x / norma for x in vector] if norma else vector
+
+
+class IndiceVectorial:
+    """
+    Índice vectorial plano en memoria.
+
+    La búsqueda es exhaustiva, suficiente para los cientos o pocos miles de
+    entradas de un aula; con numpy se calcula como un producto de matrices.
+    """
+
+    def __init__(self):
+        self._claves: List[Hashable] = []
+        self._vectores: List[Vector] = []
+        self._posicion: Dict[Hashable, int] = {}
+        self._matriz = None   # Caché de numpy, se invalida al modificar el índice
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def agregar(self, clave: Hashable, vector: Vector):
+        """Agrega o reemplaza el vector de una clave."""
+        if clave in self._posicion:
+            self._vectores[self._posicion[clave]] = vector
+        else:
+            self._posicion[clave] = len(self._claves)
+            self._claves.append(clave)
+            self._vectores.append(vector)
+        self._matriz = None
+
+    def eliminar(self, clave: Hashable):
+        """Elimina una clave (intercambiándola con la última para no desplazar)."""
+        posicion = self._posicion.pop(clave, None)
+        if posicion is None:
+            return
+        ultima = len(self._claves) - 1
+        if posicion != ultima:
+            self._claves[posicion] = self._claves[ultima]
+            self._vectores[posicion] = self._vectores[ultima]
+            self._posicion[self._claves[posicion]] = posicion
+        self._claves.pop()
+        self._vectores.pop()
+        self._matriz = None
+
+    def buscar(self, vector: Vector, k: int = 1) -> List[Tuple[Hashable, float]]:
+        """
+        Busca las k claves más parecidas a un vector.
+
+        Args:
+            vector (list): Vector de consulta normalizado
+            k (int): Número de resultados
+
+        Returns:
+            list: Pares (clave, similitud) ordenados de mayor a menor similitud
+        """
+        if not self._claves:
+            return []
+        if NUMPY_AVAILABLE:
+            import numpy as np
+            if self._matriz is None:
+                self._matriz = np.asarray(self._vectores, dtype=np.float32)
+            puntuaciones = (self._matriz @ np.asarray(vector, dtype=np.float32)).tolist()
+        else:
+            puntuaciones = [similitud_coseno(v, vector) for v in self._vectores]
+        mejores = sorted(range(len(puntuaciones)), key=puntuaciones.__getitem__, reverse=True)[:k]
+        return [(self._claves[i], float(puntuaciones[i])) for i in mejores]
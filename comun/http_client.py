@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Cliente HTTP Compartido para los Scrapers
+Un único punto de acceso HTTP para el generador de folletos y los scrapers.
+
+Este módulo proporciona:
+1. Un pool de conexiones por host reutilizado entre peticiones
+2. Timeouts de conexión y de lectura en todas las peticiones
+3. Reintentos con backoff exponencial y jitter en métodos idempotentes
+4. Descompresión transparente de gzip/deflate (y brotli si está instalado)
+5. Límite del tamaño máximo del cuerpo de cada respuesta
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import threading            # Para crear el cliente por defecto una sola vez
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+import requests                         # Cliente HTTP de alto nivel
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry    # Política de reintentos de urllib3
+
+# brotli es opcional: urllib3 lo usa automáticamente si está instalado
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+# ============================================================================
+# CONFIGURACIÓN POR DEFECTO
+# ============================================================================
+
+DEFAULT_TIMEOUT = (5.0, 20.0)          # (conexión, lectura) en segundos
+DEFAULT_MAX_BODY_BYTES = 5 * 1024 * 1024   # 5 MB por respuesta
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5           # 0.5s, 1s, 2s...
+DEFAULT_BACKOFF_JITTER = 0.5           # Hasta 0.5s aleatorios extra por reintento
+POOL_HOSTS = 32                        # Número de hosts con pool propio
+POOL_CONNECTIONS_PER_HOST = 10         # Conexiones reutilizables por host
+CHUNK_SIZE = 16 * 1024
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# ============================================================================
+# EXCEPCIONES
+# ============================================================================
+
+class ResponseTooLarge(requests.RequestException):
+    """El cuerpo de la respuesta supera el tamaño máximo permitido."""
+
+# ============================================================================
+# LECTURA ACOTADA DEL CUERPO
+# ============================================================================
+
+def iter_body(response: requests.Response, max_bytes: Optional[int],
+              chunk_size: int = CHUNK_SIZE, truncate: bool = False) -> Iterator[bytes]:
+    """
+    Itera el cuerpo (ya descomprimido) de una respuesta en streaming.
+
+    Args:
+        response (requests.Response): Respuesta obtenida con stream=True
+        max_bytes (int): Máximo de bytes a leer (None = sin límite)
+        chunk_size (int): Tamaño de cada bloque
+        truncate (bool): Si es True, al llegar al límite se deja de leer en
+            lugar de lanzar una excepción
+
+    Yields:
+        bytes: Bloques del cuerpo
+
+    Raises:
+        ResponseTooLarge: Si el cuerpo supera max_bytes y truncate es False
+    """
+    if not truncate:
+        _check_content_length(response, max_bytes)
+    received = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if max_bytes is not None and received + len(chunk) > max_bytes:
+            if truncate:
+                yield chunk[:max_bytes - received]
+                return
+            raise ResponseTooLarge(f"{response.url}: el cuerpo supera {max_bytes} bytes")
+        received += len(chunk)
+        yield chunk
+
+
+class BoundedReader:
+    """
+    Objeto tipo archivo sobre el cuerpo de una respuesta con límite de bytes.
+
+    Útil para parsers que consumen un archivo (por ejemplo iterparse de XML)
+    sin cargar toda la respuesta en memoria.
+    """
+
+    def __init__(self, response: requests.Response, max_bytes: Optional[int]):
+        _check_content_length(response, max_bytes)
+        response.raw.decode_content = True  # Descomprimir gzip/deflate/br al leer
+        self._raw = response.raw
+        self._url = response.url
+        self._max_bytes = max_bytes
+        self._received = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            # Leer hasta el final, bloque a bloque, para aplicar el límite
+            return b"".join(iter(lambda: self.read(CHUNK_SIZE), b""))
+        data = self._raw.read(size)
+        self._received += len(data)
+        if self._max_bytes is not None and self._received > self._max_bytes:
+            raise ResponseTooLarge(f"{self._url}: el cuerpo supera {self._max_bytes} bytes")
+        return data
+
+
+def _check_content_length(response: requests.Response, max_bytes: Optional[int]):
+    """Rechaza de inmediato las respuestas que declaran un tamaño excesivo."""
+    declared = response.headers.get('Content-Length')
+    if max_bytes is not None and declared and declared.isdigit() and int(declared) > max_bytes:
+        raise ResponseTooLarge(f"{response.url}: Content-Length {declared} supera {max_bytes} bytes")
+
+# ============================================================================
+# CLIENTE HTTP
+# ============================================================================
+
+class HttpClient:
+    """
+    Cliente HTTP con pool de conexiones, timeouts, reintentos y límite de tamaño.
+
+    Es seguro compartir una instancia entre hilos para peticiones GET/HEAD.
+    """
+
+    def __init__(self,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 max_retries: int = DEFAULT_RETRIES,
+                 backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                 backoff_jitter: float = DEFAULT_BACKOFF_JITTER,
+                 pool_hosts: int = POOL_HOSTS,
+                 pool_per_host: int = POOL_CONNECTIONS_PER_HOST,
+                 max_body_bytes: Optional[int] = DEFAULT_MAX_BODY_BYTES,
+                 headers: Optional[dict] = None):
+        """
+        Inicializa el cliente.
+
+        Args:
+            timeout (tuple): Timeouts (conexión, lectura) en segundos
+            max_retries (int): Reintentos ante errores de red o códigos 429/5xx
+            backoff_factor (float): Factor del backoff exponencial entre reintentos
+            backoff_jitter (float): Segundos aleatorios máximos añadidos al backoff
+            pool_hosts (int): Número de hosts distintos con pool de conexiones
+            pool_per_host (int): Conexiones reutilizables por host
+            max_body_bytes (int): Tamaño máximo del cuerpo (None = sin límite)
+            headers (dict): Cabeceras por defecto adicionales
+        """
+        self.timeout = timeout
+        self.max_body_bytes = max_body_bytes
+
+        # Solo se reintentan métodos idempotentes (GET, HEAD, PUT, DELETE, OPTIONS, TRACE)
+        retry_kwargs = dict(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        try:
+            retry = Retry(backoff_jitter=backoff_jitter, **retry_kwargs)
+        except TypeError:
+            # urllib3 < 2.0 no soporta jitter: se usa backoff exponencial puro
+            retry = Retry(**retry_kwargs)
+
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_per_host,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(self, url: str, max_bytes: Optional[int] = None, **kwargs) -> requests.Response:
+        """
+        Realiza una petición GET y descarga el cuerpo respetando el límite de tamaño.
+
+        Args:
+            url (str): URL a descargar
+            max_bytes (int): Límite para esta petición (por defecto el del cliente)
+            **kwargs: Argumentos adicionales para requests (headers, params...)
+
+        Returns:
+            requests.Response: Respuesta con el contenido ya descargado
+
+        Raises:
+            ResponseTooLarge: Si el cuerpo supera el límite
+            requests.RequestException: Si la petición falla tras los reintentos
+        """
+        limit = self.max_body_bytes if max_bytes is None else max_bytes
+        kwargs.setdefault('timeout', self.timeout)
+        response = self.session.get(url, stream=True, **kwargs)
+        try:
+            response._content = b"".join(iter_body(response, limit))
+        finally:
+            response.close()
+        return response
+
+    @contextmanager
+    def stream(self, url: str, **kwargs) -> Iterator[requests.Response]:
+        """
+        Abre una petición GET en streaming; la conexión vuelve al pool al salir.
+
+        Usar junto con iter_body() o BoundedReader para leer el cuerpo acotado.
+
+        Args:
+            url (str): URL a descargar
+            **kwargs: Argumentos adicionales para requests
+
+        Yields:
+            requests.Response: Respuesta cuyo cuerpo aún no se ha leído
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        response = self.session.get(url, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            response.close()
+
+    def close(self):
+        """Cierra todas las conexiones del pool."""
+        self.session.close()
+
+# ============================================================================
+# CLIENTE POR DEFECTO
+# ============================================================================
+
+_default_client: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def get_default_client() -> HttpClient:
+    """
+    Devuelve el cliente HTTP compartido por todo el proceso.
+
+    Returns:
+        HttpClient: Instancia única creada en el primer uso
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = HttpClient()
+    return _default_client
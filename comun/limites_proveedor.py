@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Límites de Peticiones por Proveedor de Modelos
+Reparte las llamadas a OpenAI, Anthropic y Gemini según los límites de cada
+proveedor, en lugar de esperar un tiempo fijo entre llamadas.
+
+Este módulo:
+1. Limita las peticiones por minuto con un cubo de fichas (token bucket)
+2. Limita las llamadas simultáneas a cada proveedor
+3. Comparte un limitador por proveedor en todo el proceso (entre hilos)
+
+Variables de entorno (opcionales), por ejemplo para Gemini:
+    LIMITE_GEMINI_POR_MINUTO=15
+    LIMITE_GEMINI_CONCURRENTES=2
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import os                   # Para variables de entorno
+import threading            # Para compartir los limitadores entre hilos
+import time                 # Para reponer las fichas
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+# (peticiones por minuto, llamadas simultáneas) por proveedor. Valores
+# prudentes para cuentas nuevas; se ajustan con variables de entorno.
+LIMITES: Dict[str, Tuple[float, int]] = {
+    "openai": (500, 8),
+    "anthropic": (50, 4),
+    "gemini": (15, 4),
+    "ollama": (6000, 1),     # Un modelo local atiende mejor de una en una
+}
+LIMITE_POR_DEFECTO = (60, 4)
+
+# ============================================================================
+# LIMITADOR
+# ============================================================================
+
+class LimitadorProveedor:
+    """
+    Cubo de fichas más semáforo de concurrencia para un proveedor.
+
+    Cada llamada consume una ficha; las fichas se reponen a razón de
+    por_minuto / 60 por segundo, con una ráfaga máxima igual al número de
+    llamadas simultáneas. Así unas pocas llamadas seguidas no esperan nada y
+    una conversación larga no supera el límite del proveedor.
+    """
+
+    def __init__(self, nombre: str, por_minuto: float, max_concurrentes: int):
+        """
+        Args:
+            nombre (str): Proveedor (para los mensajes)
+            por_minuto (float): Peticiones máximas por minuto
+            max_concurrentes (int): Llamadas simultáneas máximas
+        """
+        self.nombre = nombre
+        self.por_segundo = por_minuto / 60
+        self.capacidad = max(1, max_concurrentes)
+        self._fichas = float(self.capacidad)
+        self._ultima = time.monotonic()
+        self._lock = threading.Lock()
+        self._semaforo = threading.BoundedSemaphore(self.capacidad)
+
+    def _esperar_ficha(self):
+        """Bloquea hasta que haya una ficha disponible y la consume."""
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._fichas = min(self.capacidad, self._fichas + (ahora - self._ultima) * self.por_segundo)
+                self._ultima = ahora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.por_segundo
+            time.sleep(espera)
+
+    @contextmanager
+    def turno(self):
+        """Espera turno (concurrencia y ritmo) y lo libera al salir del bloque."""
+        with self._semaforo:
+            self._esperar_ficha()
+            yield
+
+# ============================================================================
+# LIMITADORES COMPARTIDOS
+# ============================================================================
+
+_limitadores: Dict[str, LimitadorProveedor] = {}
+_lock_limitadores = threading.Lock()
+
+
+def obtener_limitador(proveedor: str) -> LimitadorProveedor:
+    """
+    Limitador compartido de un proveedor, creado en el primer uso.
+
+    Args:
+        proveedor (str): openai, anthropic, gemini u ollama
+    """
+    with _lock_limitadores:
+        if proveedor not in _limitadores:
+            por_minuto, concurrentes = LIMITES.get(proveedor, LIMITE_POR_DEFECTO)
+            prefijo = f"LIMITE_{proveedor.upper()}"
+            _limitadores[proveedor] = LimitadorProveedor(
+                proveedor,
+                float(os.getenv(f"{prefijo}_POR_MINUTO", por_minuto)),
+                int(os.getenv(f"{prefijo}_CONCURRENTES", concurrentes)),
+            )
+        return _limitadores[proveedor]
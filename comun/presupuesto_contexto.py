@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Presupuesto de Tokens de Entrada por Modelo
+max_tokens limita lo que genera el modelo, pero no lo que se le envía: en una
+conversación larga cada turno manda más historial, es más lento, cuesta más
+y puede acabar pasando de la ventana de contexto de modelos pequeños.
+
+Este módulo:
+1. Conoce la ventana de contexto de cada modelo (por prefijo del nombre)
+2. Cuenta tokens con tiktoken si está instalado (modelos de OpenAI) o con
+   una aproximación rápida por caracteres en los demás casos
+3. Antes de cada llamada, condensa los turnos más antiguos en una nota con
+   un extracto de cada uno hasta que el historial cabe en el presupuesto,
+   conservando el sistema/tema del inicio y los últimos mensajes
+4. Avisa de cada recorte y acumula los tokens ahorrados
+
+Variables de entorno (opcionales):
+    LLM_PRESUPUESTO_ENTRADA=8000
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import importlib.util       # Para detectar tiktoken sin importarlo
+import math
+import os                   # Para variables de entorno
+import re                   # Para extraer la primera frase de cada turno
+import threading            # Para acumular estadísticas desde varios hilos
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+PRESUPUESTO_ENTRADA = int(os.getenv("LLM_PRESUPUESTO_ENTRADA", 8000))   # Tokens de entrada por llamada
+
+# Ventana de contexto en tokens, por prefijo del nombre del modelo
+LIMITES_CONTEXTO: Dict[str, int] = {
+    "gpt-4o-mini": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4.1": 1_047_576,
+    "gpt-5": 400_000,
+    "gpt-4": 8_192,
+    "claude-3-haiku": 200_000,
+    "claude-3-5-haiku": 200_000,
+    "claude-sonnet-4": 200_000,
+    "gemini-2.0-flash": 1_048_576,
+    "gemini-2.5-flash": 1_048_576,
+    "gemini-flash": 1_048_576,
+}
+LIMITE_POR_DEFECTO = 8_192
+
+CARACTERES_POR_TOKEN = 3.5   # Aproximación prudente para español e inglés
+TOKENS_POR_MENSAJE = 4       # Rol y separadores de cada mensaje
+MAX_EXTRACTO = 160           # Caracteres de cada turno condensado
+FRACCION_NOTA = 0.25         # Parte del presupuesto que puede ocupar la nota
+OBJETIVO_RECORTE = 0.75      # Historiales persistentes: al recortar se baja a esta fracción
+CABECERA_NOTA = "[Intervenciones anteriores, condensadas por límite de contexto]"
+
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+Mensaje = dict
+
+# ============================================================================
+# CONTEO DE TOKENS
+# ============================================================================
+
+def limite_contexto(modelo: str) -> int:
+    """Ventana de contexto del modelo (el prefijo más largo que coincida)."""
+    prefijos = [p for p in LIMITES_CONTEXTO if modelo.startswith(p)]
+    return LIMITES_CONTEXTO[max(prefijos, key=len)] if prefijos else LIMITE_POR_DEFECTO
+
+
+@lru_cache(maxsize=None)
+def _codificacion(modelo: str):
+    """Codificación de tiktoken para un modelo de OpenAI (None si no aplica)."""
+    if not TIKTOKEN_AVAILABLE or not modelo.startswith(("gpt-", "o1", "o3", "o4")):
+        return None
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model(modelo)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+@lru_cache(maxsize=8192)
+def _contar_exacto(codificacion, texto: str) -> int:
+    # Los turnos ya contados no se vuelven a codificar en las siguientes llamadas
+    return len(codificacion.encode(texto, disallowed_special=()))
+
+
+def contar_tokens(texto: str, modelo: str) -> int:
+    """Tokens de un texto: exactos con tiktoken, aproximados si no."""
+    codificacion = _codificacion(modelo)
+    if codificacion is not None:
+        return _contar_exacto(codificacion, texto)
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def tokens_mensaje(mensaje: Mensaje, modelo: str) -> int:
+    """Tokens de un mensaje en formato chat ("content") o de Gemini ("parts")."""
+    partes = mensaje["parts"] if "parts" in mensaje else [mensaje.get("content") or ""]
+    return TOKENS_POR_MENSAJE + sum(contar_tokens(str(parte), modelo) for parte in partes)
+
+
+def tokens_mensajes(mensajes: Sequence[Mensaje], modelo: str) -> int:
+    return sum(tokens_mensaje(mensaje, modelo) for mensaje in mensajes)
+
+# ============================================================================
+# ESTADÍSTICAS DE RECORTE
+# ============================================================================
+
+@dataclass
+class Recorte:
+    """Resultado de ajustar un historial al presupuesto."""
+    modelo: str
+    tokens_antes: int
+    tokens_despues: int
+    condensados: int         # Mensajes sustituidos por la nota
+
+    @property
+    def ahorrados(self) -> int:
+        return self.tokens_antes - self.tokens_despues
+
+    def __str__(self) -> str:
+        return (f"✂️ Contexto para {self.modelo}: {self.tokens_antes:,} → {self.tokens_despues:,} "
+                f"tokens (-{self.ahorrados:,}, {self.condensados} mensajes condensados)")
+
+
+_estadisticas = {"recortes": 0, "tokens_ahorrados": 0}
+_lock_estadisticas = threading.Lock()
+
+
+def estadisticas_recorte() -> Dict[str, int]:
+    """Recortes hechos y tokens de entrada ahorrados en este proceso."""
+    with _lock_estadisticas:
+        return dict(_estadisticas)
+
+# ============================================================================
+# AJUSTE DEL HISTORIAL
+# ============================================================================
+
+def _texto(mensaje: Mensaje) -> str:
+    return " ".join(map(str, mensaje["parts"])) if "parts" in mensaje else str(mensaje.get("content") or "")
+
+
+def _extractos(mensaje: Mensaje) -> List[str]:
+    """
+    Líneas de la nota para un turno: la primera frase (recortada) de cada
+    parte. Si el mensaje ya lleva una nota de un ajuste anterior (historiales
+    que se conservan entre llamadas), sus líneas se reutilizan tal cual.
+    """
+    propio = mensaje.get("role") in ("assistant", "model")
+    partes = mensaje["parts"] if "parts" in mensaje else [mensaje.get("content") or ""]
+    lineas = []
+    for parte in map(str, partes):
+        if parte.startswith(CABECERA_NOTA):
+            nota, _, parte = parte.partition("\n\n")
+            lineas += nota.splitlines()[1:]
+        texto = " ".join(parte.split())
+        if not texto:
+            continue
+        frase = re.split(r"(?<=[.!?])\s", texto, maxsplit=1)[0]
+        if len(frase) > MAX_EXTRACTO:
+            frase = frase[:MAX_EXTRACTO].rsplit(" ", 1)[0] + "…"
+        lineas.append(f"- {'(Tú) ' if propio else ''}{frase}")
+    return lineas
+
+
+def _separar_nota(mensaje: Mensaje) -> Tuple[Mensaje, List[str]]:
+    """Copia de un mensaje sin la nota añadida al final en un ajuste anterior, y sus líneas."""
+    if "parts" in mensaje:
+        if mensaje["parts"] and str(mensaje["parts"][-1]).startswith(CABECERA_NOTA):
+            return {**mensaje, "parts": mensaje["parts"][:-1]}, str(mensaje["parts"][-1]).splitlines()[1:]
+        return mensaje, []
+    antes, separador, nota = str(mensaje.get("content") or "").rpartition(f"\n\n{CABECERA_NOTA}")
+    if separador and "\n\n" not in nota:
+        return {**mensaje, "content": antes}, nota.splitlines()[1:]
+    return mensaje, []
+
+
+def _con_nota(mensaje: Mensaje, nota: str, al_final: bool = False) -> Mensaje:
+    """Copia de un mensaje del usuario con la nota antepuesta (o añadida al final)."""
+    if "parts" in mensaje:
+        partes = [*mensaje["parts"], nota] if al_final else [nota, *mensaje["parts"]]
+        return {**mensaje, "parts": partes}
+    contenido = f"{mensaje['content']}\n\n{nota}" if al_final else f"{nota}\n\n{mensaje['content']}"
+    return {**mensaje, "content": contenido}
+
+
+def ajustar_contexto(mensajes: List[Mensaje], modelo: str, max_salida: int = 0,
+                     presupuesto: Optional[int] = None, fijos: Optional[int] = None,
+                     ultimos: int = 2, objetivo: float = 1.0,
+                     avisar: bool = True) -> Tuple[List[Mensaje], Optional[Recorte]]:
+    """
+    Ajusta un historial al presupuesto de entrada del modelo.
+
+    Los mensajes más antiguos (tras los fijos del inicio) se sustituyen por
+    una nota de usuario con la primera frase de cada uno, empezando por el
+    más viejo, hasta que el total cabe. Los fijos y los últimos se conservan
+    enteros, así que si ellos solos superan el presupuesto el resultado
+    también lo supera. Si el último fijo es del usuario, la nota se le añade
+    al final y sustituye a la de un ajuste anterior en lugar de acumularse.
+
+    Args:
+        mensajes (list): Historial en formato chat o de Gemini (no se modifica)
+        modelo (str): Modelo destino (ventana de contexto y tokenizador)
+        max_salida (int): Tokens reservados para la respuesta
+        presupuesto (int): Tokens de entrada máximos (por defecto
+            LLM_PRESUPUESTO_ENTRADA, sin pasar de la ventana del modelo)
+        fijos (int): Mensajes iniciales que nunca se condensan (por defecto,
+            los de sistema del inicio)
+        ultimos (int): Mensajes finales que nunca se condensan
+        objetivo (float): Fracción del presupuesto a la que se reduce al
+            recortar; por debajo de 1 deja margen para varios turnos sin
+            volver a recortar (historiales que se conservan entre llamadas)
+        avisar (bool): Mostrar una línea con los tokens ahorrados
+
+    Returns:
+        tuple: (mensajes, Recorte o None). Si ya cabe, se devuelve la misma
+        lista sin copiarla.
+    """
+    limite = limite_contexto(modelo) - max_salida
+    presupuesto = min(presupuesto or PRESUPUESTO_ENTRADA, limite)
+    if fijos is None:
+        fijos = next((i for i, m in enumerate(mensajes) if m.get("role") != "system"), len(mensajes))
+
+    tokens = [tokens_mensaje(mensaje, modelo) for mensaje in mensajes]
+    total = sum(tokens)
+    if total <= presupuesto:
+        return mensajes, None
+
+    # La nota de un ajuste anterior que quedó en el último fijo se retoma
+    # para sustituirla por la nueva
+    cabeza = list(mensajes[:fijos])
+    en_cabeza = bool(cabeza) and cabeza[-1].get("role") == "user"
+    lineas: List[str] = []
+    ajustado = total
+    if en_cabeza:
+        cabeza[-1], lineas = _separar_nota(cabeza[-1])
+        if lineas:
+            ajustado += tokens_mensaje(cabeza[-1], modelo) - tokens[fijos - 1] \
+                + contar_tokens(CABECERA_NOTA, modelo)
+    tokens_lineas = [contar_tokens(linea, modelo) + 1 for linea in lineas]
+    ajustado += sum(tokens_lineas)
+    con_cabecera = bool(lineas)
+
+    # Condensar desde el más antiguo: cada turno pasa a ocupar solo su línea
+    # en la nota (la cabecera de la nota se cuenta al condensar el primero).
+    # Si la nota va en el último fijo, se condensa también el siguiente
+    # mensaje del usuario para que los roles sigan alternando
+    corte = fijos
+    while corte < len(mensajes) - ultimos and (
+            ajustado > presupuesto * objetivo
+            or (en_cabeza and lineas and mensajes[corte].get("role") == "user")):
+        if not con_cabecera:
+            ajustado += contar_tokens(CABECERA_NOTA, modelo) + TOKENS_POR_MENSAJE
+            con_cabecera = True
+        for linea in _extractos(mensajes[corte]):
+            lineas.append(linea)
+            tokens_lineas.append(contar_tokens(linea, modelo) + 1)
+            ajustado += tokens_lineas[-1]
+        ajustado -= tokens[corte]
+        corte += 1
+
+    # La nota tampoco puede crecer sin límite: se quedan las líneas más recientes
+    maximo_nota = int(presupuesto * FRACCION_NOTA)
+    while len(lineas) > 1 and sum(tokens_lineas) > maximo_nota:
+        ajustado -= tokens_lineas.pop(0)
+        lineas.pop(0)
+
+    if not lineas:
+        return mensajes, None
+    # La nota se une a un mensaje del usuario vecino para que los roles sigan
+    # alternando (Anthropic y Gemini lo esperan así)
+    nota = "\n".join([CABECERA_NOTA, *lineas])
+    resto = list(mensajes[corte:])
+    if en_cabeza:
+        cabeza[-1] = _con_nota(cabeza[-1], nota, al_final=True)
+        if resto and resto[0].get("role") == "user":
+            cabeza[-1] = _con_nota(cabeza[-1], _texto(resto.pop(0)), al_final=True)
+    elif resto and resto[0].get("role") == "user":
+        resto[0] = _con_nota(resto[0], nota)
+    else:
+        cabeza.append(_nota_como_mensaje(mensajes, nota))
+    ajustados = cabeza + resto
+
+    recorte = Recorte(modelo, total, ajustado, corte - fijos)
+    with _lock_estadisticas:
+        _estadisticas["recortes"] += 1
+        _estadisticas["tokens_ahorrados"] += recorte.ahorrados
+    if avisar:
+        print(recorte)
+    return ajustados, recorte
+
+
+def _nota_como_mensaje(mensajes: Sequence[Mensaje], nota: str) -> Mensaje:
+    """La nota como mensaje del usuario, en el mismo formato que el historial."""
+    if any("parts" in mensaje for mensaje in mensajes):
+        return {"role": "user", "parts": [nota]}
+    return {"role": "user", "content": nota}
+
+
+def ajustar_texto(texto: str, modelo: str, max_salida: int = 0,
+                  presupuesto: Optional[int] = None, avisar: bool = True) -> str:
+    """
+    Ajusta una transcripción en texto plano: conserva la primera línea
+    (encabezado) y las últimas líneas que quepan en el presupuesto.
+    """
+    presupuesto = min(presupuesto or PRESUPUESTO_ENTRADA, limite_contexto(modelo) - max_salida)
+    total = contar_tokens(texto, modelo)
+    if total <= presupuesto:
+        return texto
+    encabezado, _, cuerpo = texto.partition("\n")
+    lineas = cuerpo.splitlines(keepends=True)
+    conservadas: List[str] = []
+    usados = contar_tokens(encabezado, modelo) + 20
+    for linea in reversed(lineas):
+        usados += contar_tokens(linea, modelo)
+        if usados > presupuesto and conservadas:
+            break
+        conservadas.append(linea)
+    omitidas = len(lineas) - len(conservadas)
+    ajustado = f"{encabezado}\n[... {omitidas} líneas anteriores omitidas por límite de contexto ...]\n" \
+               + "".join(reversed(conservadas))
+    recorte = Recorte(modelo, total, contar_tokens(ajustado, modelo), omitidas)
+    with _lock_estadisticas:
+        _estadisticas["recortes"] += 1
+        _estadisticas["tokens_ahorrados"] += recorte.ahorrados
+    if avisar:
+        print(recorte)
+    return ajustado
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Registro de Prompts del Sistema para los Tutores
+Carga una sola vez los archivos de ejemplos por nivel y precompila los prompts
+del sistema para cada combinación (nivel, idioma).
+
+Este módulo:
+1. Lee todos los archivos prompts/{nivel}.txt al crear el registro
+2. Precompila los prompts de todos los niveles e idiomas conocidos
+3. Entrega objetos inmutables que pueden compartirse entre sesiones
+4. Recarga un nivel automáticamente cuando cambia la fecha de su archivo
+5. Opcionalmente, incluye solo los k ejemplos más parecidos a cada pregunta
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import hashlib              # Para versionar el contenido de cada prompt
+import os                   # Para consultar la fecha de modificación
+import re                   # Para separar los ejemplos de cada archivo
+import threading            # Para recargar de forma segura entre hilos
+import time                 # Para limitar la frecuencia de comprobación
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from comun.embeddings import IndiceVectorial, obtener_modelo_embeddings
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+# Cada cuántos segundos, como máximo, se comprueba si cambiaron los archivos
+INTERVALO_RECARGA = 2.0
+
+# Cada ejemplo de los archivos empieza con "Ejemplo N - Pregunta sobre ...:"
+INICIO_EJEMPLO_RE = re.compile(r'^Ejemplo \d+\b.*$', re.MULTILINE)
+
+# Caracteres de cada ejemplo usados para indexarlo (encabezado + pregunta)
+CARACTERES_INDICE = 300
+
+# Similitud mínima del ejemplo más parecido para seleccionar ejemplos; por
+# debajo la pregunta no se parece a ninguno y se incluyen todos. Calibrada con
+# los embeddings por n-gramas: "¿Qué es Arduino?" da 0.67 con su ejemplo, y
+# "que es un LED" 0.34 con el mismo solo por compartir "que es"
+SIMILITUD_MINIMA_EJEMPLO = 0.35
+
+# ============================================================================
+# PROMPT COMPILADO
+# ============================================================================
+
+@dataclass(frozen=True)
+class PromptSistema:
+    """
+    Prompt del sistema ya compilado para un nivel e idioma.
+
+    Attributes:
+        nivel (str): Nivel educativo
+        idioma (str): Idioma de las respuestas
+        texto (str): Prompt completo listo para enviar al modelo
+        version (str): Huella del archivo de ejemplos con que se construyó
+    """
+    nivel: str
+    idioma: str
+    texto: str
+    version: str
+
+# ============================================================================
+# EJEMPLOS INDIVIDUALES
+# ============================================================================
+
+def dividir_ejemplos(texto: str) -> List[str]:
+    """
+    Separa el contenido de un archivo de prompts en ejemplos individuales.
+
+    Args:
+        texto (str): Contenido completo de prompts/{nivel}.txt
+
+    Returns:
+        list: Un texto por ejemplo (o el texto completo si no hay encabezados)
+    """
+    inicios = [m.start() for m in INICIO_EJEMPLO_RE.finditer(texto)]
+    if not inicios:
+        return [texto]
+    limites = inicios + [len(texto)]
+    return [texto[a:b].strip() for a, b in zip(limites, limites[1:])]
+
+
+def resumen_ejemplo(ejemplo: str) -> str:
+    """Texto que representa a un ejemplo en el índice: encabezado y pregunta del estudiante."""
+    lineas = [l for l in ejemplo.splitlines()[:3] if not l.startswith("Tutor:")]
+    return " ".join(lineas)[:CARACTERES_INDICE]
+
+# ============================================================================
+# REGISTRO
+# ============================================================================
+
+class RegistroPrompts:
+    """
+    Caché de prompts del sistema por (nivel, idioma) con recarga en caliente.
+
+    Cambiar de nivel o de idioma no realiza lecturas de disco: solo se consulta
+    la fecha de los archivos cada INTERVALO_RECARGA segundos como máximo.
+    """
+
+    def __init__(self, directorio: str, niveles: Iterable[str],
+                 construir: Callable[[str, str, str], str],
+                 idiomas: Iterable[str] = (),
+                 intervalo_recarga: float = INTERVALO_RECARGA,
+                 k_ejemplos: Optional[int] = None,
+                 similitud_minima: float = SIMILITUD_MINIMA_EJEMPLO):
+        """
+        Carga los archivos de ejemplos y precompila los prompts.
+
+        Args:
+            directorio (str): Carpeta con los archivos {nivel}.txt
+            niveles (iterable): Niveles educativos disponibles
+            construir (callable): Función (nivel, idioma, ejemplos) -> texto del prompt
+            idiomas (iterable): Idiomas a precompilar (otros se compilan al pedirlos)
+            intervalo_recarga (float): Segundos mínimos entre comprobaciones de cambios
+            k_ejemplos (int): Ejemplos a incluir en obtener_para_pregunta()
+                (None = todos los del archivo)
+            similitud_minima (float): Similitud del ejemplo más parecido por
+                debajo de la cual se incluyen todos
+        """
+        self.directorio = directorio
+        self.niveles = tuple(niveles)
+        self.idiomas = list(idiomas)
+        self.intervalo_recarga = intervalo_recarga
+        self.k_ejemplos = k_ejemplos
+        self.similitud_minima = similitud_minima
+        self._construir = construir
+        self._lock = threading.Lock()
+        self._ejemplos: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._prompts: Dict[Tuple[str, str], PromptSistema] = {}
+        # Para la selección de ejemplos: índice por nivel y prompts por selección
+        self._indices: Dict[str, Tuple[List[str], IndiceVectorial]] = {}
+        self._prompts_seleccion: Dict[Tuple[str, str, Tuple[int, ...]], PromptSistema] = {}
+        self._ultima_comprobacion = time.monotonic()
+
+        for nivel in self.niveles:
+            self._ejemplos[nivel] = self._leer_archivo(nivel)
+            for idioma in self.idiomas:
+                self._compilar(nivel, idioma)
+
+    def obtener(self, nivel: str, idioma: str) -> PromptSistema:
+        """
+        Devuelve el prompt compilado para un nivel e idioma.
+
+        Args:
+            nivel (str): Nivel educativo
+            idioma (str): Idioma de las respuestas
+
+        Returns:
+            PromptSistema: Prompt inmutable (compartible entre sesiones)
+        """
+        self._recargar_si_cambio()
+        prompt = self._prompts.get((nivel, idioma))
+        if prompt is None:
+            with self._lock:
+                prompt = self._compilar(nivel, idioma)
+        return prompt
+
+    def obtener_para_pregunta(self, nivel: str, idioma: str, pregunta: str,
+                              tema: str = "general") -> PromptSistema:
+        """
+        Devuelve un prompt con solo los k ejemplos más relacionados con la pregunta.
+
+        Reduce los tokens de entrada de cada petición sin perder la guía de
+        estilo: siempre se incluye al menos el ejemplo más parecido. Equivale
+        a obtener() si el nivel tiene k + 1 ejemplos o menos (quitar uno solo
+        no compensa perder su guía) o si ningún ejemplo se parece a la
+        pregunta lo suficiente (similitud_minima).
+
+        Args:
+            nivel (str): Nivel educativo
+            idioma (str): Idioma de las respuestas
+            pregunta (str): Pregunta del estudiante
+            tema (str): Tema de la pregunta (se añade a la búsqueda)
+
+        Returns:
+            PromptSistema: Prompt con la misma versión que el prompt completo
+        """
+        completo = self.obtener(nivel, idioma)
+        if self.k_ejemplos is None:
+            return completo
+
+        with self._lock:
+            ejemplos, indice = self._indice(nivel)
+        if len(ejemplos) <= self.k_ejemplos + 1:
+            return completo
+
+        consulta = pregunta if tema == "general" else f"{tema}: {pregunta}"
+        vector = obtener_modelo_embeddings().codificar([consulta])[0]
+        resultados = indice.buscar(vector, k=self.k_ejemplos)
+        if not resultados or resultados[0][1] < self.similitud_minima:
+            return completo
+        # Mantener el orden original del archivo entre los seleccionados
+        seleccion = tuple(sorted(i for i, _ in resultados))
+
+        clave = (nivel, idioma, seleccion)
+        prompt = self._prompts_seleccion.get(clave)
+        if prompt is None or prompt.version != completo.version:
+            texto = "\n\n".join(ejemplos[i] for i in seleccion)
+            prompt = PromptSistema(nivel, idioma, self._construir(nivel, idioma, "\n" + texto + "\n"),
+                                   completo.version)
+            self._prompts_seleccion[clave] = prompt
+        return prompt
+
+    def ejemplos(self, nivel: str) -> str:
+        """Devuelve el texto de ejemplos multi-shot cargado para un nivel."""
+        self._recargar_si_cambio()
+        return self._ejemplos[nivel][0]
+
+    def _compilar(self, nivel: str, idioma: str) -> PromptSistema:
+        """Construye y guarda en caché el prompt de (nivel, idioma)."""
+        ejemplos = self._ejemplos[nivel][0]
+        prompt = PromptSistema(
+            nivel=nivel,
+            idioma=idioma,
+            texto=self._construir(nivel, idioma, ejemplos),
+            version=hashlib.sha1(ejemplos.encode('utf-8')).hexdigest()[:12],
+        )
+        self._prompts[(nivel, idioma)] = prompt
+        return prompt
+
+    def _indice(self, nivel: str) -> Tuple[List[str], IndiceVectorial]:
+        """Índice de los ejemplos de un nivel, creado en el primer uso (se llama con el lock tomado)."""
+        if nivel not in self._indices:
+            ejemplos = dividir_ejemplos(self._ejemplos[nivel][0])
+            indice = IndiceVectorial()
+            vectores = obtener_modelo_embeddings().codificar([resumen_ejemplo(e) for e in ejemplos])
+            for i, vector in enumerate(vectores):
+                indice.agregar(i, vector)
+            self._indices[nivel] = (ejemplos, indice)
+        return self._indices[nivel]
+
+    def _recargar_si_cambio(self):
+        """Recarga los niveles cuyo archivo cambió desde la última lectura."""
+        ahora = time.monotonic()
+        if ahora - self._ultima_comprobacion < self.intervalo_recarga:
+            return
+
+        with self._lock:
+            self._ultima_comprobacion = ahora
+            for nivel in self.niveles:
+                if self._fecha_archivo(nivel) == self._ejemplos[nivel][1]:
+                    continue
+
+                print(f"🔄 Recargando ejemplos del nivel {nivel}")
+                self._ejemplos[nivel] = self._leer_archivo(nivel)
+                self._indices.pop(nivel, None)
+                self._prompts_seleccion = {k: v for k, v in self._prompts_seleccion.items() if k[0] != nivel}
+                # Recompilar todos los idiomas ya usados para este nivel
+                idiomas = [idioma for (n, idioma) in self._prompts if n == nivel]
+                for idioma in idiomas:
+                    self._compilar(nivel, idioma)
+
+    def _ruta(self, nivel: str) -> str:
+        return os.path.join(self.directorio, f"{nivel}.txt")
+
+    def _fecha_archivo(self, nivel: str) -> Optional[float]:
+        try:
+            return os.stat(self._ruta(nivel)).st_mtime
+        except OSError:
+            return None
+
+    def _leer_archivo(self, nivel: str) -> Tuple[str, Optional[float]]:
+        """
+        Lee el archivo de ejemplos de un nivel.
+
+        Returns:
+            tuple: (contenido, fecha de modificación) con un texto de
+            respaldo si el archivo no existe o no puede leerse
+        """
+        archivo_prompt = self._ruta(nivel)
+        fecha = self._fecha_archivo(nivel)
+        try:
+            with open(archivo_prompt, 'r', encoding='utf-8') as file:
+                return file.read(), fecha
+        except FileNotFoundError:
+            print(f"⚠️ Archivo de prompt no encontrado: {archivo_prompt}")
+            return "No hay ejemplos disponibles para este nivel.", fecha
+        except Exception as e:
+            print(f"❌ Error al cargar prompt: {e}")
+            return "Error al cargar ejemplos.", fecha
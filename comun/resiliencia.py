@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Llamadas Resilientes a Modelos: Plazos, Cobertura y Cortacircuitos
+Acota lo que puede tardar una respuesta aunque un proveedor se ponga lento
+o empiece a fallar.
+
+Este módulo:
+1. Da a cada llamada un plazo máximo (deadline), que empieza a contar al
+   obtener turno en el limitador del proveedor y llega al SDK como timeout
+2. Si el primer fragmento no llega en el p95 habitual del modelo, lanza una
+   petición de cobertura (hedge) al mismo modelo o a uno alternativo y se
+   queda con la que responda primero; la otra se cancela cerrando su stream
+3. Si un candidato falla antes de responder, pasa al siguiente (failover)
+4. Abre un cortacircuitos por proveedor tras varios fallos seguidos, para
+   no esperar a un proveedor caído en cada turno
+
+Las respuestas fallidas lanzan ErrorLLM: quien llama decide qué mostrar, y
+el texto del error nunca tiene por qué acabar en el historial.
+
+Variables de entorno (opcionales):
+    LLM_PLAZO_SEGUNDOS=60
+    LLM_COBERTURA_SEGUNDOS=8
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import os                   # Para variables de entorno
+import queue                # Fragmentos de los candidatos en curso
+import threading            # Un hilo por candidato
+import time                 # Para plazos y latencias
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Callable, ContextManager, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+PLAZO_LLAMADA = float(os.getenv("LLM_PLAZO_SEGUNDOS", 60))          # Plazo total por llamada
+COBERTURA_INICIAL = float(os.getenv("LLM_COBERTURA_SEGUNDOS", 8))   # Hasta tener muestras
+COBERTURA_MINIMA = 1.0       # Nunca cubrir antes de esto (evita duplicar casi todas)
+MUESTRAS_MINIMAS = 5         # Primeros tokens observados antes de usar el p95
+MUESTRAS_MAXIMAS = 50        # Ventana de latencias recientes por modelo
+
+FALLOS_PARA_ABRIR = 3        # Fallos seguidos que abren el cortacircuitos
+ENFRIAMIENTO = 30.0          # Segundos abierto antes de dejar pasar una prueba
+
+# ============================================================================
+# ERRORES
+# ============================================================================
+
+class ErrorLLM(Exception):
+    """Ningún candidato pudo dar una respuesta completa."""
+
+
+class PlazoAgotado(ErrorLLM):
+    """La llamada superó su plazo."""
+
+
+class ProveedorNoDisponible(ErrorLLM):
+    """Todos los candidatos tienen el cortacircuitos abierto."""
+
+# ============================================================================
+# CORTACIRCUITOS POR PROVEEDOR
+# ============================================================================
+
+class Cortacircuitos:
+    """
+    Cortacircuitos clásico: cerrado → abierto tras N fallos seguidos →
+    semiabierto tras el enfriamiento (una llamada de prueba) → cerrado si sale bien.
+    """
+
+    def __init__(self, nombre: str, fallos_para_abrir: int = FALLOS_PARA_ABRIR,
+                 enfriamiento: float = ENFRIAMIENTO):
+        """
+        Args:
+            nombre (str): Proveedor (para los mensajes)
+            fallos_para_abrir (int): Fallos seguidos que abren el circuito
+            enfriamiento (float): Segundos abierto antes de la llamada de prueba
+        """
+        self.nombre = nombre
+        self.fallos_para_abrir = fallos_para_abrir
+        self.enfriamiento = enfriamiento
+        self.fallos = 0
+        self._abierto_desde: Optional[float] = None
+        self._prueba_en_curso = False
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            if self._abierto_desde is None:
+                return "cerrado"
+            if time.monotonic() - self._abierto_desde >= self.enfriamiento:
+                return "semiabierto"
+            return "abierto"
+
+    def permitir(self) -> bool:
+        """Indica si se puede llamar al proveedor (en semiabierto, solo una prueba a la vez)."""
+        with self._lock:
+            if self._abierto_desde is None:
+                return True
+            if time.monotonic() - self._abierto_desde < self.enfriamiento or self._prueba_en_curso:
+                return False
+            self._prueba_en_curso = True
+            return True
+
+    def exito(self):
+        with self._lock:
+            self.fallos = 0
+            self._abierto_desde = None
+            self._prueba_en_curso = False
+
+    def fallo(self):
+        with self._lock:
+            self.fallos += 1
+            if self._prueba_en_curso or self.fallos >= self.fallos_para_abrir:
+                if self._abierto_desde is None:
+                    print(f"🔌 Cortacircuitos de {self.nombre} abierto tras {self.fallos} fallos")
+                self._abierto_desde = time.monotonic()
+            self._prueba_en_curso = False
+
+    def liberar(self):
+        """Devuelve la prueba de semiabierto sin resultado (llamada cancelada)."""
+        with self._lock:
+            self._prueba_en_curso = False
+
+# ============================================================================
+# LATENCIAS RECIENTES POR MODELO
+# ============================================================================
+
+class LatenciasRecientes:
+    """Últimas latencias hasta el primer fragmento de un modelo."""
+
+    def __init__(self, maximo: int = MUESTRAS_MAXIMAS):
+        self._muestras: Deque[float] = deque(maxlen=maximo)
+        self._lock = threading.Lock()
+
+    def agregar(self, segundos: float):
+        with self._lock:
+            self._muestras.append(segundos)
+
+    def p95(self) -> Optional[float]:
+        """Percentil 95, o None si aún no hay muestras suficientes."""
+        with self._lock:
+            if len(self._muestras) < MUESTRAS_MINIMAS:
+                return None
+            ordenadas = sorted(self._muestras)
+        return ordenadas[min(len(ordenadas) - 1, int(0.95 * len(ordenadas)))]
+
+# ============================================================================
+# REGISTROS COMPARTIDOS
+# ============================================================================
+
+_cortacircuitos: Dict[str, Cortacircuitos] = {}
+_latencias: Dict[Tuple[str, str], LatenciasRecientes] = {}
+_lock_registros = threading.Lock()
+
+
+def obtener_cortacircuitos(proveedor: str) -> Cortacircuitos:
+    """Cortacircuitos compartido de un proveedor, creado en el primer uso."""
+    with _lock_registros:
+        if proveedor not in _cortacircuitos:
+            _cortacircuitos[proveedor] = Cortacircuitos(proveedor)
+        return _cortacircuitos[proveedor]
+
+
+def obtener_latencias(proveedor: str, modelo: str) -> LatenciasRecientes:
+    """Latencias recientes compartidas de un modelo, creadas en el primer uso."""
+    with _lock_registros:
+        clave = (proveedor, modelo)
+        if clave not in _latencias:
+            _latencias[clave] = LatenciasRecientes()
+        return _latencias[clave]
+
+
+def retraso_cobertura(proveedor: str, modelo: str) -> float:
+    """Segundos sin primer fragmento tras los que se lanza la cobertura."""
+    p95 = obtener_latencias(proveedor, modelo).p95()
+    return COBERTURA_INICIAL if p95 is None else max(COBERTURA_MINIMA, p95)
+
+# ============================================================================
+# LLAMADA RESILIENTE
+# ============================================================================
+
+@dataclass
+class Candidato:
+    """
+    Una forma de obtener la respuesta: proveedor, modelo y cómo pedirla.
+
+    Si hay un límite local (p. ej. el limitador del proveedor), se pasa en
+    `turno`: la espera de turno no cuenta para el plazo ni para la cobertura.
+    Con `repetible=False` la cobertura nunca lanza otra petición al mismo
+    proveedor mientras este candidato está en curso (p. ej. si su stream no
+    se puede cerrar al cancelarlo y la petición perdedora seguiría ocupando
+    un turno hasta su timeout); sí se puede cubrir con otro proveedor.
+    """
+    proveedor: str
+    modelo: str
+    transmitir: Callable[["Intento"], Iterator[str]]   # Iterador de fragmentos nuevo en cada llamada
+    turno: Optional[Callable[[], ContextManager]] = None
+    repetible: bool = True
+
+
+class Intento:
+    """
+    Un candidato en curso, visto desde su función de transmisión.
+
+    Da el timeout para la petición al SDK (lo que queda de plazo) y permite
+    registrar cómo cerrar el stream subyacente: al cancelar, se cierra desde
+    fuera en lugar de esperar al siguiente fragmento, y se libera el turno
+    del limitador aunque el proveedor se haya quedado colgado.
+    """
+
+    def __init__(self, plazo: float, limite: Callable[[], Optional[float]]):
+        """
+        Args:
+            plazo (float): Plazo total de la llamada
+            limite (callable): Instante límite de la llamada (None hasta que
+                un candidato obtiene turno)
+        """
+        self.cancelado = threading.Event()
+        self._plazo = plazo
+        self._limite = limite
+        self._cierres: List[Callable[[], object]] = []
+        self._lock = threading.Lock()
+
+    def timeout(self) -> float:
+        """Segundos que quedan de plazo, para el timeout de la petición al SDK."""
+        limite = self._limite()
+        if limite is None:
+            return self._plazo
+        return max(0.1, limite - time.monotonic())
+
+    def al_cancelar(self, *cierres: Callable[[], object]):
+        """Registra funciones a llamar si se cancela (si ya se canceló, se llaman ya)."""
+        with self._lock:
+            if not self.cancelado.is_set():
+                self._cierres.extend(cierres)
+                return
+        _llamar_todas(cierres)
+
+    def cancelar(self):
+        """Cancela el intento y cierra lo registrado (una sola vez)."""
+        with self._lock:
+            if self.cancelado.is_set():
+                return
+            self.cancelado.set()
+            cierres, self._cierres = self._cierres, []
+        _llamar_todas(cierres)
+
+
+def _llamar_todas(funciones):
+    for funcion in funciones:
+        try:
+            funcion()
+        except Exception:
+            pass   # Cerrar un stream ya roto no debe tumbar a quien cancela
+
+
+def transmitir_resiliente(candidatos: Sequence[Candidato], plazo: float = PLAZO_LLAMADA,
+                          cubrir: bool = True) -> Iterator[str]:
+    """
+    Fragmentos de la respuesta del primer candidato que empiece a responder.
+
+    Se lanza el primer candidato con el cortacircuitos cerrado. Si no envía
+    su primer fragmento en el p95 habitual de su modelo, se lanza el
+    siguiente (o el mismo otra vez si no hay más) y gana el primero que
+    responda; un candidato no repetible solo se cubre con otro proveedor. Si un candidato falla antes de responder, se pasa al siguiente.
+
+    El plazo y la espera de la cobertura cuentan desde que el primer
+    candidato obtiene turno en su limitador: la cola local no dispara
+    coberturas ni entra en las latencias del modelo.
+
+    Args:
+        candidatos (list): En orden de preferencia
+        plazo (float): Segundos máximos para la respuesta completa
+        cubrir (bool): Lanzar la petición de cobertura si el primero tarda
+
+    Raises:
+        ProveedorNoDisponible: Si todos tienen el cortacircuitos abierto
+        PlazoAgotado: Si se superó el plazo
+        ErrorLLM: Si fallaron todos los candidatos (o el elegido a media respuesta)
+    """
+    pendientes = list(candidatos)
+    cola: "queue.Queue[Tuple[int, str, object]]" = queue.Queue()
+    intentos: List[Intento] = []
+    activos = set()
+    errores = []
+    limite: List[Optional[float]] = [None]   # Se fija con el primer turno obtenido
+    lock_limite = threading.Lock()
+    ganador: Optional[int] = None
+    cobertura_lanzada = not cubrir
+    momento_cobertura: Optional[float] = None
+
+    def admitir():
+        """Un candidato obtuvo turno: empieza a contar el plazo (si no había empezado)."""
+        with lock_limite:
+            if limite[0] is None:
+                limite[0] = time.monotonic() + plazo
+
+    def correr(indice: int, candidato: Candidato, intento: Intento, interruptor: Cortacircuitos):
+        try:
+            with candidato.turno() if candidato.turno else nullcontext():
+                if intento.cancelado.is_set():
+                    interruptor.liberar()   # Cancelado mientras esperaba turno
+                    return
+                admitir()
+                cola.put((indice, "admitido", None))
+                t0 = time.monotonic()
+                fragmentos = None
+                try:
+                    fragmentos = candidato.transmitir(intento)
+                    primero = True
+                    for texto in fragmentos:
+                        if intento.cancelado.is_set():
+                            interruptor.liberar()
+                            return
+                        if primero:
+                            obtener_latencias(candidato.proveedor, candidato.modelo).agregar(time.monotonic() - t0)
+                            primero = False
+                        cola.put((indice, "fragmento", texto))
+                finally:
+                    # Cierra el generador (y su registro de uso) antes de soltar el turno
+                    if fragmentos is not None and hasattr(fragmentos, "close"):
+                        fragmentos.close()
+            interruptor.exito()
+            cola.put((indice, "fin", None))
+        except BaseException as e:
+            if intento.cancelado.is_set():
+                interruptor.liberar()   # El stream se cerró al cancelar: no es un fallo del proveedor
+                return
+            # Cualquier fallo se avisa: quien espera no debe quedarse hasta el plazo
+            interruptor.fallo()
+            cola.put((indice, "error", e))
+
+    lanzados: List[Candidato] = []
+
+    def lanzar(candidato: Candidato) -> bool:
+        """Lanza un candidato en su hilo si su cortacircuitos lo permite."""
+        interruptor = obtener_cortacircuitos(candidato.proveedor)
+        if not interruptor.permitir():
+            errores.append(f"{candidato.proveedor}: cortacircuitos abierto")
+            return False
+        indice = len(lanzados)
+        lanzados.append(candidato)
+        intentos.append(Intento(plazo, lambda: limite[0]))
+        activos.add(indice)
+        threading.Thread(target=correr, args=(indice, candidato, intentos[indice], interruptor),
+                         name=f"llm-{candidato.proveedor}", daemon=True).start()
+        return True
+
+    def lanzar_siguiente() -> bool:
+        """Lanza el siguiente candidato pendiente que esté permitido."""
+        while pendientes:
+            if lanzar(pendientes.pop(0)):
+                return True
+        return False
+
+    def lanzar_cobertura() -> bool:
+        """Lanza la petición de cobertura del primer candidato, si se puede."""
+        primero = lanzados[0]
+        for candidato in list(pendientes):
+            if primero.repetible or candidato.proveedor != primero.proveedor:
+                pendientes.remove(candidato)
+                if lanzar(candidato):
+                    return True
+        return primero.repetible and lanzar(primero)
+
+    if not lanzar_siguiente():
+        raise ProveedorNoDisponible("; ".join(errores) or "sin candidatos")
+
+    try:
+        while True:
+            ahora = time.monotonic()
+            if limite[0] is not None and ahora >= limite[0]:
+                raise PlazoAgotado(f"Sin respuesta completa en {plazo:.0f}s")
+            esperar_cobertura = ganador is None and not cobertura_lanzada and momento_cobertura is not None
+            if esperar_cobertura and ahora >= momento_cobertura:
+                # Cobertura: el siguiente candidato o, si no hay, el mismo otra vez
+                lanzar_cobertura()
+                cobertura_lanzada = True
+                continue
+            # Sin plazo aún (todos en cola del limitador): se espera al primer turno
+            espera = None if limite[0] is None else limite[0] - ahora
+            if esperar_cobertura:
+                espera = momento_cobertura - ahora if espera is None else min(espera, momento_cobertura - ahora)
+            try:
+                indice, tipo, dato = cola.get(timeout=None if espera is None else max(espera, 0.001))
+            except queue.Empty:
+                continue
+            if ganador is not None and indice != ganador:
+                continue   # Restos de un candidato descartado
+
+            if tipo == "admitido":
+                if momento_cobertura is None:
+                    momento_cobertura = time.monotonic() + retraso_cobertura(
+                        lanzados[indice].proveedor, lanzados[indice].modelo)
+                continue
+
+            if tipo == "error":
+                activos.discard(indice)
+                errores.append(f"{lanzados[indice].proveedor}: {dato}")
+                if ganador is not None:
+                    raise ErrorLLM(f"La respuesta se interrumpió ({dato})")
+                # Failover: si no queda nadie en curso, pasar al siguiente candidato
+                if not activos and not lanzar_siguiente():
+                    raise ErrorLLM("; ".join(errores))
+                continue
+
+            if ganador is None:
+                ganador = indice
+                for otro in activos - {indice}:
+                    intentos[otro].cancelar()
+            if tipo == "fin":
+                return
+            yield dato
+    finally:
+        for intento in intentos:
+            intento.cancelar()
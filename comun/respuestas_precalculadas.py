@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Respuestas Precalculadas para las Preguntas de Ejemplo
+Almacén local y versionado de respuestas generadas por adelantado para las
+preguntas de ejemplo que muestran los tutores.
+
+Este módulo:
+1. Guarda cada respuesta por (nivel, idioma, pregunta) en un archivo JSON
+2. Asocia cada respuesta a la versión del prompt con que se generó
+3. Descarta en tiempo de ejecución las respuestas de versiones antiguas
+4. Genera en lote, con concurrencia limitada, solo las respuestas que faltan
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import json                 # Formato del almacén
+import os                   # Para escrituras atómicas y fechas de archivo
+import threading            # Para guardar de forma segura desde varios hilos
+import time                 # Para registrar cuándo se generó cada respuesta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+from comun.embeddings import normalizar_texto
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+FORMATO = 1                 # Versión del formato del archivo JSON
+MAX_CONCURRENCIA = 4        # Peticiones simultáneas al generar en lote
+INTERVALO_RECARGA = 5.0     # Segundos mínimos entre comprobaciones del archivo
+
+# ============================================================================
+# ALMACÉN
+# ============================================================================
+
+@dataclass(frozen=True)
+class TareaPrecalculo:
+    """
+    Una celda de la matriz (pregunta × nivel × idioma) a generar.
+
+    Attributes:
+        nivel (str): Nivel educativo
+        idioma (str): Idioma de la respuesta
+        pregunta (str): Pregunta de ejemplo
+        version (str): Versión del prompt del sistema de ese nivel e idioma
+    """
+    nivel: str
+    idioma: str
+    pregunta: str
+    version: str
+
+
+class AlmacenRespuestas:
+    """
+    Almacén JSON de respuestas precalculadas con recarga automática.
+
+    Si el trabajo por lotes actualiza el archivo mientras el tutor está en
+    marcha, las nuevas respuestas se cargan sin reiniciar.
+    """
+
+    def __init__(self, ruta: str, intervalo_recarga: float = INTERVALO_RECARGA):
+        """
+        Args:
+            ruta (str): Archivo JSON del almacén (se crea al guardar)
+            intervalo_recarga (float): Segundos mínimos entre comprobaciones de cambios
+        """
+        self.ruta = str(ruta)
+        self.intervalo_recarga = intervalo_recarga
+        self._lock = threading.Lock()
+        self._respuestas: Dict[str, Dict] = {}
+        self._fecha = None
+        self._ultima_comprobacion = time.monotonic()
+        self._cargar()
+
+    def __len__(self) -> int:
+        return len(self._respuestas)
+
+    @staticmethod
+    def clave(nivel: str, idioma: str, pregunta: str) -> str:
+        """Clave de una pregunta, insensible a mayúsculas, acentos y signos."""
+        return f"{nivel}|{idioma}|{normalizar_texto(pregunta)}"
+
+    def obtener(self, nivel: str, idioma: str, pregunta: str, version: str) -> Optional[str]:
+        """
+        Devuelve la respuesta precalculada si existe y es de la versión actual.
+
+        Args:
+            nivel (str): Nivel educativo
+            idioma (str): Idioma de la respuesta
+            pregunta (str): Pregunta del estudiante
+            version (str): Versión actual del prompt del sistema
+
+        Returns:
+            str: Respuesta guardada, o None si falta o está desactualizada
+        """
+        self._recargar_si_cambio()
+        entrada = self._respuestas.get(self.clave(nivel, idioma, pregunta))
+        if entrada and entrada["version"] == version:
+            return entrada["respuesta"]
+        return None
+
+    def vigente(self, tarea: TareaPrecalculo) -> bool:
+        """True si la tarea ya tiene una respuesta de su versión."""
+        entrada = self._respuestas.get(self.clave(tarea.nivel, tarea.idioma, tarea.pregunta))
+        return bool(entrada) and entrada["version"] == tarea.version
+
+    def guardar(self, tarea: TareaPrecalculo, respuesta: str, modelo: str = ""):
+        """
+        Guarda una respuesta y persiste el archivo de inmediato.
+
+        Args:
+            tarea (TareaPrecalculo): Pregunta, nivel, idioma y versión
+            respuesta (str): Respuesta generada
+            modelo (str): Modelo que la generó (informativo)
+        """
+        with self._lock:
+            self._respuestas[self.clave(tarea.nivel, tarea.idioma, tarea.pregunta)] = {
+                "nivel": tarea.nivel,
+                "idioma": tarea.idioma,
+                "pregunta": tarea.pregunta,
+                "version": tarea.version,
+                "modelo": modelo,
+                "generada": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "respuesta": respuesta,
+            }
+            self._escribir()
+
+    def _escribir(self):
+        """Escribe el archivo de forma atómica (se llama con el lock tomado)."""
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump({"formato": FORMATO, "respuestas": self._respuestas}, archivo,
+                      ensure_ascii=False, indent=1)
+        os.replace(temporal, self.ruta)
+        self._fecha = self._fecha_archivo()
+
+    def _cargar(self):
+        """Lee el archivo del almacén si existe."""
+        self._fecha = self._fecha_archivo()
+        if self._fecha is None:
+            return
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+            if datos.get("formato") == FORMATO:
+                self._respuestas = datos.get("respuestas", {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ No se pudo leer {self.ruta}: {e}")
+
+    def _recargar_si_cambio(self):
+        ahora = time.monotonic()
+        if ahora - self._ultima_comprobacion < self.intervalo_recarga:
+            return
+        with self._lock:
+            self._ultima_comprobacion = ahora
+            if self._fecha_archivo() != self._fecha:
+                self._cargar()
+
+    def _fecha_archivo(self) -> Optional[float]:
+        try:
+            return os.stat(self.ruta).st_mtime
+        except OSError:
+            return None
+
+# ============================================================================
+# GENERACIÓN EN LOTE
+# ============================================================================
+
+def precalcular(almacen: AlmacenRespuestas, tareas: Iterable[TareaPrecalculo],
+                generar: Callable[[TareaPrecalculo], str], modelo: str = "",
+                max_concurrencia: int = MAX_CONCURRENCIA, forzar: bool = False) -> Dict[str, int]:
+    """
+    Genera las respuestas que faltan o están desactualizadas.
+
+    Args:
+        almacen (AlmacenRespuestas): Almacén donde guardar las respuestas
+        tareas (iterable): Matriz de (pregunta × nivel × idioma) a cubrir
+        generar (callable): Función que genera la respuesta de una tarea
+        modelo (str): Modelo usado (se guarda con cada respuesta)
+        max_concurrencia (int): Peticiones simultáneas al modelo
+        forzar (bool): Regenerar también las respuestas vigentes
+
+    Returns:
+        dict: Número de respuestas generadas, vigentes (omitidas) y con error
+    """
+    tareas = list(dict.fromkeys(tareas))   # Sin duplicados, conservando el orden
+    pendientes = [t for t in tareas if forzar or not almacen.vigente(t)]
+    resultado = {"generadas": 0, "vigentes": len(tareas) - len(pendientes), "errores": 0}
+    print(f"📦 {len(tareas)} respuestas en la matriz, {len(pendientes)} por generar")
+
+    with ThreadPoolExecutor(max_workers=max_concurrencia, thread_name_prefix="precalculo") as executor:
+        futuros = {executor.submit(generar, tarea): tarea for tarea in pendientes}
+        for i, futuro in enumerate(as_completed(futuros), 1):
+            tarea = futuros[futuro]
+            try:
+                almacen.guardar(tarea, futuro.result(), modelo)
+                resultado["generadas"] += 1
+                print(f"✓ [{i}/{len(pendientes)}] {tarea.nivel} · {tarea.idioma} · {tarea.pregunta}")
+            except Exception as e:
+                resultado["errores"] += 1
+                print(f"❌ [{i}/{len(pendientes)}] {tarea.nivel} · {tarea.idioma} · {tarea.pregunta}: {e}")
+
+    return resultado
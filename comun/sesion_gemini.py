@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Sesión de Chat Persistente de Gemini para Conversaciones a Varias Voces
+Mantiene un ChatSession nativo por participante y le envía solo lo dicho
+desde su último turno, con roles user/model, en lugar de aplanar todo el
+historial a texto en cada llamada.
+
+Este módulo:
+1. Convierte las intervenciones nuevas de un registro (autor, texto) en un
+   único mensaje "user" con una parte por intervención
+2. Reutiliza el historial ya convertido del ChatSession: el prefijo de la
+   conversación no cambia entre turnos, así que el servidor puede
+   aprovechar su caché implícita de contexto (los tokens en caché quedan en
+   la contabilidad como "cache")
+3. Confirma el turno solo si la respuesta llega completa; si falla o se
+   abandona a medias, el chat vuelve al último estado confirmado
+4. Ajusta el historial al presupuesto de entrada (presupuesto_contexto)
+   solo cuando no cabe, y lo baja al 75% para no romper el prefijo en
+   cada turno
+
+Uso:
+    sesion = SesionGemini(modelo_generativo, "Gemini", "gemini-flash-latest")
+    for texto in sesion.transmitir(registro.intervenciones, llamada):
+        print(texto, end="")
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import threading            # Un turno de la sesión a la vez
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from comun.contabilidad_tokens import uso_gemini
+from comun.presupuesto_contexto import OBJETIVO_RECORTE, ajustar_contexto
+
+Mensaje = Dict[str, Any]
+Intervencion = Tuple[str, str]   # (autor, texto)
+
+# Si nadie habló desde su último turno (p. ej. en rondas paralelas), la
+# sesión necesita igualmente un mensaje "user" al que responder
+CONTINUAR = "Continúa la conversación."
+
+# ============================================================================
+# SESIÓN
+# ============================================================================
+
+class SesionGemini:
+    """
+    ChatSession de Gemini de un participante, alimentado de forma incremental.
+
+    La sesión recorre el registro desde donde se quedó: las intervenciones de
+    los demás se acumulan como partes del siguiente mensaje "user" y las
+    propias que no generó ella (p. ej. al reanudar) entran como "model". Sus
+    propias respuestas ya están en el chat y se saltan al verlas en el registro.
+    """
+
+    def __init__(self, modelo, nombre: str, nombre_modelo: str, max_salida: int = 0,
+                 fijos: int = 0, historial: Optional[List[Mensaje]] = None):
+        """
+        Args:
+            modelo (GenerativeModel): Modelo con su system_instruction
+            nombre (str): Nombre del participante en el registro
+            nombre_modelo (str): Modelo (para la ventana de contexto)
+            max_salida (int): Tokens reservados para cada respuesta
+            fijos (int): Mensajes iniciales que nunca se condensan
+            historial (list): Mensajes previos en formato de Gemini
+                (p. ej. el tema como primer mensaje "user")
+        """
+        self.nombre = nombre
+        self.nombre_modelo = nombre_modelo
+        self.max_salida = max_salida
+        self.fijos = fijos
+        self.historial: List[Mensaje] = [dict(m, parts=list(m["parts"])) for m in historial or []]
+        self._pendientes: List[str] = []    # Partes del siguiente mensaje "user"
+        if self.historial and self.historial[-1]["role"] == "user":
+            # El chat debe acabar en "model": el último "user" se envía en el primer turno
+            self._pendientes = self.historial.pop()["parts"]
+        self._chat = modelo.start_chat(history=self.historial)
+        self._propias: List[str] = []       # Respuestas aún no vistas en el registro
+        self._vistas = 0                    # Intervenciones del registro ya recorridas
+        self._reconstruir = False           # El chat debe recargar self.historial
+        self._lock = threading.Lock()
+
+    def _agregar(self, rol: str, partes: List[str]):
+        """Añade un mensaje confirmado (uniendo con el anterior si es del mismo rol)."""
+        if self.historial and self.historial[-1]["role"] == rol:
+            self.historial[-1]["parts"].extend(partes)
+        else:
+            self.historial.append({"role": rol, "parts": list(partes)})
+
+    def _recorrer(self, intervenciones: Sequence[Intervencion]):
+        """Incorpora las intervenciones del registro que la sesión aún no ha visto."""
+        for autor, texto in intervenciones[self._vistas:]:
+            if autor != self.nombre:
+                self._pendientes.append(f"{autor} dice: {texto}")
+            elif texto in self._propias:
+                self._propias.remove(texto)   # Ya está en el chat
+            else:
+                # Intervención propia anterior a la sesión: entra tal cual
+                if self._pendientes:
+                    self._agregar("user", self._pendientes)
+                    self._pendientes = []
+                self._agregar("model", [texto])
+                self._reconstruir = True
+        self._vistas = len(intervenciones)
+
+    def transmitir(self, intervenciones: Sequence[Intervencion], llamada,
+                   generation_config: Optional[Dict[str, Any]] = None,
+                   timeout: Optional[float] = None,
+                   en_curso: Sequence[Intervencion] = ()) -> Iterator[str]:
+        """
+        Respuesta del participante a lo dicho desde su último turno, fragmento a fragmento.
+
+        Args:
+            intervenciones (list): Registro completo (autor, texto); solo se
+                envía lo que la sesión aún no ha visto
+            llamada: Registro de uso de registrar_llamada
+            generation_config (dict): Configuración de generación de Gemini
+            timeout (float): Segundos máximos de la petición (None = los del SDK)
+            en_curso (list): Intervenciones (autor, texto) que aún no están en
+                el registro; se envían en este mensaje y quedan en el chat,
+                pero la versión final vuelve a llegar desde el registro
+        """
+        with self._lock:
+            self._recorrer(intervenciones)
+            actuales = [f"{autor} dice: {texto}" for autor, texto in en_curso]
+            nuevo = {"role": "user", "parts": self._pendientes + actuales or [CONTINUAR]}
+            mensajes, recorte = ajustar_contexto(self.historial + [nuevo], self.nombre_modelo,
+                                                 self.max_salida, fijos=self.fijos,
+                                                 objetivo=OBJETIVO_RECORTE, avisar=False)
+            if recorte:
+                self.historial = mensajes[:-1]
+                self._reconstruir = True
+            if self._reconstruir:
+                self._chat.history = self.historial
+                self._reconstruir = False
+
+            completa = False
+            partes = []
+            try:
+                respuesta = self._chat.send_message(
+                    mensajes[-1]["parts"], stream=True, generation_config=generation_config,
+                    request_options={"timeout": timeout} if timeout else None)
+                for chunk in respuesta:
+                    if chunk.text:
+                        llamada.marcar_primer_token()
+                        partes.append(chunk.text)
+                        yield chunk.text
+                llamada.registrar_uso(uso_gemini(respuesta.usage_metadata))
+                completa = True
+            finally:
+                if completa:
+                    self.historial += [mensajes[-1], {"role": "model", "parts": ["".join(partes)]}]
+                    self._pendientes = []
+                    self._propias.append("".join(partes))
+                else:
+                    # Respuesta fallida o abandonada: el chat vuelve al último
+                    # estado confirmado y lo pendiente se reenvía la próxima vez
+                    self._chat.history = self.historial
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Pruebas del registro de llamadas de ContadorTokens (escritura en segundo plano).
+
+Uso:
+    python -m pytest -q comun/test_contabilidad_tokens.py
+"""
+
+import threading
+import time
+
+from comun.contabilidad_tokens import ContadorTokens, LlamadaLLM
+
+
+def _llamada(funcion="respuesta"):
+    return LlamadaLLM("openai", "gpt-4o-mini", funcion, uso={"prompt": 1000, "generados": 100})
+
+
+def test_la_base_se_crea_con_la_primera_escritura(tmp_path):
+    ruta = tmp_path / "cache" / "uso.sqlite"
+    contador = ContadorTokens(str(ruta))
+    assert not ruta.parent.exists()
+
+    contador.guardar(_llamada())
+    contador.vaciar()
+    assert ruta.exists()
+    contador.cerrar()
+
+
+def test_guardar_no_espera_a_la_base(tmp_path):
+    contador = ContadorTokens(str(tmp_path / "uso.sqlite"))
+    contador.guardar(_llamada())
+    contador.vaciar()
+
+    with contador._lock:   # Otra escritura o consulta ocupa la base
+        inicio = time.perf_counter()
+        for _ in range(20):
+            contador.guardar(_llamada("resumen"))
+        assert time.perf_counter() - inicio < 0.5
+
+    filas = {f["funcion"]: f["llamadas"] for f in contador.resumen()}
+    assert filas == {"respuesta": 1, "resumen": 20}
+    contador.cerrar()
+
+
+def test_cerrar_escribe_lo_pendiente(tmp_path):
+    ruta = str(tmp_path / "uso.sqlite")
+    contador = ContadorTokens(ruta)
+    hilos = [threading.Thread(target=contador.guardar, args=(_llamada(),)) for _ in range(10)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    contador.cerrar()
+
+    assert ContadorTokens(ruta).resumen()[0]["llamadas"] == 10
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la selección de ejemplos por pregunta de RegistroPrompts.
+
+Uso:
+    python -m pytest -q comun/test_registro_prompts.py
+"""
+
+from comun.registro_prompts import RegistroPrompts
+
+TEMAS = [
+    ("Arduino", "¿Qué es Arduino y para qué sirve?"),
+    ("sensores", "¿Cómo funcionan los sensores?"),
+    ("motores", "¿Cómo controlo la velocidad de un motor?"),
+    ("baterías", "¿Qué batería necesita mi robot?"),
+]
+
+
+def _registro(tmp_path, ejemplos, k=1):
+    texto = "\n\n".join(f'Ejemplo {i} - Pregunta sobre {tema}:\nEstudiante: "{pregunta}"\nTutor: "Respuesta {i}"'
+                        for i, (tema, pregunta) in enumerate(TEMAS[:ejemplos], 1))
+    (tmp_path / "primaria.txt").write_text(texto, encoding="utf-8")
+    return RegistroPrompts(str(tmp_path), ["primaria"],
+                           construir=lambda nivel, idioma, ejemplos: ejemplos,
+                           idiomas=["Español"], k_ejemplos=k)
+
+
+def test_con_k_mas_uno_ejemplos_se_incluyen_todos(tmp_path):
+    registro = _registro(tmp_path, ejemplos=2)
+    texto = registro.obtener_para_pregunta("primaria", "Español", "¿Qué es Arduino?").texto
+
+    assert "Respuesta 1" in texto and "Respuesta 2" in texto
+
+
+def test_selecciona_el_ejemplo_mas_parecido(tmp_path):
+    registro = _registro(tmp_path, ejemplos=4)
+    texto = registro.obtener_para_pregunta("primaria", "Español", "¿Qué es Arduino?").texto
+
+    assert "Respuesta 1" in texto
+    assert "Respuesta 3" not in texto and "Respuesta 4" not in texto
+
+
+def test_pregunta_sin_parecido_incluye_todos(tmp_path):
+    registro = _registro(tmp_path, ejemplos=4)
+    texto = registro.obtener_para_pregunta("primaria", "Español", "hola").texto
+
+    assert all(f"Respuesta {i}" in texto for i in range(1, 5))
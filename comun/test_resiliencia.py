@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Pruebas de transmitir_resiliente (failover, cobertura, plazo y cortacircuitos).
+
+Uso:
+    python -m pytest -q comun/test_resiliencia.py
+"""
+
+import threading
+
+import pytest
+
+from comun import resiliencia
+from comun.resiliencia import (Candidato, Cortacircuitos, ErrorLLM, PlazoAgotado,
+                               ProveedorNoDisponible, transmitir_resiliente)
+
+
+@pytest.fixture(autouse=True)
+def registros_limpios(monkeypatch):
+    """Cortacircuitos y latencias nuevos en cada prueba; cobertura rápida."""
+    monkeypatch.setattr(resiliencia, "_cortacircuitos", {})
+    monkeypatch.setattr(resiliencia, "_latencias", {})
+    monkeypatch.setattr(resiliencia, "COBERTURA_INICIAL", 0.05)
+    monkeypatch.setattr(resiliencia, "COBERTURA_MINIMA", 0.05)
+
+
+class TransmisionFalsa:
+    """Función `transmitir` de un candidato: cuenta llamadas y registra cancelaciones."""
+
+    def __init__(self, fragmentos=("hola ", "mundo"), error=None, atascar=False):
+        self.fragmentos = fragmentos
+        self.error = error
+        self.atascar = atascar
+        self.llamadas = 0
+        self.cerradas = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, intento):
+        with self._lock:
+            self.llamadas += 1
+        intento.al_cancelar(self._cerrar)
+        return self._generar(intento)
+
+    def _cerrar(self):
+        with self._lock:
+            self.cerradas += 1
+
+    def _generar(self, intento):
+        if self.error:
+            raise self.error
+        if self.atascar:
+            intento.cancelado.wait(5)   # Colgado hasta que lo cancelen
+            return
+        yield from self.fragmentos
+
+
+def _texto(candidatos, **kwargs):
+    return "".join(transmitir_resiliente(candidatos, **kwargs))
+
+
+def test_failover_al_siguiente_candidato():
+    falla = TransmisionFalsa(error=RuntimeError("500"))
+    respaldo = TransmisionFalsa(fragmentos=("respaldo",))
+    texto = _texto([Candidato("openai", "a", falla), Candidato("anthropic", "b", respaldo)])
+
+    assert texto == "respaldo"
+    assert resiliencia.obtener_cortacircuitos("openai").fallos == 1
+    assert resiliencia.obtener_cortacircuitos("anthropic").fallos == 0
+
+
+def test_todos_fallan_lanza_error_llm():
+    with pytest.raises(ErrorLLM):
+        _texto([Candidato("openai", "a", TransmisionFalsa(error=RuntimeError("500")))])
+
+
+def test_cobertura_gana_el_respaldo_y_cancela_al_lento():
+    lento = TransmisionFalsa(atascar=True)
+    rapido = TransmisionFalsa(fragmentos=("rápido",))
+    texto = _texto([Candidato("openai", "a", lento), Candidato("anthropic", "b", rapido)])
+
+    assert texto == "rápido"
+    assert lento.cerradas == 1
+    # Cancelar al perdedor no cuenta como fallo de su proveedor
+    assert resiliencia.obtener_cortacircuitos("openai").fallos == 0
+
+
+def test_cobertura_repite_el_mismo_candidato_si_no_hay_otro():
+    transmision = TransmisionFalsa(atascar=True)
+    with pytest.raises(PlazoAgotado):
+        _texto([Candidato("openai", "a", transmision)], plazo=0.3)
+    assert transmision.llamadas == 2
+
+
+def test_candidato_no_repetible_no_se_cubre_con_su_proveedor():
+    gemini = TransmisionFalsa(atascar=True)
+    otro_gemini = TransmisionFalsa(fragmentos=("gemini",))
+    with pytest.raises(PlazoAgotado):
+        _texto([Candidato("gemini", "flash", gemini, repetible=False),
+                Candidato("gemini", "pro", otro_gemini)], plazo=0.3)
+    assert gemini.llamadas == 1
+    assert otro_gemini.llamadas == 0
+
+
+def test_candidato_no_repetible_se_cubre_con_otro_proveedor():
+    gemini = TransmisionFalsa(atascar=True)
+    respaldo = TransmisionFalsa(fragmentos=("openai",))
+    texto = _texto([Candidato("gemini", "flash", gemini, repetible=False),
+                    Candidato("openai", "a", respaldo)])
+    assert texto == "openai"
+    assert gemini.llamadas == 1
+
+
+def test_sin_cobertura_el_plazo_corta_la_llamada():
+    transmision = TransmisionFalsa(atascar=True)
+    with pytest.raises(PlazoAgotado):
+        _texto([Candidato("openai", "a", transmision)], plazo=0.2, cubrir=False)
+    assert transmision.llamadas == 1
+    assert transmision.cerradas == 1
+
+
+def test_cortacircuitos_abierto_rechaza_la_llamada():
+    for _ in range(resiliencia.FALLOS_PARA_ABRIR):
+        with pytest.raises(ErrorLLM):
+            _texto([Candidato("openai", "a", TransmisionFalsa(error=RuntimeError("503")))])
+
+    transmision = TransmisionFalsa()
+    with pytest.raises(ProveedorNoDisponible):
+        _texto([Candidato("openai", "a", transmision)])
+    assert transmision.llamadas == 0
+
+
+def test_cortacircuitos_semiabierto_deja_pasar_una_prueba():
+    interruptor = Cortacircuitos("openai", fallos_para_abrir=2, enfriamiento=0.05)
+    interruptor.fallo()
+    interruptor.fallo()
+    assert interruptor.estado == "abierto"
+    assert not interruptor.permitir()
+
+    threading.Event().wait(0.06)
+    assert interruptor.estado == "semiabierto"
+    assert interruptor.permitir()
+    assert not interruptor.permitir()   # Solo una prueba a la vez
+
+    interruptor.exito()
+    assert interruptor.estado == "cerrado"
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Prueba de Carga de los Tutores de Robótica
+Mide cuántos estudiantes simultáneos soportan el tutor de consola
+(tutor_robotica.py) y el tutor web (tutor_robotica_gradio.py) usando un
+modelo simulado, sin gastar tokens.
+
+Esta prueba:
+1. Arranca el servidor simulado compatible con OpenAI y Ollama (o usa uno externo)
+2. Crea N sesiones de estudiante con niveles e idiomas repartidos como en una clase
+3. Cada sesión hace varias preguntas seguidas (primeras preguntas y seguimientos)
+4. Repite para cada nivel de concurrencia y mide tiempo al primer token,
+   percentiles de latencia, tasa de error y memoria por sesión
+5. Guarda un reporte JSON y puede compararlo con uno anterior para detectar regresiones
+
+Uso:
+    python prueba_carga.py --concurrencias 1 5 10 25 50
+    python prueba_carga.py --objetivo gradio --tokens-por-segundo 30 --salida gradio.json
+    python prueba_carga.py --backend ollama --max-concurrentes-modelo 4
+    python prueba_carga.py --comparar reporte_anterior.json --tolerancia 0.2
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import argparse             # Para los argumentos de la línea de comandos
+import json                 # Reportes y archivo de preguntas
+import os                   # Para configurar los clientes con variables de entorno
+import platform             # Información del equipo en el reporte
+import random               # Para la mezcla de preguntas
+import sys                  # Para importar los tutores
+import tempfile             # Almacén vacío de respuestas precalculadas
+import threading            # Para arrancar todas las sesiones a la vez
+import time                 # Para medir tiempos
+import tracemalloc          # Para medir la memoria por sesión
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from servidor_llm_simulado import ConfiguracionSimulador, iniciar_en_hilo
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+RAIZ = Path(__file__).resolve().parents[1]
+DIR_TUTOR_CLI = RAIZ / "5_laboratorio_final_semana_1" / "tutor_robotica"
+DIR_TUTOR_GRADIO = RAIZ / "8_Asistente_IA" / "tutor_robotica_gradio"
+
+CONCURRENCIAS = [1, 5, 10, 25]
+PREGUNTAS_POR_SESION = 3
+SALIDA = "reporte_carga.json"
+
+# Reparto de estudiantes de una clase típica
+MEZCLA_NIVELES = {"preescolar": 0.15, "primaria": 0.35, "secundaria": 0.30, "preparatoria": 0.20}
+MEZCLA_IDIOMAS = {"Español": 0.8, "English": 0.2}
+
+# Preguntas además de EJEMPLOS_PREGUNTAS de cada tutor
+PREGUNTAS_ADICIONALES = {
+    "preescolar": ["¿Los robots duermen?", "¿Por qué el robot tiene luces?", "¿Cómo camina un robot?"],
+    "primaria": ["¿Cómo hago que un LED parpadee?", "¿Qué es un sensor de luz?", "¿Para qué sirve una batería?"],
+    "secundaria": ["¿Cómo leo un potenciómetro con Arduino?", "¿Qué es PWM?", "¿Cómo controlo un motor con un puente H?"],
+    "preparatoria": ["¿Cómo sintonizo un controlador PID?", "¿Qué diferencia hay entre I2C y SPI?",
+                     "¿Cómo implemento un filtro de Kalman simple?"],
+}
+
+# Preguntas de seguimiento: usan el historial de la conversación
+SEGUIMIENTOS = ["¿Me das otro ejemplo?", "¿Puedes explicarlo más sencillo?",
+                "¿Cómo lo conecto a un Arduino?", "¿Qué materiales necesito?"]
+
+# ============================================================================
+# SESIONES DE ESTUDIANTE
+# ============================================================================
+
+class ErrorRespuesta(Exception):
+    """El tutor devolvió un mensaje de error en lugar de una respuesta."""
+
+
+class SesionCLI:
+    """Un estudiante del tutor de consola (una instancia de TutorRobotica)."""
+
+    def __init__(self, modulo, backend, nivel: str, idioma: str, usar_cache: bool):
+        self.tutor = modulo.TutorRobotica(nivel, idioma, backend=backend,
+                                          usar_cache=usar_cache, silencioso=True)
+
+    def preguntar(self, pregunta: str) -> Iterator[str]:
+        return self.tutor.responder_stream(pregunta)
+
+
+class SesionGradio:
+    """Un estudiante del tutor web: su propio TutorRoboticaGradio e historial."""
+
+    def __init__(self, modulo, backend, nivel: str, idioma: str, usar_cache: bool):
+        self.tutor = modulo.TutorRoboticaGradio()
+        self.tutor.cambiar_nivel(nivel)
+        self.tutor.cambiar_idioma(idioma)
+        self.historial: List[Dict] = []
+
+    def preguntar(self, pregunta: str) -> Iterator[str]:
+        respuesta = ""
+        for respuesta in self.tutor.chat(pregunta, self.historial):
+            yield respuesta   # Gradio recibe el texto acumulado, no solo el fragmento nuevo
+        if respuesta.startswith("❌ Error"):
+            raise ErrorRespuesta(respuesta.splitlines()[0])
+        self.historial += [{"role": "user", "content": pregunta}, {"role": "assistant", "content": respuesta}]
+
+
+def preparar_objetivo(objetivo: str, url: str, usar_cache: bool):
+    """
+    Configura los clientes para usar el servidor simulado e importa el tutor.
+
+    Las variables de entorno se fijan antes de importar: los tutores y los
+    clientes de OpenAI y Ollama las leen al crearse.
+
+    Args:
+        objetivo (str): "cli" o "gradio"
+        url (str): URL base del servidor simulado
+        usar_cache (bool): Mantener la caché semántica y las respuestas precalculadas
+
+    Returns:
+        tuple: (módulo del tutor, clase de sesión)
+    """
+    os.environ["OPENAI_BASE_URL"] = f"{url}/v1"
+    os.environ["OPENAI_API_KEY"] = "sk-proj-simulado"
+    os.environ["OLLAMA_HOST"] = url
+    os.environ.setdefault("LLM_USO_DB", "0")   # Las llamadas simuladas no cuentan en el costo real
+    if not usar_cache:
+        os.environ["TUTOR_CACHE_SEMANTICO"] = "0"
+
+    directorio, nombre, sesion = {
+        "cli": (DIR_TUTOR_CLI, "tutor_robotica", SesionCLI),
+        "gradio": (DIR_TUTOR_GRADIO, "tutor_robotica_gradio", SesionGradio),
+    }[objetivo]
+    sys.path.insert(0, str(directorio))
+    modulo = __import__(nombre)
+
+    if not usar_cache:
+        # Sin respuestas precalculadas: cada pregunta llega al modelo
+        from comun.respuestas_precalculadas import AlmacenRespuestas
+        modulo.RESPUESTAS_PRECALCULADAS = AlmacenRespuestas(Path(tempfile.mkdtemp()) / "vacio.json")
+    return modulo, sesion
+
+# ============================================================================
+# MEZCLA DE PREGUNTAS
+# ============================================================================
+
+@dataclass
+class GuionSesion:
+    """Nivel, idioma y preguntas que hará un estudiante simulado."""
+    nivel: str
+    idioma: str
+    preguntas: List[str]
+
+
+def elegir(pesos: Dict[str, float], rng: random.Random) -> str:
+    return rng.choices(list(pesos), weights=list(pesos.values()))[0]
+
+
+def cargar_preguntas(ruta: Optional[str], ejemplos: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Banco de primeras preguntas por nivel.
+
+    Args:
+        ruta (str): Archivo JSONL con {"nivel": ..., "pregunta": ...} por línea
+            (por ejemplo, preguntas reales de una clase); None para usar las incluidas
+        ejemplos (dict): EJEMPLOS_PREGUNTAS del tutor
+
+    Returns:
+        dict: Preguntas por nivel
+    """
+    if ruta is None:
+        return {nivel: list(ejemplos.get(nivel, [])) + extra for nivel, extra in PREGUNTAS_ADICIONALES.items()}
+    banco: Dict[str, List[str]] = {}
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        for linea in archivo:
+            if linea.strip():
+                registro = json.loads(linea)
+                banco.setdefault(registro["nivel"], []).append(registro["pregunta"])
+    return banco
+
+
+def crear_guiones(cantidad: int, preguntas_por_sesion: int, banco: Dict[str, List[str]],
+                  rng: random.Random) -> List[GuionSesion]:
+    """Un guion por estudiante: una primera pregunta y después seguimientos o preguntas nuevas."""
+    mezcla = {nivel: peso for nivel, peso in MEZCLA_NIVELES.items() if banco.get(nivel)}
+    guiones = []
+    for _ in range(cantidad):
+        nivel = elegir(mezcla, rng)
+        preguntas = [rng.choice(banco[nivel])]
+        for _ in range(preguntas_por_sesion - 1):
+            preguntas.append(rng.choice(SEGUIMIENTOS) if rng.random() < 0.6 else rng.choice(banco[nivel]))
+        guiones.append(GuionSesion(nivel, elegir(MEZCLA_IDIOMAS, rng), preguntas))
+    return guiones
+
+# ============================================================================
+# MEDICIÓN
+# ============================================================================
+
+def percentiles(valores: List[float]) -> Dict[str, Optional[float]]:
+    """p50, p90, p95, p99 y máximo, con interpolación lineal."""
+    if not valores:
+        return {"p50": None, "p90": None, "p95": None, "p99": None, "max": None}
+    ordenados = sorted(valores)
+
+    def percentil(p: float) -> float:
+        posicion = (len(ordenados) - 1) * p
+        inferior = int(posicion)
+        superior = min(inferior + 1, len(ordenados) - 1)
+        return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+    return {"p50": round(percentil(0.50), 4), "p90": round(percentil(0.90), 4),
+            "p95": round(percentil(0.95), 4), "p99": round(percentil(0.99), 4),
+            "max": round(ordenados[-1], 4)}
+
+
+def ejecutar_sesion(sesion, guion: GuionSesion, salida: threading.Barrier, pausa: float,
+                    rng: random.Random) -> List[Dict]:
+    """Hace todas las preguntas del guion y devuelve una medición por pregunta."""
+    salida.wait()   # Todas las sesiones empiezan a la vez
+    mediciones = []
+    for pregunta in guion.preguntas:
+        inicio = time.perf_counter()
+        primer_token, caracteres, error = None, 0, None
+        try:
+            for texto in sesion.preguntar(pregunta):
+                if primer_token is None:
+                    primer_token = time.perf_counter() - inicio
+                caracteres = len(texto) if isinstance(sesion, SesionGradio) else caracteres + len(texto)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        mediciones.append({"nivel": guion.nivel, "primer_token": primer_token,
+                           "total": time.perf_counter() - inicio, "caracteres": caracteres, "error": error})
+        if pausa:
+            time.sleep(rng.expovariate(1 / pausa))   # Tiempo de lectura del estudiante
+    return mediciones
+
+
+def medir_concurrencia(concurrencia: int, crear_sesion, guiones: List[GuionSesion],
+                       pausa: float, medir_memoria: bool, semilla: int) -> Dict:
+    """
+    Ejecuta `concurrencia` sesiones simultáneas y resume sus mediciones.
+
+    Returns:
+        dict: Resultado de este nivel de concurrencia
+    """
+    if medir_memoria:
+        tracemalloc.start()
+    memoria_inicial = tracemalloc.get_traced_memory()[0] if medir_memoria else 0
+
+    sesiones = [crear_sesion(guion) for guion in guiones]
+    salida = threading.Barrier(concurrencia)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia, thread_name_prefix="estudiante") as executor:
+        futuros = [executor.submit(ejecutar_sesion, sesion, guion, salida, pausa, random.Random(semilla + i))
+                   for i, (sesion, guion) in enumerate(zip(sesiones, guiones))]
+        mediciones = [m for futuro in futuros for m in futuro.result()]
+    duracion = time.perf_counter() - inicio
+
+    memoria = {}
+    if medir_memoria:
+        # Las sesiones siguen vivas: la memoria retenida incluye su historial
+        actual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memoria = {"memoria_por_sesion_kb": round((actual - memoria_inicial) / concurrencia / 1024, 1),
+                   "memoria_pico_mb": round((pico - memoria_inicial) / 1024 / 1024, 2)}
+    del sesiones
+
+    correctas = [m for m in mediciones if m["error"] is None]
+    errores: Dict[str, int] = {}
+    for m in mediciones:
+        if m["error"]:
+            errores[m["error"][:120]] = errores.get(m["error"][:120], 0) + 1
+    return {
+        "concurrencia": concurrencia,
+        "preguntas": len(mediciones),
+        "duracion_s": round(duracion, 3),
+        "preguntas_por_s": round(len(mediciones) / duracion, 3) if duracion else None,
+        "primer_token_s": percentiles([m["primer_token"] for m in correctas if m["primer_token"] is not None]),
+        "latencia_total_s": percentiles([m["total"] for m in correctas]),
+        "tasa_error": round(1 - len(correctas) / len(mediciones), 4) if mediciones else 0.0,
+        "errores": errores,
+        **memoria,
+    }
+
+# ============================================================================
+# REPORTE Y REGRESIONES
+# ============================================================================
+
+def mostrar_resultado(resultado: Dict):
+    ttft, total = resultado["primer_token_s"], resultado["latencia_total_s"]
+    formato = lambda v: f"{v:7.3f}" if v is not None else "      -"
+    print(f"{resultado['concurrencia']:>5} | {formato(ttft['p50'])} {formato(ttft['p95'])} | "
+          f"{formato(total['p50'])} {formato(total['p95'])} {formato(total['p99'])} | "
+          f"{resultado['tasa_error']:6.1%} | {resultado['preguntas_por_s'] or 0:6.2f} | "
+          f"{resultado.get('memoria_por_sesion_kb', '-'):>8}")
+
+
+def comparar(actual: Dict, anterior: Dict, tolerancia: float) -> List[str]:
+    """
+    Compara dos reportes por nivel de concurrencia.
+
+    Se considera regresión que el p95 de primer token o de latencia total
+    crezca más que la tolerancia relativa, o que la tasa de error suba más
+    de un punto porcentual.
+
+    Returns:
+        list: Descripción de cada regresión encontrada
+    """
+    previos = {r["concurrencia"]: r for r in anterior.get("resultados", [])}
+    regresiones = []
+    for resultado in actual["resultados"]:
+        previo = previos.get(resultado["concurrencia"])
+        if not previo:
+            continue
+        for metrica in ("primer_token_s", "latencia_total_s"):
+            nuevo, viejo = resultado[metrica]["p95"], previo[metrica]["p95"]
+            if nuevo is not None and viejo and nuevo > viejo * (1 + tolerancia):
+                regresiones.append(f"c={resultado['concurrencia']}: {metrica} p95 {viejo:.3f}s → {nuevo:.3f}s")
+        if resultado["tasa_error"] > previo["tasa_error"] + 0.01:
+            regresiones.append(f"c={resultado['concurrencia']}: tasa de error "
+                               f"{previo['tasa_error']:.1%} → {resultado['tasa_error']:.1%}")
+    return regresiones
+
+# ============================================================================
+# FUNCIÓN PRINCIPAL
+# ============================================================================
+
+def main():
+    """Ejecuta la prueba de carga y guarda el reporte."""
+    parser = argparse.ArgumentParser(description="Prueba de carga de los tutores con un modelo simulado")
+    parser.add_argument("--objetivo", choices=["cli", "gradio"], default="cli", help="Tutor a probar")
+    parser.add_argument("--backend", choices=["openai", "ollama"], default="openai",
+                        help="Cliente del tutor de consola que se conecta al servidor simulado")
+    parser.add_argument("--concurrencias", nargs="+", type=int, default=CONCURRENCIAS)
+    parser.add_argument("--preguntas-por-sesion", type=int, default=PREGUNTAS_POR_SESION)
+    parser.add_argument("--pausa", type=float, default=0.0, help="Segundos medios entre preguntas de un estudiante")
+    parser.add_argument("--preguntas", help="Archivo JSONL con preguntas reales {nivel, pregunta}")
+    parser.add_argument("--con-cache", action="store_true",
+                        help="Mantener la caché semántica y las respuestas precalculadas")
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir memoria (tracemalloc añade sobrecarga)")
+    parser.add_argument("--semilla", type=int, default=42)
+    # Servidor simulado
+    parser.add_argument("--url", help="Usar un servidor simulado ya en marcha en lugar de arrancar uno")
+    parser.add_argument("--latencia-primer-token", type=float, default=ConfiguracionSimulador.latencia_primer_token)
+    parser.add_argument("--tokens-por-segundo", type=float, default=ConfiguracionSimulador.tokens_por_segundo)
+    parser.add_argument("--tokens-respuesta", type=int, default=ConfiguracionSimulador.tokens_respuesta)
+    parser.add_argument("--max-concurrentes-modelo", type=int, default=0, help="Capacidad del modelo (0 = sin límite)")
+    parser.add_argument("--tasa-error", type=float, default=0.0)
+    # Reporte
+    parser.add_argument("--salida", default=SALIDA, help="Archivo JSON del reporte")
+    parser.add_argument("--comparar", help="Reporte anterior con el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Empeoramiento relativo tolerado del p95")
+    args = parser.parse_args()
+
+    config = ConfiguracionSimulador(args.latencia_primer_token, args.tokens_por_segundo, args.tokens_respuesta,
+                                    args.max_concurrentes_modelo, args.tasa_error)
+    url = args.url
+    if url is None:
+        _, url = iniciar_en_hilo(config)
+    modulo, clase_sesion = preparar_objetivo(args.objetivo, url, args.con_cache)
+
+    backend = None
+    if args.objetivo == "cli":
+        from backends_llm import BackendOllama, BackendOpenAI
+        backend = BackendOpenAI() if args.backend == "openai" else BackendOllama(keep_alive="5m")
+
+    rng = random.Random(args.semilla)
+    banco = cargar_preguntas(args.preguntas, modulo.EJEMPLOS_PREGUNTAS)
+
+    print("📈 PRUEBA DE CARGA DEL TUTOR DE ROBÓTICA")
+    print("=" * 72)
+    print(f"Objetivo: {args.objetivo}" + (f" ({args.backend})" if backend else "") + f" | Servidor: {url}")
+    print(f"Modelo simulado: {config.latencia_primer_token}s al primer token, {config.tokens_por_segundo} tok/s, "
+          f"{config.tokens_respuesta} tokens, capacidad {config.max_concurrentes or '∞'}, errores {config.tasa_error:.0%}")
+    print("=" * 72)
+    print(" conc |  ttft p50   p95 | total p50   p95     p99 |  error |  preg/s | KB/sesión")
+
+    crear_sesion = lambda g: clase_sesion(modulo, backend, g.nivel, g.idioma, args.con_cache)
+    # Calentamiento: los prompts, índices y conexiones se crean una vez por proceso
+    # y no deben contarse en la primera medición
+    for guion in crear_guiones(1, 1, banco, random.Random(args.semilla)):
+        for _ in crear_sesion(guion).preguntar(guion.preguntas[0]):
+            pass
+
+    resultados = []
+    for concurrencia in args.concurrencias:
+        guiones = crear_guiones(concurrencia, args.preguntas_por_sesion, banco, rng)
+        resultado = medir_concurrencia(concurrencia, crear_sesion, guiones, args.pausa,
+                                       not args.sin_memoria, args.semilla)
+        resultados.append(resultado)
+        mostrar_resultado(resultado)
+
+    reporte = {
+        "formato": 1,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "objetivo": args.objetivo,
+        "backend": args.backend if backend else "openai",
+        "servidor_simulado": asdict(config) if args.url is None else {"url": url},
+        "preguntas_por_sesion": args.preguntas_por_sesion,
+        "pausa_s": args.pausa,
+        "con_cache": args.con_cache,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(reporte, archivo, ensure_ascii=False, indent=2)
+    print("=" * 72)
+    print(f"💾 Reporte guardado en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as archivo:
+            regresiones = comparar(reporte, json.load(archivo), args.tolerancia)
+        if regresiones:
+            print(f"❌ {len(regresiones)} regresiones respecto a {args.comparar}:")
+            for regresion in regresiones:
+                print(f"   • {regresion}")
+            exit(1)
+        print(f"✅ Sin regresiones respecto a {args.comparar}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⏹️ Prueba de carga interrumpida")
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Servidor de Modelo de Lenguaje Simulado
+Imita las APIs de OpenAI y de Ollama con tiempos configurables, para medir
+cuántos estudiantes soportan los tutores sin gastar tokens ni GPU.
+
+Este servidor:
+1. Responde POST /v1/chat/completions como OpenAI (SSE o JSON completo)
+2. Responde POST /api/chat y /api/generate como Ollama (NDJSON o JSON)
+3. Simula la latencia del primer token y la velocidad de generación
+4. Limita las generaciones simultáneas (capacidad de la GPU o del proveedor)
+5. Inyecta errores 503 con la probabilidad indicada
+6. Publica sus contadores en GET /estadisticas
+
+Solo usa la biblioteca estándar de Python.
+
+Uso:
+    python servidor_llm_simulado.py --puerto 11500 --tokens-por-segundo 40
+    OPENAI_BASE_URL=http://127.0.0.1:11500/v1 python tutor_robotica.py
+    OLLAMA_HOST=http://127.0.0.1:11500 python tutor_robotica_local.py
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import argparse             # Para los argumentos de la línea de comandos
+import json                 # Formato de las peticiones y respuestas
+import random               # Para inyectar errores
+import threading            # Para contar peticiones y limitar generaciones
+import time                 # Para simular la latencia
+import uuid                 # Identificadores de las respuestas estilo OpenAI
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Tuple
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+HOST = '127.0.0.1'
+PUERTO = 11500
+
+# Texto con el que se arman las respuestas simuladas (se repite si hace falta)
+TEXTO_BASE = (
+    "Un robot usa sensores para percibir su entorno, un controlador como Arduino "
+    "para decidir qué hacer y actuadores como motores o servos para moverse. "
+    "Por ejemplo, un sensor ultrasónico mide la distancia a un obstáculo y el "
+    "programa decide si el robot debe girar. Para empezar, conecta el sensor a "
+    "los pines digitales, lee la distancia en el loop y prueba con valores sencillos. "
+)
+
+
+@dataclass
+class ConfiguracionSimulador:
+    """
+    Comportamiento del modelo simulado.
+
+    Attributes:
+        latencia_primer_token (float): Segundos hasta el primer token
+        tokens_por_segundo (float): Velocidad de generación de cada respuesta
+        tokens_respuesta (int): Tokens de cada respuesta
+        max_concurrentes (int): Generaciones simultáneas; el resto espera turno
+            (0 = sin límite)
+        tasa_error (float): Probabilidad (0-1) de responder 503
+        modelo (str): Nombre de modelo que se anuncia
+    """
+    latencia_primer_token: float = 0.3
+    tokens_por_segundo: float = 50.0
+    tokens_respuesta: int = 150
+    max_concurrentes: int = 0
+    tasa_error: float = 0.0
+    modelo: str = "simulado"
+
+# ============================================================================
+# GENERACIÓN SIMULADA
+# ============================================================================
+
+def tokens_simulados(cantidad: int) -> Iterator[str]:
+    """Devuelve `cantidad` tokens (palabras con su espacio) del texto base."""
+    palabras = TEXTO_BASE.split()
+    for i in range(cantidad):
+        yield palabras[i % len(palabras)] + " "
+
+
+def tokens_prompt(mensajes) -> int:
+    """Aproximación de los tokens de entrada (~4 caracteres por token)."""
+    return sum(len(str(m.get("content", ""))) for m in mensajes) // 4 + 1
+
+
+class SimuladorLLM:
+    """
+    Estado compartido del servidor: configuración, capacidad y contadores.
+    """
+
+    def __init__(self, config: ConfiguracionSimulador):
+        self.config = config
+        capacidad = config.max_concurrentes
+        self._capacidad = threading.BoundedSemaphore(capacidad) if capacidad > 0 else None
+        self._lock = threading.Lock()
+        self.contadores = {"peticiones": 0, "activas": 0, "max_activas": 0,
+                           "errores_inyectados": 0, "tokens_generados": 0}
+
+    def falla(self) -> bool:
+        """Decide si la petición actual debe fallar."""
+        if random.random() < self.config.tasa_error:
+            self._sumar("errores_inyectados")
+            return True
+        return False
+
+    def generar(self) -> Iterator[str]:
+        """
+        Produce los tokens de una respuesta con la latencia configurada.
+
+        Espera turno si se alcanzó la capacidad, igual que un servidor real saturado.
+        """
+        if self._capacidad:
+            self._capacidad.acquire()
+        self._sumar("activas")
+        try:
+            time.sleep(self.config.latencia_primer_token)
+            pausa = 1.0 / self.config.tokens_por_segundo if self.config.tokens_por_segundo > 0 else 0.0
+            for i, token in enumerate(tokens_simulados(self.config.tokens_respuesta)):
+                if i:
+                    time.sleep(pausa)
+                self._sumar("tokens_generados")
+                yield token
+        finally:
+            self._sumar("activas", -1)
+            if self._capacidad:
+                self._capacidad.release()
+
+    def _sumar(self, contador: str, cantidad: int = 1):
+        with self._lock:
+            self.contadores[contador] += cantidad
+            if contador == "activas":
+                self.contadores["max_activas"] = max(self.contadores["max_activas"], self.contadores["activas"])
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            return {**self.contadores, "config": asdict(self.config)}
+
+# ============================================================================
+# MANEJADOR HTTP
+# ============================================================================
+
+class ManejadorLLM(BaseHTTPRequestHandler):
+    """
+    Atiende las rutas de OpenAI y Ollama. El simulador se comparte a través
+    del servidor (`self.server.simulador`).
+    """
+
+    protocol_version = "HTTP/1.1"   # Conexiones persistentes, como los clientes reales
+
+    def log_message(self, formato, *args):
+        pass   # Sin una línea por petición: ensuciaría la salida de la prueba de carga
+
+    @property
+    def simulador(self) -> SimuladorLLM:
+        return self.server.simulador
+
+    # ------------------------------------------------------------------ rutas
+
+    def do_GET(self):
+        modelo = self.simulador.config.modelo
+        if self.path.startswith("/v1/models"):
+            self._json(200, {"object": "list", "data": [{"id": modelo, "object": "model", "owned_by": "simulado"}]})
+        elif self.path.startswith("/api/tags"):
+            self._json(200, {"models": [{"name": modelo, "model": modelo, "size": 0}]})
+        elif self.path.startswith("/estadisticas"):
+            self._json(200, self.simulador.estadisticas())
+        elif self.path == "/":
+            self._texto(200, "Ollama is running")
+        else:
+            self._json(404, {"error": f"ruta no encontrada: {self.path}"})
+
+    def do_POST(self):
+        try:
+            cuerpo = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self._json(400, {"error": "JSON no válido"})
+            return
+        self.simulador._sumar("peticiones")
+
+        if self.simulador.falla():
+            self._json(503, {"error": {"message": "Servidor simulado sobrecargado", "type": "server_error"}})
+        elif self.path.startswith("/v1/chat/completions"):
+            self._openai(cuerpo)
+        elif self.path.startswith("/api/chat"):
+            self._ollama(cuerpo)
+        elif self.path.startswith("/api/generate"):
+            # Solo se usa para precalentar el modelo
+            self._json(200, {"model": cuerpo.get("model", ""), "response": "", "done": True})
+        else:
+            self._json(404, {"error": f"ruta no encontrada: {self.path}"})
+
+    # ---------------------------------------------------------------- OpenAI
+
+    def _openai(self, cuerpo: Dict):
+        id_respuesta = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        modelo = cuerpo.get("model", self.simulador.config.modelo)
+        prompt = tokens_prompt(cuerpo.get("messages", []))
+
+        def fragmento(delta: Dict, fin=None, **extra) -> Dict:
+            return {"id": id_respuesta, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": modelo, "choices": [{"index": 0, "delta": delta, "finish_reason": fin}], **extra}
+
+        if not cuerpo.get("stream"):
+            texto, generados = self._generar_completo()
+            self._json(200, {
+                "id": id_respuesta, "object": "chat.completion", "created": int(time.time()), "model": modelo,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": texto}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt, "completion_tokens": generados, "total_tokens": prompt + generados},
+            })
+            return
+
+        self._iniciar_stream("text/event-stream")
+        self._enviar_fragmento(f"data: {json.dumps(fragmento({'role': 'assistant', 'content': ''}))}\n\n")
+        generados = 0
+        for token in self.simulador.generar():
+            generados += 1
+            self._enviar_fragmento(f"data: {json.dumps(fragmento({'content': token}))}\n\n")
+        self._enviar_fragmento(f"data: {json.dumps(fragmento({}, 'stop'))}\n\n")
+        if cuerpo.get("stream_options", {}).get("include_usage"):
+            uso = {"prompt_tokens": prompt, "completion_tokens": generados, "total_tokens": prompt + generados}
+            final = fragmento({}, usage=uso)
+            final["choices"] = []
+            self._enviar_fragmento(f"data: {json.dumps(final)}\n\n")
+        self._enviar_fragmento("data: [DONE]\n\n")
+        self._terminar_stream()
+
+    # ---------------------------------------------------------------- Ollama
+
+    def _ollama(self, cuerpo: Dict):
+        modelo = cuerpo.get("model", self.simulador.config.modelo)
+        prompt = tokens_prompt(cuerpo.get("messages", []))
+        inicio = time.perf_counter_ns()
+
+        def final(generados: int, inicio_generacion: int) -> Dict:
+            ahora = time.perf_counter_ns()
+            return {"model": modelo, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "stop",
+                    "total_duration": ahora - inicio, "prompt_eval_count": prompt,
+                    "eval_count": generados, "eval_duration": ahora - inicio_generacion}
+
+        if cuerpo.get("stream") is False:
+            texto, generados = self._generar_completo()
+            respuesta = final(generados, inicio)
+            respuesta["message"]["content"] = texto
+            self._json(200, respuesta)
+            return
+
+        self._iniciar_stream("application/x-ndjson")
+        generados, inicio_generacion = 0, None
+        for token in self.simulador.generar():
+            inicio_generacion = inicio_generacion or time.perf_counter_ns()
+            generados += 1
+            linea = {"model": modelo, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                     "message": {"role": "assistant", "content": token}, "done": False}
+            self._enviar_fragmento(json.dumps(linea) + "\n")
+        self._enviar_fragmento(json.dumps(final(generados, inicio_generacion or inicio)) + "\n")
+        self._terminar_stream()
+
+    # --------------------------------------------------------------- utilidades
+
+    def _generar_completo(self) -> Tuple[str, int]:
+        tokens = list(self.simulador.generar())
+        return "".join(tokens), len(tokens)
+
+    def _json(self, estado: int, datos: Dict):
+        self._texto(estado, json.dumps(datos), "application/json")
+
+    def _texto(self, estado: int, texto: str, tipo: str = "text/plain"):
+        cuerpo = texto.encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _iniciar_stream(self, tipo: str):
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _enviar_fragmento(self, texto: str):
+        datos = texto.encode("utf-8")
+        self.wfile.write(f"{len(datos):X}\r\n".encode("ascii") + datos + b"\r\n")
+        self.wfile.flush()
+
+    def _terminar_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+# ============================================================================
+# ARRANQUE
+# ============================================================================
+
+def crear_servidor(config: ConfiguracionSimulador, host: str = HOST, puerto: int = PUERTO) -> ThreadingHTTPServer:
+    """
+    Crea el servidor HTTP (un hilo por conexión) sin arrancarlo.
+
+    Args:
+        config (ConfiguracionSimulador): Comportamiento del modelo simulado
+        host (str): Dirección donde escuchar
+        puerto (int): Puerto (0 = cualquiera libre)
+
+    Returns:
+        ThreadingHTTPServer: Servidor con el simulador en `servidor.simulador`
+    """
+    servidor = ThreadingHTTPServer((host, puerto), ManejadorLLM)
+    servidor.daemon_threads = True
+    servidor.simulador = SimuladorLLM(config)
+    return servidor
+
+
+def iniciar_en_hilo(config: ConfiguracionSimulador, host: str = HOST, puerto: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Arranca el servidor en un hilo de fondo (para las pruebas de carga).
+
+    Returns:
+        tuple: (servidor, URL base como http://127.0.0.1:puerto)
+    """
+    servidor = crear_servidor(config, host, puerto)
+    threading.Thread(target=servidor.serve_forever, daemon=True, name="llm-simulado").start()
+    return servidor, f"http://{host}:{servidor.server_address[1]}"
+
+
+def main():
+    """Arranca el servidor simulado en primer plano."""
+    parser = argparse.ArgumentParser(description="Servidor de modelo de lenguaje simulado (OpenAI y Ollama)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--latencia-primer-token", type=float, default=ConfiguracionSimulador.latencia_primer_token)
+    parser.add_argument("--tokens-por-segundo", type=float, default=ConfiguracionSimulador.tokens_por_segundo)
+    parser.add_argument("--tokens-respuesta", type=int, default=ConfiguracionSimulador.tokens_respuesta)
+    parser.add_argument("--max-concurrentes", type=int, default=0, help="Generaciones simultáneas (0 = sin límite)")
+    parser.add_argument("--tasa-error", type=float, default=0.0, help="Probabilidad de responder 503")
+    args = parser.parse_args()
+
+    config = ConfiguracionSimulador(args.latencia_primer_token, args.tokens_por_segundo, args.tokens_respuesta,
+                                    args.max_concurrentes, args.tasa_error)
+    servidor = crear_servidor(config, args.host, args.puerto)
+    print(f"🧪 Modelo simulado escuchando en http://{args.host}:{args.puerto}")
+    print(f"   OpenAI: http://{args.host}:{args.puerto}/v1  |  Ollama: http://{args.host}:{args.puerto}")
+    print(f"   {config}")
+    servidor.serve_forever()
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n👋 Servidor simulado detenido")
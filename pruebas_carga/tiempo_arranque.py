@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tiempo de Arranque de los Tutores y Asistentes
+Mide cuánto tarda en importarse cada punto de entrada del repositorio, en un
+proceso nuevo cada vez, para detectar importaciones pesadas o con efectos
+secundarios (clientes de API, validaciones que terminan el programa...).
+
+Este benchmark:
+1. Importa cada módulo en un intérprete limpio varias veces (mediana y máximo)
+2. Descuenta el arranque del propio intérprete
+3. Lista las importaciones más lentas de cada módulo (python -X importtime)
+4. Mide la recolección de pytest de la carpeta del tutor
+5. Guarda un reporte JSON y falla si algún módulo supera el límite indicado
+
+Uso:
+    python tiempo_arranque.py
+    python tiempo_arranque.py --repeticiones 10 --max-ms 150 --salida arranque.json
+"""
+
+# ============================================================================
+# IMPORTACIONES NECESARIAS
+# ============================================================================
+import argparse             # Para los argumentos de la línea de comandos
+import json                 # Formato del reporte
+import os                   # Para el entorno de los procesos hijos
+import platform             # Información del equipo en el reporte
+import statistics           # Mediana de las repeticiones
+import subprocess           # Cada medición en un intérprete nuevo
+import sys                  # Intérprete actual
+import time                 # Para medir tiempos
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+RAIZ = Path(__file__).resolve().parents[1]
+REPETICIONES = 5
+SALIDA = "reporte_arranque.json"
+TOP_IMPORTACIONES = 5       # Importaciones más lentas que se muestran por módulo
+
+# (carpeta relativa a la raíz, módulo a importar)
+PUNTOS_DE_ENTRADA = [
+    ("5_laboratorio_final_semana_1/tutor_robotica", "tutor_robotica"),
+    ("5_laboratorio_final_semana_1/tutor_robotica", "tutor_robotica_local"),
+    ("5_laboratorio_final_semana_1/tutor_robotica", "servidor_tutor"),
+    ("5_laboratorio_final_semana_1/tutor_robotica", "test_languages"),
+    ("5_laboratorio_final_semana_1/brochure_generator", "brochure_generator"),
+    ("8_Asistente_IA/tutor_robotica_gradio", "tutor_robotica_gradio"),
+    ("7_Intro_Gradio", "asistente_multi_modelo"),
+    ("9_Herramientas", "asistente_aerolinea"),
+    ("10_Asistentes_Multimodales", "tutor_robotica_multimodal"),
+    ("10_Asistentes_Multimodales", "tutor_robotica_simple"),
+]
+
+# Carpeta cuya recolección de pytest se mide
+CARPETA_PYTEST = "5_laboratorio_final_semana_1/tutor_robotica"
+
+# ============================================================================
+# MEDICIÓN
+# ============================================================================
+
+def ejecutar(comando: List[str], carpeta: Path) -> Tuple[float, subprocess.CompletedProcess]:
+    """Ejecuta un comando en un proceso nuevo y devuelve (milisegundos, resultado)."""
+    entorno = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    inicio = time.perf_counter()
+    resultado = subprocess.run(comando, cwd=carpeta, env=entorno, capture_output=True, text=True)
+    return (time.perf_counter() - inicio) * 1000, resultado
+
+
+def importaciones_lentas(stderr: str, modulo: str) -> Tuple[Optional[float], List[Dict]]:
+    """
+    Interpreta la salida de `python -X importtime`.
+
+    Returns:
+        tuple: (ms acumulados del módulo, importaciones de primer nivel más lentas)
+    """
+    # -X importtime escribe cada módulo después de sus dependencias: las líneas
+    # con sangría 3 previas a la del módulo son sus importaciones directas
+    total, hijos, pendientes = None, [], []
+    for linea in stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        try:
+            _, acumulado, nombre = linea[len("import time:"):].split("|")
+            acumulado_ms = int(acumulado) / 1000
+        except ValueError:
+            continue   # Encabezado de la tabla
+        sangria = len(nombre) - len(nombre.lstrip())
+        nombre = nombre.strip()
+        if sangria == 1:
+            if nombre == modulo:
+                total, hijos = acumulado_ms, pendientes
+            pendientes = []
+        elif sangria == 3:
+            pendientes.append({"modulo": nombre, "ms": round(acumulado_ms, 2)})
+    hijos.sort(key=lambda h: h["ms"], reverse=True)
+    return total, hijos[:TOP_IMPORTACIONES]
+
+
+def medir_modulo(carpeta: str, modulo: str, repeticiones: int, base_ms: float) -> Dict:
+    """Importa un módulo `repeticiones` veces, cada una en un intérprete limpio."""
+    ruta = RAIZ / carpeta
+    tiempos, importtime, error = [], None, None
+    for _ in range(repeticiones):
+        ms, resultado = ejecutar([sys.executable, "-X", "importtime", "-c", f"import {modulo}"], ruta)
+        if resultado.returncode != 0:
+            lineas = [l for l in resultado.stderr.splitlines() if not l.startswith("import time:")]
+            error = (lineas or [f"código de salida {resultado.returncode}"])[-1]
+            break
+        tiempos.append(ms - base_ms)
+        importtime = resultado.stderr
+
+    medicion = {"carpeta": carpeta, "modulo": modulo, "error": error}
+    if tiempos:
+        acumulado, lentas = importaciones_lentas(importtime, modulo)
+        medicion.update({
+            "mediana_ms": round(statistics.median(tiempos), 1),
+            "max_ms": round(max(tiempos), 1),
+            "importacion_ms": round(acumulado, 1) if acumulado is not None else None,
+            "mas_lentas": lentas,
+        })
+    return medicion
+
+
+def medir_pytest(repeticiones: int) -> Optional[Dict]:
+    """Tiempo de `pytest --collect-only` en la carpeta del tutor (si pytest está instalado)."""
+    comando = [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider"]
+    tiempos = []
+    for _ in range(repeticiones):
+        ms, resultado = ejecutar(comando, RAIZ / CARPETA_PYTEST)
+        if resultado.returncode not in (0, 5):   # 5 = no se encontraron tests
+            return {"carpeta": CARPETA_PYTEST, "error": (resultado.stdout.strip().splitlines() or ["?"])[-1]}
+        tiempos.append(ms)
+    return {"carpeta": CARPETA_PYTEST, "mediana_ms": round(statistics.median(tiempos), 1),
+            "max_ms": round(max(tiempos), 1), "error": None}
+
+# ============================================================================
+# FUNCIÓN PRINCIPAL
+# ============================================================================
+
+def main():
+    """Mide todos los puntos de entrada y guarda el reporte."""
+    parser = argparse.ArgumentParser(description="Benchmark del tiempo de importación de los puntos de entrada")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--modulos", nargs="+", help="Medir solo estos módulos")
+    parser.add_argument("--sin-pytest", action="store_true", help="No medir la recolección de pytest")
+    parser.add_argument("--max-ms", type=float, help="Terminar con código 1 si algún módulo supera este tiempo")
+    parser.add_argument("--salida", default=SALIDA, help="Archivo JSON del reporte")
+    args = parser.parse_args()
+
+    # Arranque del intérprete vacío, que se descuenta de cada medición
+    base_ms = statistics.median(ejecutar([sys.executable, "-c", "pass"], RAIZ)[0]
+                                for _ in range(args.repeticiones))
+
+    print("⏱️ TIEMPO DE ARRANQUE DE LOS PUNTOS DE ENTRADA")
+    print("=" * 72)
+    print(f"Intérprete vacío: {base_ms:.1f} ms (descontado) | {args.repeticiones} repeticiones")
+    print("=" * 72)
+
+    mediciones = []
+    for carpeta, modulo in PUNTOS_DE_ENTRADA:
+        if args.modulos and modulo not in args.modulos:
+            continue
+        medicion = medir_modulo(carpeta, modulo, args.repeticiones, base_ms)
+        mediciones.append(medicion)
+        if medicion["error"]:
+            print(f"❌ {modulo:<28} {medicion['error']}")
+            continue
+        lentas = ", ".join(f"{l['modulo']} {l['ms']:.0f}" for l in medicion["mas_lentas"][:3])
+        print(f"✓ {modulo:<28} {medicion['mediana_ms']:8.1f} ms (máx {medicion['max_ms']:.1f})  {lentas}")
+
+    pytest = None if args.sin_pytest else medir_pytest(args.repeticiones)
+    if pytest:
+        estado = pytest["error"] or f"{pytest['mediana_ms']:.1f} ms (máx {pytest['max_ms']:.1f}, con arranque)"
+        print(f"🧪 {'pytest --collect-only':<28} {estado}")
+
+    reporte = {
+        "formato": 1,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticiones": args.repeticiones,
+        "interprete_vacio_ms": round(base_ms, 1),
+        "modulos": mediciones,
+        "pytest": pytest,
+    }
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(reporte, archivo, ensure_ascii=False, indent=2)
+    print("=" * 72)
+    print(f"💾 Reporte guardado en {args.salida}")
+
+    if args.max_ms is not None:
+        lentos = [m["modulo"] for m in mediciones if m["error"] or m["mediana_ms"] > args.max_ms]
+        if lentos:
+            print(f"❌ Superan {args.max_ms:.0f} ms o fallan al importar: {', '.join(lentos)}")
+            exit(1)
+        print(f"✅ Todos los módulos se importan en menos de {args.max_ms:.0f} ms")
+
+if __name__ == "__main__":
+    main()